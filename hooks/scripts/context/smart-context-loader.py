@@ -91,6 +91,35 @@ def extract_keywords(prompt: str) -> list[str]:
     return found
 
 
+def run_git_query(
+    args: list[str],
+    depends: tuple[str, ...],
+    timeout: float = 1.0,
+) -> Optional[str]:
+    """
+    Run a read-only git query through the cross-invocation git cache.
+
+    Args:
+        args: git arguments (without "git")
+        depends: Repository state the output depends on ("head", "index", "worktree")
+        timeout: Seconds before the command is killed
+
+    Returns:
+        stdout, or None on failure
+    """
+    try:
+        # Imported lazily: only prompts with keywords reach git
+        from lib.core.git.cache import cached_run_git
+    except ImportError:
+        return run_command(["git"] + args, timeout=timeout)
+
+    exit_code, stdout, stderr = cached_run_git(args, depends=depends, timeout=timeout)
+    if exit_code == 0:
+        return stdout.strip()
+    debug(f"Command failed: git {args[0]} - {stderr.strip()}")
+    return None
+
+
 def run_command(args: list[str], timeout: float = 1.0) -> Optional[str]:
     """Run a command and return stdout, or None on failure."""
     try:
@@ -116,7 +145,7 @@ def find_relevant_files(keywords: list[str], limit: int = 5) -> list[str]:
         patterns = mappings.get(keyword, [])
         for pattern in patterns:
             # Use git ls-files with glob pattern
-            output = run_command(["git", "ls-files", f"*{pattern}*"])
+            output = run_git_query(["ls-files", f"*{pattern}*"], depends=("index",))
             if output:
                 files = [f for f in output.split("\n") if f and not f.startswith(".")]
                 relevant.update(files[:3])  # Limit per pattern
@@ -132,9 +161,9 @@ def get_recent_changes(keywords: list[str], limit: int = 5) -> list[str]:
     changes = []
 
     for keyword in keywords:
-        output = run_command([
-            "git", "log", "--oneline", "-3", f"--grep={keyword}"
-        ])
+        output = run_git_query(
+            ["log", "--oneline", "-3", f"--grep={keyword}"], depends=("head",)
+        )
         if output:
             commits = [c for c in output.split("\n") if c]
             changes.extend(commits)
@@ -162,10 +191,11 @@ def get_todos(keywords: list[str], limit: int = 3) -> list[str]:
         patterns = mappings.get(keyword, [])
         for pattern in patterns:
             # Use git grep for TODOs in relevant files
-            output = run_command([
-                "git", "grep", "-n", "-i", "TODO",
-                "--", f"*{pattern}*"
-            ], timeout=1.5)
+            output = run_git_query(
+                ["grep", "-n", "-i", "TODO", "--", f"*{pattern}*"],
+                depends=("index", "worktree"),
+                timeout=1.5,
+            )
 
             if output:
                 matches = [m for m in output.split("\n") if m]
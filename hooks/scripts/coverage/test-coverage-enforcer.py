@@ -4,10 +4,14 @@ Test coverage enforcer hook.
 
 Checks if new/changed source code has corresponding tests.
 Uses delta coverage approach - only checks new code, ignores legacy gaps.
+When a coverage report exists, also warns if the edited file's coverage
+is below the configured threshold: coverage of the lines changed since
+HEAD by default (coverage_delta_only), or the whole file's statement
+coverage from a precompiled summary when that setting is off.
 
 Exit codes:
   0 = Test file exists or file skipped
-  1 = Test file missing (non-blocking warning)
+  1 = Test file missing or coverage below threshold (non-blocking warning)
 """
 
 import json
@@ -22,7 +26,12 @@ sys.path.insert(0, DEVKIT_PATH)
 
 try:
     from lib.core.output import severity_badge, is_ci
-    from lib.core.config import is_extension_enabled, get_extension_option
+    from lib.core.config import (
+        is_extension_enabled,
+        get_extension_option,
+        get_setting,
+        get_performance_budget,
+    )
 except ImportError:
     # Fallback if core library not available
     def severity_badge(level: str, plain_text: bool = False) -> str:
@@ -44,6 +53,12 @@ except ImportError:
     def get_extension_option(name: str, option: str, default=None, settings=None):
         return default
 
+    def get_setting(key: str, default=None, settings=None):
+        return default
+
+    def get_performance_budget() -> int:
+        return 2000
+
 
 # Debug mode
 DEBUG = os.environ.get("CLAUDE_HOOK_DEBUG") == "1"
@@ -155,16 +170,61 @@ def should_skip_file(file_path: str) -> bool:
     return False
 
 
+def find_indexed_test_file(source_file: str) -> Optional[str]:
+    """
+    Look up a source file's test in the repository-wide test index.
+
+    Args:
+        source_file: Path to source file
+
+    Returns:
+        Nearest test file of the source's package, or None if the index
+        is unavailable or has no qualifying test
+    """
+    try:
+        # Imported lazily: skipped files never need git
+        from lib.core.testmap import load_test_index
+    except ImportError:
+        return None
+
+    index = load_test_index()
+    if index is None:
+        return None
+
+    tests = index.find(source_file)
+    return tests[0] if tests else None
+
+
+def record_written_test_file(file_path: str) -> None:
+    """Add a just-written test file to the test index."""
+    try:
+        from lib.core.testmap import record_test_file
+    except ImportError:
+        return
+
+    if record_test_file(file_path):
+        debug(f"Recorded test file: {file_path}")
+
+
 def find_test_file(source_file: str) -> Optional[str]:
     """
     Find corresponding test file for a source file.
 
+    Uses the repository-wide test index when available (one lookup, and
+    finds tests outside the standard locations); when it has no test for
+    the source's package, probes the SOURCE_PATTERNS locations.
+
     Args:
         source_file: Path to source file
 
     Returns:
         Path to test file if found, None otherwise
     """
+    test_file = find_indexed_test_file(source_file)
+    if test_file is not None:
+        debug(f"Test index lookup: {test_file}")
+        return test_file
+
     path = Path(source_file)
     ext = path.suffix
     name = path.stem
@@ -212,6 +272,105 @@ def get_suggested_test_path(source_file: str) -> str:
     return pattern.format(name=name, dir=str(path.parent))
 
 
+def changed_line_coverage(report_path: str, file_path: str) -> Optional[float]:
+    """
+    Coverage of the edited file's lines changed since HEAD.
+
+    The report's index is only rebuilt inline within the latency budget
+    (as for the whole-file summary); while it is stale and being rebuilt
+    in the background, or when the report predates the edit (its line
+    numbers are those of the old file), the check is skipped.
+
+    Args:
+        report_path: Coverage report to read
+        file_path: Absolute path of the edited file
+
+    Returns:
+        Percentage, or None if no changed line holds a statement, the
+        file isn't in the report, or the report can't be used yet
+    """
+    try:
+        from lib.core.coverage import calculate_changed_line_coverage
+        from lib.core.coverage.index import open_coverage_index
+        from lib.core.coverage.summary import refresh_within_budget
+    except ImportError:
+        return None
+
+    try:
+        if os.path.getmtime(report_path) < os.path.getmtime(file_path):
+            debug(f"Coverage report is older than {file_path}")
+            return None
+    except OSError:
+        return None
+
+    index = open_coverage_index(report_path, build=False)
+    if index is None and refresh_within_budget(report_path):
+        index = open_coverage_index(report_path, build=False)
+    if index is None:
+        debug("Coverage index not available yet")
+        return None
+
+    result = calculate_changed_line_coverage(index, files=[file_path])
+    if result is None or not result.files:
+        debug(f"No changed-line coverage for {file_path}")
+        return None
+    if result.total_lines == 0:
+        debug(f"No changed statements in {file_path}")
+        return None
+    return result.coverage
+
+
+def check_file_coverage(file_path: str) -> Optional[tuple[float, float, str]]:
+    """
+    Check the edited file's coverage against the configured threshold.
+
+    With coverage_delta_only (the default), only the lines changed since
+    HEAD count, so legacy gaps elsewhere in the file don't warn. Otherwise
+    the file's statement coverage is read from the report's precompiled
+    per-file summary, so the lookup cost doesn't grow with report size;
+    a stale summary for a large report is rebuilt in the background and
+    the check is skipped this time.
+
+    Args:
+        file_path: Absolute path of the edited file
+
+    Returns:
+        (coverage, threshold, description) if below threshold, None otherwise
+    """
+    try:
+        # Imported lazily: most edits exit before reaching this point
+        from lib.core.coverage import find_coverage_report
+        from lib.core.coverage.summary import get_file_summary
+    except ImportError:
+        return None
+
+    report_path = get_extension_option("test-coverage-enforcer", "coverageReport", default=None)
+    if report_path is None:
+        found = find_coverage_report()
+        if found is None:
+            debug("No coverage report found")
+            return None
+        report_path = found[0]
+
+    threshold = get_setting("coverage_threshold", 80.0)
+
+    if get_setting("coverage_delta_only", True):
+        coverage = changed_line_coverage(report_path, file_path)
+        description = "changed-line coverage"
+    else:
+        summary = get_file_summary(report_path, file_path, budget_ms=get_performance_budget())
+        if summary is None:
+            debug(f"No coverage summary for {file_path}")
+            return None
+        coverage = summary.statement_coverage
+        description = "statement coverage"
+
+    if coverage is None:
+        return None
+    debug(f"{description} for {file_path}: {coverage:.1f}% (threshold {threshold}%)")
+    return (coverage, threshold, description) if coverage < threshold else None
+
+
 def main() -> None:
     """Main entry point for the hook."""
     # Check if extension is enabled
@@ -249,26 +408,46 @@ def main() -> None:
 
     # Check if file should be skipped
     if should_skip_file(file_path):
+        if tool_name == "Write":
+            record_written_test_file(file_path)
         sys.exit(0)
 
     # Look for corresponding test file
     test_file = find_test_file(file_path)
 
+    relative_path = file_path
+    try:
+        relative_path = str(Path(file_path).relative_to(Path.cwd()))
+    except ValueError:
+        pass
+
     if test_file is not None:
         debug(f"Test file found: {test_file}")
-        sys.exit(0)
+
+        below = check_file_coverage(file_path)
+        if below is None:
+            sys.exit(0)
+
+        coverage, threshold, description = below
+        try:
+            test_file = str(Path(test_file).relative_to(Path.cwd()))
+        except ValueError:
+            pass
+
+        badge = severity_badge("low", plain_text=is_ci())
+        warning_msg = (
+            f"{badge} {relative_path} has {coverage:.1f}% {description} "
+            f"(threshold {threshold:g}%)\n\n"
+            f"Suggestion: Add tests to {test_file}"
+        )
+        print(json.dumps({"warning": warning_msg}))
+        sys.exit(1)
 
     # No test file found - emit warning
     suggestion = get_suggested_test_path(file_path)
 
     # Format output
     badge = severity_badge("medium", plain_text=is_ci())
-    relative_path = file_path
-    try:
-        relative_path = str(Path(file_path).relative_to(Path.cwd()))
-    except ValueError:
-        pass
-
     warning_msg = (
         f"{badge} No test file found for {relative_path}\n\n"
         f"Suggestion: Create test file at {suggestion}"
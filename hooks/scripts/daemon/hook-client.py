@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Hook client shim.
+
+Forwards a hook invocation to the warm devkit hook daemon and replays its
+stdout, stderr and exit code. When the daemon is not running, the hook
+script runs in this process exactly as if it had been invoked directly.
+Once the daemon has accepted the request the hook is never run again
+here: if no result comes back, the failure is reported on stderr and the
+shim exits 0.
+
+Usage:
+  python3 hook-client.py <hook-name> < hook-input.json
+
+Exit codes:
+  Same as the target hook (0 = allow, 2 = block, 3 = prompt modified, ...)
+"""
+
+import io
+import os
+import runpy
+import sys
+from pathlib import Path
+
+# Add lib to path for imports
+DEVKIT_PATH = os.environ.get("CLAUDE_DEVKIT", str(Path.home() / ".claude" / "devkit"))
+sys.path.insert(0, DEVKIT_PATH)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+try:
+    from lib.core.daemon import HookDaemonError, call_hook, resolve_hook_script
+except ImportError:
+    class HookDaemonError(Exception):
+        pass
+
+    def call_hook(name, stdin_text, socket_path=None, timeout=None):
+        return None
+
+    def resolve_hook_script(name, scripts_dir=None):
+        for path in sorted(Path(scripts_dir).glob(f"*/{name}.py")):
+            return path
+        return None
+
+
+def main() -> None:
+    """Main entry point for the shim."""
+    if len(sys.argv) < 2:
+        print("Usage: hook-client.py <hook-name>", file=sys.stderr)
+        sys.exit(0)  # Fail open
+
+    name = sys.argv[1]
+    stdin_text = sys.stdin.read()
+
+    try:
+        response = call_hook(name, stdin_text)
+    except HookDaemonError as e:
+        print(f"[hook-client] {e}", file=sys.stderr)
+        sys.exit(0)  # Fail open; the hook may already have run
+
+    if response is not None:
+        exit_code, stdout, stderr = response
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.exit(exit_code)
+
+    # Daemon unavailable: run the hook script in-process
+    script = resolve_hook_script(name, SCRIPTS_DIR)
+    if script is None:
+        print(f"[hook-client] Unknown hook: {name}", file=sys.stderr)
+        sys.exit(0)  # Fail open
+
+    sys.stdin = io.StringIO(stdin_text)
+    sys.argv = [str(script)]
+    runpy.run_path(str(script), run_name="__main__")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Hook daemon server.
+
+Keeps lib.core imported and all devkit hook scripts compiled, and serves
+hook invocations from hook-client.py over a Unix socket. Each invocation
+runs in a forked child, so exit codes and output are unchanged.
+
+Usage:
+  python3 hook-server.py              # Run in the foreground
+  python3 hook-server.py --daemonize  # Start in the background (no-op if running)
+  python3 hook-server.py --status     # Exit 0 if running, 1 otherwise
+
+Environment:
+  CLAUDE_DEVKIT_HOOK_SOCKET: Socket path (default ~/.claude/devkit-hookd.sock)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add devkit root to path (this file lives in hooks/scripts/daemon/)
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR.parent.parent))
+
+from lib.core.daemon import daemonize, get_socket_path, is_running, serve
+
+
+def main() -> None:
+    """Main entry point for the server."""
+    parser = argparse.ArgumentParser(description="Devkit warm hook daemon")
+    parser.add_argument("--socket", type=Path, default=None, help="Socket path")
+    parser.add_argument("--daemonize", action="store_true", help="Run in background")
+    parser.add_argument("--status", action="store_true", help="Check if running")
+    args = parser.parse_args()
+
+    socket_path = args.socket or get_socket_path()
+
+    if args.status:
+        running = is_running(socket_path)
+        print("running" if running else "stopped")
+        sys.exit(0 if running else 1)
+
+    if is_running(socket_path):
+        sys.exit(0)
+
+    if args.daemonize:
+        daemonize(lambda: serve(socket_path, SCRIPTS_DIR))
+        sys.exit(0)
+
+    serve(socket_path, SCRIPTS_DIR)
+
+
+if __name__ == "__main__":
+    main()
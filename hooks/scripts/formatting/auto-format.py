@@ -3,6 +3,15 @@
 Auto-Format Hook (PostToolUse)
 Runs formatters after Edit/Write operations based on file extension.
 
+Formatting goes to persistent formatter processes when available (a
+prettier server holding the project's prettier, blackd for Python) and
+falls back to the formatter command line; Python files are formatted
+with black's library API in-process when the importable black is the
+`black` on PATH. Edits
+arriving within a short window are formatted together in one call, and
+content already known to be formatted skips the formatter entirely
+(lib.core.formatting).
+
 Exit Codes:
   0 = Success (or no action needed)
   1 = Formatter error (non-blocking, informational)
@@ -14,25 +23,23 @@ import sys
 import subprocess
 import os
 
+# Add lib to path for imports
+DEVKIT_PATH = os.environ.get(
+    'CLAUDE_DEVKIT', os.path.join(os.path.expanduser('~'), '.claude', 'devkit')
+)
+sys.path.insert(0, DEVKIT_PATH)
+
 DEBUG = os.environ.get('CLAUDE_HOOK_DEBUG', '0') == '1'
 
 def debug(msg):
     if DEBUG:
         print(f"[auto-format] {msg}", file=sys.stderr)
 
-# Handle malformed JSON gracefully
 try:
-    data = json.load(sys.stdin)
-except json.JSONDecodeError:
-    debug("Malformed JSON input")
-    sys.exit(0)
-
-file_path = data.get('tool_input', {}).get('file_path', '')
-debug(f"Checking file: {file_path}")
-
-if not file_path or not os.path.exists(file_path):
-    debug("File path empty or doesn't exist")
-    sys.exit(0)
+    from lib.core.config import get_extension_option
+except ImportError:
+    def get_extension_option(name, option, default=None, settings=None):
+        return default
 
 formatters = {
     '.ts': ['npx', 'prettier', '--write'],
@@ -42,9 +49,9 @@ formatters = {
     '.py': ['black', '--line-length', '100'],
 }
 
-ext = os.path.splitext(file_path)[1]
-if ext in formatters:
-    debug(f"Found formatter for extension: {ext}")
+def format_in_subprocess(file_path):
+    """Run the file's formatter command directly. Returns the exit code."""
+    ext = os.path.splitext(file_path)[1]
     try:
         result = subprocess.run(
             formatters[ext] + [file_path],
@@ -57,15 +64,76 @@ if ext in formatters:
             print(f"Formatter failed for {file_path}", file=sys.stderr)
             if result.stderr:
                 print(result.stderr, file=sys.stderr)
-            sys.exit(1)
+            return 1
         print(f"✓ Formatted {file_path}")
     except FileNotFoundError:
         debug("Formatter not installed")
-        pass
     except subprocess.TimeoutExpired:
         debug("Formatter timed out")
         print(f"Formatter timeout for {file_path}", file=sys.stderr)
-else:
+    return 0
+
+def format_with_backends(file_path):
+    """
+    Format through lib.core.formatting (daemons and batching).
+
+    Returns the exit code, or None if the devkit lib isn't available.
+    """
+    try:
+        from lib.core.formatting import (
+            DEFAULT_BATCH_MS, DEFAULT_BLACKD_URL, KNOWN_FORMATTED, FormatOptions, format_file
+        )
+    except ImportError:
+        return None
+
+    options = FormatOptions(
+        daemons=get_extension_option('auto-format', 'daemons', True),
+        blackd_url=get_extension_option('auto-format', 'blackdUrl', DEFAULT_BLACKD_URL),
+        in_process=get_extension_option('auto-format', 'inProcess', True),
+        skip_known=get_extension_option('auto-format', 'skipFormatted', True),
+    )
+    batch_ms = get_extension_option('auto-format', 'batchWindowMs', DEFAULT_BATCH_MS)
+    result = format_file(file_path, options, batch_ms)
+    if result is None:
+        return 0
+
+    debug(f"Format status: {result.status} {result.message}".rstrip())
+    if result.message == KNOWN_FORMATTED:
+        return 0  # Formatter skipped; nothing to report
+    if result.status == 'failed':
+        print(f"Formatter failed for {file_path}", file=sys.stderr)
+        if result.message:
+            print(result.message, file=sys.stderr)
+        return 1
+    if result.status == 'timeout':
+        print(f"Formatter timeout for {file_path}", file=sys.stderr)
+    elif result.status == 'missing':
+        debug("Formatter not installed")
+    else:
+        print(f"✓ Formatted {file_path}")
+    return 0
+
+# Handle malformed JSON gracefully
+try:
+    data = json.load(sys.stdin)
+except json.JSONDecodeError:
+    debug("Malformed JSON input")
+    sys.exit(0)
+
+file_path = data.get('tool_input', {}).get('file_path', '')
+debug(f"Checking file: {file_path}")
+
+if not file_path or not os.path.exists(file_path):
+    debug("File path empty or doesn't exist")
+    sys.exit(0)
+
+ext = os.path.splitext(file_path)[1]
+if ext not in formatters:
     debug(f"No formatter configured for extension: {ext}")
+    sys.exit(0)
 
-sys.exit(0)
+debug(f"Found formatter for extension: {ext}")
+exit_code = format_with_backends(file_path)
+if exit_code is None:
+    exit_code = format_in_subprocess(file_path)
+sys.exit(exit_code)
@@ -0,0 +1,164 @@
+#!/usr/bin/env node
+/**
+ * Persistent prettier server for the auto-format hook.
+ *
+ * Keeps the project's own prettier loaded so each format request skips
+ * npx resolution and Node startup. Speaks the devkit daemon framing
+ * (4-byte big-endian length + JSON, see lib/core/daemon.py) on a Unix
+ * socket:
+ *
+ *   {"op": "ping"}            -> {"ok": true}
+ *   {"files": [path, ...]}    -> {"results": [{"file", "changed"} or {"file", "error"}]}
+ *
+ * Files are formatted in place with the project's prettier config and
+ * .prettierignore, re-read on every request. The server replies
+ * {"stale": true} and exits once the installed prettier changes, and exits
+ * after an idle timeout.
+ *
+ * Usage: node prettier-server.js <socket path> <project root>
+ */
+'use strict';
+
+const fs = require('fs');
+const net = require('net');
+const path = require('path');
+
+const IDLE_TIMEOUT_MS = 30 * 60 * 1000;
+
+const [socketPath, root] = process.argv.slice(2);
+
+let packageJson;
+let prettier;
+try {
+  packageJson = require.resolve('prettier/package.json', { paths: [root] });
+  prettier = require(path.dirname(packageJson));
+} catch (e) {
+  process.exit(3); // No local prettier: the hook keeps using npx
+}
+const loadedMtime = fs.statSync(packageJson).mtimeMs;
+
+function isStale() {
+  try {
+    return fs.statSync(packageJson).mtimeMs !== loadedMtime;
+  } catch (e) {
+    return true;
+  }
+}
+
+async function formatFile(file) {
+  const info = await prettier.getFileInfo(file, {
+    ignorePath: path.join(root, '.prettierignore'),
+  });
+  if (info.ignored || !info.inferredParser) {
+    return { file, changed: false };
+  }
+  const text = fs.readFileSync(file, 'utf8');
+  const options = (await prettier.resolveConfig(file, { editorconfig: true })) || {};
+  const formatted = await prettier.format(text, { ...options, filepath: file });
+  if (formatted === text) {
+    return { file, changed: false };
+  }
+  fs.writeFileSync(file, formatted);
+  return { file, changed: true };
+}
+
+async function handle(payload) {
+  if (payload.op === 'ping') {
+    return { ok: true, pid: process.pid };
+  }
+  if (isStale()) {
+    return { stale: true };
+  }
+  // resolveConfig caches config files for the life of the process; drop
+  // the cache so .prettierrc / package.json edits apply to this request
+  await prettier.clearConfigCache();
+  const results = [];
+  for (const file of payload.files || []) {
+    try {
+      results.push(await formatFile(file));
+    } catch (e) {
+      results.push({ file, error: String((e && e.message) || e) });
+    }
+  }
+  return { results };
+}
+
+function send(socket, response, done) {
+  const data = Buffer.from(JSON.stringify(response), 'utf8');
+  const header = Buffer.alloc(4);
+  header.writeUInt32BE(data.length, 0);
+  socket.end(Buffer.concat([header, data]), done);
+}
+
+let idleTimer;
+function resetIdleTimer() {
+  clearTimeout(idleTimer);
+  idleTimer = setTimeout(shutdown, IDLE_TIMEOUT_MS);
+}
+
+const server = net.createServer((socket) => {
+  resetIdleTimer();
+  let buffer = Buffer.alloc(0);
+  let received = false;
+  socket.on('data', async (chunk) => {
+    buffer = Buffer.concat([buffer, chunk]);
+    if (received || buffer.length < 4 || buffer.length < 4 + buffer.readUInt32BE(0)) {
+      return;
+    }
+    received = true; // One request per connection
+    const length = buffer.readUInt32BE(0);
+    let payload;
+    try {
+      payload = JSON.parse(buffer.subarray(4, 4 + length).toString('utf8'));
+    } catch (e) {
+      socket.destroy();
+      return;
+    }
+    const response = await handle(payload);
+    send(socket, response, () => {
+      if (response.stale) {
+        shutdown();
+      }
+    });
+  });
+  socket.on('error', () => {});
+});
+
+function shutdown() {
+  server.close();
+  try {
+    fs.unlinkSync(socketPath);
+  } catch (e) {
+    // Already removed
+  }
+  process.exit(0);
+}
+
+process.on('SIGTERM', shutdown);
+process.on('SIGINT', shutdown);
+
+// Another server owns a live socket: exit instead of replacing it
+server.on('error', () => process.exit(0));
+
+function listen() {
+  server.listen(socketPath, () => {
+    fs.chmodSync(socketPath, 0o600);
+    resetIdleTimer();
+  });
+}
+
+if (fs.existsSync(socketPath)) {
+  // Remove a stale socket left by a crashed server
+  const probe = net.connect(socketPath);
+  probe.on('connect', () => process.exit(0));
+  probe.on('error', () => {
+    try {
+      fs.unlinkSync(socketPath);
+    } catch (e) {
+      // Raced with another server
+    }
+    listen();
+  });
+} else {
+  listen();
+}
@@ -2,10 +2,24 @@
 """
 Test-On-Change Hook (PostToolUse)
 Runs tests after source file edits. Skips test files to avoid infinite loops.
+For Python files, only the test modules that (transitively) import the
+edited file are run.
+
+By default tests run in a background runner (lib.core.runner) that
+coalesces edits within a quiet window into one run and cancels runs made
+stale by newer edits; the hook returns immediately and reports the last
+finished run's result on its next invocation. Set the extension option
+"background" to false to run tests synchronously.
+
+Python test outcomes are cached by the content of the edited file, its
+transitive imports and the selected tests (lib.core.testcache): a no-op
+edit, or one that restores a tested state, reports the recorded result
+instead of running tests.
 
 Exit Codes:
   0 = Success (or no action needed)
-  1 = Tests failed (non-blocking warning)
+  1 = Tests failed (non-blocking warning; in background mode, the last
+      finished run failed)
 
 Debug: Set CLAUDE_HOOK_DEBUG=1 to enable verbose logging
 """
@@ -14,12 +28,106 @@ import sys
 import subprocess
 import os
 
+# Add lib to path for imports
+DEVKIT_PATH = os.environ.get(
+    'CLAUDE_DEVKIT', os.path.join(os.path.expanduser('~'), '.claude', 'devkit')
+)
+sys.path.insert(0, DEVKIT_PATH)
+
 DEBUG = os.environ.get('CLAUDE_HOOK_DEBUG', '0') == '1'
 
 def debug(msg):
     if DEBUG:
         print(f"[test-on-change] {msg}", file=sys.stderr)
 
+try:
+    from lib.core.config import get_extension_option
+except ImportError:
+    def get_extension_option(name, option, default=None, settings=None):
+        return default
+
+def get_background_runner():
+    """The project's background test runner, or None to run synchronously."""
+    if not get_extension_option('test-on-change', 'background', True):
+        return None
+    try:
+        from lib.core.runner import DEFAULT_QUIET_MS, DEFAULT_TIMEOUT, get_runner
+    except ImportError:
+        return None
+    return get_runner(
+        quiet_ms=get_extension_option('test-on-change', 'quietWindowMs', DEFAULT_QUIET_MS),
+        timeout=get_extension_option('test-on-change', 'timeout', DEFAULT_TIMEOUT),
+        warm_worker=get_extension_option('test-on-change', 'warmWorker', False),
+        result_cache=get_extension_option('test-on-change', 'resultCache', True),
+    )
+
+def report_background_result(runner):
+    """Report the last finished background run, once. Returns the exit code."""
+    status = runner.take_result()
+    if status is None:
+        return 0
+    files = ', '.join(status.files)
+    if status.ok:
+        print(f"✓ Tests passing for {files}")
+        return 0
+    if status.state == 'timeout':
+        print(f"Test timeout for {files}", file=sys.stderr)
+        return 0
+    if status.state == 'error':
+        print(f"Could not run tests: {status.output}", file=sys.stderr)
+        return 0
+    print(f"⚠️ Tests failed after editing {files}", file=sys.stderr)
+    if status.output:
+        print(status.output, file=sys.stderr)
+    return 1
+
+PYTEST_CMD = ['pytest', '-x', '-q', '--tb=short']
+
+# Output lines kept with a cached result
+OUTPUT_TAIL_LINES = 40
+
+def select_python_tests(file_path):
+    """The edit's Impact (affected tests), or None to run the whole suite."""
+    try:
+        # Imported lazily: only Python edits need the import graph
+        from lib.core.impact import analyze_impact
+    except ImportError:
+        return None
+    try:
+        return analyze_impact(file_path)
+    except Exception as e:
+        debug(f"Import graph unavailable: {e}")
+        return None
+
+def get_result_key(impact, test_cmd):
+    """Result cache key for a test run, or None if results aren't cached."""
+    if impact is None or not get_extension_option('test-on-change', 'resultCache', True):
+        return None
+    try:
+        from lib.core.testcache import result_key
+    except ImportError:
+        return None
+    try:
+        return result_key(impact.graph, impact.file, impact.tests, test_cmd)
+    except Exception as e:
+        debug(f"Result cache unavailable: {e}")
+        return None
+
+def report_cached_result(key, file_path):
+    """Report a recorded outcome. Returns the exit code, or None on a miss."""
+    from lib.core.testcache import get_cached_result
+
+    cached = get_cached_result(key)
+    if cached is None:
+        return None
+    if cached.passed:
+        print(f"✓ Tests passing for {file_path} (cached result)")
+        return 0
+    print(f"⚠️ Tests failed after editing {file_path} (cached result)", file=sys.stderr)
+    if cached.output:
+        print(cached.output, file=sys.stderr)
+    return 1
+
 # Handle malformed JSON gracefully
 try:
     data = json.load(sys.stdin)
@@ -49,12 +157,42 @@ path_parts = file_path.split(os.sep)
 if '.claude' in path_parts:
     sys.exit(0)
 
-# Determine test command
+# Determine tests to run
+impact = None
+tests = None
 if ext == '.py':
-    test_cmd = ['pytest', '-x', '-q', '--tb=short']
+    impact = select_python_tests(file_path)
+    if impact is not None:
+        tests = impact.paths
+        debug(f"Affected tests: {tests}")
+
+runner = get_background_runner()
+exit_code = report_background_result(runner) if runner is not None else 0
+
+if tests == []:
+    debug("No tests import this file")
+    sys.exit(exit_code)
+
+if ext == '.py':
+    test_cmd = PYTEST_CMD + (tests or [])
 else:
     test_cmd = ['npm', 'test', '--', '--bail', '--findRelatedTests', file_path]
 
+result_key = get_result_key(impact, test_cmd)
+if result_key is not None:
+    cached_exit = report_cached_result(result_key, file_path)
+    if cached_exit is not None:
+        sys.exit(max(exit_code, cached_exit))
+
+if runner is not None:
+    from lib.core.runner import RunRequest
+
+    kind = 'pytest' if ext == '.py' else 'jest'
+    runner.submit(RunRequest(kind=kind, file=file_path, targets=tests))
+    started = runner.spawn()
+    debug(f"Queued tests (runner started: {started})")
+    sys.exit(exit_code)
+
 try:
     result = subprocess.run(
         test_cmd,
@@ -62,6 +200,14 @@ try:
         timeout=60,
         cwd=os.getcwd()
     )
+    if result_key is not None:
+        from lib.core.testcache import RECORDED_EXIT_CODES, record_result
+
+        # Interrupted runs and usage/internal errors say nothing about the tests
+        if result.returncode in RECORDED_EXIT_CODES:
+            output = (result.stdout + result.stderr).decode('utf-8', 'replace')
+            tail = '\n'.join(output.splitlines()[-OUTPUT_TAIL_LINES:])
+            record_result(result_key, result.returncode == 0, tail)
     if result.returncode != 0:
         print(f"⚠️ Tests failed after editing {file_path}", file=sys.stderr)
         sys.exit(1)
@@ -6,63 +6,85 @@ This module provides shared primitives for hooks, commands, and agents:
 - coverage: Coverage report parsing (Jest, Pytest)
 - output: Markdown formatting, spinners, colors
 - config: Settings loading, CI detection
-"""
-
-from lib.core.git import (
-    get_diff,
-    get_blame,
-    get_recent_commits,
-    get_changed_files,
-    get_file_history,
-    FileDiff,
-    BlameInfo,
-    Commit,
-)
 
-from lib.core.coverage import (
-    parse_jest_coverage,
-    parse_pytest_coverage,
-    get_uncovered_lines,
-    calculate_delta_coverage,
-    CoverageReport,
-)
+Submodules are imported lazily on first attribute access, so a hook that
+only needs lib.core.config doesn't pay for git, coverage or output.
+"""
 
-from lib.core.output import (
-    spinner,
-    severity_badge,
-    markdown_table,
-    is_ci,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from lib.core.config import (
-    load_settings,
-    get_setting,
-    Settings,
-)
+if TYPE_CHECKING:
+    from lib.core.git import (
+        get_diff,
+        get_blame,
+        get_recent_commits,
+        get_changed_files,
+        get_file_history,
+        FileDiff,
+        BlameInfo,
+        Commit,
+    )
+    from lib.core.coverage import (
+        parse_jest_coverage,
+        parse_pytest_coverage,
+        get_uncovered_lines,
+        calculate_delta_coverage,
+        CoverageReport,
+    )
+    from lib.core.output import (
+        spinner,
+        severity_badge,
+        markdown_table,
+        is_ci,
+    )
+    from lib.core.config import (
+        load_settings,
+        get_setting,
+        Settings,
+    )
 
-__all__ = [
+# Public name -> defining submodule
+_LAZY_ATTRS = {
     # git
-    "get_diff",
-    "get_blame",
-    "get_recent_commits",
-    "get_changed_files",
-    "get_file_history",
-    "FileDiff",
-    "BlameInfo",
-    "Commit",
+    "get_diff": "lib.core.git",
+    "get_blame": "lib.core.git",
+    "get_recent_commits": "lib.core.git",
+    "get_changed_files": "lib.core.git",
+    "get_file_history": "lib.core.git",
+    "FileDiff": "lib.core.git",
+    "BlameInfo": "lib.core.git",
+    "Commit": "lib.core.git",
     # coverage
-    "parse_jest_coverage",
-    "parse_pytest_coverage",
-    "get_uncovered_lines",
-    "calculate_delta_coverage",
-    "CoverageReport",
+    "parse_jest_coverage": "lib.core.coverage",
+    "parse_pytest_coverage": "lib.core.coverage",
+    "get_uncovered_lines": "lib.core.coverage",
+    "calculate_delta_coverage": "lib.core.coverage",
+    "CoverageReport": "lib.core.coverage",
     # output
-    "spinner",
-    "severity_badge",
-    "markdown_table",
-    "is_ci",
+    "spinner": "lib.core.output",
+    "severity_badge": "lib.core.output",
+    "markdown_table": "lib.core.output",
+    "is_ci": "lib.core.output",
     # config
-    "load_settings",
-    "get_setting",
-    "Settings",
-]
+    "load_settings": "lib.core.config",
+    "get_setting": "lib.core.config",
+    "Settings": "lib.core.config",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve public names from their submodule on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Cache so __getattr__ isn't hit again
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,207 @@
+"""
+Size-capped on-disk cache shared across hook and command invocations.
+
+Each hook runs in a fresh process, so anything worth reusing between calls
+has to live on disk. DiskCache stores one marshal file per entry under the
+devkit cache directory (see lib.core.config.get_cache_dir), uses file mtime
+as the LRU clock, and evicts least-recently-used entries once a namespace
+grows past its byte budget.
+
+Values must be marshal-able (str, bytes, numbers, lists, tuples, dicts,
+sets, None). Callers are expected to put everything that invalidates an
+entry (commit, file stat, ...) into its key.
+"""
+
+import marshal
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from lib.core.config import get_cache_dir
+
+
+CACHE_VERSION = 1
+
+# Default byte budget per namespace
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Eviction trims a namespace to this fraction of its budget, so a full
+# cache doesn't rescan the directory on every write
+EVICT_TO = 0.8
+
+ENTRY_SUFFIX = ".marshal"
+
+_MISSING = object()
+
+
+def _entry_name(key: str) -> str:
+    """Map a key to a 64-bit file name (the key itself is verified on read)."""
+    data = key.encode("utf-8", "surrogateescape")
+    return f"{zlib.crc32(data):08x}{zlib.adler32(data):08x}{ENTRY_SUFFIX}"
+
+
+class DiskCache:
+    """
+    One namespace of marshal-file entries with LRU eviction by total size.
+
+    All operations are best effort: I/O errors behave like cache misses,
+    and concurrent writers of the same key simply race to the last replace.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / _entry_name(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value stored under key, or default."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                version, stored_key, value = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return default
+
+        if version != CACHE_VERSION or stored_key != key:
+            return default
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key (atomic replace), evicting old entries if needed."""
+        path = self._path(key)
+        try:
+            data = marshal.dumps((CACHE_VERSION, key, value))
+        except ValueError:
+            return  # Not marshal-able
+
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove one entry."""
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def size(self) -> int:
+        """Total bytes used by entries."""
+        return sum(st.st_size for _, st in self._stats())
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith(ENTRY_SUFFIX)]
+        except OSError:
+            return []
+
+    def _stats(self) -> list[tuple[os.DirEntry, os.stat_result]]:
+        stats = []
+        for entry in self._entries():
+            try:
+                stats.append((entry, entry.stat()))
+            except OSError:
+                pass  # Evicted by another process
+        return stats
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries once over budget."""
+        stats = self._stats()
+        total = sum(st.st_size for _, st in stats)
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * EVICT_TO
+        for entry, st in sorted(stats, key=lambda item: item[1].st_mtime_ns):
+            if total <= target:
+                break
+            try:
+                os.unlink(entry.path)
+                total -= st.st_size
+            except OSError:
+                pass
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file.
+
+    Blocks until acquired, unless nonblocking=True, in which case
+    acquire() returns False while another process holds the lock. Where
+    fcntl is unavailable (Windows) the lock is a no-op: acquire() always
+    succeeds, so callers that need mutual exclusion check for POSIX first.
+    """
+
+    def __init__(self, path: Path, nonblocking: bool = False):
+        self._path = path
+        self._nonblocking = nonblocking
+        self._file = None
+
+    def acquire(self) -> bool:
+        self._file = open(self._path, "a")
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        flags = fcntl.LOCK_EX | (fcntl.LOCK_NB if self._nonblocking else 0)
+        try:
+            fcntl.flock(self._file, flags)
+        except BlockingIOError:
+            self.release()
+            return False
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()  # Releases the lock
+            self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def get_disk_cache(namespace: str, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[DiskCache]:
+    """
+    Get the cache for a namespace (a subdirectory of the devkit cache dir).
+
+    Returns:
+        DiskCache, or None if caching is disabled via CLAUDE_DEVKIT_NO_CACHE
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    return DiskCache(cache_dir / namespace, max_bytes=max_bytes)
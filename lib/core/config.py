@@ -5,10 +5,13 @@ Provides:
 - Settings loading from ~/.claude/settings.json
 - Type-safe settings access
 - Default value handling
+- Settings snapshots cached per process and on disk (keyed by mtime and size)
 """
 
 import json
+import marshal
 import os
+import zlib
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional
@@ -66,6 +69,46 @@ class Settings:
 
         return settings
 
+    def to_snapshot(self) -> tuple:
+        """Convert to a tuple of primitives (marshal-safe)."""
+        extensions = {
+            name: (ext.enabled, ext.options)
+            for name, ext in self.extensions.items()
+        }
+        return (
+            extensions,
+            self.debug,
+            self.quiet,
+            self.performance_budget_ms,
+            self.coverage_threshold,
+            self.coverage_delta_only,
+            self.security_patterns,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple) -> "Settings":
+        """Create Settings from a to_snapshot() tuple."""
+        extensions, debug, quiet, budget, threshold, delta_only, patterns = snapshot
+        return cls(
+            extensions={
+                name: ExtensionSettings(enabled=enabled, options=options)
+                for name, (enabled, options) in extensions.items()
+            },
+            debug=debug,
+            quiet=quiet,
+            performance_budget_ms=budget,
+            coverage_threshold=threshold,
+            coverage_delta_only=delta_only,
+            security_patterns=patterns,
+        )
+
+
+# Bump when the snapshot layout changes
+SNAPSHOT_VERSION = 1
+
+# Parsed settings per path: path -> (mtime_ns, size, Settings)
+_settings_cache: dict[str, tuple[int, int, Settings]] = {}
+
 
 def get_settings_path() -> Path:
     """Get path to Claude Code settings.json."""
@@ -79,10 +122,77 @@ def get_settings_path() -> Path:
     return home / ".claude" / "settings.json"
 
 
+def get_cache_dir() -> Optional[Path]:
+    """
+    Get the devkit cache directory.
+
+    Returns:
+        Cache directory path, or None if caching is disabled
+        via CLAUDE_DEVKIT_NO_CACHE
+    """
+    if os.getenv("CLAUDE_DEVKIT_NO_CACHE"):
+        return None
+
+    custom_path = os.getenv("CLAUDE_DEVKIT_CACHE_DIR")
+    if custom_path:
+        return Path(custom_path)
+
+    return Path.home() / ".claude" / "cache" / "devkit"
+
+
+def _snapshot_path(path: Path) -> Optional[Path]:
+    """Get on-disk snapshot path for a settings file."""
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+
+    digest = zlib.crc32(str(path).encode("utf-8"))
+    return cache_dir / f"settings-{digest:08x}.marshal"
+
+
+def _read_snapshot(path: Path, mtime_ns: int, size: int) -> Optional[Settings]:
+    """Load a pre-digested settings snapshot if it matches the file stat."""
+    snapshot_path = _snapshot_path(path)
+    if snapshot_path is None:
+        return None
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            version, snap_path, snap_mtime, snap_size, snapshot = marshal.load(f)
+        expected = (SNAPSHOT_VERSION, str(path), mtime_ns, size)
+        if (version, snap_path, snap_mtime, snap_size) != expected:
+            return None
+        return Settings.from_snapshot(snapshot)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_snapshot(path: Path, mtime_ns: int, size: int, settings: Settings) -> None:
+    """Persist a settings snapshot (best effort, atomic replace)."""
+    snapshot_path = _snapshot_path(path)
+    if snapshot_path is None:
+        return
+
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            marshal.dump(
+                (SNAPSHOT_VERSION, str(path), mtime_ns, size, settings.to_snapshot()), f
+            )
+        os.replace(tmp_path, snapshot_path)
+    except (OSError, ValueError):
+        pass  # Unmarshallable option values or read-only cache dir
+
+
 def load_settings(path: Optional[Path] = None) -> Settings:
     """
     Load settings from settings.json.
 
+    Parsed settings are cached per process and in a pre-digested on-disk
+    snapshot; both are invalidated when the file's mtime or size changes.
+    The returned object is shared, so treat it as read-only.
+
     Args:
         path: Optional custom path. If None, uses default location.
 
@@ -93,12 +203,33 @@ def load_settings(path: Optional[Path] = None) -> Settings:
         path = get_settings_path()
 
     try:
-        with open(path, "r") as f:
-            data = json.load(f)
-        return Settings.from_dict(data)
-    except (FileNotFoundError, json.JSONDecodeError):
+        st = os.stat(path)
+    except OSError:
         return Settings()
 
+    key = str(path)
+    cached = _settings_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    settings = _read_snapshot(Path(path), st.st_mtime_ns, st.st_size)
+    if settings is None:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            settings = Settings.from_dict(data)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return Settings()
+        _write_snapshot(Path(path), st.st_mtime_ns, st.st_size, settings)
+
+    _settings_cache[key] = (st.st_mtime_ns, st.st_size, settings)
+    return settings
+
+
+def clear_settings_cache() -> None:
+    """Drop all in-process settings snapshots."""
+    _settings_cache.clear()
+
 
 def get_setting(key: str, default: Any = None, settings: Optional[Settings] = None) -> Any:
     """
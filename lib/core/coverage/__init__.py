@@ -0,0 +1,1046 @@
+"""
+Coverage report parsing for devkit extensions.
+
+Supports:
+- Jest coverage (JSON format)
+- Pytest coverage (JSON format via pytest-cov)
+- LCOV (lcov.info) and Cobertura XML
+- Delta coverage calculation
+- Changed-line coverage from git diff hunks
+- Merging sharded reports (lib.core.coverage.merge)
+
+Reports are read incrementally (JSON via lib.core.coverage.stream, LCOV
+line by line, Cobertura with iterparse): one file's entry is decoded at a
+time, and parsing can stop once requested files have been found.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union
+
+from lib.core.coverage.index import (
+    CoverageIndex,
+    PathTrie,
+    lookup_keys,
+    normalize_path,
+    open_coverage_index,
+)
+from lib.core.coverage.stream import JsonObjectStream, first_key
+from lib.core.lines import LineSet
+
+
+# First keys of a coverage.py JSON report
+PYTEST_TOP_LEVEL_KEYS = ("meta", "files", "totals")
+
+# Record prefixes an lcov.info file can start with
+LCOV_FIRST_RECORDS = ("TN:", "SF:")
+
+# Cobertura branch summary, e.g. condition-coverage="50% (1/2)"
+_CONDITION_COVERAGE = re.compile(r"\((\d+)/(\d+)\)")
+
+
+@dataclass
+class FileCoverage:
+    """Coverage data for a single file."""
+    path: str
+    statements_total: int
+    statements_covered: int
+    branches_total: int
+    branches_covered: int
+    functions_total: int
+    functions_covered: int
+    lines_covered: LineSet = field(default_factory=LineSet)
+    lines_uncovered: LineSet = field(default_factory=LineSet)
+
+    def __post_init__(self):
+        # Accept plain lists from callers; store bitmaps
+        if not isinstance(self.lines_covered, LineSet):
+            self.lines_covered = LineSet(self.lines_covered)
+        if not isinstance(self.lines_uncovered, LineSet):
+            self.lines_uncovered = LineSet(self.lines_uncovered)
+
+    @property
+    def line_coverage(self) -> float:
+        """Calculate line coverage percentage."""
+        total = len(self.lines_covered) + len(self.lines_uncovered)
+        if total == 0:
+            return 100.0
+        return (len(self.lines_covered) / total) * 100
+
+    @property
+    def statement_coverage(self) -> float:
+        """Calculate statement coverage percentage."""
+        if self.statements_total == 0:
+            return 100.0
+        return (self.statements_covered / self.statements_total) * 100
+
+
+@dataclass
+class CoverageReport:
+    """Complete coverage report."""
+    files: dict[str, FileCoverage] = field(default_factory=dict)
+    total_statements: int = 0
+    covered_statements: int = 0
+    total_branches: int = 0
+    covered_branches: int = 0
+    total_functions: int = 0
+    covered_functions: int = 0
+    _trie: Optional[tuple[int, PathTrie]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def find(self, file: str) -> Optional[FileCoverage]:
+        """
+        Look up a file by exact path, then by longest path-suffix match.
+
+        An exact match may be absolute or relative to the working directory
+        (see lookup_keys); a suffix match must be unique and cover at least
+        two path components. The suffix trie is built on first use and
+        rebuilt if files change.
+        """
+        for key in [file] + lookup_keys(file):
+            cov = self.files.get(key)
+            if cov is not None:
+                return cov
+
+        if self._trie is None or self._trie[0] != len(self.files):
+            trie = PathTrie()
+            for i, path in enumerate(self.files):
+                trie.insert(path, i)
+            self._trie = (len(self.files), trie)
+
+        i = self._trie[1].find(file)
+        if i is None:
+            return None
+        return next(islice(self.files.values(), i, None), None)
+
+    @property
+    def line_coverage(self) -> float:
+        """Overall line coverage percentage."""
+        if self.total_statements == 0:
+            return 100.0
+        return (self.covered_statements / self.total_statements) * 100
+
+    @property
+    def branch_coverage(self) -> float:
+        """Overall branch coverage percentage."""
+        if self.total_branches == 0:
+            return 100.0
+        return (self.covered_branches / self.total_branches) * 100
+
+    @property
+    def function_coverage(self) -> float:
+        """Overall function coverage percentage."""
+        if self.total_functions == 0:
+            return 100.0
+        return (self.covered_functions / self.total_functions) * 100
+
+
+def _jest_file_coverage(file_path: str, file_data: dict) -> FileCoverage:
+    """Build FileCoverage from one coverage-final.json entry."""
+    # Extract statement data
+    stmt_map = file_data.get("statementMap", {})
+    stmt_hits = file_data.get("s", {})
+
+    statements_total = len(stmt_map)
+    statements_covered = sum(1 for v in stmt_hits.values() if v > 0)
+
+    # Extract branch data
+    branch_map = file_data.get("branchMap", {})
+    branch_hits = file_data.get("b", {})
+
+    branches_total = sum(len(b.get("locations", [])) for b in branch_map.values())
+    branches_covered = sum(sum(1 for h in hits if h > 0) for hits in branch_hits.values())
+
+    # Extract function data
+    fn_map = file_data.get("fnMap", {})
+    fn_hits = file_data.get("f", {})
+
+    functions_total = len(fn_map)
+    functions_covered = sum(1 for v in fn_hits.values() if v > 0)
+
+    # Build line coverage sets (a line can hold covered and uncovered statements)
+    lines_covered = LineSet()
+    lines_uncovered = LineSet()
+
+    for stmt_id, stmt in stmt_map.items():
+        start_line = stmt.get("start", {}).get("line", 0)
+        if stmt_hits.get(stmt_id, 0) > 0:
+            lines_covered.add(start_line)
+        else:
+            lines_uncovered.add(start_line)
+
+    return FileCoverage(
+        path=file_path,
+        statements_total=statements_total,
+        statements_covered=statements_covered,
+        branches_total=branches_total,
+        branches_covered=branches_covered,
+        functions_total=functions_total,
+        functions_covered=functions_covered,
+        lines_covered=lines_covered,
+        lines_uncovered=lines_uncovered,
+    )
+
+
+def _pytest_file_coverage(file_path: str, file_data: dict) -> FileCoverage:
+    """Build FileCoverage from one coverage.py JSON "files" entry."""
+    summary = file_data.get("summary", {})
+
+    return FileCoverage(
+        path=file_path,
+        # Pytest uses different field names
+        statements_total=summary.get("num_statements", 0),
+        statements_covered=summary.get("covered_lines", 0),
+        branches_total=summary.get("num_branches", 0),
+        branches_covered=summary.get("covered_branches", 0),
+        functions_total=0,  # Pytest doesn't track function coverage separately
+        functions_covered=0,
+        lines_covered=file_data.get("executed_lines", []),
+        lines_uncovered=file_data.get("missing_lines", []),
+    )
+
+
+class _PathFilter:
+    """
+    Matches report paths against requested files.
+
+    A report path matches a requested file when it is equal to it or ends
+    with it on a path boundary (reports usually hold absolute paths).
+    """
+
+    def __init__(self, files: Iterable[str]):
+        self.wanted = {normalize_path(f) for f in files}
+        self.remaining = set(self.wanted)
+
+    def match(self, path: str) -> bool:
+        path = normalize_path(path)
+        matched = [w for w in self.wanted if path == w or path.endswith("/" + w)]
+        self.remaining.difference_update(matched)
+        return bool(matched)
+
+    @property
+    def done(self) -> bool:
+        return not self.remaining
+
+
+def _iter_report_entries(
+    json_path: str,
+    section: Optional[str],
+    files: Optional[Iterable[str]],
+) -> Iterator[tuple[str, dict]]:
+    """
+    Stream (path, entry) pairs from a report's file map.
+
+    Args:
+        json_path: Report path
+        section: Top-level key holding the file map, or None if the file
+            map is the top-level object itself
+        files: If given, only yield these files and stop once all are found
+    """
+    path_filter = _PathFilter(files) if files is not None else None
+    if path_filter is not None and path_filter.done:
+        return
+
+    with open(json_path, "r") as f:
+        stream = JsonObjectStream(f)
+
+        members = stream.members()
+        if section is not None:
+            for key, _ in members:
+                if key == section:
+                    members = stream.members()
+                    break
+            else:
+                return
+
+        for file_path, _ in members:
+            if path_filter is not None and not path_filter.match(file_path):
+                continue  # Decoded and discarded by the stream
+            file_data = stream.value()
+            if isinstance(file_data, dict):
+                yield file_path, file_data
+            if path_filter is not None and path_filter.done:
+                return
+
+
+def iter_jest_coverage(
+    json_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Iterator[FileCoverage]:
+    """
+    Stream FileCoverage entries from a Jest coverage-final.json.
+
+    Only one file's entry is decoded at a time, so memory stays flat for
+    very large reports. Test files are skipped.
+
+    Args:
+        json_path: Path to coverage-final.json or coverage-summary.json
+        files: If given, only these files (exact or path-suffix match);
+            reading stops once all of them have been found
+
+    Yields:
+        FileCoverage per source file, in report order
+
+    Raises:
+        OSError, ValueError: if the file can't be read or isn't valid JSON
+    """
+    for file_path, file_data in _iter_report_entries(json_path, None, files):
+        if file_path == "total":
+            continue
+
+        # Skip test files
+        if "test" in file_path.lower() or "spec" in file_path.lower():
+            continue
+
+        yield _jest_file_coverage(file_path, file_data)
+
+
+def iter_pytest_coverage(
+    json_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Iterator[FileCoverage]:
+    """
+    Stream FileCoverage entries from a coverage.py JSON report.
+
+    Args:
+        json_path: Path to coverage.json
+        files: If given, only these files (exact or path-suffix match);
+            reading stops once all of them have been found
+
+    Yields:
+        FileCoverage per source file, in report order
+
+    Raises:
+        OSError, ValueError: if the file can't be read or isn't valid JSON
+    """
+    for file_path, file_data in _iter_report_entries(json_path, "files", files):
+        # Skip test files
+        if "test" in file_path.lower():
+            continue
+
+        yield _pytest_file_coverage(file_path, file_data)
+
+
+def _lcov_file_coverage(file_path: str, records: list[str]) -> FileCoverage:
+    """Build FileCoverage from the records of one LCOV SF: section."""
+    lines_covered = LineSet()
+    lines_uncovered = LineSet()
+    branches_total = branches_covered = 0
+    functions = {}
+    summary = {}
+
+    for record in records:
+        kind, _, data = record.partition(":")
+        if kind == "DA":
+            line, hits = data.split(",")[:2]
+            if int(hits) > 0:
+                lines_covered.add(int(line))
+            else:
+                lines_uncovered.add(int(line))
+        elif kind == "BRDA":
+            taken = data.rsplit(",", 1)[-1]
+            branches_total += 1
+            if taken not in ("-", "0"):
+                branches_covered += 1
+        elif kind == "FN":
+            functions.setdefault(data.split(",", 1)[-1], 0)
+        elif kind == "FNDA":
+            hits, name = data.split(",", 1)
+            functions[name] = functions.get(name, 0) + int(hits)
+        elif kind in ("BRF", "BRH", "FNF", "FNH"):
+            summary[kind] = int(data)
+
+    # Prefer per-item records; fall back to the summary counts
+    if not branches_total:
+        branches_total = summary.get("BRF", 0)
+        branches_covered = summary.get("BRH", 0)
+    functions_total = len(functions) or summary.get("FNF", 0)
+    if functions:
+        functions_covered = sum(1 for hits in functions.values() if hits > 0)
+    else:
+        functions_covered = summary.get("FNH", 0)
+
+    # A line can't be both: LCOV has one DA record per line
+    return FileCoverage(
+        path=file_path,
+        statements_total=len(lines_covered) + len(lines_uncovered),
+        statements_covered=len(lines_covered),
+        branches_total=branches_total,
+        branches_covered=branches_covered,
+        functions_total=functions_total,
+        functions_covered=functions_covered,
+        lines_covered=lines_covered,
+        lines_uncovered=lines_uncovered,
+    )
+
+
+def iter_lcov_coverage(
+    lcov_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Iterator[FileCoverage]:
+    """
+    Stream FileCoverage entries from an LCOV tracefile.
+
+    The file is read line by line and only one SF: section is held at a
+    time. Sections of files that weren't requested are skipped without
+    parsing. Test files are skipped.
+
+    Args:
+        lcov_path: Path to lcov.info
+        files: If given, only these files (exact or path-suffix match);
+            reading stops once all of them have been found
+
+    Yields:
+        FileCoverage per source file, in report order
+
+    Raises:
+        OSError, ValueError: if the file can't be read or is malformed
+    """
+    path_filter = _PathFilter(files) if files is not None else None
+    if path_filter is not None and path_filter.done:
+        return
+
+    with open(lcov_path, "r") as f:
+        file_path = None
+        records = None  # None while skipping a section
+        for line in f:
+            line = line.strip()
+            if line.startswith("SF:"):
+                file_path = line[3:]
+                lowered = file_path.lower()
+                wanted = "test" not in lowered and "spec" not in lowered
+                if wanted and path_filter is not None:
+                    wanted = path_filter.match(file_path)
+                records = [] if wanted else None
+            elif line == "end_of_record":
+                if records is not None:
+                    yield _lcov_file_coverage(file_path, records)
+                    if path_filter is not None and path_filter.done:
+                        return
+                file_path = records = None
+            elif records is not None and line:
+                records.append(line)
+
+
+def _cobertura_class_coverage(element) -> tuple:
+    """Pull (line hits, branch counts, method hits) out of a <class> element."""
+    line_hits = {}
+    branches_total = branches_covered = 0
+    lines = element.find("lines")
+    for line in lines.iter("line") if lines is not None else ():
+        number = int(line.get("number", 0))
+        line_hits[number] = line_hits.get(number, 0) + int(line.get("hits", 0))
+        if line.get("branch") == "true":
+            match = _CONDITION_COVERAGE.search(line.get("condition-coverage", ""))
+            if match:
+                branches_covered += int(match.group(1))
+                branches_total += int(match.group(2))
+
+    method_hits = []
+    methods = element.find("methods")
+    for method in methods.iter("method") if methods is not None else ():
+        hits = [int(line.get("hits", 0)) for line in method.iter("line")]
+        method_hits.append(any(hits))
+
+    return line_hits, branches_total, branches_covered, method_hits
+
+
+def _cobertura_file_coverage(file_path: str, classes: list[tuple]) -> FileCoverage:
+    """Build FileCoverage from the <class> elements sharing one filename."""
+    line_hits = {}
+    branches_total = branches_covered = 0
+    method_hits = []
+    for hits, b_total, b_covered, methods in classes:
+        for number, count in hits.items():
+            line_hits[number] = line_hits.get(number, 0) + count
+        branches_total += b_total
+        branches_covered += b_covered
+        method_hits.extend(methods)
+
+    lines_covered = LineSet(n for n, count in line_hits.items() if count > 0)
+    lines_uncovered = LineSet(n for n, count in line_hits.items() if count == 0)
+    return FileCoverage(
+        path=file_path,
+        statements_total=len(line_hits),
+        statements_covered=len(lines_covered),
+        branches_total=branches_total,
+        branches_covered=branches_covered,
+        functions_total=len(method_hits),
+        functions_covered=sum(method_hits),
+        lines_covered=lines_covered,
+        lines_uncovered=lines_uncovered,
+    )
+
+
+def iter_cobertura_coverage(
+    xml_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Iterator[FileCoverage]:
+    """
+    Stream FileCoverage entries from a Cobertura coverage.xml.
+
+    Parsed with iterparse: each <class> element is dropped from the tree
+    once read, so memory stays flat. Consecutive classes with the same
+    filename (e.g. inner classes) are combined into one entry; a file
+    whose classes are not adjacent is yielded once per run of classes
+    (see merge_entries). Test files are skipped.
+
+    Args:
+        xml_path: Path to coverage.xml
+        files: If given, only these files (exact or path-suffix match);
+            the whole report is still read, since a later <class> may
+            belong to a file already found
+
+    Yields:
+        FileCoverage per run of classes, in report order
+
+    Raises:
+        OSError, ValueError: if the file can't be read or isn't valid XML
+    """
+    # Imported lazily: only Cobertura reports need the XML parser
+    from xml.etree.ElementTree import ParseError, iterparse
+
+    path_filter = _PathFilter(files) if files is not None else None
+    if path_filter is not None and not path_filter.wanted:
+        return
+
+    current = None  # Filename of the classes collected in `pending`
+    pending = []
+    parents = []
+    try:
+        for event, element in iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if element.tag != "class":
+                continue
+
+            file_path = element.get("filename", "")
+            if file_path != current:
+                if pending:
+                    yield _cobertura_file_coverage(current, pending)
+                current = file_path
+                pending = []
+                wanted = file_path and "test" not in file_path.lower()
+                if wanted and path_filter is not None:
+                    wanted = path_filter.match(file_path)
+                if not wanted:
+                    current = None
+
+            if current is not None:
+                pending.append(_cobertura_class_coverage(element))
+
+            # Detach the class so the tree never holds more than one
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+    except ParseError as e:
+        raise ValueError(f"Invalid Cobertura XML: {e}") from e
+
+    if pending:
+        yield _cobertura_file_coverage(current, pending)
+
+
+def _merge_file_coverage(a: FileCoverage, b: FileCoverage) -> FileCoverage:
+    """
+    Combine two entries for the same file.
+
+    Repeated paths only occur in the line-based formats (LCOV, Cobertura),
+    whose statements are lines: statement counts come from the union of
+    the line sets, so a line reported twice is counted once. Branch and
+    function counts are summed.
+    """
+    lines_covered = a.lines_covered | b.lines_covered
+    lines_uncovered = (a.lines_uncovered | b.lines_uncovered) - lines_covered
+    return FileCoverage(
+        path=a.path,
+        statements_total=len(lines_covered) + len(lines_uncovered),
+        statements_covered=len(lines_covered),
+        branches_total=a.branches_total + b.branches_total,
+        branches_covered=a.branches_covered + b.branches_covered,
+        functions_total=a.functions_total + b.functions_total,
+        functions_covered=a.functions_covered + b.functions_covered,
+        lines_covered=lines_covered,
+        lines_uncovered=lines_uncovered,
+    )
+
+
+def merge_entries(entries: Iterable[FileCoverage]) -> dict[str, FileCoverage]:
+    """
+    FileCoverage entries by path, combining repeated paths.
+
+    A Cobertura report may list one file in several non-adjacent <class>
+    elements; they become one entry, in first-seen order.
+    """
+    merged: dict[str, FileCoverage] = {}
+    for file_cov in entries:
+        existing = merged.get(file_cov.path)
+        merged[file_cov.path] = (
+            file_cov if existing is None else _merge_file_coverage(existing, file_cov)
+        )
+    return merged
+
+
+def _build_report(entries: Iterable[FileCoverage]) -> CoverageReport:
+    """Collect FileCoverage entries into a CoverageReport with totals."""
+    report = CoverageReport(files=merge_entries(entries))
+    for file_cov in report.files.values():
+        report.total_statements += file_cov.statements_total
+        report.covered_statements += file_cov.statements_covered
+        report.total_branches += file_cov.branches_total
+        report.covered_branches += file_cov.branches_covered
+        report.total_functions += file_cov.functions_total
+        report.covered_functions += file_cov.functions_covered
+    return report
+
+
+def parse_jest_coverage(
+    json_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Optional[CoverageReport]:
+    """
+    Parse Jest coverage JSON report.
+
+    Jest outputs coverage in a specific format when using:
+    jest --coverage --coverageReporters=json
+
+    Args:
+        json_path: Path to coverage-final.json or coverage-summary.json
+        files: If given, only parse these files (totals cover them only)
+
+    Returns:
+        CoverageReport or None if parsing fails
+    """
+    try:
+        return _build_report(iter_jest_coverage(json_path, files))
+    except (OSError, ValueError):
+        return None
+
+
+def parse_pytest_coverage(
+    json_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Optional[CoverageReport]:
+    """
+    Parse Pytest coverage JSON report.
+
+    Generated with: pytest --cov --cov-report=json
+
+    Args:
+        json_path: Path to coverage.json
+        files: If given, only parse these files (totals cover them only)
+
+    Returns:
+        CoverageReport or None if parsing fails
+    """
+    try:
+        return _build_report(iter_pytest_coverage(json_path, files))
+    except (OSError, ValueError):
+        return None
+
+
+def _lookup(report: Union[CoverageReport, CoverageIndex], file: str) -> Optional[FileCoverage]:
+    """Find one file in a report or index (exact, then path-suffix match)."""
+    if isinstance(report, CoverageIndex):
+        return report.get(file)
+    return report.find(file)
+
+
+def parse_lcov_coverage(
+    lcov_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Optional[CoverageReport]:
+    """
+    Parse an LCOV tracefile.
+
+    Generated by: jest --coverageReporters=lcov, c8, nyc, geninfo, ...
+
+    Args:
+        lcov_path: Path to lcov.info
+        files: If given, only parse these files (totals cover them only)
+
+    Returns:
+        CoverageReport or None if parsing fails
+    """
+    try:
+        return _build_report(iter_lcov_coverage(lcov_path, files))
+    except (OSError, ValueError):
+        return None
+
+
+def parse_cobertura_coverage(
+    xml_path: str,
+    files: Optional[Iterable[str]] = None,
+) -> Optional[CoverageReport]:
+    """
+    Parse a Cobertura XML report.
+
+    Generated by: pytest --cov --cov-report=xml, jest --coverageReporters=cobertura
+
+    Args:
+        xml_path: Path to coverage.xml
+        files: If given, only parse these files (totals cover them only)
+
+    Returns:
+        CoverageReport or None if parsing fails
+    """
+    try:
+        return _build_report(iter_cobertura_coverage(xml_path, files))
+    except (OSError, ValueError):
+        return None
+
+
+def get_uncovered_lines(report: Union[CoverageReport, CoverageIndex], file: str) -> list[int]:
+    """
+    Get uncovered lines for a specific file.
+
+    Args:
+        report: CoverageReport, or a CoverageIndex (reads only this file)
+        file: File path to look up (exact, or matched by path suffix)
+
+    Returns:
+        List of uncovered line numbers
+    """
+    cov = _lookup(report, file)
+    return cov.lines_uncovered.tolist() if cov is not None else []
+
+
+def get_file_coverage(report_path: str, file: str) -> Optional[FileCoverage]:
+    """
+    Get one file's coverage without parsing the whole report.
+
+    Uses the report's sidecar index (see lib.core.coverage.index), building
+    it on first use; falls back to a filtered streaming parse when the
+    cache is disabled.
+
+    Args:
+        report_path: Coverage report path
+        file: File path to look up (exact, or matched by path suffix)
+
+    Returns:
+        FileCoverage or None if the file isn't in the report
+    """
+    index = open_coverage_index(report_path)
+    if index is not None:
+        return index.get(file)
+
+    report = parse_coverage_report(report_path)
+    return report.find(file) if report is not None else None
+
+
+def calculate_delta_coverage(
+    base: CoverageReport,
+    current: CoverageReport,
+    changed_files: Optional[list[str]] = None
+) -> float:
+    """
+    Calculate coverage delta between two reports.
+
+    Only considers new/changed code, ignoring existing gaps.
+
+    Args:
+        base: Baseline coverage report
+        current: Current coverage report
+        changed_files: Optional list of changed files to focus on
+
+    Returns:
+        Coverage percentage for new/changed code
+    """
+    if changed_files is None:
+        # Compare all files
+        changed_files = list(set(current.files.keys()) | set(base.files.keys()))
+
+    new_lines_total = 0
+    new_lines_covered = 0
+
+    for file in changed_files:
+        current_cov = current.files.get(file)
+        base_cov = base.files.get(file)
+
+        if current_cov is None:
+            continue
+
+        if base_cov is None:
+            # New file - all lines are new
+            new_lines_total += len(current_cov.lines_covered) + len(current_cov.lines_uncovered)
+            new_lines_covered += len(current_cov.lines_covered)
+        else:
+            # Existing file - only count new lines
+            base_lines = base_cov.lines_covered | base_cov.lines_uncovered
+            current_lines = current_cov.lines_covered | current_cov.lines_uncovered
+
+            new_lines = current_lines - base_lines
+
+            new_lines_total += len(new_lines)
+            new_lines_covered += len(new_lines & current_cov.lines_covered)
+
+    if new_lines_total == 0:
+        return 100.0
+
+    return (new_lines_covered / new_lines_total) * 100
+
+
+@dataclass
+class ChangedFileCoverage:
+    """Coverage of the lines a diff added or modified in one file."""
+    path: str  # Path as reported by git
+    report_path: str  # Matching path in the coverage report
+    changed_lines: LineSet  # Changed lines that hold statements
+    covered_lines: LineSet  # Changed lines that were executed
+
+    @property
+    def uncovered_lines(self) -> LineSet:
+        return self.changed_lines - self.covered_lines
+
+    @property
+    def coverage(self) -> float:
+        """Changed-line coverage percentage."""
+        if not self.changed_lines:
+            return 100.0
+        return (len(self.covered_lines) / len(self.changed_lines)) * 100
+
+
+@dataclass
+class ChangedLineCoverage:
+    """Changed-line coverage for a whole diff."""
+    files: dict[str, ChangedFileCoverage] = field(default_factory=dict)
+    # Changed files with no entry in the report (including test files,
+    # which the parsers skip)
+    unreported: list[str] = field(default_factory=list)
+
+    @property
+    def total_lines(self) -> int:
+        return sum(len(f.changed_lines) for f in self.files.values())
+
+    @property
+    def covered_lines(self) -> int:
+        return sum(len(f.covered_lines) for f in self.files.values())
+
+    @property
+    def coverage(self) -> float:
+        """Changed-line coverage percentage across all files."""
+        total = self.total_lines
+        if total == 0:
+            return 100.0
+        return (self.covered_lines / total) * 100
+
+
+def calculate_changed_line_coverage(
+    report: Union[CoverageReport, CoverageIndex, str, None] = None,
+    base: str = "HEAD",
+    diff: Optional[dict] = None,
+    files: Optional[list[str]] = None,
+) -> Optional[ChangedLineCoverage]:
+    """
+    Calculate coverage of the lines changed since base.
+
+    Unlike calculate_delta_coverage, no baseline report is needed and
+    shifted lines aren't miscounted: the changed line ranges come from
+    the `-U0` hunks of `git diff <base>` and are intersected with the
+    current report's line bitmaps. Given a report path, only the changed
+    files are read from it (through its sidecar index when available).
+
+    Lines without statements (blank lines, comments) don't count. A line
+    counts as covered if any statement on it was executed.
+
+    Args:
+        report: CoverageReport, CoverageIndex or report path (default:
+            the first report found by find_coverage_report)
+        base: Git ref to diff against (e.g. a merge base for a branch)
+        diff: Precomputed get_diff_index(include_hunks=True) result
+        files: Optional paths to limit the diff to
+
+    Returns:
+        ChangedLineCoverage, or None if no report is available
+    """
+    if diff is None:
+        # Imported lazily: coverage lookups alone shouldn't load git helpers
+        from lib.core.git import get_diff_index
+
+        diff = get_diff_index(base, include_hunks=True, paths=files)
+
+    changed = {
+        path: file_diff.added_lines
+        for path, file_diff in diff.items()
+        if file_diff.status != "D" and file_diff.added_lines
+    }
+
+    if not isinstance(report, (CoverageReport, CoverageIndex)):
+        if report is None:
+            found = find_coverage_report()
+            if found is None:
+                return None
+            report = found[0]
+        index = open_coverage_index(report)
+        report = index if index is not None else parse_coverage_report(report, files=changed)
+        if report is None:
+            return None
+
+    result = ChangedLineCoverage()
+    for path, added in changed.items():
+        cov = _lookup(report, path)
+        if cov is None:
+            result.unreported.append(path)
+            continue
+
+        added_lines = LineSet.from_ranges(added.intervals())
+        result.files[path] = ChangedFileCoverage(
+            path=path,
+            report_path=cov.path,
+            changed_lines=(cov.lines_covered | cov.lines_uncovered) & added_lines,
+            covered_lines=cov.lines_covered & added_lines,
+        )
+
+    return result
+
+
+def find_coverage_report() -> Optional[tuple[str, str]]:
+    """
+    Find coverage report in common locations.
+
+    Returns:
+        Tuple of (report_path, report_type) or None
+    """
+    # Jest locations
+    jest_paths = [
+        "coverage/coverage-final.json",
+        "coverage/coverage-summary.json",
+        ".coverage/coverage-final.json",
+    ]
+
+    for path in jest_paths:
+        if Path(path).exists():
+            return path, "jest"
+
+    # Pytest locations
+    pytest_paths = [
+        "coverage.json",
+        ".coverage.json",
+        "htmlcov/coverage.json",
+    ]
+
+    for path in pytest_paths:
+        if Path(path).exists():
+            return path, "pytest"
+
+    # LCOV and Cobertura locations
+    other_paths = [
+        ("coverage/lcov.info", "lcov"),
+        ("lcov.info", "lcov"),
+        ("coverage/cobertura-coverage.xml", "cobertura"),
+        ("coverage.xml", "cobertura"),
+    ]
+
+    for path, report_type in other_paths:
+        if Path(path).exists():
+            return path, report_type
+
+    return None
+
+
+def sniff_coverage_format(path: str) -> Optional[str]:
+    """
+    Detect a coverage report's format from its first bytes.
+
+    coverage.py JSON starts with "meta" (or "files"/"totals"); Jest reports
+    are keyed by source path (or "total" for coverage-summary.json). LCOV
+    starts with a TN: or SF: record, Cobertura with an XML <coverage> root.
+
+    Returns:
+        "jest", "pytest", "lcov", "cobertura", or None if unrecognized
+    """
+    try:
+        with open(path, "r") as f:
+            head = f.read(512).lstrip("\ufeff \t\r\n")
+            if head.startswith(LCOV_FIRST_RECORDS):
+                return "lcov"
+            if head.startswith("<"):
+                return "cobertura" if "<coverage" in _xml_prolog(f, head) else None
+            f.seek(0)
+            key = first_key(f)
+    except (OSError, ValueError):
+        return None
+
+    if key is None:
+        return None
+    if key in PYTEST_TOP_LEVEL_KEYS:
+        return "pytest"
+    return "jest"
+
+
+def _xml_prolog(f, head: str, limit: int = 8192) -> str:
+    """Read past the XML declaration, DOCTYPE and comments to the root tag."""
+    while "<coverage" not in head and len(head) < limit:
+        more = f.read(512)
+        if not more:
+            break
+        head += more
+    return head
+
+
+_ITERATORS = {
+    "jest": iter_jest_coverage,
+    "pytest": iter_pytest_coverage,
+    "lcov": iter_lcov_coverage,
+    "cobertura": iter_cobertura_coverage,
+}
+
+
+def iter_report(
+    path: str,
+    report_format: Optional[str] = None,
+    files: Optional[Iterable[str]] = None,
+) -> Iterator[FileCoverage]:
+    """
+    Stream FileCoverage entries from a report of any supported format.
+
+    Raises:
+        ValueError: if the format isn't recognized
+    """
+    report_format = report_format or sniff_coverage_format(path)
+    iterator = _ITERATORS.get(report_format)
+    if iterator is None:
+        raise ValueError(f"Unrecognized coverage report: {path}")
+    return iterator(path, files)
+
+
+_PARSERS = {
+    "jest": parse_jest_coverage,
+    "pytest": parse_pytest_coverage,
+    "lcov": parse_lcov_coverage,
+    "cobertura": parse_cobertura_coverage,
+}
+
+
+def parse_coverage_report(
+    path: Optional[str] = None,
+    files: Optional[Iterable[str]] = None,
+) -> Optional[CoverageReport]:
+    """
+    Auto-detect and parse coverage report.
+
+    Args:
+        path: Optional explicit path. If None, searches common locations.
+        files: If given, only parse these files
+
+    Returns:
+        CoverageReport or None if not found
+    """
+    if path:
+        # Detect type from the first key, without loading the report
+        report_type = sniff_coverage_format(path)
+    else:
+        result = find_coverage_report()
+        if result is None:
+            return None
+        path, report_type = result
+
+    parser = _PARSERS.get(report_type)
+    if parser is None:
+        return None
+    return parser(path, files)
@@ -0,0 +1,470 @@
+"""
+Append-only coverage history.
+
+Each time a report is indexed (see lib.core.coverage.index), its per-file
+counts are appended under the commit HEAD pointed at. Trend and
+regression queries then read this history instead of old reports.
+
+Layout (one directory per repository, under the devkit cache directory):
+
+- paths: path dictionary, one per line; line number = path id
+- commits: one line per recorded run: "<sha> <first row> <rows> <time>"
+- <column>.u32: one native uint32 per row for the path id and each count
+
+A run's rows are contiguous and sorted by path id, so finding one file in
+one run is a binary search over a memory-mapped column. The commits line
+is written last: rows past the last recorded run (from an interrupted
+write) are ignored and overwritten by the next run.
+"""
+
+import mmap
+import os
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from lib.core.cache import FileLock
+from lib.core.config import get_cache_dir
+from lib.core.coverage.index import PathTrie, normalize_path
+
+HISTORY_NAMESPACE = "coverage-history"
+
+# Per-row columns, in FileCoverage field names
+COLUMNS = (
+    "path",
+    "statements_total",
+    "statements_covered",
+    "branches_total",
+    "branches_covered",
+    "functions_total",
+    "functions_covered",
+)
+
+_ITEM_SIZE = array("I").itemsize
+
+# Ancestors of a merge base searched for the nearest recorded commit
+MERGE_BASE_SEARCH_DEPTH = 50
+
+
+@dataclass
+class HistoryEntry:
+    """One file's coverage counts in one recorded run."""
+    commit: str
+    timestamp: float
+    path: str
+    statements_total: int
+    statements_covered: int
+    branches_total: int
+    branches_covered: int
+    functions_total: int
+    functions_covered: int
+
+    @property
+    def statement_coverage(self) -> float:
+        """Statement coverage percentage."""
+        if self.statements_total == 0:
+            return 100.0
+        return (self.statements_covered / self.statements_total) * 100
+
+
+@dataclass
+class CoverageDrop:
+    """A file whose statement coverage fell between two runs."""
+    path: str
+    before: HistoryEntry
+    after: HistoryEntry
+
+    @property
+    def delta(self) -> float:
+        """Change in statement coverage (percentage points, negative)."""
+        return self.after.statement_coverage - self.before.statement_coverage
+
+
+@dataclass
+class _Run:
+    commit: str
+    start: int
+    count: int
+    timestamp: float
+
+
+class _Columns:
+    """Memory-mapped read access to the column files."""
+
+    def __init__(self, directory: Path):
+        self._maps = []
+        self.views = {}
+        for name in COLUMNS:
+            try:
+                with open(directory / f"{name}.u32", "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):  # Missing or empty
+                self.views[name] = memoryview(array("I"))
+                continue
+            self._maps.append(mapped)
+            whole = len(mapped) - len(mapped) % _ITEM_SIZE  # Ignore a torn last row
+            self.views[name] = memoryview(mapped)[:whole].cast("I")
+
+    def row(self, i: int) -> tuple[int, ...]:
+        return tuple(self.views[name][i] for name in COLUMNS[1:])
+
+    def close(self) -> None:
+        for view in self.views.values():
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+
+    def __enter__(self) -> "_Columns":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CoverageHistory:
+    """Columnar commit x file coverage history for one repository."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    # -- reading ---------------------------------------------------------
+
+    def _read_paths(self) -> list[str]:
+        try:
+            with open(self.directory / "paths", "r", encoding="utf-8") as f:
+                return f.read().split("\n")[:-1]
+        except OSError:
+            return []
+
+    def _read_runs(self) -> list[_Run]:
+        runs = []
+        try:
+            with open(self.directory / "commits", "r") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 4:
+                        commit, start, count, when = parts
+                        runs.append(_Run(commit, int(start), int(count), float(when)))
+        except (OSError, ValueError):
+            pass
+        return runs
+
+    def _latest_runs(self) -> dict[str, _Run]:
+        """Commit -> its most recent run, in order of recording."""
+        latest = {}
+        for run in self._read_runs():
+            latest.pop(run.commit, None)  # Re-recorded commits move to the end
+            latest[run.commit] = run
+        return latest
+
+    def commits(self) -> list[str]:
+        """Recorded commits, oldest first (by most recent recording)."""
+        return list(self._latest_runs())
+
+    def _resolve_path(self, path: str, paths: list[str]) -> Optional[int]:
+        try:
+            return paths.index(path)
+        except ValueError:
+            pass
+
+        # Usually a repo-relative path against absolute report paths
+        suffix = "/" + normalize_path(path)
+        matches = [i for i, known in enumerate(paths) if known.endswith(suffix)]
+        if len(matches) == 1:
+            return matches[0]
+
+        trie = PathTrie()
+        for i, known in enumerate(paths):
+            trie.insert(known, i)
+        return trie.find(path)
+
+    @staticmethod
+    def _find_row(columns: _Columns, run: _Run, path_id: int) -> Optional[int]:
+        ids = columns.views["path"]
+        end = min(run.start + run.count, len(ids))
+        i = bisect_left(ids, path_id, run.start, end)
+        return i if i < end and ids[i] == path_id else None
+
+    @staticmethod
+    def _entry(run: _Run, path: str, counts: tuple[int, ...]) -> HistoryEntry:
+        return HistoryEntry(run.commit, run.timestamp, path, *counts)
+
+    def trend(
+        self,
+        path: str,
+        limit: int = 50,
+        commits: Optional[Iterable[str]] = None,
+    ) -> list[HistoryEntry]:
+        """
+        Coverage of one file across recorded runs.
+
+        Args:
+            path: File path (exact, or matched by path suffix)
+            limit: Number of most recent recorded commits to look at
+            commits: Restrict to these commits (e.g. from iter_commits)
+
+        Returns:
+            HistoryEntry per run that includes the file, oldest first
+        """
+        paths = self._read_paths()
+        path_id = self._resolve_path(path, paths)
+        if path_id is None:
+            return []
+
+        latest = self._latest_runs()
+        if commits is not None:
+            runs = [latest[c] for c in commits if c in latest][:limit]
+            runs.sort(key=lambda run: run.start)
+        else:
+            runs = list(latest.values())[-limit:]
+
+        entries = []
+        with _Columns(self.directory) as columns:
+            for run in runs:
+                i = self._find_row(columns, run, path_id)
+                if i is not None:
+                    entries.append(self._entry(run, paths[path_id], columns.row(i)))
+        return entries
+
+    def snapshot(self, commit: str) -> dict[str, HistoryEntry]:
+        """All files recorded for a commit, keyed by path."""
+        run = self._latest_runs().get(commit)
+        if run is None:
+            return {}
+        paths = self._read_paths()
+        with _Columns(self.directory) as columns:
+            ids = columns.views["path"]
+            end = min(run.start + run.count, len(ids))
+            return {
+                paths[ids[i]]: self._entry(run, paths[ids[i]], columns.row(i))
+                for i in range(run.start, end)
+            }
+
+    def dropped_since(
+        self,
+        base: str,
+        head: Optional[str] = None,
+        min_drop: float = 0.0,
+    ) -> list[CoverageDrop]:
+        """
+        Files whose statement coverage is lower at head than at base.
+
+        Files missing from either run (new or deleted) aren't reported.
+
+        Args:
+            base: Baseline commit (e.g. the merge base)
+            head: Later commit (default: the most recently recorded one)
+            min_drop: Only report drops larger than this many points
+
+        Returns:
+            CoverageDrop list, largest drop first
+        """
+        latest = self._latest_runs()
+        if head is None and latest:
+            head = next(reversed(latest))
+        base_run = latest.get(base)
+        head_run = latest.get(head)
+        if base_run is None or head_run is None:
+            return []
+
+        paths = self._read_paths()
+        drops = []
+        with _Columns(self.directory) as columns:
+            views = columns.views
+            base_end = min(base_run.start + base_run.count, len(views["path"]))
+            head_end = min(head_run.start + head_run.count, len(views["path"]))
+            base_counts = dict(zip(
+                views["path"][base_run.start:base_end].tolist(),
+                zip(
+                    views["statements_total"][base_run.start:base_end].tolist(),
+                    views["statements_covered"][base_run.start:base_end].tolist(),
+                    range(base_run.start, base_end),
+                ),
+            ))
+            head_rows = zip(
+                views["path"][head_run.start:head_end].tolist(),
+                views["statements_total"][head_run.start:head_end].tolist(),
+                views["statements_covered"][head_run.start:head_end].tolist(),
+                range(head_run.start, head_end),
+            )
+
+            # Compare statement coverage in bulk; build entries for drops only
+            for path_id, total, covered, i in head_rows:
+                base = base_counts.get(path_id)
+                if base is None:
+                    continue
+                before = base[1] / base[0] * 100 if base[0] else 100.0
+                after = covered / total * 100 if total else 100.0
+                if after - before < -min_drop:
+                    path = paths[path_id]
+                    drops.append(CoverageDrop(
+                        path,
+                        self._entry(base_run, path, columns.row(base[2])),
+                        self._entry(head_run, path, columns.row(i)),
+                    ))
+
+        drops.sort(key=lambda d: (d.delta, d.path))
+        return drops
+
+    # -- writing ---------------------------------------------------------
+
+    def record(
+        self,
+        commit: str,
+        files: Iterable,
+        timestamp: Optional[float] = None,
+    ) -> int:
+        """
+        Append one run.
+
+        Args:
+            commit: Commit the report was produced at
+            files: FileCoverage entries
+            timestamp: Run time (default: now)
+
+        Returns:
+            Number of rows written
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with FileLock(self.directory / "lock"):
+            paths = self._read_paths()
+            ids = {path: i for i, path in enumerate(paths)}
+            new_paths = []
+
+            rows = {}
+            for cov in files:
+                if "\n" in cov.path:
+                    continue
+                path_id = ids.get(cov.path)
+                if path_id is None:
+                    path_id = ids[cov.path] = len(paths) + len(new_paths)
+                    new_paths.append(cov.path)
+                rows[path_id] = cov
+
+            if new_paths:
+                with open(self.directory / "paths", "a", encoding="utf-8") as f:
+                    f.write("".join(path + "\n" for path in new_paths))
+
+            runs = self._read_runs()
+            start = runs[-1].start + runs[-1].count if runs else 0
+            order = sorted(rows)
+            for name in COLUMNS:
+                if name == "path":
+                    values = array("I", order)
+                else:
+                    values = array("I", (max(0, getattr(rows[i], name)) for i in order))
+                with open(self.directory / f"{name}.u32", "ab") as f:
+                    f.truncate(start * _ITEM_SIZE)  # Drop rows of interrupted runs
+                    values.tofile(f)
+
+            when = time.time() if timestamp is None else timestamp
+            with open(self.directory / "commits", "a") as f:
+                f.write(f"{commit} {start} {len(order)} {when:.3f}\n")
+
+        return len(order)
+
+
+def open_history(cwd: Optional[str] = None) -> Optional[CoverageHistory]:
+    """
+    Get the coverage history of the repository containing cwd.
+
+    Returns:
+        CoverageHistory, or None outside a repository or if caching is
+        disabled
+    """
+    from lib.core.git.repo import find_git_dir
+
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+
+    try:
+        found = find_git_dir(os.path.realpath(cwd or os.getcwd()))
+    except OSError:
+        return None
+    if found is None:
+        return None
+
+    digest = zlib.crc32(found[0].encode("utf-8", "surrogateescape"))
+    return CoverageHistory(cache_dir / HISTORY_NAMESPACE / f"{digest:08x}")
+
+
+def _resolve_commit(rev: str, cwd: Optional[str] = None) -> Optional[str]:
+    from lib.core.git import run_git
+    from lib.core.git.repo import UnsupportedRepository, open_repository
+
+    repo = open_repository(cwd)
+    if repo is not None and rev == "HEAD":
+        try:
+            sha = repo.resolve_ref("HEAD")
+        except (UnsupportedRepository, OSError, ValueError):
+            sha = None
+        if sha:
+            return sha
+
+    exit_code, stdout, _ = run_git(["rev-parse", "--verify", "-q", rev], cwd=cwd)
+    return stdout.strip() if exit_code == 0 else None
+
+
+def record_history(
+    files: Iterable,
+    timestamp: Optional[float] = None,
+    cwd: Optional[str] = None,
+) -> int:
+    """
+    Record a report's per-file counts under the current HEAD commit.
+
+    Returns:
+        Number of rows written (0 if there's no repository or history)
+    """
+    history = open_history(cwd)
+    commit = _resolve_commit("HEAD", cwd) if history is not None else None
+    if commit is None:
+        return 0
+    try:
+        return history.record(commit, files, timestamp)
+    except OSError:
+        return 0
+
+
+def dropped_since_merge_base(
+    base_branch: Optional[str] = None,
+    min_drop: float = 0.0,
+) -> list[CoverageDrop]:
+    """
+    Files whose coverage dropped between the merge base and HEAD.
+
+    If the merge base itself was never recorded, its nearest recorded
+    ancestor (within MERGE_BASE_SEARCH_DEPTH commits) is used. HEAD falls
+    back to the most recently recorded run.
+
+    Args:
+        base_branch: Branch to diff against (default: main or master)
+        min_drop: Only report drops larger than this many points
+
+    Returns:
+        CoverageDrop list, largest drop first
+    """
+    from lib.core.git import get_commit_range, run_git
+
+    history = open_history()
+    if history is None:
+        return []
+    recorded = set(history.commits())
+    if not recorded:
+        return []
+
+    merge_base, _ = get_commit_range(base_branch)
+    exit_code, stdout, _ = run_git(
+        ["rev-list", f"--max-count={MERGE_BASE_SEARCH_DEPTH}", merge_base]
+    )
+    base = next((c for c in stdout.split() if c in recorded), None) if exit_code == 0 else None
+    if base is None:
+        return []
+
+    head = _resolve_commit("HEAD")
+    return history.dropped_since(base, head if head in recorded else None, min_drop)
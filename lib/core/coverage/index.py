@@ -0,0 +1,331 @@
+"""
+Random-access sidecar index for coverage reports.
+
+Hooks usually need coverage for one or two files, but a report can hold
+tens of thousands. build_coverage_index() parses a report once and writes
+a sidecar file (under the devkit cache directory) holding:
+
+- a header: report stat, per-file byte offsets and a path-suffix trie
+- one pre-extracted record per file (counts and line bitmaps)
+
+open_coverage_index() reuses the sidecar while the report's mtime and size
+are unchanged, so a single-file lookup reads the header plus that file's
+record and never touches the report itself. Each build also writes the
+report's per-file summary for hooks (lib.core.coverage.summary) and
+appends its counts to the coverage history (lib.core.coverage.history).
+"""
+
+import marshal
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+from lib.core.config import get_cache_dir
+from lib.core.lines import LineSet
+
+INDEX_VERSION = 2
+INDEX_MAGIC = b"DKCI"
+INDEX_NAMESPACE = "coverage-index"
+
+# magic, version, header length
+_PREAMBLE = struct.Struct("<4sIQ")
+
+# Trie node key holding the smallest record index below the node
+_LEAF = "\0"
+
+# Trie node key present when more than one record lies below the node
+_SHARED = "\1"
+
+# Path components a suffix match must share (a lone basename such as
+# __init__.py or index.ts says nothing about which file it is)
+MIN_SUFFIX_PARTS = 2
+
+
+def normalize_path(path: str) -> str:
+    """Normalize separators and leading "./" for path matching."""
+    path = path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def lookup_keys(file: str) -> list[str]:
+    """
+    Spellings of a file that count as an exact match.
+
+    The path as given, plus its absolute form and its form relative to the
+    working directory (the project root when hooks run), so repo-relative
+    and absolute report paths both match exactly.
+    """
+    keys = [normalize_path(file)]
+    try:
+        absolute = os.path.abspath(file)
+        relative = os.path.relpath(absolute)
+    except (OSError, ValueError):
+        return keys
+    for key in (absolute, relative):
+        key = normalize_path(key)
+        if key not in keys and not key.startswith("../"):
+            keys.append(key)
+    return keys
+
+
+class PathTrie:
+    """
+    Trie over path components, last component first.
+
+    Resolves a (possibly partial or differently-rooted) path to the entry
+    sharing the longest component suffix with it. The match must cover at
+    least MIN_SUFFIX_PARTS components and identify a single entry; a
+    query that only matches a basename, or matches several entries
+    equally well, resolves to nothing.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: Optional[dict] = None):
+        self.root = root if root is not None else {}
+
+    def insert(self, path: str, index: int) -> None:
+        node = self.root
+        for part in reversed([p for p in normalize_path(path).split("/") if p]):
+            node = node.setdefault(part, {})
+            leaf = node.get(_LEAF)
+            if leaf is not None and leaf != index:
+                node[_SHARED] = 1
+            if leaf is None or leaf > index:
+                node[_LEAF] = index
+
+    def find(self, path: str) -> Optional[int]:
+        """Index of the unique best suffix match, or None."""
+        node = self.root
+        depth = 0
+        for part in reversed([p for p in normalize_path(path).split("/") if p]):
+            child = node.get(part)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        if depth < MIN_SUFFIX_PARTS or _SHARED in node:
+            return None
+        return node[_LEAF]
+
+
+def _encode_record(cov) -> bytes:
+    return marshal.dumps((
+        cov.path,
+        cov.statements_total,
+        cov.statements_covered,
+        cov.branches_total,
+        cov.branches_covered,
+        cov.functions_total,
+        cov.functions_covered,
+        cov.lines_covered.to_bytes(),
+        cov.lines_uncovered.to_bytes(),
+    ))
+
+
+def _decode_record(data: bytes):
+    from lib.core.coverage import FileCoverage
+
+    (path, st, sc, bt, bc, ft, fc, covered, uncovered) = marshal.loads(data)
+    return FileCoverage(
+        path=path,
+        statements_total=st,
+        statements_covered=sc,
+        branches_total=bt,
+        branches_covered=bc,
+        functions_total=ft,
+        functions_covered=fc,
+        lines_covered=LineSet.from_bytes(covered),
+        lines_uncovered=LineSet.from_bytes(uncovered),
+    )
+
+
+class CoverageIndex:
+    """An opened sidecar index for one report."""
+
+    def __init__(self, index_path: Path, header: tuple, data_start: int):
+        (
+            self.report_path,
+            self.report_mtime_ns,
+            self.report_size,
+            self.format,
+            self.paths,
+            offsets,
+            trie,
+        ) = header
+        self.index_path = index_path
+        self._offsets = offsets  # len(paths) + 1 record boundaries
+        self._data_start = data_start
+        self._trie = PathTrie(trie)
+        self._positions: dict[str, int] = {}
+        for i, path in enumerate(self.paths):
+            self._positions.setdefault(normalize_path(path), i)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, file: str) -> bool:
+        return self.find(file) is not None
+
+    def find(self, file: str) -> Optional[str]:
+        """Resolve a file to its path in the report (exact, then suffix match)."""
+        i = self._position(file)
+        return self.paths[i] if i is not None else None
+
+    def _position(self, file: str) -> Optional[int]:
+        for key in lookup_keys(file):
+            i = self._positions.get(key)
+            if i is not None:
+                return i
+        return self._trie.find(file)
+
+    def get(self, file: str):
+        """
+        Read one file's coverage.
+
+        Returns:
+            FileCoverage, or None if the file isn't in the report
+        """
+        i = self._position(file)
+        if i is None:
+            return None
+
+        start, end = self._offsets[i], self._offsets[i + 1]
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._data_start + start)
+                return _decode_record(f.read(end - start))
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def get_many(self, files: Iterable[str]) -> dict:
+        """Read coverage for several files, keyed by report path."""
+        results = {}
+        for file in files:
+            cov = self.get(file)
+            if cov is not None:
+                results[cov.path] = cov
+        return results
+
+
+def _index_path(report_path: str) -> Optional[Path]:
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = zlib.crc32(report_path.encode("utf-8", "surrogateescape"))
+    return cache_dir / INDEX_NAMESPACE / f"{digest:08x}.idx"
+
+
+def _read_index(index_path: Path, report_path: str) -> Optional[CoverageIndex]:
+    try:
+        with open(index_path, "rb") as f:
+            magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                return None
+            header = marshal.loads(f.read(header_len))
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+
+    if not isinstance(header, tuple) or len(header) != 7 or header[0] != report_path:
+        return None
+    return CoverageIndex(index_path, header, _PREAMBLE.size + header_len)
+
+
+def build_coverage_index(
+    report_path: str,
+    report_format: Optional[str] = None,
+) -> Optional[CoverageIndex]:
+    """
+    Parse a report (streaming) and write its sidecar index.
+
+    Args:
+        report_path: Coverage report to index
+        report_format: "jest" or "pytest" (sniffed if None)
+
+    Returns:
+        The new index, or None if the report can't be parsed or caching
+        is disabled
+    """
+    from lib.core.coverage import iter_report, merge_entries, sniff_coverage_format
+
+    report_path = os.path.realpath(report_path)
+    index_path = _index_path(report_path)
+    if index_path is None:
+        return None
+
+    try:
+        st = os.stat(report_path)
+        report_format = report_format or sniff_coverage_format(report_path)
+        paths = []
+        offsets = [0]
+        trie = PathTrie()
+        records = []
+        covs = list(merge_entries(iter_report(report_path, report_format)).values())
+        for cov in covs:
+            record = _encode_record(cov)
+            trie.insert(cov.path, len(paths))
+            paths.append(cov.path)
+            records.append(record)
+            offsets.append(offsets[-1] + len(record))
+    except (OSError, ValueError):
+        return None
+
+    header = (report_path, st.st_mtime_ns, st.st_size, report_format, paths, offsets, trie.root)
+    header_bytes = marshal.dumps(header)
+
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(INDEX_MAGIC, INDEX_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for record in records:
+                f.write(record)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        return None
+
+    # Each new report is parsed here exactly once: write the hook summary
+    # and remember its counts
+    from lib.core.coverage.history import record_history
+    from lib.core.coverage.summary import write_coverage_summary
+
+    write_coverage_summary(report_path, st, covs)
+    record_history(covs, timestamp=st.st_mtime)
+
+    return CoverageIndex(index_path, header, _PREAMBLE.size + len(header_bytes))
+
+
+def open_coverage_index(report_path: str, build: bool = True) -> Optional[CoverageIndex]:
+    """
+    Open the sidecar index for a report, (re)building it if stale.
+
+    Args:
+        report_path: Coverage report
+        build: If False, return None instead of building a missing or
+            stale index
+
+    Returns:
+        CoverageIndex, or None if unavailable
+    """
+    report_path = os.path.realpath(report_path)
+    index_path = _index_path(report_path)
+    if index_path is None:
+        return None
+
+    try:
+        st = os.stat(report_path)
+    except OSError:
+        return None
+
+    index = _read_index(index_path, report_path)
+    if index is not None and (index.report_mtime_ns, index.report_size) == (
+        st.st_mtime_ns, st.st_size
+    ):
+        return index
+
+    return build_coverage_index(report_path) if build else None
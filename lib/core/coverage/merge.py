@@ -0,0 +1,229 @@
+"""
+Merging of sharded coverage reports.
+
+CI runs split across Jest `--shard`s or pytest-xdist workers each write
+their own report. merge_coverage_reports() parses the shards concurrently
+in a process pool and sums hit counts per statement, branch and function,
+so a statement executed in any shard counts as covered.
+
+Shard entries are reduced to hit maps in the worker processes; only those
+(not the decoded JSON) cross the process boundary. The merged result does
+not depend on shard order or completion order.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Optional
+
+from lib.core.coverage import (
+    CoverageReport,
+    FileCoverage,
+    _build_report,
+    _iter_report_entries,
+    sniff_coverage_format,
+)
+from lib.core.lines import LineSet
+
+# Default worker processes (shard parsing is CPU-bound JSON decoding)
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Shards parsed in flight per worker before results are merged
+_BACKLOG_PER_WORKER = 2
+
+# Per-file hit maps:
+#   statements: statement key -> (line, hits)
+#   branches: (branch key, outcome) -> hits
+#   functions: function key -> hits
+ShardFile = tuple[dict, dict, dict]
+
+
+def _jest_shard_file(file_data: dict) -> ShardFile:
+    stmt_hits = file_data.get("s", {})
+    statements = {
+        stmt_id: (stmt.get("start", {}).get("line", 0), stmt_hits.get(stmt_id, 0))
+        for stmt_id, stmt in file_data.get("statementMap", {}).items()
+    }
+
+    branch_hits = file_data.get("b", {})
+    branches = {}
+    for branch_id, branch in file_data.get("branchMap", {}).items():
+        hits = branch_hits.get(branch_id, [])
+        for i in range(len(branch.get("locations", []))):
+            branches[(branch_id, i)] = hits[i] if i < len(hits) else 0
+
+    fn_hits = file_data.get("f", {})
+    functions = {fn_id: fn_hits.get(fn_id, 0) for fn_id in file_data.get("fnMap", {})}
+
+    return statements, branches, functions
+
+
+def _pytest_shard_file(file_data: dict) -> ShardFile:
+    # coverage.py records executed/missing lines rather than hit counts
+    statements = {line: (line, 1) for line in file_data.get("executed_lines", [])}
+    for line in file_data.get("missing_lines", []):
+        statements.setdefault(line, (line, 0))
+
+    branches = {tuple(arc): 1 for arc in file_data.get("executed_branches", [])}
+    for arc in file_data.get("missing_branches", []):
+        branches.setdefault(tuple(arc), 0)
+
+    return statements, branches, {}
+
+
+def load_shard(path: str) -> dict[str, ShardFile]:
+    """
+    Read one shard into per-file hit maps.
+
+    Runs in pool workers, so it only returns plain picklable data. Test
+    files are skipped, as in the report parsers.
+
+    Args:
+        path: Jest coverage-final.json or coverage.py JSON report
+
+    Returns:
+        Dict of source path -> (statements, branches, functions)
+
+    Raises:
+        OSError, ValueError: if the shard can't be read, isn't a
+            recognized report, or has malformed entries
+    """
+    report_format = sniff_coverage_format(path)
+    if report_format == "jest":
+        entries = _iter_report_entries(path, None, None)
+        shard_file = _jest_shard_file
+    elif report_format == "pytest":
+        entries = _iter_report_entries(path, "files", None)
+        shard_file = _pytest_shard_file
+    else:
+        raise ValueError(f"Unrecognized coverage report: {path}")
+
+    files = {}
+    for file_path, file_data in entries:
+        lowered = file_path.lower()
+        if file_path == "total" or "test" in lowered:
+            continue
+        if report_format == "jest" and "spec" in lowered:
+            continue
+        try:
+            files[file_path] = shard_file(file_data)
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError(f"Malformed coverage entry for {file_path} in {path}: {e}") from e
+    return files
+
+
+class CoverageMerger:
+    """
+    Accumulates shards and produces the merged CoverageReport.
+
+    Shards can be added in any order, including while others are still
+    being parsed; report() sorts files by path so the result is stable.
+    """
+
+    def __init__(self):
+        self._files: dict[str, ShardFile] = {}
+        self.shards = 0
+
+    def add(self, path: str) -> None:
+        """Parse a shard in this process and merge it."""
+        self.add_shard(load_shard(path))
+
+    def add_shard(self, shard: dict[str, ShardFile]) -> None:
+        """Merge a load_shard() result."""
+        for file_path, (statements, branches, functions) in shard.items():
+            merged = self._files.get(file_path)
+            if merged is None:
+                self._files[file_path] = (dict(statements), dict(branches), dict(functions))
+                continue
+
+            merged_statements, merged_branches, merged_functions = merged
+            for key, (line, hits) in statements.items():
+                previous = merged_statements.get(key)
+                merged_statements[key] = (line, previous[1] + hits if previous else hits)
+            for key, hits in branches.items():
+                merged_branches[key] = merged_branches.get(key, 0) + hits
+            for key, hits in functions.items():
+                merged_functions[key] = merged_functions.get(key, 0) + hits
+        self.shards += 1
+
+    def hits(self, file_path: str) -> Optional[ShardFile]:
+        """Merged hit maps for one file, or None if no shard covers it."""
+        return self._files.get(file_path)
+
+    def report(self) -> CoverageReport:
+        """Build the merged report (files in path order)."""
+        return _build_report(
+            self._file_coverage(path) for path in sorted(self._files)
+        )
+
+    def _file_coverage(self, file_path: str) -> FileCoverage:
+        statements, branches, functions = self._files[file_path]
+
+        lines_covered = LineSet()
+        lines_uncovered = LineSet()
+        statements_covered = 0
+        for line, hits in statements.values():
+            if hits > 0:
+                statements_covered += 1
+                lines_covered.add(line)
+            else:
+                lines_uncovered.add(line)
+
+        return FileCoverage(
+            path=file_path,
+            statements_total=len(statements),
+            statements_covered=statements_covered,
+            branches_total=len(branches),
+            branches_covered=sum(1 for hits in branches.values() if hits > 0),
+            functions_total=len(functions),
+            functions_covered=sum(1 for hits in functions.values() if hits > 0),
+            lines_covered=lines_covered,
+            lines_uncovered=lines_uncovered,
+        )
+
+
+def merge_coverage_reports(
+    paths: Iterable[str],
+    max_workers: Optional[int] = None,
+) -> Optional[CoverageReport]:
+    """
+    Merge coverage shards into one report.
+
+    Shards are parsed in a process pool and merged as they complete.
+    `paths` may be a generator yielding shards as they become available;
+    each is submitted as soon as it is yielded, and at most a few shards
+    per worker are held unmerged at a time.
+
+    Args:
+        paths: Shard report paths (Jest and coverage.py JSON may be mixed)
+        max_workers: Worker processes (default: DEFAULT_WORKERS); 1
+            parses in this process
+
+    Returns:
+        Merged CoverageReport, or None if any shard can't be parsed (or a
+        pool worker dies while parsing one)
+    """
+    merger = CoverageMerger()
+    workers = max_workers or DEFAULT_WORKERS
+
+    try:
+        if workers <= 1:
+            for path in paths:
+                merger.add(path)
+            return merger.report()
+
+        pending: set[Future] = set()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path in paths:
+                pending.add(pool.submit(load_shard, path))
+                if len(pending) >= workers * _BACKLOG_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merger.add_shard(future.result())
+
+            for future in wait(pending).done:
+                merger.add_shard(future.result())
+    except (OSError, ValueError, BrokenProcessPool):
+        return None
+
+    return merger.report()
@@ -0,0 +1,151 @@
+"""
+Incremental JSON reading for large coverage reports.
+
+Coverage reports are one big object whose members (one per source file)
+are individually small. JsonObjectStream walks the outer structure itself
+and hands each member value to the C-accelerated json decoder, so memory is
+bounded by the largest single member rather than the whole report, and
+callers can stop as soon as they have what they need.
+"""
+
+import json
+from typing import IO, Any, Iterator, Optional
+
+
+# Characters read per refill
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+class JsonObjectStream:
+    """
+    Pull-based reader over a text stream containing a JSON object.
+
+    Only the object structure along the path being walked is tokenized in
+    Python; member values are decoded with json.JSONDecoder.raw_decode.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: Optional[int] = None):
+        self._file = f
+        self._chunk_size = chunk_size or CHUNK_SIZE
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0  # Characters dropped from the front of _buf
+        self._eof = False
+
+    def tell(self) -> int:
+        """Character offset of the read position from the start of input."""
+        return self._offset + self._pos
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Read more input. Returns False at end of file."""
+        if self._eof:
+            return False
+
+        # Drop consumed input so the buffer only holds the current value
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._offset += self._pos
+            self._pos = 0
+
+        data = self._file.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf += data
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            end = len(buf)
+            while pos < end and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < end:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete value: grow geometrically so huge members
+                # aren't re-decoded once per chunk
+                if not self._fill(max(self._chunk_size, len(self._buf) - self._pos)):
+                    raise
+                continue
+
+            # A number (or literal) ending at the buffer edge may continue
+            if end == len(self._buf) and not isinstance(value, (dict, list, str)):
+                if self._fill():
+                    continue
+
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[tuple[str, "JsonObjectStream"]]:
+        """
+        Iterate the members of the object at the current position.
+
+        Yields each key with the stream positioned at its value; the
+        consumer must read the value (value(), or members() to descend)
+        before advancing, otherwise it is decoded and discarded.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("JSON object key is not a string")
+            self.expect(":")
+
+            start = self.tell()
+            yield key, self
+            if self.tell() == start:
+                self.value()  # Consumer skipped this member
+
+            sep = self.peek()
+            self._pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON stream, found {sep!r}")
+
+
+def first_key(f: IO[str], chunk_size: int = 4096) -> Optional[str]:
+    """
+    Read the first key of a top-level JSON object from the start of a file.
+
+    Returns:
+        The key, or None if the file doesn't start with a non-empty object
+    """
+    stream = JsonObjectStream(f, chunk_size=chunk_size)
+    try:
+        if stream.peek() != "{":
+            return None
+        stream.expect("{")
+        if stream.peek() != '"':
+            return None
+        key = stream.value()
+    except ValueError:
+        return None
+    return key if isinstance(key, str) else None
@@ -0,0 +1,361 @@
+"""
+Precompiled per-file coverage summaries for hooks.
+
+A summary holds only the counts of each file in a report (no line data),
+hashed into buckets by basename, so a lookup reads the preamble, one
+bucket-table slot and one small bucket regardless of report size. It is
+written alongside the sidecar index (see lib.core.coverage.index) and is
+valid while the report's mtime and size are unchanged.
+
+Hooks call get_file_summary(), which rebuilds a stale summary inline when
+the report is small enough to parse within the latency budget and
+otherwise hands the rebuild to a detached background process.
+"""
+
+import marshal
+import os
+import struct
+import subprocess
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from lib.core.config import get_cache_dir
+from lib.core.coverage.index import MIN_SUFFIX_PARTS, lookup_keys, normalize_path
+
+SUMMARY_VERSION = 2
+SUMMARY_MAGIC = b"DKCS"
+SUMMARY_NAMESPACE = "coverage-summary"
+
+# magic, version, report mtime_ns, report size, bucket count, report path length
+_PREAMBLE = struct.Struct("<4sIqQII")
+
+# Bucket table entry: byte offset of the bucket in the data section
+_OFFSET = struct.Struct("<Q")
+
+# Average files per bucket
+BUCKET_LOAD = 4
+
+# Report bytes parsed per millisecond, conservatively (used to decide
+# whether a stale summary can be rebuilt inline)
+PARSE_BYTES_PER_MS = 4096
+
+# Seconds before an unfinished background rebuild may be retried
+REBUILD_MARKER_TTL = 120
+
+DEVKIT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+
+@dataclass
+class FileSummary:
+    """Coverage counts for one file."""
+    path: str
+    statements_total: int
+    statements_covered: int
+    branches_total: int
+    branches_covered: int
+    functions_total: int
+    functions_covered: int
+
+    @property
+    def statement_coverage(self) -> float:
+        """Statement coverage percentage."""
+        if self.statements_total == 0:
+            return 100.0
+        return (self.statements_covered / self.statements_total) * 100
+
+    @property
+    def branch_coverage(self) -> float:
+        """Branch coverage percentage."""
+        if self.branches_total == 0:
+            return 100.0
+        return (self.branches_covered / self.branches_total) * 100
+
+
+def _parts(path: str) -> list[str]:
+    return [p for p in normalize_path(path).split("/") if p]
+
+
+def _bucket(basename: str, buckets: int) -> int:
+    return zlib.crc32(basename.encode("utf-8", "surrogateescape")) % buckets
+
+
+def _suffix_length(a: list[str], b: list[str]) -> int:
+    n = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class CoverageSummary:
+    """An opened summary file for one report."""
+
+    def __init__(self, summary_path: Path, report_path: str, buckets: int, data_start: int):
+        self.summary_path = summary_path
+        self.report_path = report_path
+        self._buckets = buckets
+        self._table_start = data_start
+        self._data_start = data_start + (buckets + 1) * _OFFSET.size
+
+    def get(self, file: str) -> Optional[FileSummary]:
+        """
+        Look up one file (exact, or the longest path-suffix match).
+
+        A suffix match must cover at least MIN_SUFFIX_PARTS components and
+        identify a single file in the report.
+
+        Returns:
+            FileSummary, or None if the file isn't in the report
+        """
+        parts = _parts(file)
+        if not parts:
+            return None
+
+        try:
+            with open(self.summary_path, "rb") as f:
+                f.seek(self._table_start + _bucket(parts[-1], self._buckets) * _OFFSET.size)
+                start, end = struct.unpack("<QQ", f.read(2 * _OFFSET.size))
+                if start == end:
+                    return None
+                f.seek(self._data_start + start)
+                entries = marshal.loads(f.read(end - start))
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+
+        exact = {tuple(_parts(key)) for key in lookup_keys(file)}
+        best, best_length, tied = None, 0, False
+        for entry in entries:
+            entry_parts = _parts(entry[0])
+            if tuple(entry_parts) in exact:
+                return FileSummary(*entry)
+            length = _suffix_length(parts, entry_parts)
+            if length > best_length:
+                best, best_length, tied = entry, length, False
+            elif length == best_length:
+                tied = True
+        if best is None or best_length < MIN_SUFFIX_PARTS or tied:
+            return None
+        return FileSummary(*best)
+
+
+def _summary_path(report_path: str) -> Optional[Path]:
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = zlib.crc32(report_path.encode("utf-8", "surrogateescape"))
+    return cache_dir / SUMMARY_NAMESPACE / f"{digest:08x}.sum"
+
+
+def write_coverage_summary(
+    report_path: str,
+    st: os.stat_result,
+    files: Iterable,
+) -> Optional[CoverageSummary]:
+    """
+    Write the summary for a report.
+
+    Args:
+        report_path: Real path of the report
+        st: The report's stat result when it was parsed
+        files: The report's FileCoverage entries
+
+    Returns:
+        The new summary, or None if caching is disabled or writing fails
+    """
+    summary_path = _summary_path(report_path)
+    if summary_path is None:
+        return None
+
+    rows = [
+        (cov.path, cov.statements_total, cov.statements_covered, cov.branches_total,
+         cov.branches_covered, cov.functions_total, cov.functions_covered)
+        for cov in files
+    ]
+    buckets = max(1, len(rows) // BUCKET_LOAD)
+    grouped = [[] for _ in range(buckets)]
+    for row in rows:
+        parts = _parts(row[0])
+        if parts:
+            grouped[_bucket(parts[-1], buckets)].append(row)
+
+    offsets = [0]
+    blobs = []
+    for group in grouped:
+        blob = marshal.dumps(group) if group else b""
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+
+    encoded_path = report_path.encode("utf-8", "surrogateescape")
+    try:
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = summary_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(
+                SUMMARY_MAGIC, SUMMARY_VERSION, st.st_mtime_ns, st.st_size,
+                buckets, len(encoded_path),
+            ))
+            f.write(encoded_path)
+            f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+            f.write(b"".join(blobs))
+        os.replace(tmp_path, summary_path)
+    except OSError:
+        return None
+
+    return CoverageSummary(
+        summary_path, report_path, buckets, _PREAMBLE.size + len(encoded_path)
+    )
+
+
+def open_coverage_summary(report_path: str) -> Optional[CoverageSummary]:
+    """
+    Open a report's summary if it is up to date (never builds).
+
+    Returns:
+        CoverageSummary, or None if missing, stale or caching is disabled
+    """
+    report_path = os.path.realpath(report_path)
+    summary_path = _summary_path(report_path)
+    if summary_path is None:
+        return None
+
+    try:
+        st = os.stat(report_path)
+        with open(summary_path, "rb") as f:
+            magic, version, mtime_ns, size, buckets, path_len = _PREAMBLE.unpack(
+                f.read(_PREAMBLE.size)
+            )
+            stored_path = f.read(path_len)
+    except (OSError, struct.error):
+        return None
+
+    if (
+        magic != SUMMARY_MAGIC
+        or version != SUMMARY_VERSION
+        or (mtime_ns, size) != (st.st_mtime_ns, st.st_size)
+        or stored_path != report_path.encode("utf-8", "surrogateescape")
+    ):
+        return None
+    return CoverageSummary(summary_path, report_path, buckets, _PREAMBLE.size + path_len)
+
+
+def rebuild_in_background(report_path: str) -> bool:
+    """
+    Rebuild a report's index and summary in a detached process.
+
+    A marker file keeps concurrent hooks from starting duplicate rebuilds;
+    a marker older than REBUILD_MARKER_TTL (a crashed rebuild) is ignored.
+
+    Returns:
+        True if a rebuild was started
+    """
+    report_path = os.path.realpath(report_path)
+    summary_path = _summary_path(report_path)
+    if summary_path is None:
+        return False
+
+    marker = summary_path.with_suffix(".building")
+    try:
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if time.time() - marker.stat().st_mtime < REBUILD_MARKER_TTL:
+                return False
+            marker.unlink()
+        except FileNotFoundError:
+            pass
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return False
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(DEVKIT_ROOT), env.get("PYTHONPATH")) if p
+    )
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "lib.core.coverage.summary", report_path, str(marker)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+    except OSError:
+        marker.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def refresh_within_budget(report_path: str, budget_ms: Optional[int] = None) -> bool:
+    """
+    Rebuild a report's stale index and summary if that fits a latency budget.
+
+    The report is parsed inline if it can be parsed in about half the
+    budget; larger reports are rebuilt in the background.
+
+    Args:
+        report_path: Coverage report
+        budget_ms: Latency budget (default: the configured performance budget)
+
+    Returns:
+        True if the index and summary were rebuilt inline
+    """
+    if budget_ms is None:
+        from lib.core.config import get_performance_budget
+
+        budget_ms = get_performance_budget()
+
+    try:
+        size = os.path.getsize(report_path)
+    except OSError:
+        return False
+
+    if size > budget_ms // 2 * PARSE_BYTES_PER_MS:
+        rebuild_in_background(report_path)
+        return False
+
+    from lib.core.coverage.index import build_coverage_index
+
+    return build_coverage_index(report_path) is not None
+
+
+def get_file_summary(
+    report_path: str,
+    file: str,
+    budget_ms: Optional[int] = None,
+) -> Optional[FileSummary]:
+    """
+    Get one file's coverage counts within a latency budget.
+
+    A fresh summary is used directly. A stale or missing one is rebuilt
+    inline if the report can be parsed in about half the budget; larger
+    reports are rebuilt in the background and None is returned until the
+    rebuild finishes.
+
+    Args:
+        report_path: Coverage report
+        file: File to look up (exact, or matched by path suffix)
+        budget_ms: Latency budget (default: the configured performance budget)
+
+    Returns:
+        FileSummary, or None if the file isn't covered or no summary is
+        available yet
+    """
+    summary = open_coverage_summary(report_path)
+    if summary is None and refresh_within_budget(report_path, budget_ms):
+        summary = open_coverage_summary(report_path)
+    return summary.get(file) if summary is not None else None
+
+
+if __name__ == "__main__":
+    # Background rebuild: python -m lib.core.coverage.summary <report> <marker>
+    from lib.core.coverage.index import build_coverage_index
+
+    try:
+        build_coverage_index(sys.argv[1])
+    finally:
+        Path(sys.argv[2]).unlink(missing_ok=True)
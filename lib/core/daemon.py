@@ -0,0 +1,544 @@
+"""
+Warm hook daemon for devkit extensions.
+
+Provides:
+- A forking Unix-socket server that keeps lib.core and hook scripts resident
+- A client used by the hook shim to forward invocations to the server
+- In-process fallback when the daemon is not running
+
+Each request is served in a forked child, so hook scripts keep their
+run-once semantics (module-level code, sys.exit) while skipping interpreter
+startup and imports.
+"""
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+# Hook name -> script path relative to hooks/scripts/
+HOOK_SCRIPTS = {
+    "dangerous-command-blocker": "security/dangerous-command-blocker.py",
+    "sensitive-file-guard": "security/sensitive-file-guard.py",
+    "auto-format": "formatting/auto-format.py",
+    "test-on-change": "testing/test-on-change.py",
+    "test-coverage-enforcer": "coverage/test-coverage-enforcer.py",
+    "smart-context-loader": "context/smart-context-loader.py",
+}
+
+# Modules imported once by the server so forked children start warm
+PRELOAD_MODULES = [
+    "lib.core.config",
+    "lib.core.output",
+    "lib.core.git",
+    "lib.core.coverage",
+    "fnmatch",
+    "json",
+    "re",
+    "signal",
+    "subprocess",
+]
+
+# Frame header: 4-byte big-endian payload length
+_HEADER = struct.Struct(">I")
+
+DEFAULT_TIMEOUT = 120.0
+
+
+def get_socket_path() -> Path:
+    """Get path to the hook daemon socket."""
+    custom_path = os.getenv("CLAUDE_DEVKIT_HOOK_SOCKET")
+    if custom_path:
+        return Path(custom_path)
+
+    return Path.home() / ".claude" / "devkit-hookd.sock"
+
+
+def get_scripts_dir() -> Path:
+    """Get path to hooks/scripts/ in this devkit checkout."""
+    return Path(__file__).resolve().parent.parent.parent / "hooks" / "scripts"
+
+
+def resolve_hook_script(name: str, scripts_dir: Optional[Path] = None) -> Optional[Path]:
+    """
+    Resolve a hook name to its script path.
+
+    Args:
+        name: Hook name (e.g. "dangerous-command-blocker")
+        scripts_dir: Optional hooks/scripts/ directory
+
+    Returns:
+        Path to the script, or None if unknown
+    """
+    if scripts_dir is None:
+        scripts_dir = get_scripts_dir()
+
+    relative = HOOK_SCRIPTS.get(name)
+    if relative is not None:
+        path = scripts_dir / relative
+        if path.exists():
+            return path
+
+    # Unregistered hooks: look one directory deep for <name>.py
+    for path in sorted(scripts_dir.glob(f"*/{name}.py")):
+        return path
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Framing
+# ---------------------------------------------------------------------------
+
+def send_message(sock: socket.socket, payload: dict) -> None:
+    """Send a length-prefixed JSON message."""
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or None if the peer closed early."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Optional[dict]:
+    """Receive a length-prefixed JSON message, or None on EOF."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+
+    (length,) = _HEADER.unpack(header)
+    data = _recv_exact(sock, length)
+    if data is None:
+        return None
+
+    try:
+        return json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
+
+def request(
+    socket_path: Path,
+    payload: dict,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Optional[dict]:
+    """
+    Send a request to a devkit daemon and wait for the response.
+
+    Args:
+        socket_path: Unix socket the daemon listens on
+        payload: JSON-serializable request
+        timeout: Seconds to wait for the response
+
+    Returns:
+        Response dict, or None if the daemon is unavailable
+    """
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):
+        return None  # No Unix sockets on this platform
+
+    try:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        send_message(sock, payload)
+        return recv_message(sock)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def is_running(socket_path: Optional[Path] = None) -> bool:
+    """Check if a daemon is accepting connections on socket_path."""
+    if socket_path is None:
+        socket_path = get_socket_path()
+
+    return request(socket_path, {"op": "ping"}, timeout=1.0) is not None
+
+
+# ---------------------------------------------------------------------------
+# Hook execution
+# ---------------------------------------------------------------------------
+
+def exit_status(code: Any) -> int:
+    """Convert a SystemExit code to a process exit status."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def exec_hook(code: Any, script_path: Path, stdin_text: str) -> tuple[int, str, str]:
+    """
+    Execute compiled hook code as __main__ with captured stdio.
+
+    Args:
+        code: Compiled code object for the hook script
+        script_path: Path used for __file__ and argv[0]
+        stdin_text: Hook input to expose on stdin
+
+    Returns:
+        Tuple of (exit_code, stdout, stderr)
+    """
+    saved = (sys.stdin, sys.stdout, sys.stderr, sys.argv)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    sys.stdin = io.StringIO(stdin_text)
+    sys.stdout, sys.stderr = stdout, stderr
+    sys.argv = [str(script_path)]
+
+    namespace = {
+        "__name__": "__main__",
+        "__file__": str(script_path),
+        "__builtins__": __builtins__,
+    }
+
+    try:
+        exec(code, namespace)
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = exit_status(e.code)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr, sys.argv = saved
+
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def watch_client(sock: socket.socket, done: threading.Event) -> None:
+    """
+    Kill this process group if the client disconnects before done is set.
+
+    Runs in a thread of a forked child that leads its own process group, so
+    a hook abandoned by its client (timed out or killed) stops, along with
+    any subprocesses it started in the group.
+    """
+    try:
+        while sock.recv(4096):
+            pass  # Clients send nothing after the request
+    except OSError:
+        pass
+    if done.is_set():
+        return
+    try:
+        os.killpg(os.getpid(), signal.SIGKILL)
+    except OSError:
+        pass  # Not a group leader: never kill the server's group
+
+
+def compile_script(path: Path) -> Any:
+    """Compile a hook script to a code object."""
+    source = path.read_text()
+    return compile(source, str(path), "exec")
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """
+    Forking Unix-socket server with length-prefixed JSON requests.
+
+    Subclasses implement handle_request_payload(); it runs in a forked child,
+    so it may freely mutate process state. The child's client socket is
+    available as self.connection for interim messages sent before the
+    response.
+    """
+
+    connection: Optional[socket.socket] = None
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = Path(socket_path)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Remove a stale socket left by a crashed daemon
+        if self.socket_path.exists() and not is_running(self.socket_path):
+            self.socket_path.unlink()
+
+        super().__init__(str(self.socket_path), _RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def handle_request_payload(self, payload: dict) -> dict:
+        """Handle one decoded request (runs in the forked child)."""
+        raise NotImplementedError
+
+    def before_fork(self) -> None:
+        """Hook run in the parent before each request is forked."""
+
+    def process_request(self, request, client_address):
+        self.before_fork()
+        super().process_request(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Decode one request, dispatch to the server, send the response."""
+
+    def handle(self):
+        # Forked child: don't inherit the server's shutdown handler
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        payload = recv_message(self.request)
+        if payload is None:
+            return
+
+        if payload.get("op") == "ping":
+            response = {"ok": True, "pid": os.getppid()}
+        else:
+            self.server.connection = self.request
+            try:
+                response = self.server.handle_request_payload(payload)
+            except Exception:
+                response = {"error": traceback.format_exc()}
+
+        try:
+            send_message(self.request, response)
+        except OSError:
+            pass  # Client went away
+
+
+class HookServer(ForkingUnixServer):
+    """Hook daemon: keeps lib.core imported and hook scripts compiled."""
+
+    def __init__(self, socket_path: Path, scripts_dir: Optional[Path] = None):
+        self.scripts_dir = scripts_dir or get_scripts_dir()
+        self._compiled: dict[str, tuple[int, Path, Any]] = {}
+        super().__init__(socket_path)
+        self.preload()
+
+    def preload(self) -> None:
+        """Import shared modules and compile all known hook scripts."""
+        devkit_root = str(self.scripts_dir.parent.parent)
+        if devkit_root not in sys.path:
+            sys.path.insert(0, devkit_root)
+
+        import importlib
+        for module in PRELOAD_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+        for name in HOOK_SCRIPTS:
+            self._load(name)
+
+    def _load(self, name: str) -> Optional[tuple[Path, Any]]:
+        """Return (path, code) for a hook, recompiling if the script changed."""
+        path = resolve_hook_script(name, self.scripts_dir)
+        if path is None:
+            return None
+
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self._compiled.get(name)
+        if cached is None or cached[0] != mtime or cached[1] != path:
+            try:
+                code = compile_script(path)
+            except (OSError, SyntaxError):
+                return None
+            cached = (mtime, path, code)
+            self._compiled[name] = cached
+
+        return cached[1], cached[2]
+
+    def before_fork(self) -> None:
+        # Refresh compiled scripts and settings in the parent so children
+        # inherit them warm
+        for name in list(self._compiled):
+            self._load(name)
+
+        try:
+            from lib.core.config import load_settings
+            load_settings()
+        except Exception:
+            pass
+
+    def handle_request_payload(self, payload: dict) -> dict:
+        name = payload.get("hook", "")
+        loaded = self._load(name)
+        if loaded is None:
+            # Nothing ran: the client may run the hook itself
+            return {"error": f"Unknown hook: {name}", "rejected": True}
+
+        path, code = loaded
+
+        # Mirror the client's process context
+        env = payload.get("env")
+        if isinstance(env, dict):
+            os.environ.clear()
+            os.environ.update(env)
+
+        cwd = payload.get("cwd")
+        if cwd:
+            try:
+                os.chdir(cwd)
+            except OSError:
+                pass
+
+        # Lead a process group, so a hook whose client goes away is killed
+        # with everything it started
+        done = threading.Event()
+        try:
+            os.setpgid(0, 0)
+        except OSError:
+            pass
+        else:
+            threading.Thread(
+                target=watch_client, args=(self.connection, done), daemon=True
+            ).start()
+
+        try:
+            exit_code, stdout, stderr = exec_hook(code, path, payload.get("stdin", ""))
+        finally:
+            done.set()
+        return {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+
+
+def serve(socket_path: Optional[Path] = None, scripts_dir: Optional[Path] = None) -> None:
+    """Run the hook daemon in the foreground until interrupted."""
+    if socket_path is None:
+        socket_path = get_socket_path()
+
+    # Treat SIGTERM like Ctrl-C so the socket file is removed on exit
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with HookServer(socket_path, scripts_dir) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def daemonize(target: Callable[[], None]) -> bool:
+    """
+    Run target in a detached background process (double fork).
+
+    Returns:
+        True in the original process once the daemon is launched
+    """
+    pid = os.fork()
+    if pid > 0:
+        os.waitpid(pid, 0)
+        return True
+
+    # First child: new session, then fork again so we can't reacquire a tty
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    try:
+        target()
+    finally:
+        os._exit(0)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class HookDaemonError(Exception):
+    """The daemon accepted a hook request but didn't complete it."""
+
+
+def call_hook(
+    name: str,
+    stdin_text: str,
+    socket_path: Optional[Path] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Optional[tuple[int, str, str]]:
+    """
+    Run a hook on the warm daemon.
+
+    Args:
+        name: Hook name (see HOOK_SCRIPTS)
+        stdin_text: Raw hook input
+        socket_path: Optional daemon socket path
+        timeout: Seconds to wait for the hook to finish
+
+    Returns:
+        Tuple of (exit_code, stdout, stderr), or None if the daemon is
+        unavailable or rejected the request before running the hook, and
+        the caller should run the hook itself
+
+    Raises:
+        HookDaemonError: The request was delivered but no result came back
+            (timeout, crash, error response). The hook may have run, so
+            the caller must not run it again.
+    """
+    if socket_path is None:
+        socket_path = get_socket_path()
+
+    if not socket_path.exists():
+        return None
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):
+        return None  # No Unix sockets on this platform
+
+    try:
+        try:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            send_message(sock, {
+                "hook": name,
+                "stdin": stdin_text,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+            })
+        except OSError:
+            return None  # Not delivered: nothing ran
+
+        try:
+            response = recv_message(sock)
+        except socket.timeout:
+            raise HookDaemonError(f"hook {name} timed out after {timeout:g}s on the daemon")
+        except OSError as e:
+            raise HookDaemonError(f"lost connection to the daemon running {name}: {e}")
+    finally:
+        sock.close()
+
+    if response is None:
+        raise HookDaemonError(f"daemon closed the connection while running {name}")
+    if response.get("rejected"):
+        return None
+    if "exit_code" not in response:
+        raise HookDaemonError(response.get("error") or f"malformed daemon response for {name}")
+
+    return response["exit_code"], response.get("stdout", ""), response.get("stderr", "")
@@ -0,0 +1,731 @@
+"""
+Formatter backends and edit batching for auto-format.
+
+Formatting goes to a long-lived process when one is available, and falls
+back to the formatter's command line otherwise:
+
+- JS/TS: a persistent prettier server (hooks/scripts/formatting/
+  prettier-server.js) holding the project's own prettier, started on
+  first use when the project has prettier in node_modules; fallback
+  `npx prettier --write`
+- Python: black's library API in-process when the importable black is
+  the `black` on PATH, then blackd over HTTP (started on first use if
+  installed); fallback `black`
+
+Hooks for files edited in quick succession are batched: each hook
+queues its file, the first one to take the leader lock waits a short
+window, formats the whole queue with one call per formatter and hands
+the other hooks their results.
+
+Content left by a successful format is remembered by (path, content
+hash, formatter settings); an edit that produces already-formatted
+content skips the formatter entirely and the file is not rewritten.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tokenize
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from lib.core.cache import DiskCache, FileLock, get_disk_cache
+from lib.core.config import get_cache_dir
+
+PRETTIER_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+BLACK_EXTENSIONS = (".py", ".pyi")
+
+DEFAULT_LINE_LENGTH = 100
+
+# Seconds before a formatter call is abandoned
+FORMAT_TIMEOUT = 10.0
+
+# Default milliseconds a batch leader waits for other edits to join
+DEFAULT_BATCH_MS = 30
+
+# blackd's default address
+DEFAULT_BLACKD_URL = "http://127.0.0.1:45484"
+
+# Seconds between checks while waiting for a batch result
+POLL_INTERVAL = 0.005
+
+PRETTIER_SERVER_NAMESPACE = "prettier-server"
+BATCH_NAMESPACE = "format-batch"
+KNOWN_FORMATTED_NAMESPACE = "formatted"
+
+# Byte budget for known-formatted entries
+KNOWN_FORMATTED_MAX_BYTES = 1024 * 1024
+
+# Bump when the known-formatted key changes
+KNOWN_FORMATTED_VERSION = 1
+
+# Message of the result returned when the formatter was skipped
+KNOWN_FORMATTED = "known formatted"
+
+# Files whose content changes a formatter's output, looked up from the
+# edited file's directory up to the repository root
+CONFIG_FILES = {
+    "black": ("pyproject.toml",),
+    "prettier": (
+        "package.json", ".prettierrc", ".prettierrc.json", ".prettierrc.yaml",
+        ".prettierrc.yml", ".prettierrc.json5", ".prettierrc.js", ".prettierrc.cjs",
+        ".prettierrc.mjs", ".prettierrc.toml", "prettier.config.js", "prettier.config.cjs",
+        "prettier.config.mjs", ".prettierignore", ".editorconfig",
+    ),
+}
+
+
+@dataclass
+class FormatResult:
+    """Outcome of formatting one file."""
+    path: str
+    status: str  # "formatted", "unchanged", "failed", "missing" or "timeout"
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("formatted", "unchanged")
+
+
+def formatter_for(path: str) -> Optional[str]:
+    """Name of the formatter for a file ("prettier" or "black"), or None."""
+    ext = os.path.splitext(path)[1]
+    if ext in PRETTIER_EXTENSIONS:
+        return "prettier"
+    if ext in BLACK_EXTENSIONS:
+        return "black"
+    return None
+
+
+def _project_key(root: str) -> str:
+    return f"{zlib.crc32(os.path.realpath(root).encode('utf-8', 'surrogateescape')):08x}"
+
+
+# ---------------------------------------------------------------------------
+# Command-line fallback
+# ---------------------------------------------------------------------------
+
+def cli_command(formatter: str, line_length: int = DEFAULT_LINE_LENGTH) -> list[str]:
+    """Formatter command line (files are appended)."""
+    if formatter == "prettier":
+        return ["npx", "prettier", "--write"]
+    return ["black", "--line-length", str(line_length)]
+
+
+def format_with_cli(
+    formatter: str,
+    paths: list[str],
+    line_length: int = DEFAULT_LINE_LENGTH,
+) -> dict[str, FormatResult]:
+    """Format files with one formatter subprocess."""
+    try:
+        result = subprocess.run(
+            cli_command(formatter, line_length) + paths,
+            capture_output=True,
+            timeout=FORMAT_TIMEOUT,
+            text=True,
+        )
+    except FileNotFoundError:
+        return {path: FormatResult(path, "missing") for path in paths}
+    except subprocess.TimeoutExpired:
+        return {path: FormatResult(path, "timeout") for path in paths}
+
+    if result.returncode != 0:
+        if len(paths) > 1:
+            # Find out which files the failure belongs to
+            results = {}
+            for path in paths:
+                results.update(format_with_cli(formatter, [path], line_length))
+            return results
+        return {path: FormatResult(path, "failed", result.stderr) for path in paths}
+    return {path: FormatResult(path, "formatted") for path in paths}
+
+
+# ---------------------------------------------------------------------------
+# prettier server
+# ---------------------------------------------------------------------------
+
+def get_prettier_server_script() -> Path:
+    """Path to prettier-server.js in this devkit checkout."""
+    from lib.core.daemon import get_scripts_dir
+
+    return get_scripts_dir() / "formatting" / "prettier-server.js"
+
+
+def find_local_prettier(root: str) -> Optional[str]:
+    """node_modules/prettier directory visible from root, or None."""
+    directory = os.path.realpath(root)
+    while True:
+        candidate = os.path.join(directory, "node_modules", "prettier")
+        if os.path.isfile(os.path.join(candidate, "package.json")):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def prettier_socket_path(root: str) -> Optional[Path]:
+    """Socket of the project's prettier server, or None if caching is disabled."""
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    return cache_dir / PRETTIER_SERVER_NAMESPACE / f"{_project_key(root)}.sock"
+
+
+def start_prettier_server(root: str) -> bool:
+    """
+    Start the project's prettier server in the background.
+
+    Only projects with prettier installed locally get a server (npx would
+    otherwise resolve a global or downloaded copy on every call).
+
+    Returns:
+        True if a server was started
+    """
+    socket_path = prettier_socket_path(root)
+    node = shutil.which("node")
+    if socket_path is None or node is None or find_local_prettier(root) is None:
+        return False
+
+    try:
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.Popen(
+            [node, str(get_prettier_server_script()), str(socket_path), os.path.realpath(root)],
+            cwd=root,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return False
+    return True
+
+
+def format_with_prettier_server(paths: list[str], root: str) -> Optional[dict[str, FormatResult]]:
+    """
+    Format files on the project's prettier server.
+
+    Returns:
+        Results, or None if no server is available (one is started for
+        later calls when possible)
+    """
+    from lib.core.daemon import request
+
+    socket_path = prettier_socket_path(root)
+    if socket_path is None:
+        return None
+
+    response = None
+    if socket_path.exists():
+        response = request(socket_path, {"files": paths}, timeout=FORMAT_TIMEOUT)
+    if response is None or "results" not in response:
+        start_prettier_server(root)
+        return None
+
+    results = {}
+    for item in response["results"]:
+        path = item.get("file")
+        if "error" in item:
+            results[path] = FormatResult(path, "failed", item["error"])
+        else:
+            results[path] = FormatResult(path, "formatted" if item.get("changed") else "unchanged")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# blackd
+# ---------------------------------------------------------------------------
+
+def _blackd_request(url: str, source: bytes, headers: dict) -> Optional[tuple[int, bytes]]:
+    import http.client
+
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(
+        parts.hostname or "127.0.0.1", parts.port or 80, timeout=FORMAT_TIMEOUT
+    )
+    try:
+        conn.request("POST", parts.path or "/", body=source, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+def start_blackd(url: str = DEFAULT_BLACKD_URL) -> bool:
+    """
+    Start blackd in the background if it is installed.
+
+    Returns:
+        True if blackd was started
+    """
+    blackd = shutil.which("blackd")
+    parts = urlsplit(url)
+    if blackd is None or parts.port is None:
+        return False
+
+    try:
+        subprocess.Popen(
+            [blackd, "--bind-host", parts.hostname or "127.0.0.1", "--bind-port", str(parts.port)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return False
+    return True
+
+
+def format_with_blackd(
+    paths: list[str],
+    url: str = DEFAULT_BLACKD_URL,
+    line_length: int = DEFAULT_LINE_LENGTH,
+) -> Optional[dict[str, FormatResult]]:
+    """
+    Format files through blackd.
+
+    Returns:
+        Results, or None if blackd isn't reachable (it is started for
+        later calls when installed)
+    """
+    results = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                source = f.read()
+        except OSError as e:
+            results[path] = FormatResult(path, "failed", str(e))
+            continue
+
+        headers = {"X-Line-Length": str(line_length), "X-Protocol-Version": "1"}
+        if path.endswith(".pyi"):
+            headers["X-Python-Variant"] = "pyi"
+        response = _blackd_request(url, source, headers)
+        if response is None:
+            if not results:
+                start_blackd(url)
+                return None
+            results[path] = FormatResult(path, "failed", "blackd stopped responding")
+            continue
+
+        status, body = response
+        if status == 204:
+            results[path] = FormatResult(path, "unchanged")
+        elif status == 200:
+            try:
+                with open(path, "wb") as f:
+                    f.write(body)
+            except OSError as e:
+                results[path] = FormatResult(path, "failed", str(e))
+                continue
+            results[path] = FormatResult(path, "formatted")
+        else:
+            results[path] = FormatResult(path, "failed", body.decode("utf-8", "replace"))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# black in-process
+# ---------------------------------------------------------------------------
+
+def _find_black_origin() -> Optional[str]:
+    """Path of the black package this interpreter would import, or None."""
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec("black")
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec is not None else None
+
+
+def black_library_matches_cli() -> bool:
+    """
+    Whether importing black here gets the same installation as `black` on PATH.
+
+    The command on PATH (usually the project's virtualenv) is what the
+    formatter would otherwise run; formatting with a different black
+    version would make the two reformat files back and forth. They match
+    when the console script runs under this interpreter and the imported
+    package lives in the script's installation prefix.
+    """
+    script = shutil.which("black")
+    origin = _find_black_origin()
+    if script is None or origin is None:
+        return False
+
+    from lib.core.pytest_worker import script_python
+
+    script = os.path.realpath(script)
+    python = script_python(script)
+    if python is None or os.path.realpath(python) != os.path.realpath(sys.executable):
+        return False
+    prefix = os.path.dirname(os.path.dirname(script))  # <prefix>/bin/black
+    return os.path.realpath(origin).startswith(prefix + os.sep)
+
+
+def _black_mode(black, path: str, line_length: int, modes: dict):
+    """
+    black.Mode for a file from its project's [tool.black] settings.
+
+    Only target-version, skip-string-normalization,
+    skip-magic-trailing-comma and preview are read; line-length is always
+    the hook's. Other keys (unstable, enable-unstable-feature,
+    skip-source-first-line, python-cell-magics, include/exclude patterns)
+    are ignored.
+    """
+    config_path = black.find_pyproject_toml((os.path.dirname(os.path.abspath(path)),))
+    key = (config_path, path.endswith(".pyi"))
+    if key not in modes:
+        config = {}
+        if config_path:
+            try:
+                config = black.parse_pyproject_toml(config_path)
+            except (OSError, ValueError):
+                pass
+        target_versions = set()
+        for name in config.get("target_version") or ():
+            try:
+                target_versions.add(black.TargetVersion[name.upper()])
+            except KeyError:
+                pass
+        modes[key] = black.Mode(
+            target_versions=target_versions,
+            line_length=line_length,  # The hook's line length wins, as with the CLI
+            string_normalization=not config.get("skip_string_normalization", False),
+            magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+            is_pyi=key[1],
+            preview=bool(config.get("preview", False)),
+        )
+    return modes[key]
+
+
+def _decode_source(raw: bytes) -> tuple[str, str, str]:
+    """Source text (universal newlines), its encoding and its newline style."""
+    encoding = tokenize.detect_encoding(io.BytesIO(raw).readline)[0]
+    line_end = raw.find(b"\n")
+    newline = "\r\n" if line_end > 0 and raw[line_end - 1:line_end] == b"\r" else "\n"
+    return io.TextIOWrapper(io.BytesIO(raw), encoding).read(), encoding, newline
+
+
+def format_with_black_library(
+    paths: list[str],
+    line_length: int = DEFAULT_LINE_LENGTH,
+) -> Optional[dict[str, FormatResult]]:
+    """
+    Format files with black's library API in this process.
+
+    Returns:
+        Results, or None if black isn't importable here
+    """
+    try:
+        import black
+    except ImportError:
+        return None
+
+    modes: dict = {}
+    results = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                source, encoding, newline = _decode_source(f.read())
+            mode = _black_mode(black, path, line_length, modes)
+            formatted = black.format_file_contents(source, fast=False, mode=mode)
+        except black.NothingChanged:
+            results[path] = FormatResult(path, "unchanged")
+            continue
+        except Exception as e:  # Parse errors and black's internal checks
+            results[path] = FormatResult(path, "failed", f"{type(e).__name__}: {e}")
+            continue
+
+        try:
+            with open(path, "w", encoding=encoding, newline=newline) as f:
+                f.write(formatted)
+        except OSError as e:
+            results[path] = FormatResult(path, "failed", str(e))
+            continue
+        results[path] = FormatResult(path, "formatted")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Known-formatted content
+# ---------------------------------------------------------------------------
+
+def get_known_formatted_cache() -> Optional[DiskCache]:
+    """Cache of known-formatted contents, or None if caching is disabled."""
+    return get_disk_cache(KNOWN_FORMATTED_NAMESPACE, max_bytes=KNOWN_FORMATTED_MAX_BYTES)
+
+
+def _stat_signature(path: Optional[str]) -> str:
+    if not path:
+        return ""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _formatter_signature(formatter: str, path: str) -> str:
+    """Cheap identity of the installed formatter (no import, no subprocess)."""
+    if formatter == "prettier":
+        local = find_local_prettier(os.path.dirname(path) or ".")
+        return _stat_signature(local and os.path.join(local, "package.json"))
+
+    return f"{_stat_signature(_find_black_origin())}|{_stat_signature(shutil.which('black'))}"
+
+
+def _config_signatures(formatter: str, path: str) -> list[str]:
+    """Stat signatures of the formatter config files that can apply to path."""
+    found = []
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        for name in CONFIG_FILES[formatter]:
+            signature = _stat_signature(os.path.join(directory, name))
+            if signature:
+                found.append(f"{directory}/{name}:{signature}")
+        parent = os.path.dirname(directory)
+        if parent == directory or os.path.exists(os.path.join(directory, ".git")):
+            return found
+        directory = parent
+
+
+def known_formatted_key(path: str, options: "FormatOptions") -> Optional[str]:
+    """
+    Key for a file's current content under the current formatter settings.
+
+    Returns:
+        Hex digest, or None if the file can't be read or has no formatter
+    """
+    formatter = formatter_for(path)
+    if formatter is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{KNOWN_FORMATTED_VERSION}\0{os.path.realpath(path)}\0".encode(
+        "utf-8", "surrogateescape"
+    ))
+    h.update(f"{formatter}\0{options.line_length}\0".encode())
+    h.update(f"{_formatter_signature(formatter, path)}\0".encode("utf-8", "surrogateescape"))
+    for signature in _config_signatures(formatter, path):
+        h.update(f"{signature}\0".encode("utf-8", "surrogateescape"))
+    h.update(content)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FormatOptions:
+    """Formatter settings (from the auto-format extension options)."""
+    line_length: int = DEFAULT_LINE_LENGTH
+    daemons: bool = True
+    blackd_url: str = DEFAULT_BLACKD_URL
+    in_process: bool = True  # Use black's library API when it is the black on PATH
+    skip_known: bool = True  # Skip content known to be formatted
+    root: str = ""  # Project directory (default: the current directory)
+
+
+def format_files(
+    paths: Iterable[str],
+    options: Optional[FormatOptions] = None,
+) -> dict[str, FormatResult]:
+    """
+    Format files, one call per formatter.
+
+    Args:
+        paths: Files to format (unsupported extensions are ignored)
+        options: Formatter settings
+
+    Returns:
+        Result per formatted path
+    """
+    if options is None:
+        options = FormatOptions()
+    root = options.root or os.getcwd()
+
+    groups: dict[str, list[str]] = {}
+    for path in dict.fromkeys(paths):  # Dedupe, keep order
+        formatter = formatter_for(path)
+        if formatter is not None:
+            groups.setdefault(formatter, []).append(path)
+
+    results: dict[str, FormatResult] = {}
+    for formatter, group in groups.items():
+        found = None
+        if options.in_process and formatter == "black" and black_library_matches_cli():
+            found = format_with_black_library(group, options.line_length)
+        if found is None and options.daemons and formatter == "prettier":
+            found = format_with_prettier_server(group, root)
+        elif found is None and options.daemons and formatter == "black":
+            found = format_with_blackd(group, options.blackd_url, options.line_length)
+        if found is None:
+            found = format_with_cli(formatter, group, options.line_length)
+        results.update(found)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Batching
+# ---------------------------------------------------------------------------
+
+class FormatBatch:
+    """Queue and leader election for one project's concurrent format hooks."""
+
+    def __init__(self, directory: Path, options: FormatOptions, window_ms: int = DEFAULT_BATCH_MS):
+        self.directory = Path(directory)
+        self.options = options
+        self.window = window_ms / 1000
+
+    def _append(self, request_id: str, path: str) -> None:
+        with FileLock(self.directory / "queue.lock"):
+            with open(self.directory / "queue", "a", encoding="utf-8") as f:
+                f.write(json.dumps([request_id, path]) + "\n")
+
+    def _take_queue(self) -> list[tuple[str, str]]:
+        with FileLock(self.directory / "queue.lock"):
+            try:
+                with open(self.directory / "queue", "r+", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+                    f.truncate(0)
+            except FileNotFoundError:
+                return []
+
+        entries = []
+        for line in lines:
+            try:
+                request_id, path = json.loads(line)
+            except ValueError:
+                continue  # Torn line
+            entries.append((request_id, path))
+        return entries
+
+    def _result_path(self, request_id: str) -> Path:
+        return self.directory / f"{request_id}.result"
+
+    def _take_result(self, request_id: str) -> Optional[FormatResult]:
+        path = self._result_path(request_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = FormatResult(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        path.unlink(missing_ok=True)
+        return result
+
+    def _lead(self, request_id: str) -> Optional[FormatResult]:
+        """Format the queued batch as leader; returns this request's result."""
+        time.sleep(self.window)
+        entries = self._take_queue()
+        results = format_files([path for _, path in entries], self.options)
+
+        own = None
+        for entry_id, path in entries:
+            result = results.get(path, FormatResult(path, "unchanged"))
+            if entry_id == request_id:
+                own = result
+                continue
+            tmp_path = self._result_path(entry_id).with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(asdict(result), f)
+                os.replace(tmp_path, self._result_path(entry_id))
+            except OSError:
+                pass  # The follower times out and formats its file itself
+        return own
+
+    def format(self, path: str) -> FormatResult:
+        """
+        Format one file, sharing a formatter call with concurrent hooks.
+
+        Returns:
+            The file's result
+        """
+        request_id = f"{os.getpid()}-{time.time_ns()}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._append(request_id, path)
+
+        deadline = time.monotonic() + self.window + 2 * FORMAT_TIMEOUT
+        while time.monotonic() < deadline:
+            result = self._take_result(request_id)
+            if result is not None:
+                return result
+
+            lock = FileLock(self.directory / "leader.lock", nonblocking=True)
+            if lock.acquire():
+                try:
+                    # A leader may have finished this request meanwhile
+                    result = self._take_result(request_id) or self._lead(request_id)
+                finally:
+                    lock.release()
+                if result is not None:
+                    return result
+            time.sleep(POLL_INTERVAL)
+
+        return format_files([path], self.options).get(path, FormatResult(path, "unchanged"))
+
+
+def format_file(
+    path: str,
+    options: Optional[FormatOptions] = None,
+    batch_window_ms: int = DEFAULT_BATCH_MS,
+) -> Optional[FormatResult]:
+    """
+    Format one edited file.
+
+    Args:
+        path: File to format
+        options: Formatter settings
+        batch_window_ms: How long a batch leader waits for concurrent
+            edits (0 formats immediately, without batching)
+
+    Returns:
+        FormatResult ("unchanged" with message KNOWN_FORMATTED when the
+        formatter was skipped), or None if no formatter handles the file
+    """
+    if formatter_for(path) is None:
+        return None
+    if options is None:
+        options = FormatOptions()
+
+    known = get_known_formatted_cache() if options.skip_known else None
+    if known is not None:
+        key = known_formatted_key(path, options)
+        if key is not None and known.get(key):
+            return FormatResult(path, "unchanged", KNOWN_FORMATTED)
+
+    cache_dir = get_cache_dir()
+    if batch_window_ms <= 0 or cache_dir is None or sys.platform == "win32":
+        result = format_files([path], options).get(path)
+    else:
+        root = options.root or os.getcwd()
+        batch = FormatBatch(
+            cache_dir / BATCH_NAMESPACE / _project_key(root), options, batch_window_ms
+        )
+        result = batch.format(path)
+
+    if known is not None and result is not None and result.ok:
+        key = known_formatted_key(path, options)  # Content after formatting
+        if key is not None:
+            known.set(key, True)
+    return result
@@ -0,0 +1,793 @@
+"""
+Git operations for devkit extensions.
+
+Provides typed wrappers around git commands for:
+- Diff analysis
+- Blame information
+- Commit history
+- File change detection
+
+Object and metadata lookups go through a pooled `git cat-file --batch`
+session (see lib.core.git.batch), falling back to one process per call.
+Branch, base-branch and modified-file checks read .git directly (see
+lib.core.git.repo) when the repository layout allows it. asyncio variants
+for running independent queries concurrently live in
+lib.core.git.aio.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+import datetime
+import os
+import struct
+import subprocess
+import re
+from typing import Iterator, Optional
+
+from lib.core.git.batch import GitSession, get_session
+from lib.core.git.repo import UnsupportedRepository, blob_sha, open_repository
+from lib.core.lines import LineRanges
+
+
+@dataclass
+class FileDiff:
+    """Represents a file diff from git."""
+    path: str
+    status: str  # A=added, M=modified, D=deleted, R=renamed
+    additions: int
+    deletions: int
+    old_path: Optional[str] = None  # For renames and copies
+    # Changed line ranges (filled when hunks are requested)
+    added_lines: LineRanges = field(default_factory=LineRanges)  # New-file line numbers
+    removed_lines: LineRanges = field(default_factory=LineRanges)  # Old-file line numbers
+
+    def is_line_changed(self, line: int) -> bool:
+        """Check if a line (new-file numbering) was added or modified."""
+        return line in self.added_lines
+
+
+@dataclass
+class BlameInfo:
+    """Blame information for a specific line."""
+    commit_hash: str
+    author: str
+    author_email: str
+    date: str
+    line_number: int
+    content: str
+
+
+@dataclass
+class Commit:
+    """Represents a git commit."""
+    hash: str
+    short_hash: str
+    author: str
+    author_email: str
+    date: str
+    message: str
+    files_changed: list[str] = field(default_factory=list)
+
+
+def run_git(
+    args: list[str],
+    cwd: Optional[str] = None,
+    timeout: float = 30,
+) -> tuple[int, str, str]:
+    """Run a git command and return (exit_code, stdout, stderr)."""
+    try:
+        result = subprocess.run(
+            ["git"] + args,
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        return result.returncode, result.stdout, result.stderr
+    except subprocess.TimeoutExpired:
+        return 1, "", "Command timed out"
+    except Exception as e:
+        return 1, "", str(e)
+
+
+_NUMSTAT_RE = re.compile(r"^(?:\d+|-)\t(?:\d+|-)\t")
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _parse_diff_output(stdout: str) -> tuple[dict[str, FileDiff], str]:
+    """
+    Parse `git diff --raw --numstat -z [-p]` output.
+
+    Returns:
+        Tuple of (path-keyed index in git order, trailing patch text)
+    """
+    index: dict[str, FileDiff] = {}
+    tokens = stdout.split("\0")
+    pos = 0
+
+    # Raw records: ":<modes> <shas> <status>\0<path>\0[<new path>\0]"
+    while pos < len(tokens) and tokens[pos].startswith(":"):
+        status_field = tokens[pos].split(" ")[-1]
+        status = status_field[:1]
+        if status in ("R", "C"):
+            old_path, path = tokens[pos + 1], tokens[pos + 2]
+            pos += 3
+        else:
+            old_path, path = None, tokens[pos + 1]
+            pos += 2
+
+        diff = FileDiff(path=path, status=status, additions=0, deletions=0, old_path=old_path)
+        index[path] = diff
+
+    # Numstat records: "<add>\t<del>\t<path>\0" or "<add>\t<del>\t\0<old>\0<new>\0"
+    while pos < len(tokens) and _NUMSTAT_RE.match(tokens[pos]):
+        parts = tokens[pos].split("\t", 2)
+        if parts[2]:
+            path = parts[2]
+            pos += 1
+        else:
+            path = tokens[pos + 2]  # Rename/copy: old and new follow
+            pos += 3
+
+        diff = index.get(path)
+        if diff is not None:
+            diff.additions = int(parts[0]) if parts[0] != "-" else 0
+            diff.deletions = int(parts[1]) if parts[1] != "-" else 0
+
+    patch = "\0".join(tokens[pos:]).lstrip("\0")
+    return index, patch
+
+
+# C escapes git uses when quoting paths (octal escapes aside)
+_C_ESCAPES = {
+    b"a": b"\a", b"b": b"\b", b"t": b"\t", b"n": b"\n", b"v": b"\v",
+    b"f": b"\f", b"r": b"\r", b'"': b'"', b"\\": b"\\",
+}
+_C_ESCAPE = re.compile(rb"\\([0-7]{3}|.)", re.DOTALL)
+
+
+def _unquote_path(path: str) -> str:
+    """
+    Undo git's C-style quoting of unusual paths in patch headers.
+
+    Works on the UTF-8 bytes: octal escapes are raw path bytes, and with
+    core.quotepath=false non-ASCII characters appear unescaped.
+    """
+    if not path.startswith('"'):
+        return path
+
+    def unescape(match: "re.Match[bytes]") -> bytes:
+        code = match.group(1)
+        if len(code) == 3:
+            return bytes([int(code, 8) & 0xFF])
+        return _C_ESCAPES.get(code, code)
+
+    raw = path[1:-1].encode("utf-8", "surrogateescape")
+    return _C_ESCAPE.sub(unescape, raw).decode("utf-8", "surrogateescape")
+
+
+def _header_path(line: str) -> Optional[str]:
+    """Path named by a `--- a/<path>` or `+++ b/<path>` line (None for /dev/null)."""
+    path = _unquote_path(line[4:].rstrip("\t"))
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
+
+
+def _parse_hunks(patch: str, index: dict[str, FileDiff]) -> None:
+    """
+    Fill added_lines/removed_lines from a unified diff (-U0).
+
+    Sections are matched to their FileDiff by the path in the `+++ b/<path>`
+    header (`--- a/<path>` for deletions), so a path with several sections
+    (a typechange is a deletion plus an addition) gets all of their hunks.
+    """
+    current: Optional[FileDiff] = None
+    old_path: Optional[str] = None
+    in_header = False
+
+    for line in patch.split("\n"):
+        if line.startswith("diff --git "):
+            current, old_path, in_header = None, None, True
+        elif in_header and line.startswith("--- "):
+            old_path = _header_path(line)
+        elif in_header and line.startswith("+++ "):
+            path = _header_path(line) or old_path
+            current = index.get(path) if path is not None else None
+            in_header = False
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_RE.match(line)
+            if not match:
+                continue
+            old_start, old_count, new_start, new_count = match.groups()
+            old_count = 1 if old_count is None else int(old_count)
+            new_count = 1 if new_count is None else int(new_count)
+            if old_count:
+                current.removed_lines.add(int(old_start), int(old_start) + old_count - 1)
+            if new_count:
+                current.added_lines.add(int(new_start), int(new_start) + new_count - 1)
+
+
+def _diff_args(base: str, include_hunks: bool, paths: Optional[list[str]]) -> list[str]:
+    """Build the single-pass `git diff` invocation used by get_diff_index."""
+    args = ["diff", "--raw", "--numstat", "-z"]
+    if include_hunks:
+        args.extend([
+            "-p", "-U0", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/"
+        ])
+    args.append(base)
+    if paths:
+        args.append("--")
+        args.extend(paths)
+    return args
+
+
+def _build_diff_index(stdout: str, include_hunks: bool) -> dict[str, FileDiff]:
+    """Parse _diff_args output into a path-keyed FileDiff index."""
+    index, patch = _parse_diff_output(stdout)
+    if include_hunks:
+        _parse_hunks(patch, index)
+    return index
+
+
+def get_diff_index(
+    base: str = "HEAD",
+    include_hunks: bool = False,
+    paths: Optional[list[str]] = None,
+) -> dict[str, FileDiff]:
+    """
+    Get file diffs compared to base, keyed by path.
+
+    Status, line counts and (optionally) hunk line ranges all come from a
+    single `git diff -z` invocation.
+
+    Args:
+        base: Git ref to compare against (default: HEAD)
+        include_hunks: If True, fill added_lines/removed_lines per file
+        paths: Optional paths to limit the diff to
+
+    Returns:
+        Dict of path -> FileDiff, in git's output order
+    """
+    exit_code, stdout, _ = run_git(_diff_args(base, include_hunks, paths))
+    if exit_code != 0:
+        return {}
+
+    return _build_diff_index(stdout, include_hunks)
+
+
+def get_diff(
+    base: str = "HEAD",
+    include_hunks: bool = False,
+    paths: Optional[list[str]] = None,
+) -> list[FileDiff]:
+    """
+    Get file diffs compared to base.
+
+    Args:
+        base: Git ref to compare against (default: HEAD)
+        include_hunks: If True, fill added_lines/removed_lines per file
+        paths: Optional paths to limit the diff to
+
+    Returns:
+        List of FileDiff objects for changed files
+    """
+    return list(get_diff_index(base, include_hunks=include_hunks, paths=paths).values())
+
+
+UNCOMMITTED_HASH = "0" * 40
+
+# Blame cache size (files)
+BLAME_CACHE_SIZE = 64
+
+# Ranges up to this many lines are blamed with -L unless the file's blame
+# is already cached; larger ranges blame (and cache) the whole file
+BLAME_RANGE_LINES = 50
+
+# (real path, HEAD sha, blob sha at HEAD) -> blame of the committed file
+_blame_cache: "OrderedDict[tuple[str, str, str], list[BlameInfo]]" = OrderedDict()
+
+
+def _format_blame_date(timestamp: int) -> str:
+    """Convert a blame author-time to an ISO date."""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def parse_blame_porcelain(stdout: str) -> list[BlameInfo]:
+    """
+    Parse `git blame --porcelain` output.
+
+    Commit metadata is emitted only for the first line of each commit and
+    shared by every later line from the same commit.
+
+    Returns:
+        BlameInfo per line, in output order
+    """
+    results = []
+    commits: dict[str, dict[str, str]] = {}
+    current: Optional[dict[str, str]] = None
+    commit_hash = ""
+    line_number = 0
+
+    for l in stdout.split("\n"):
+        if l.startswith("\t"):
+            meta = current or {}
+            results.append(BlameInfo(
+                commit_hash=commit_hash,
+                author=meta.get("author", ""),
+                author_email=meta.get("author_email", ""),
+                date=meta.get("date", ""),
+                line_number=line_number,
+                content=l[1:],
+            ))
+            continue
+
+        parts = l.split(" ")
+        if len(parts) >= 3 and len(parts[0]) in (40, 64) and parts[1].isdigit():
+            # Header: <sha> <orig line> <final line> [<group size>]
+            commit_hash = parts[0]
+            line_number = int(parts[2])
+            current = commits.setdefault(commit_hash, {})
+        elif current is not None:
+            if l.startswith("author "):
+                current["author"] = l[7:]
+            elif l.startswith("author-mail "):
+                current["author_email"] = l[12:].strip("<>")
+            elif l.startswith("author-time "):
+                current["date"] = _format_blame_date(int(l[12:]))
+
+    return results
+
+
+def _head_blob(session: GitSession, file: str) -> tuple[Optional[str], Optional[str]]:
+    """HEAD's commit sha and the file's blob sha at HEAD (None if missing)."""
+    try:
+        head, blob = session.object_info_many(["HEAD", f"HEAD:./{file}"])
+    except (OSError, ValueError):
+        return None, None
+    return (head and head.sha), (blob and blob.sha)
+
+
+def _blame_key(file: str, head: str, blob: str) -> tuple[str, str, str]:
+    return (os.path.realpath(file), head, blob)
+
+
+def _blame_committed(session: GitSession, file: str, head: str, blob: str) -> list[BlameInfo]:
+    """Blame the HEAD version of a file, using the cache."""
+    key = _blame_key(file, head, blob)
+    cached = _blame_cache.get(key)
+    if cached is not None:
+        _blame_cache.move_to_end(key)
+        return cached
+
+    exit_code, stdout, _ = run_git(["blame", "--porcelain", head, "--", file])
+    if exit_code != 0:
+        return []
+
+    blame = parse_blame_porcelain(stdout)
+    _blame_cache[key] = blame
+    if len(_blame_cache) > BLAME_CACHE_SIZE:
+        _blame_cache.popitem(last=False)
+    return blame
+
+
+def _blame_worktree(file: str, committed: list[BlameInfo], data: bytes) -> list[BlameInfo]:
+    """
+    Map a cached HEAD blame onto the working-tree file.
+
+    Unchanged lines keep their HEAD blame with shifted line numbers; lines
+    inside added hunks are attributed to the uncommitted working tree, as
+    `git blame` does. Only a -U0 diff of the one file is needed.
+    """
+    lines = data.decode("utf-8", "replace").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    diff = get_diff_index("HEAD", include_hunks=True, paths=[file])
+    file_diff = next(iter(diff.values()), None)
+    added = file_diff.added_lines if file_diff else LineRanges()
+    removed = file_diff.removed_lines if file_diff else LineRanges()
+
+    uncommitted = BlameInfo(
+        commit_hash=UNCOMMITTED_HASH,
+        author="Not Committed Yet",
+        author_email="not.committed.yet",
+        date=datetime.date.today().strftime("%Y-%m-%d"),
+        line_number=0,
+        content="",
+    )
+
+    results = []
+    old_line = 1
+    for new_line, content in enumerate(lines, 1):
+        if new_line in added:
+            info = uncommitted
+        else:
+            # Walk the old file in step, skipping lines the diff removed
+            while old_line in removed:
+                old_line += 1
+            info = committed[old_line - 1] if old_line <= len(committed) else uncommitted
+            old_line += 1
+        results.append(BlameInfo(
+            commit_hash=info.commit_hash,
+            author=info.author,
+            author_email=info.author_email,
+            date=info.date,
+            line_number=new_line,
+            content=content,
+        ))
+
+    return results
+
+
+def get_blame_file(file: str) -> list[BlameInfo]:
+    """
+    Get blame information for every line of a file.
+
+    The HEAD version is blamed once and cached by (path, HEAD, blob sha);
+    working-tree edits are mapped onto the cached result via a diff of the
+    file, so re-blames after small edits don't re-run `git blame`.
+
+    Args:
+        file: Path to the file
+
+    Returns:
+        BlameInfo per line (index 0 is line 1), or [] if not available
+    """
+    session = get_session()
+    if session is not None:
+        head, blob = _head_blob(session, file)
+
+        if head is not None and blob is not None:
+            committed = _blame_committed(session, file, head, blob)
+            try:
+                with open(file, "rb") as f:
+                    data = f.read()
+            except OSError:
+                return committed
+
+            if blob_sha(data, len(blob)) == blob:
+                return committed
+            return _blame_worktree(file, committed, data)
+
+    # No session, or file not in HEAD: blame the working tree directly
+    exit_code, stdout, _ = run_git(["blame", "--porcelain", "--", file])
+    if exit_code != 0:
+        return []
+    return parse_blame_porcelain(stdout)
+
+
+def get_blame_range(file: str, start: int, end: int) -> list[BlameInfo]:
+    """
+    Get blame information for lines start..end (inclusive, 1-indexed).
+
+    Small ranges run `git blame -L` unless the file's blame is already
+    cached; larger ranges blame the whole file once (see get_blame_file)
+    so later lookups in it are served from the cache.
+
+    Args:
+        file: Path to the file
+        start: First line
+        end: Last line
+
+    Returns:
+        BlameInfo per line in the range ([] if end < start)
+    """
+    start = max(start, 1)
+    if end < start:
+        return []
+
+    if end - start < BLAME_RANGE_LINES and not _blame_cached(file):
+        exit_code, stdout, _ = run_git(
+            ["blame", "--porcelain", "-L", f"{start},{end}", "--", file]
+        )
+        if exit_code == 0:
+            return parse_blame_porcelain(stdout)
+        # E.g. a range past the end of the file: slice what exists
+
+    return get_blame_file(file)[start - 1:end]
+
+
+def _blame_cached(file: str) -> bool:
+    """Whether the HEAD version of file has a cached blame."""
+    if not _blame_cache:
+        return False  # Skip starting a session for nothing
+    session = get_session()
+    if session is None:
+        return False
+    head, blob = _head_blob(session, file)
+    return head is not None and blob is not None and _blame_key(file, head, blob) in _blame_cache
+
+
+def get_blame(file: str, line: int) -> Optional[BlameInfo]:
+    """
+    Get blame information for a specific line in a file.
+
+    Args:
+        file: Path to the file
+        line: Line number (1-indexed)
+
+    Returns:
+        BlameInfo or None if not available
+    """
+    blame = get_blame_range(file, line, line)
+    return blame[0] if blame else None
+
+
+def clear_blame_cache() -> None:
+    """Drop all cached blame results."""
+    _blame_cache.clear()
+
+
+# git log record layout: RS, then US-separated fields, then US NUL, then
+# (with --name-only) a newline and NUL-terminated file names
+_LOG_FORMAT = "%x1e%H%x1f%h%x1f%an%x1f%ae%x1f%ai%x1f%s%x1f"
+_RECORD_SEP = b"\x1e"
+_FIELD_SEP = "\x1f"
+
+
+def stream_git(
+    args: list[str],
+    cwd: Optional[str] = None,
+    chunk_size: int = 65536,
+) -> Iterator[bytes]:
+    """
+    Run a git command and yield its stdout in chunks as it is produced.
+
+    The process is killed if the consumer stops iterating early.
+    """
+    try:
+        proc = subprocess.Popen(
+            ["git"] + args,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return
+
+    try:
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+
+def _log_args(
+    count: Optional[int],
+    path: Optional[str],
+    skip: int,
+    since: Optional[str],
+    include_files: bool,
+    rev: str,
+) -> list[str]:
+    """Build the `git log` invocation used by iter_commits."""
+    args = ["log", "-z", f"--format={_LOG_FORMAT}"]
+    if include_files:
+        args.append("--name-only")
+    if count is not None:
+        args.append(f"--max-count={count}")
+    if skip:
+        args.append(f"--skip={skip}")
+    if since:
+        args.append(f"--since={since}")
+    args.append(rev)
+    if path:
+        args.extend(["--", path])
+    return args
+
+
+def _parse_log_record(record: bytes) -> Optional[Commit]:
+    """Parse one _LOG_FORMAT record into a Commit."""
+    text = record.decode("utf-8", "replace")
+    header, _, names = text.partition(_FIELD_SEP + "\0")
+    fields = header.split(_FIELD_SEP)
+    if len(fields) < 6:
+        return None
+
+    return Commit(
+        hash=fields[0],
+        short_hash=fields[1],
+        author=fields[2],
+        author_email=fields[3],
+        date=fields[4][:10],  # Just the date part
+        message=fields[5],
+        files_changed=[f for f in names.lstrip("\n").split("\0") if f],
+    )
+
+
+def iter_commits(
+    count: Optional[int] = None,
+    path: Optional[str] = None,
+    skip: int = 0,
+    since: Optional[str] = None,
+    include_files: bool = True,
+    rev: str = "HEAD",
+) -> Iterator[Commit]:
+    """
+    Stream commits from a single `git log` pass.
+
+    Commits are parsed and yielded as git produces them, so callers that
+    stop early never wait for (or buffer) the rest of the history.
+
+    Args:
+        count: Maximum number of commits (None for all)
+        path: Optional file/directory to filter by
+        skip: Number of commits to skip before the first one yielded
+        since: Only commits more recent than this date (any `git log --since` format)
+        include_files: If False, skip file lists (files_changed stays empty)
+        rev: Revision to start from
+
+    Yields:
+        Commit objects, newest first
+    """
+    args = _log_args(count, path, skip, since, include_files, rev)
+
+    pending: list[bytes] = []  # Pieces of the current, incomplete record
+    for chunk in stream_git(args):
+        if _RECORD_SEP not in chunk:
+            pending.append(chunk)
+            continue
+
+        records = chunk.split(_RECORD_SEP)
+        pending.append(records[0])
+        records[0] = b"".join(pending)
+        pending = [records.pop()]
+
+        for record in records:
+            commit = _parse_log_record(record) if record else None
+            if commit is not None:
+                yield commit
+
+    if pending:
+        commit = _parse_log_record(b"".join(pending))
+        if commit is not None:
+            yield commit
+
+
+def get_recent_commits(
+    count: int = 10,
+    path: Optional[str] = None,
+    skip: int = 0,
+    since: Optional[str] = None,
+    include_files: bool = True,
+) -> list[Commit]:
+    """
+    Get recent commits.
+
+    Args:
+        count: Number of commits to retrieve
+        path: Optional file/directory to filter by
+        skip: Number of commits to skip (for paging)
+        since: Only commits more recent than this date
+        include_files: If False, leave files_changed empty (cheaper)
+
+    Returns:
+        List of Commit objects
+    """
+    return list(iter_commits(
+        count=count,
+        path=path,
+        skip=skip,
+        since=since,
+        include_files=include_files,
+    ))
+
+
+def get_changed_files(staged: bool = False) -> list[str]:
+    """
+    Get list of changed files.
+
+    Args:
+        staged: If True, only return staged files
+
+    Unstaged changes are found by comparing the index's stat data with the
+    working tree in-process; staged changes go through a cached
+    `git diff --name-only --cached` (see lib.core.git.cache), and
+    repositories the reader doesn't support through `git diff --name-only`.
+
+    Returns:
+        List of file paths
+    """
+    if not staged:
+        repo = open_repository()
+        if repo is not None:
+            try:
+                return repo.modified_files()
+            except (UnsupportedRepository, OSError, ValueError, struct.error):
+                pass
+
+    if staged:
+        # Index vs HEAD: reuse the last answer until either changes
+        from lib.core.git.cache import HEAD, INDEX, cached_run_git
+
+        exit_code, stdout, _ = cached_run_git(
+            ["diff", "--name-only", "--cached"], depends=(HEAD, INDEX)
+        )
+    else:
+        exit_code, stdout, _ = run_git(["diff", "--name-only"])
+
+    if exit_code != 0:
+        return []
+
+    return [f for f in stdout.strip().split("\n") if f]
+
+
+def get_file_history(file: str, count: int = 5, skip: int = 0) -> list[Commit]:
+    """
+    Get commit history for a specific file.
+
+    Args:
+        file: Path to the file
+        count: Number of commits to retrieve
+        skip: Number of commits to skip (for paging)
+
+    Returns:
+        List of Commit objects affecting this file
+    """
+    return get_recent_commits(count=count, path=file, skip=skip)
+
+
+def get_current_branch() -> Optional[str]:
+    """Get the current branch name ("" when HEAD is detached)."""
+    repo = open_repository()
+    if repo is not None:
+        try:
+            return repo.current_branch()
+        except UnsupportedRepository:
+            pass
+
+    exit_code, stdout, _ = run_git(["branch", "--show-current"])
+    if exit_code != 0:
+        return None
+    return stdout.strip()
+
+
+def get_repo_root(cwd: Optional[str] = None) -> Optional[str]:
+    """Get the working tree root of the repository containing cwd."""
+    repo = open_repository(cwd)
+    if repo is not None:
+        return repo.work_tree
+
+    exit_code, stdout, _ = run_git(["rev-parse", "--show-toplevel"], cwd=cwd)
+    root = stdout.strip()
+    return root if exit_code == 0 and root else None
+
+
+def get_base_branch() -> str:
+    """Get the base branch (main or master)."""
+    repo = open_repository()
+    if repo is not None:
+        return "main" if repo.has_branch("main") else "master"
+
+    exit_code, stdout, _ = run_git(["branch", "-l", "main", "master"])
+    if "main" in stdout:
+        return "main"
+    return "master"
+
+
+def get_commit_range(base: Optional[str] = None) -> tuple[str, str]:
+    """
+    Get commit range for current branch vs base.
+
+    Returns:
+        Tuple of (base_ref, head_ref)
+    """
+    if base is None:
+        base = get_base_branch()
+
+    # Get merge base
+    exit_code, stdout, _ = run_git(["merge-base", base, "HEAD"])
+    if exit_code != 0:
+        return base, "HEAD"
+
+    return stdout.strip(), "HEAD"
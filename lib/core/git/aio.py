@@ -0,0 +1,293 @@
+"""
+asyncio variants of the lib.core.git helpers.
+
+Each coroutine runs git via an asyncio subprocess and returns the same
+dataclasses as its synchronous counterpart, so independent queries can be
+awaited together instead of paying the sum of their latencies:
+
+    branch, diff = await asyncio.gather(get_current_branch(), get_diff())
+
+Concurrent git processes are bounded by a per-event-loop limiter (see
+set_concurrency). gather_repo_snapshot() fetches the set most commands need
+in one go.
+"""
+
+import asyncio
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+from lib.core.git import (
+    BlameInfo,
+    Commit,
+    FileDiff,
+    _RECORD_SEP,
+    _build_diff_index,
+    _diff_args,
+    _log_args,
+    _parse_log_record,
+    parse_blame_porcelain,
+)
+from lib.core.git.repo import UnsupportedRepository, open_repository
+
+
+# Maximum git processes running at once per event loop
+DEFAULT_CONCURRENCY = min(8, os.cpu_count() or 1)
+
+# Seconds before a git process is killed
+GIT_TIMEOUT = 30
+
+_concurrency = DEFAULT_CONCURRENCY
+
+# Semaphores bind to the loop they are first used on, so keep one per loop
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@dataclass
+class RepoSnapshot:
+    """The repository state most commands start from."""
+    branch: Optional[str]
+    base_branch: str
+    merge_base: str
+    diff: list[FileDiff] = field(default_factory=list)
+    recent_commits: list[Commit] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
+
+    @property
+    def commit_range(self) -> tuple[str, str]:
+        """(base_ref, head_ref), as returned by get_commit_range."""
+        return self.merge_base, "HEAD"
+
+
+def set_concurrency(limit: int) -> None:
+    """
+    Set the maximum number of concurrent git processes.
+
+    Applies to event loops that haven't run a git command yet.
+    """
+    global _concurrency
+    _concurrency = max(1, limit)
+    _limiters.clear()
+
+
+def _limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(_concurrency)
+        _limiters[loop] = limiter
+    return limiter
+
+
+async def run_git_bytes(
+    args: list[str],
+    cwd: Optional[str] = None,
+    timeout: float = GIT_TIMEOUT,
+) -> tuple[int, bytes, str]:
+    """Run a git command and return (exit_code, raw stdout, stderr)."""
+    async with _limiter():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            return 1, b"", str(e)
+
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return 1, b"", "Command timed out"
+        except asyncio.CancelledError:
+            if proc.returncode is None:
+                proc.kill()
+            raise
+
+        return proc.returncode, stdout, stderr.decode("utf-8", "replace")
+
+
+async def run_git(
+    args: list[str],
+    cwd: Optional[str] = None,
+    timeout: float = GIT_TIMEOUT,
+) -> tuple[int, str, str]:
+    """Run a git command and return (exit_code, stdout, stderr)."""
+    exit_code, stdout, stderr = await run_git_bytes(args, cwd=cwd, timeout=timeout)
+    return exit_code, stdout.decode("utf-8", "replace"), stderr
+
+
+async def get_diff_index(
+    base: str = "HEAD",
+    include_hunks: bool = False,
+    paths: Optional[list[str]] = None,
+) -> dict[str, FileDiff]:
+    """Async lib.core.git.get_diff_index."""
+    exit_code, stdout, _ = await run_git(_diff_args(base, include_hunks, paths))
+    if exit_code != 0:
+        return {}
+    return _build_diff_index(stdout, include_hunks)
+
+
+async def get_diff(
+    base: str = "HEAD",
+    include_hunks: bool = False,
+    paths: Optional[list[str]] = None,
+) -> list[FileDiff]:
+    """Async lib.core.git.get_diff."""
+    return list((await get_diff_index(base, include_hunks, paths)).values())
+
+
+async def get_recent_commits(
+    count: int = 10,
+    path: Optional[str] = None,
+    skip: int = 0,
+    since: Optional[str] = None,
+    include_files: bool = True,
+) -> list[Commit]:
+    """Async lib.core.git.get_recent_commits."""
+    args = _log_args(count, path, skip, since, include_files, "HEAD")
+    exit_code, stdout, _ = await run_git_bytes(args)
+    if exit_code != 0:
+        return []
+
+    commits = []
+    for record in stdout.split(_RECORD_SEP):
+        commit = _parse_log_record(record) if record else None
+        if commit is not None:
+            commits.append(commit)
+    return commits
+
+
+async def get_file_history(file: str, count: int = 5, skip: int = 0) -> list[Commit]:
+    """Async lib.core.git.get_file_history."""
+    return await get_recent_commits(count=count, path=file, skip=skip)
+
+
+async def get_blame_range(file: str, start: int, end: int) -> list[BlameInfo]:
+    """
+    Blame lines start..end (inclusive, 1-indexed) of the working-tree file.
+
+    Unlike the synchronous version this runs a ranged `git blame` directly
+    rather than going through the per-file blame cache. Returns [] if
+    end < start.
+    """
+    start = max(start, 1)
+    if end < start:
+        return []
+
+    exit_code, stdout, _ = await run_git(
+        ["blame", "--porcelain", f"-L{start},{end}", "--", file]
+    )
+    if exit_code != 0:
+        return []
+    return parse_blame_porcelain(stdout)
+
+
+async def get_blame(file: str, line: int) -> Optional[BlameInfo]:
+    """Async lib.core.git.get_blame."""
+    blame = await get_blame_range(file, line, line)
+    return blame[0] if blame else None
+
+
+async def get_changed_files(staged: bool = False) -> list[str]:
+    """Async lib.core.git.get_changed_files."""
+    args = ["diff", "--name-only", "--cached"] if staged else ["diff", "--name-only"]
+    exit_code, stdout, _ = await run_git(args)
+    if exit_code != 0:
+        return []
+    return [f for f in stdout.strip().split("\n") if f]
+
+
+async def get_current_branch() -> Optional[str]:
+    """Async lib.core.git.get_current_branch (reads .git directly when it can)."""
+    repo = open_repository()
+    if repo is not None:
+        try:
+            return repo.current_branch()
+        except UnsupportedRepository:
+            pass
+
+    exit_code, stdout, _ = await run_git(["branch", "--show-current"])
+    if exit_code != 0:
+        return None
+    return stdout.strip()
+
+
+async def get_base_branch() -> str:
+    """Async lib.core.git.get_base_branch (reads .git directly when it can)."""
+    repo = open_repository()
+    if repo is not None:
+        return "main" if repo.has_branch("main") else "master"
+
+    _, stdout, _ = await run_git(["branch", "-l", "main", "master"])
+    if "main" in stdout:
+        return "main"
+    return "master"
+
+
+async def get_commit_range(base: Optional[str] = None) -> tuple[str, str]:
+    """Async lib.core.git.get_commit_range."""
+    if base is None:
+        base = await get_base_branch()
+
+    exit_code, stdout, _ = await run_git(["merge-base", base, "HEAD"])
+    if exit_code != 0:
+        return base, "HEAD"
+
+    return stdout.strip(), "HEAD"
+
+
+async def gather_repo_snapshot(
+    base: Optional[str] = None,
+    commit_count: int = 10,
+    include_hunks: bool = False,
+) -> RepoSnapshot:
+    """
+    Fetch branch, merge base, diff, changed files and recent commits concurrently.
+
+    Args:
+        base: Base branch (default: main or master, as get_base_branch)
+        commit_count: Number of recent commits to include
+        include_hunks: If True, fill added_lines/removed_lines on the diff
+
+    Returns:
+        RepoSnapshot
+    """
+    async def base_and_range() -> tuple[str, str]:
+        base_branch = base or await get_base_branch()
+        merge_base, _ = await get_commit_range(base_branch)
+        return base_branch, merge_base
+
+    branch, (base_branch, merge_base), diff, changed, commits = await asyncio.gather(
+        get_current_branch(),
+        base_and_range(),
+        get_diff(include_hunks=include_hunks),
+        get_changed_files(),
+        get_recent_commits(count=commit_count),
+    )
+
+    return RepoSnapshot(
+        branch=branch,
+        base_branch=base_branch,
+        merge_base=merge_base,
+        diff=diff,
+        recent_commits=commits,
+        changed_files=changed,
+    )
+
+
+def repo_snapshot(
+    base: Optional[str] = None,
+    commit_count: int = 10,
+    include_hunks: bool = False,
+) -> RepoSnapshot:
+    """Synchronous entry point for gather_repo_snapshot (runs its own loop)."""
+    return asyncio.run(gather_repo_snapshot(base, commit_count, include_hunks))
@@ -0,0 +1,391 @@
+"""
+Long-lived git object sessions.
+
+Keeps `git cat-file --batch-check` and `git cat-file --batch` processes open
+per repository and pipelines lookups over them, so hot paths resolve refs
+and read objects without a fork+exec per object.
+
+Callers should treat a None session (git missing, not a repository) as a
+signal to fall back to run_git().
+"""
+
+import atexit
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+# Requests written before reading responses. Keeps the request text well
+# under the pipe buffer so writes never block while git waits on stdout.
+PIPELINE_CHUNK = 128
+
+
+@dataclass
+class ObjectInfo:
+    """Object metadata from `git cat-file --batch-check`."""
+    sha: str
+    type: str  # blob, tree, commit, tag
+    size: int
+
+
+@dataclass
+class CommitObject:
+    """Parsed commit object headers."""
+    sha: str
+    tree: str
+    parents: list[str]
+    author: str
+    message: str
+
+
+class _CatFile:
+    """One `git cat-file` process in batch or batch-check mode."""
+
+    def __init__(self, mode: str, cwd: str):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def write_requests(self, revs: Sequence[str]) -> None:
+        data = b"".join(rev.encode("utf-8") + b"\n" for rev in revs)
+        self.proc.stdin.write(data)
+        self.proc.stdin.flush()
+
+    def read_header(self) -> Optional[ObjectInfo]:
+        line = self.proc.stdout.readline()
+        if not line:
+            raise BrokenPipeError("git cat-file exited")
+
+        parts = line.rstrip(b"\n").split(b" ")
+        if len(parts) != 3:
+            return None  # "<rev> missing" / "<rev> ambiguous"
+
+        return ObjectInfo(
+            sha=parts[0].decode("ascii"),
+            type=parts[1].decode("ascii"),
+            size=int(parts[2]),
+        )
+
+    def read_body(self, size: int) -> bytes:
+        body = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # Trailing newline
+        return body
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class GitSession:
+    """
+    Batch-mode git processes for one repository.
+
+    All methods are thread-safe and return None for objects that don't
+    exist. Requests for many objects are pipelined in chunks.
+    """
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self._lock = threading.Lock()
+        self._check: Optional[_CatFile] = None
+        self._batch: Optional[_CatFile] = None
+
+    def _process(self, contents: bool) -> _CatFile:
+        attr = "_batch" if contents else "_check"
+        proc = getattr(self, attr)
+        if proc is None or not proc.alive():
+            proc = _CatFile("--batch" if contents else "--batch-check", self.cwd)
+            setattr(self, attr, proc)
+        return proc
+
+    def _run(self, revs: Sequence[str], contents: bool) -> list:
+        results = []
+        with self._lock:
+            proc = self._process(contents)
+            try:
+                for start in range(0, len(revs), PIPELINE_CHUNK):
+                    chunk = revs[start:start + PIPELINE_CHUNK]
+                    proc.write_requests(chunk)
+                    for _ in chunk:
+                        info = proc.read_header()
+                        if info is None:
+                            results.append(None)
+                        elif contents:
+                            results.append((info, proc.read_body(info.size)))
+                        else:
+                            results.append(info)
+            except (OSError, ValueError):
+                # Process died mid-pipeline: drop it so the next call restarts
+                proc.close()
+                setattr(self, "_batch" if contents else "_check", None)
+                raise
+        return results
+
+    def object_info_many(self, revs: Sequence[str]) -> list[Optional[ObjectInfo]]:
+        """Resolve many revisions (refs, shas, "rev:path") in one pipeline."""
+        return self._run(list(revs), contents=False)
+
+    def object_info(self, rev: str) -> Optional[ObjectInfo]:
+        """Resolve a revision to its object metadata."""
+        return self.object_info_many([rev])[0]
+
+    def rev_parse(self, rev: str) -> Optional[str]:
+        """Resolve a revision to a full object id."""
+        info = self.object_info(rev)
+        return info.sha if info else None
+
+    def read_objects(self, revs: Sequence[str]) -> list[Optional[tuple[ObjectInfo, bytes]]]:
+        """Read many objects' contents in one pipeline."""
+        return self._run(list(revs), contents=True)
+
+    def read_object(self, rev: str) -> Optional[tuple[ObjectInfo, bytes]]:
+        """Read one object's contents."""
+        return self.read_objects([rev])[0]
+
+    def read_commits(self, revs: Sequence[str]) -> list[Optional[CommitObject]]:
+        """Read and parse many commit objects."""
+        commits = []
+        for result in self.read_objects(revs):
+            if result is None or result[0].type != "commit":
+                commits.append(None)
+            else:
+                commits.append(parse_commit(result[0].sha, result[1]))
+        return commits
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class GitSession:
+    """
+    Batch-mode git processes for one repository.
+
+    All methods are thread-safe and return None for objects that don't
+    exist. Requests for many objects are pipelined in chunks.
+    """
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self._lock = threading.Lock()
+        self._check: Optional[_CatFile] = None
+        self._batch: Optional[_CatFile] = None
+
+    def _process(self, contents: bool) -> _CatFile:
+        attr = "_batch" if contents else "_check"
+        proc = getattr(self, attr)
+        if proc is None or not proc.alive():
+            proc = _CatFile("--batch" if contents else "--batch-check", self.cwd)
+            setattr(self, attr, proc)
+        return proc
+
+    def _run(self, revs: Sequence[str], contents: bool) -> list:
+        results = []
+        with self._lock:
+            proc = self._process(contents)
+            try:
+                for start in range(0, len(revs), PIPELINE_CHUNK):
+                    chunk = revs[start:start + PIPELINE_CHUNK]
+                    proc.write_requests(chunk)
+                    for _ in chunk:
+                        info = proc.read_header()
+                        if info is None:
+                            results.append(None)
+                        elif contents:
+                            results.append((info, proc.read_body(info.size)))
+                        else:
+                            results.append(info)
+            except (OSError, ValueError):
+                # Process died mid-pipeline: drop it so the next call restarts
+                proc.close()
+                setattr(self, "_batch" if contents else "_check", None)
+                raise
+        return results
+
+    def object_info_many(self, revs: Sequence[str]) -> list[Optional[ObjectInfo]]:
+        """Resolve many revisions (refs, shas, "rev:path") in one pipeline."""
+        return self._run(list(revs), contents=False)
+
+    def object_info(self, rev: str) -> Optional[ObjectInfo]:
+        """Resolve a revision to its object metadata."""
+        return self.object_info_many([rev])[0]
+
+    def rev_parse(self, rev: str) -> Optional[str]:
+        """Resolve a revision to a full object id."""
+        info = self.object_info(rev)
+        return info.sha if info else None
+
+    def read_objects(self, revs: Sequence[str]) -> list[Optional[tuple[ObjectInfo, bytes]]]:
+        """Read many objects' contents in one pipeline."""
+        return self._run(list(revs), contents=True)
+
+    def read_object(self, rev: str) -> Optional[tuple[ObjectInfo, bytes]]:
+        """Read one object's contents."""
+        return self.read_objects([rev])[0]
+
+    def read_commits(self, revs: Sequence[str]) -> list[Optional[CommitObject]]:
+        """Read and parse many commit objects."""
+        commits = []
+        for result in self.read_objects(revs):
+            if result is None or result[0].type != "commit":
+                commits.append(None)
+            else:
+                commits.append(parse_commit(result[0].sha, result[1]))
+        return commits
+
+    def changed_paths_many(self, revs: Sequence[str]) -> list[Optional[list[str]]]:
+        """
+        List paths changed by each commit relative to its first parent.
+
+        Equivalent to `git diff-tree --no-commit-id --name-only -r <rev>`:
+        root and merge commits list nothing. Trees are compared level by
+        level, with each level's reads pipelined across all commits.
+
+        Returns:
+            One sorted path list per revision (None if it isn't a commit)
+        """
+        commits = self.read_commits(revs)
+        results: list[Optional[list[str]]] = [None if c is None else [] for c in commits]
+
+        # Resolve parent trees for non-merge commits
+        parent_shas = [c.parents[0] for c in commits if c is not None and len(c.parents) == 1]
+        parent_trees = {}
+        for sha, parent in zip(parent_shas, self.read_commits(parent_shas)):
+            if parent is not None:
+                parent_trees[sha] = parent.tree
+
+        # Pending tree comparisons: (result index, path prefix, old tree, new tree)
+        pending = []
+        for i, commit in enumerate(commits):
+            if commit is None or len(commit.parents) != 1:
+                continue
+            pending.append((i, "", parent_trees.get(commit.parents[0]), commit.tree))
+
+        while pending:
+            shas = sorted({sha for _, _, old, new in pending for sha in (old, new) if sha})
+            trees = dict(zip(shas, self.read_objects(shas)))
+
+            next_pending = []
+            for i, prefix, old, new in pending:
+                old_entries = _tree_entries(trees.get(old)) if old else {}
+                new_entries = _tree_entries(trees.get(new)) if new else {}
+
+                for name in sorted(old_entries.keys() | new_entries.keys()):
+                    old_entry = old_entries.get(name)
+                    new_entry = new_entries.get(name)
+                    if old_entry == new_entry:
+                        continue
+
+                    path = prefix + name
+                    old_sub = old_entry[1] if old_entry and old_entry[0] == TREE_MODE else None
+                    new_sub = new_entry[1] if new_entry and new_entry[0] == TREE_MODE else None
+
+                    # Non-tree entries that differ are reported directly
+                    old_leaf = old_entry is not None and old_sub is None
+                    new_leaf = new_entry is not None and new_sub is None
+                    if old_leaf or new_leaf:
+                        results[i].append(path)
+                    if old_sub or new_sub:
+                        next_pending.append((i, path + "/", old_sub, new_sub))
+
+            pending = next_pending
+
+        return [sorted(paths) if paths is not None else None for paths in results]
+
+    def changed_paths(self, rev: str) -> Optional[list[str]]:
+        """List paths changed by one commit (see changed_paths_many)."""
+        return self.changed_paths_many([rev])[0]
+
+    def close(self) -> None:
+        """Terminate the batch processes."""
+        with self._lock:
+            for proc in (self._check, self._batch):
+                if proc is not None:
+                    proc.close()
+            self._check = self._batch = None
+
+
+def parse_commit(sha: str, body: bytes) -> CommitObject:
+    """Parse a raw commit object."""
+    header, _, message = body.partition(b"\n\n")
+    tree = ""
+    parents = []
+    author = ""
+
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"tree":
+            tree = value.decode("ascii")
+        elif key == b"parent":
+            parents.append(value.decode("ascii"))
+        elif key == b"author":
+            author = value.decode("utf-8", "replace")
+
+    return CommitObject(
+        sha=sha,
+        tree=tree,
+        parents=parents,
+        author=author,
+        message=message.decode("utf-8", "replace"),
+    )
+
+
+# Sessions per repository working directory
+_sessions: dict[str, GitSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(cwd: Optional[str] = None) -> Optional[GitSession]:
+    """
+    Get the shared session for a working directory.
+
+    Returns:
+        GitSession, or None if git batch processes can't be started
+    """
+    key = os.path.realpath(cwd or os.getcwd())
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is not None:
+            return session
+
+        session = GitSession(key)
+        try:
+            session._process(contents=False)
+        except OSError:
+            return None  # git not installed
+
+        _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_sessions)
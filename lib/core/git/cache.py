@@ -0,0 +1,142 @@
+"""
+Cross-invocation cache for read-only git queries.
+
+Hooks run as fresh processes and often repeat the same question within
+seconds (`git ls-files`, `git log --grep`, `git grep`, ...). cached_run_git()
+stores results on disk keyed by the command and a fingerprint of the
+repository state it depends on:
+
+- HEAD: the commit HEAD points at (and the ref it points through)
+- INDEX: the index file's mtime and size
+- WORKTREE: tracked files that differ from the index, with their stat data
+
+Fingerprints are computed in-process by lib.core.git.repo; when the
+repository isn't supported there, the query just runs uncached.
+"""
+
+import os
+import time
+from typing import Iterable, Optional
+
+from lib.core.cache import DiskCache, get_disk_cache
+from lib.core.git import run_git
+from lib.core.git.repo import UnsupportedRepository, open_repository
+
+HEAD = "head"
+INDEX = "index"
+WORKTREE = "worktree"
+
+CACHE_NAMESPACE = "git"
+
+# Byte budget for cached git output
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Seconds a computed fingerprint is reused within one process
+FINGERPRINT_TTL = 1.0
+
+# (git dir, depends) -> (monotonic time, fingerprint)
+_fingerprints: dict[tuple[str, frozenset], tuple[float, str]] = {}
+
+
+def clear_fingerprints() -> None:
+    """Forget in-process fingerprints (e.g. after changing the repository)."""
+    _fingerprints.clear()
+
+
+def get_git_cache() -> Optional[DiskCache]:
+    """The git query cache, or None if caching is disabled."""
+    return get_disk_cache(CACHE_NAMESPACE, max_bytes=CACHE_MAX_BYTES)
+
+
+def repo_fingerprint(depends: Iterable[str], cwd: Optional[str] = None) -> Optional[str]:
+    """
+    Fingerprint the parts of repository state a query depends on.
+
+    A hook typically asks several questions back to back, so fingerprints
+    are reused within one process for FINGERPRINT_TTL seconds.
+
+    Args:
+        depends: Any of HEAD, INDEX, WORKTREE
+        cwd: Directory inside the repository (default: current directory)
+
+    Returns:
+        Fingerprint string, or None if it can't be computed without git
+    """
+    repo = open_repository(cwd)
+    if repo is None:
+        return None
+
+    depends = frozenset(depends)
+    now = time.monotonic()
+    memo = _fingerprints.get((repo.git_dir, depends))
+    if memo is not None and now - memo[0] < FINGERPRINT_TTL:
+        return memo[1]
+
+    parts = [repo.git_dir]
+    try:
+        if HEAD in depends:
+            head_ref = repo.head_ref()
+            head = repo.resolve_ref("HEAD")
+            parts.append(f"{head_ref or '-'}@{head or '-'}")
+
+        if INDEX in depends or WORKTREE in depends:
+            try:
+                st = os.stat(os.path.join(repo.git_dir, "index"))
+                parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+            except FileNotFoundError:
+                parts.append("no-index")
+
+        if WORKTREE in depends:
+            for path in repo.modified_files():
+                try:
+                    st = os.lstat(os.path.join(repo.work_tree, path))
+                    parts.append(f"{path}:{st.st_mtime_ns}:{st.st_size}")
+                except OSError:
+                    parts.append(f"{path}:deleted")
+    except (UnsupportedRepository, OSError, ValueError):
+        return None
+
+    fingerprint = "\0".join(parts)
+    _fingerprints[(repo.git_dir, depends)] = (now, fingerprint)
+    return fingerprint
+
+
+def cached_run_git(
+    args: list[str],
+    depends: Iterable[str] = (HEAD,),
+    cwd: Optional[str] = None,
+    timeout: float = 30,
+) -> tuple[int, str, str]:
+    """
+    Run a read-only git command, reusing a previous result if the
+    repository state it depends on hasn't changed.
+
+    Only clean results are cached: exit code 0, or 1 with no stderr (how
+    `git grep` and friends report "no matches").
+
+    Args:
+        args: git arguments (without "git")
+        depends: Repository state the output depends on (HEAD, INDEX, WORKTREE)
+        cwd: Working directory
+        timeout: Seconds before the command is killed
+
+    Returns:
+        Tuple of (exit_code, stdout, stderr)
+    """
+    cache = get_git_cache()
+    fingerprint = repo_fingerprint(depends, cwd) if cache is not None else None
+    if fingerprint is None:
+        return run_git(args, cwd=cwd, timeout=timeout)
+
+    # Relative pathspecs resolve against the working directory
+    where = os.path.realpath(cwd or os.getcwd())
+    key = "\0".join([fingerprint, where, *args])
+
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    exit_code, stdout, stderr = run_git(args, cwd=cwd, timeout=timeout)
+    if exit_code == 0 or (exit_code == 1 and not stderr):
+        cache.set(key, (exit_code, stdout, stderr))
+    return exit_code, stdout, stderr
@@ -0,0 +1,485 @@
+"""
+Subprocess-free reads of repository state.
+
+Resolves HEAD and refs (loose and packed) and parses the index file, so the
+questions hooks ask on every call ("which branch?", "does main exist?",
+"which tracked files are modified?") are answered from a few stat() calls
+and cached file parses instead of a git fork+exec.
+
+Only plain repositories are handled. open_repository() returns None for
+anything exotic (linked worktrees, submodule gitfiles, GIT_DIR overrides,
+reftable), and Repository methods raise UnsupportedRepository when the
+data on disk needs git itself (split or sparse index, unmerged entries,
+gitlinks, content filters); callers fall back to run_git() in both cases.
+"""
+
+import os
+import stat
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+class UnsupportedRepository(Exception):
+    """Repository state that the pure-Python reader doesn't handle."""
+
+
+# Environment variables that relocate the repository or its index
+_GIT_ENV_OVERRIDES = ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_COMMON_DIR")
+
+# Index entry flags
+_FLAG_ASSUME_VALID = 0x8000
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_EXT_SKIP_WORKTREE = 0x4000
+_EXT_INTENT_TO_ADD = 0x2000
+
+# Index extensions that move entries out of the main entry table
+_UNSUPPORTED_EXTENSIONS = (b"link", b"sdir")
+
+_MODE_GITLINK = 0o160000
+_MODE_SYMLINK = 0o120000
+
+# ctime, mtime, dev, ino, mode, uid, gid, size
+_STAT_FIELDS = struct.Struct(">10I")
+
+# .gitattributes settings that make worktree bytes differ from blob bytes
+_FILTER_ATTRIBUTES = ("filter=", "text", "eol=", "ident", "working-tree-encoding", "crlf")
+
+
+@dataclass
+class IndexEntry:
+    """One stage-0 entry of the index."""
+    path: str
+    mode: int
+    sha: str
+    mtime_ns: int
+    size: int
+    intent_to_add: bool = False
+
+
+def parse_config(path: str) -> dict[str, str]:
+    """
+    Parse a git config file into {"section.key": value} (last value wins).
+
+    Handles the subset git writes itself: [section], [section "sub"],
+    key = value and bare boolean keys. Includes are not followed.
+    """
+    values: dict[str, str] = {}
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return values
+
+    section = ""
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1:line.find("]")]
+            name, _, sub = header.partition(" ")
+            section = name.lower()
+            if sub:
+                section += "." + sub.strip().strip('"')
+            continue
+
+        key, sep, value = line.partition("=")
+        value = value.split(" #")[0].split(" ;")[0].strip().strip('"') if sep else "true"
+        values[f"{section}.{key.strip().lower()}"] = value
+
+    return values
+
+
+def _is_false(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("false", "no", "off", "0")
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def blob_sha(data: bytes, sha_len: int = 40) -> str:
+    """Compute the git blob id for raw contents."""
+    import hashlib  # Only needed when stat data is inconclusive
+
+    header = f"blob {len(data)}\0".encode("ascii")
+    algorithm = hashlib.sha256 if sha_len == 64 else hashlib.sha1
+    return algorithm(header + data).hexdigest()
+
+
+class Repository:
+    """
+    Read-only view of a plain (non-worktree) repository.
+
+    Parsed packed-refs and index files are cached and re-read only when
+    their mtime or size changes.
+    """
+
+    def __init__(self, git_dir: str, work_tree: str):
+        self.git_dir = git_dir
+        self.work_tree = work_tree
+        self._lock = threading.Lock()
+        self._config: Optional[tuple[tuple[int, int], dict[str, str]]] = None
+        self._packed: Optional[tuple[tuple[int, int], dict[str, str]]] = None
+        self._index: Optional[tuple[tuple[int, int], int, list[IndexEntry]]] = None
+
+    # -- config ----------------------------------------------------------
+
+    def config(self) -> dict[str, str]:
+        """Repository-local config values."""
+        path = os.path.join(self.git_dir, "config")
+        key = _stat_key(path)
+        if self._config is None or self._config[0] != key:
+            self._config = (key, parse_config(path))
+        return self._config[1]
+
+    @property
+    def sha_len(self) -> int:
+        """Hex length of object ids (40 for SHA-1, 64 for SHA-256)."""
+        fmt = self.config().get("extensions.objectformat", "sha1").lower()
+        return 64 if fmt == "sha256" else 40
+
+    # -- refs ------------------------------------------------------------
+
+    def _packed_refs(self) -> dict[str, str]:
+        path = os.path.join(self.git_dir, "packed-refs")
+        key = _stat_key(path)
+        if self._packed is not None and self._packed[0] == key:
+            return self._packed[1]
+
+        refs: dict[str, str] = {}
+        text = _read_text(path) if key != (0, 0) else None
+        for line in (text or "").splitlines():
+            if not line or line[0] in "#^":
+                continue  # Header or peeled tag
+            sha, _, name = line.partition(" ")
+            refs[name] = sha
+
+        self._packed = (key, refs)
+        return refs
+
+    def read_ref(self, name: str) -> Optional[str]:
+        """
+        Read a ref without following symbolic refs.
+
+        Returns:
+            "ref: <target>" for symbolic refs, an object id, or None
+        """
+        value = _read_text(os.path.join(self.git_dir, name))
+        if value:
+            return value
+        return self._packed_refs().get(name)
+
+    def resolve_ref(self, name: str) -> Optional[str]:
+        """Resolve a ref (e.g. HEAD, refs/heads/main) to an object id."""
+        for _ in range(5):  # git's own symref depth limit
+            value = self.read_ref(name)
+            if value is None:
+                return None
+            if not value.startswith("ref:"):
+                return value
+            name = value[4:].strip()
+        return None
+
+    def head_ref(self) -> Optional[str]:
+        """Symbolic target of HEAD (e.g. refs/heads/main), None if detached."""
+        value = _read_text(os.path.join(self.git_dir, "HEAD"))
+        if value is None:
+            raise UnsupportedRepository("unreadable HEAD")
+        if value.startswith("ref:"):
+            return value[4:].strip()
+        return None
+
+    def current_branch(self) -> str:
+        """Current branch name, or "" when HEAD is detached (as `git branch --show-current`)."""
+        ref = self.head_ref()
+        if ref is None:
+            return ""
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+
+    def has_branch(self, name: str) -> bool:
+        """Whether refs/heads/<name> exists (loose or packed)."""
+        ref = f"refs/heads/{name}"
+        if os.path.isfile(os.path.join(self.git_dir, ref)):
+            return True
+        return ref in self._packed_refs()
+
+    # -- index -----------------------------------------------------------
+
+    def index_entries(self) -> list[IndexEntry]:
+        """Parse (or return the cached) stage-0 index entries, in index order."""
+        return self._read_index()[1]
+
+    def _read_index(self) -> tuple[int, list[IndexEntry]]:
+        path = os.path.join(self.git_dir, "index")
+        with self._lock:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return 0, []  # Nothing staged yet
+            key = (st.st_mtime_ns, st.st_size)
+            if self._index is None or self._index[0] != key:
+                with open(path, "rb") as f:
+                    data = f.read()
+                self._index = (key, st.st_mtime_ns, parse_index(data, self.sha_len))
+            return self._index[1], self._index[2]
+
+    def modified_files(self) -> list[str]:
+        """
+        Tracked files whose working-tree content differs from the index.
+
+        Equivalent to `git diff --name-only`: entries whose stat data
+        matches the index are clean; the rest (and racily-clean entries)
+        are confirmed by hashing their contents.
+        """
+        index_mtime, entries = self._read_index()
+        filemode = not _is_false(self.config().get("core.filemode"))
+        sha_len = self.sha_len
+        filters_checked = False
+
+        # One lstat per entry dominates; keep the loop body minimal
+        prefix = os.path.join(self.work_tree, "")
+        lstat = os.lstat
+        mode_mask = 0o170000 | (0o100 if filemode else 0)  # File type (+ exec bit)
+
+        modified = []
+        for entry in entries:
+            if entry.intent_to_add:
+                modified.append(entry.path)
+                continue
+
+            full = prefix + entry.path
+            try:
+                st = lstat(full)
+            except OSError:
+                modified.append(entry.path)  # Deleted
+                continue
+
+            if (st.st_mode ^ entry.mode) & mode_mask and _mode_changed(
+                entry.mode, st.st_mode, filemode
+            ):
+                modified.append(entry.path)
+                continue
+
+            # Entries written in the same tick as the index can't be trusted
+            racy = entry.mtime_ns >= index_mtime
+            if st.st_mtime_ns == entry.mtime_ns and st.st_size == entry.size and not racy:
+                continue
+
+            if not filters_checked:
+                if self._has_content_filters():
+                    raise UnsupportedRepository("content filters configured")
+                filters_checked = True
+
+            if _worktree_sha(full, st, sha_len) != entry.sha:
+                modified.append(entry.path)
+
+        return modified
+
+    def _has_content_filters(self) -> bool:
+        """Whether attributes or config could make worktree bytes differ from blobs."""
+        config = dict(self.config())
+        for path in _global_config_paths():
+            for key, value in parse_config(path).items():
+                config.setdefault(key, value)
+
+        if "core.autocrlf" in config and not _is_false(config["core.autocrlf"]):
+            return True
+        if any(key.startswith("filter.") for key in config):
+            return True
+
+        # Attribute files in subdirectories apply below them; tracked ones
+        # are listed in the index
+        paths = [
+            os.path.join(self.work_tree, ".gitattributes"),
+            os.path.join(self.git_dir, "info", "attributes"),
+        ]
+        paths += [
+            os.path.join(self.work_tree, entry.path) for entry in self.index_entries()
+            if entry.path.endswith("/.gitattributes")
+        ]
+        for path in paths:
+            text = _read_text(path)
+            if text and any(attr in text for attr in _FILTER_ATTRIBUTES):
+                return True
+        return False
+
+
+def parse_index(data: bytes, sha_len: int = 40) -> list[IndexEntry]:
+    """
+    Parse a version 2 or 3 index file.
+
+    Raises:
+        UnsupportedRepository: for index v4, split or sparse indexes,
+            unmerged entries and gitlinks
+    """
+    if data[:4] != b"DIRC":
+        raise UnsupportedRepository("not an index file")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3):
+        raise UnsupportedRepository(f"index version {version}")
+
+    raw_len = sha_len // 2
+    entries = []
+    pos = 12
+
+    for _ in range(count):
+        start = pos
+        (_, _, mtime_s, mtime_ns, _, _, mode, _, _, size) = _STAT_FIELDS.unpack_from(data, pos)
+        pos += 40
+        sha = data[pos:pos + raw_len].hex()
+        pos += raw_len
+        (flags,) = struct.unpack_from(">H", data, pos)
+        pos += 2
+
+        ext_flags = 0
+        if flags & _FLAG_EXTENDED:
+            (ext_flags,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+
+        name_len = flags & _FLAG_NAME_MASK
+        if name_len == _FLAG_NAME_MASK:
+            name_len = data.index(b"\0", pos) - pos
+        path = data[pos:pos + name_len].decode("utf-8", "surrogateescape")
+        pos += name_len
+
+        # Entries are NUL-padded to a multiple of 8 bytes (at least one NUL)
+        pos = start + ((pos - start + 8) & ~7)
+
+        if flags & _FLAG_STAGE_MASK:
+            raise UnsupportedRepository("unmerged entries")
+        if mode == _MODE_GITLINK:
+            raise UnsupportedRepository("submodules")
+        if flags & _FLAG_ASSUME_VALID or ext_flags & _EXT_SKIP_WORKTREE:
+            continue  # git diff doesn't look at these either
+
+        entries.append(IndexEntry(
+            path=path,
+            mode=mode,
+            sha=sha,
+            mtime_ns=mtime_s * 1_000_000_000 + mtime_ns,
+            size=size,
+            intent_to_add=bool(ext_flags & _EXT_INTENT_TO_ADD),
+        ))
+
+    # Extensions: 4-byte signature + 4-byte length, until the trailing checksum
+    end = len(data) - raw_len
+    while pos + 8 <= end:
+        signature = data[pos:pos + 4]
+        (length,) = struct.unpack_from(">I", data, pos + 4)
+        if signature in _UNSUPPORTED_EXTENSIONS:
+            raise UnsupportedRepository(f"index extension {signature.decode()}")
+        pos += 8 + length
+
+    return entries
+
+
+def _stat_key(path: str) -> tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _mode_changed(index_mode: int, st_mode: int, filemode: bool) -> bool:
+    """Whether the file type (or, with core.fileMode, the exec bit) differs."""
+    if stat.S_IFMT(index_mode) != stat.S_IFMT(st_mode):
+        return True
+    if filemode and stat.S_ISREG(st_mode):
+        return bool(index_mode & 0o100) != bool(st_mode & 0o100)
+    return False
+
+
+def _worktree_sha(path: str, st: os.stat_result, sha_len: int) -> str:
+    if stat.S_ISLNK(st.st_mode):
+        return blob_sha(os.fsencode(os.readlink(path)), sha_len)
+    try:
+        with open(path, "rb") as f:
+            return blob_sha(f.read(), sha_len)
+    except OSError:
+        return ""
+
+
+def _global_config_paths() -> list[str]:
+    xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return [
+        "/etc/gitconfig",
+        os.path.join(xdg, "git", "config"),
+        os.path.join(os.path.expanduser("~"), ".gitconfig"),
+    ]
+
+
+def find_git_dir(start: str) -> Optional[tuple[str, str]]:
+    """
+    Find the repository containing start.
+
+    Returns:
+        (git_dir, work_tree), or None if there is no plain repository
+        (including when .git is a gitfile, as in worktrees and submodules)
+    """
+    path = start
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            if os.path.exists(os.path.join(candidate, "commondir")):
+                return None
+            return candidate, path
+        if os.path.exists(candidate):
+            return None  # gitfile: linked worktree or submodule
+
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+# Repositories per working directory
+_repositories: dict[str, Repository] = {}
+_repositories_lock = threading.Lock()
+
+
+def open_repository(cwd: Optional[str] = None) -> Optional[Repository]:
+    """
+    Get the shared Repository for a working directory.
+
+    Returns:
+        Repository, or None when the caller should fall back to git
+    """
+    if any(var in os.environ for var in _GIT_ENV_OVERRIDES):
+        return None
+
+    try:
+        key = os.path.realpath(cwd or os.getcwd())
+    except OSError:
+        return None
+
+    with _repositories_lock:
+        repo = _repositories.get(key)
+        if repo is not None:
+            return repo
+
+        found = find_git_dir(key)
+        if found is None:
+            return None
+
+        repo = Repository(*found)
+        if "extensions.refstorage" in repo.config():
+            return None  # reftable
+
+        _repositories[key] = repo
+        return repo
+
+
+def clear_repositories() -> None:
+    """Forget cached repositories."""
+    with _repositories_lock:
+        _repositories.clear()
@@ -0,0 +1,388 @@
+"""
+Affected-test selection from the project's Python import graph.
+
+Each .py file's imports are extracted with ast and cached per file, keyed
+by stat data and content hash: an unchanged file is never read, a touched
+but identical file is read and hashed but not parsed, and only changed
+files are parsed again. The reverse graph (module -> importing files) then
+gives the test modules that transitively import an edited file.
+
+Module names are resolved the way tests usually import them: by package
+(walking up __init__.py files), and by dotted path from the project root
+and from a top-level src/ directory.
+"""
+
+import ast
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from lib.core.cache import DiskCache, get_disk_cache
+
+CACHE_NAMESPACE = "impact"
+
+# Byte budget for cached per-file imports
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Bump when the cached entry layout or import extraction changes
+IMPACT_VERSION = 1
+
+# Directories never scanned when git can't list files
+SKIP_DIRS = {
+    ".git", ".hg", ".tox", ".nox", ".venv", "venv", "env", "node_modules",
+    "__pycache__", "build", "dist", ".mypy_cache", ".pytest_cache",
+}
+
+# Top-level directories also treated as import roots
+SOURCE_ROOTS = ("src",)
+
+# pytest loads these for every test below their directory
+CONFTEST = "conftest.py"
+
+
+def is_test_module(path: str) -> bool:
+    """Whether pytest would collect a file by its default naming rules."""
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _module_names(path: str, root: str, packages: Optional[dict[str, bool]] = None) -> set[str]:
+    """
+    Dotted names a project file can be imported as (path is root-relative).
+
+    packages memoizes which directories hold an __init__.py; pass the same
+    dict for every file of a project to check each directory once.
+    """
+    if packages is None:
+        packages = {}
+    parts = path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts:
+        return set()
+
+    names = {".".join(parts)}
+    if len(parts) > 1 and parts[0] in SOURCE_ROOTS:
+        names.add(".".join(parts[1:]))
+
+    # Package name: walk up while the containing directory is a package
+    directory = os.path.join(root, *parts[:-1])
+    depth = 0
+    while depth < len(parts) - 1:
+        is_package = packages.get(directory)
+        if is_package is None:
+            is_package = packages[directory] = os.path.isfile(
+                os.path.join(directory, "__init__.py")
+            )
+        if not is_package:
+            break
+        directory = os.path.dirname(directory)
+        depth += 1
+    names.add(".".join(parts[len(parts) - 1 - depth:]) if depth else parts[-1])
+    return names
+
+
+def _package_of(path: str, root: str) -> list[str]:
+    """Package components of a file, for resolving relative imports."""
+    names = sorted(_module_names(path, root), key=len)
+    parts = names[0].split(".")  # Shortest: the package-based name
+    return parts if path.endswith("__init__.py") else parts[:-1]
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    if isinstance(test, ast.Name):
+        return test.id == "TYPE_CHECKING"
+    return isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+
+
+# Statement fields that hold nested statements
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def _runtime_statements(tree: ast.Module):
+    """
+    Walk statements only (imports can't appear inside expressions),
+    skipping `if TYPE_CHECKING:` bodies, which never execute.
+    """
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, ast.If) and _is_type_checking(node.test):
+            stack.extend(node.orelse)
+            continue
+        for name in _BLOCK_FIELDS:
+            block = getattr(node, name, None)
+            if block:
+                stack.extend(block)
+
+
+def extract_imports(source: bytes, path: str, root: str) -> tuple[str, ...]:
+    """
+    Module names a file imports, including parent packages.
+
+    `from a.b import c` yields a.b.c (c may be a submodule), a.b and a;
+    relative imports are resolved against the file's package.
+
+    Returns:
+        Sorted module names (empty if the file doesn't parse)
+    """
+    if b"import" not in source:
+        return ()
+
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return ()
+
+    names = set()
+    for node in _runtime_statements(tree):
+        if isinstance(node, ast.Import):
+            targets = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module.split(".") if node.module else []
+            if node.level:
+                package = _package_of(path, root)
+                if node.level - 1 > len(package):
+                    continue
+                base = package[:len(package) - (node.level - 1)] + base
+            if not base:
+                continue
+            module = ".".join(base)
+            targets = [module] + [f"{module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+
+        for target in targets:
+            parts = target.split(".")
+            for i in range(1, len(parts) + 1):
+                names.add(".".join(parts[:i]))
+
+    return tuple(sorted(names))
+
+
+@dataclass
+class ImportGraph:
+    """Imports of every Python file in a project, and the reverse edges."""
+    root: str
+    imports: dict[str, tuple[str, ...]] = field(default_factory=dict)  # file -> modules
+    modules: dict[str, list[str]] = field(default_factory=dict)  # module -> files
+    digests: dict[str, str] = field(default_factory=dict)  # file -> content hash
+
+    def __post_init__(self):
+        if not self.modules:
+            packages: dict[str, bool] = {}
+            for path in self.imports:
+                for name in _module_names(path, self.root, packages):
+                    self.modules.setdefault(name, []).append(path)
+        self._importers: Optional[dict[str, list[str]]] = None
+
+    def importers(self) -> dict[str, list[str]]:
+        """File -> files that import it directly."""
+        if self._importers is None:
+            importers: dict[str, list[str]] = {}
+            for path, names in self.imports.items():
+                for name in names:
+                    for target in self.modules.get(name, ()):
+                        if target != path:
+                            importers.setdefault(target, []).append(path)
+            self._importers = importers
+        return self._importers
+
+    def dependents(self, path: str) -> set[str]:
+        """Files that import path, directly or transitively."""
+        importers = self.importers()
+        seen = {path}
+        queue = deque([path])
+        while queue:
+            for importer in importers.get(queue.popleft(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+        seen.discard(path)
+        return seen
+
+    def dependencies(self, paths: Iterable[str]) -> set[str]:
+        """Files that paths import, directly or transitively (paths included)."""
+        seen = {path for path in paths if path in self.imports}
+        queue = deque(seen)
+        while queue:
+            for name in self.imports[queue.popleft()]:
+                for target in self.modules.get(name, ()):
+                    if target not in seen:
+                        seen.add(target)
+                        queue.append(target)
+        return seen
+
+    def affected_tests(self, path: str) -> Optional[list[str]]:
+        """
+        Test modules affected by a change to one file.
+
+        A conftest.py that is (or imports) the changed file affects every
+        test below its directory.
+
+        Args:
+            path: Root-relative path of the changed file
+
+        Returns:
+            Sorted root-relative test paths, or None if path isn't part of
+            the graph (the caller should fall back to the full suite)
+        """
+        if path not in self.imports:
+            return None
+
+        tests = set()
+        for affected in self.dependents(path) | {path}:
+            if is_test_module(affected):
+                tests.add(affected)
+            elif os.path.basename(affected) == CONFTEST:
+                tests.update(self._tests_below(os.path.dirname(affected)))
+        return sorted(tests)
+
+    def _tests_below(self, directory: str) -> list[str]:
+        prefix = directory + "/" if directory else ""
+        return [p for p in self.imports if p.startswith(prefix) and is_test_module(p)]
+
+
+def get_impact_cache() -> Optional[DiskCache]:
+    """The per-file import cache, or None if caching is disabled."""
+    return get_disk_cache(CACHE_NAMESPACE, max_bytes=CACHE_MAX_BYTES)
+
+
+def _list_python_files(root: str) -> list[str]:
+    from lib.core.git import run_git
+
+    exit_code, stdout, _ = run_git(
+        ["ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", "*.py"],
+        cwd=root,
+    )
+    if exit_code == 0:
+        return [p for p in stdout.split("\0") if p]
+
+    paths = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        relative = os.path.relpath(directory, root).replace(os.sep, "/")
+        for name in files:
+            if name.endswith(".py"):
+                paths.append(name if relative == "." else f"{relative}/{name}")
+    return paths
+
+
+def _content_hash(data: bytes) -> str:
+    import hashlib
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def build_import_graph(root: str, paths: Optional[Iterable[str]] = None) -> ImportGraph:
+    """
+    Build (or incrementally update) the import graph of a project.
+
+    Args:
+        root: Project root
+        paths: Root-relative .py files (default: git ls-files, or a walk)
+
+    Returns:
+        ImportGraph over the files that exist
+    """
+    root = os.path.realpath(root)
+    cache = get_impact_cache()
+    key = f"{IMPACT_VERSION}\0{root}"
+    cached = cache.get(key, {}) if cache is not None else {}
+
+    entries = {}
+    changed = False
+    for path in (paths if paths is not None else _list_python_files(root)):
+        full = os.path.join(root, path)
+        try:
+            st = os.stat(full)
+        except OSError:
+            continue  # Deleted but still tracked
+
+        entry = cached.get(path)
+        if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+            entries[path] = entry
+            continue
+
+        try:
+            with open(full, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        digest = _content_hash(data)
+        if entry is not None and entry[2] == digest:
+            imports = entry[3]  # Touched but unchanged: skip parsing
+        else:
+            imports = extract_imports(data, path, root)
+        entries[path] = (st.st_mtime_ns, st.st_size, digest, imports)
+        changed = True
+
+    if cache is not None and (changed or len(entries) != len(cached)):
+        cache.set(key, entries)
+
+    return ImportGraph(
+        root,
+        {path: entry[3] for path, entry in entries.items()},
+        digests={path: entry[2] for path, entry in entries.items()},
+    )
+
+
+@dataclass
+class Impact:
+    """The tests selected for one edited file."""
+    graph: ImportGraph
+    file: str  # Root-relative
+    tests: list[str]  # Root-relative
+
+    @property
+    def paths(self) -> list[str]:
+        """Absolute test paths."""
+        return [os.path.join(self.graph.root, path) for path in self.tests]
+
+
+def analyze_impact(file_path: str, cwd: Optional[str] = None) -> Optional[Impact]:
+    """
+    Select the tests affected by an edited Python file.
+
+    Args:
+        file_path: Edited file (absolute or relative to cwd)
+        cwd: Directory inside the project
+
+    Returns:
+        Impact (possibly with no tests), or None if the file isn't in a
+        repository's import graph
+    """
+    from lib.core.git import get_repo_root
+
+    root = get_repo_root(cwd)
+    if root is None:
+        return None
+    root = os.path.realpath(root)
+
+    relative = os.path.relpath(os.path.realpath(file_path), root).replace(os.sep, "/")
+    if relative.startswith("../"):
+        return None
+
+    graph = build_import_graph(root)
+    tests = graph.affected_tests(relative)
+    if tests is None:
+        return None
+    return Impact(graph, relative, tests)
+
+
+def affected_tests(file_path: str, cwd: Optional[str] = None) -> Optional[list[str]]:
+    """
+    Test files that transitively import an edited Python file.
+
+    Args:
+        file_path: Edited file (absolute or relative to cwd)
+        cwd: Directory inside the project
+
+    Returns:
+        Absolute test paths (possibly empty), or None if the file isn't in
+        a repository's import graph
+    """
+    impact = analyze_impact(file_path, cwd)
+    return impact.paths if impact is not None else None
@@ -0,0 +1,225 @@
+"""
+Compact line-number containers for devkit extensions.
+
+Provides:
+- LineRanges: sorted, merged intervals of line numbers backed by arrays,
+  with O(log n) membership (e.g. "was line N changed?")
+- LineSet: bitmap of individual line numbers with O(1) membership and
+  set operations done on whole bitmaps (e.g. covered/uncovered lines)
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Union
+
+
+class LineRanges:
+    """
+    Set of line numbers stored as sorted, non-overlapping inclusive intervals.
+
+    Intervals live in two parallel array('I') columns, so a file with
+    thousands of changed hunks costs 8 bytes per hunk.
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()):
+        self._starts = array("I")
+        self._ends = array("I")
+        for start, end in sorted(intervals):
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Add the inclusive interval [start, end].
+
+        Intervals must be added in ascending order of start; overlapping
+        or adjacent intervals are merged.
+        """
+        if end < start:
+            return
+
+        if self._ends and start <= self._ends[-1] + 1:
+            if start < self._starts[-1]:
+                raise ValueError("LineRanges.add() requires ascending starts")
+            if end > self._ends[-1]:
+                self._ends[-1] = end
+            return
+
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def __contains__(self, line: object) -> bool:
+        if not isinstance(line, int):
+            return False
+        i = bisect_right(self._starts, line) - 1
+        return i >= 0 and line <= self._ends[i]
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end + 1)
+
+    def __len__(self) -> int:
+        """Total number of lines covered by all intervals."""
+        return sum(end - start + 1 for start, end in zip(self._starts, self._ends))
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LineRanges):
+            return self._starts == other._starts and self._ends == other._ends
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        spans = ", ".join(
+            str(s) if s == e else f"{s}-{e}" for s, e in self.intervals()
+        )
+        return f"LineRanges([{spans}])"
+
+    def intervals(self) -> list[tuple[int, int]]:
+        """Return the inclusive (start, end) intervals."""
+        return list(zip(self._starts, self._ends))
+
+
+# Bit offsets set in each byte value, for iterating bitmaps
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+class LineSet:
+    """
+    Set of line numbers stored as a bitmap (one bit per line).
+
+    Membership is O(1) and len() is O(1). Union, intersection and
+    difference convert both bitmaps to integers and combine them in a
+    single C-level operation. Iteration is always in ascending order, and
+    indexing and comparison with lists are supported so a LineSet can
+    stand in for a sorted list of unique line numbers.
+    """
+
+    __slots__ = ("_bits", "_count", "_list")
+
+    def __init__(self, lines: Iterable[int] = ()):
+        self._bits = bytearray()
+        self._count = 0
+        self._list = None
+
+        lines = lines if isinstance(lines, (list, tuple, range)) else list(lines)
+        if lines:
+            self._grow(max(lines))
+            for line in lines:
+                self.add(line)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LineSet":
+        """Rebuild a LineSet from to_bytes() output."""
+        return cls._from_int(int.from_bytes(data, "little"))
+
+    @classmethod
+    def from_ranges(cls, intervals: Iterable[tuple[int, int]]) -> "LineSet":
+        """Build a LineSet from inclusive (start, end) intervals (e.g. LineRanges)."""
+        value = 0
+        for start, end in intervals:
+            if end >= start:
+                value |= ((1 << (end - start + 1)) - 1) << start
+        return cls._from_int(value)
+
+    @classmethod
+    def _from_int(cls, value: int) -> "LineSet":
+        result = cls()
+        if value:
+            result._bits = bytearray(value.to_bytes((value.bit_length() + 7) // 8, "little"))
+            result._count = bin(value).count("1")
+        return result
+
+    def _to_int(self) -> int:
+        return int.from_bytes(self._bits, "little")
+
+    def _grow(self, line: int) -> None:
+        needed = (line >> 3) + 1
+        if needed > len(self._bits):
+            # Over-allocate so sequential adds don't resize every time
+            self._bits.extend(bytes(max(needed, len(self._bits) * 2) - len(self._bits)))
+
+    def add(self, line: int) -> None:
+        """Add a line number (>= 0)."""
+        if line < 0:
+            raise ValueError("line numbers must be non-negative")
+        byte = line >> 3
+        if byte >= len(self._bits):
+            self._grow(line)
+        mask = 1 << (line & 7)
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+            self._list = None
+
+    def update(self, lines: Iterable[int]) -> None:
+        """Add many line numbers."""
+        for line in lines:
+            self.add(line)
+
+    def __contains__(self, line: object) -> bool:
+        if not isinstance(line, int) or line < 0:
+            return False
+        byte = line >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] >> (line & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for index, value in enumerate(self._bits):
+            if value:
+                base = index << 3
+                for bit in _BYTE_BITS[value]:
+                    yield base + bit
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def tolist(self) -> list[int]:
+        """Sorted list of line numbers (cached until the set changes)."""
+        if self._list is None:
+            self._list = list(self)
+        return list(self._list)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if self._list is None:
+            self._list = list(self)
+        return self._list[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LineSet):
+            return self._count == other._count and self._to_int() == other._to_int()
+        if isinstance(other, (list, tuple)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    __hash__ = None  # Mutable
+
+    def _coerce(self, other: Iterable[int]) -> "LineSet":
+        if isinstance(other, LineSet):
+            return other
+        if isinstance(other, LineRanges):
+            return LineSet.from_ranges(other.intervals())
+        return LineSet(other)
+
+    def __or__(self, other: Iterable[int]) -> "LineSet":
+        return LineSet._from_int(self._to_int() | self._coerce(other)._to_int())
+
+    def __and__(self, other: Iterable[int]) -> "LineSet":
+        return LineSet._from_int(self._to_int() & self._coerce(other)._to_int())
+
+    def __sub__(self, other: Iterable[int]) -> "LineSet":
+        return LineSet._from_int(self._to_int() & ~self._coerce(other)._to_int())
+
+    def __xor__(self, other: Iterable[int]) -> "LineSet":
+        return LineSet._from_int(self._to_int() ^ self._coerce(other)._to_int())
+
+    def __repr__(self) -> str:
+        return f"LineSet({self.tolist()!r})"
+
+    def to_bytes(self) -> bytes:
+        """Compact bitmap bytes (trailing zero bytes dropped)."""
+        return bytes(self._bits).rstrip(b"\0")
@@ -0,0 +1,430 @@
+"""
+Warm pre-forked pytest worker.
+
+A resident process per project that has already imported pytest, its
+entry-point plugins and the project's third-party and standard-library
+imports (found through lib.core.impact). Each run is served in a freshly
+forked child, so project modules and conftest files are always imported
+anew while the expensive, stable imports are inherited warm.
+
+Protocol (length-prefixed JSON over a Unix socket, see lib.core.daemon):
+
+- request: {"args": [...], "cwd": ..., "env": {...}, "log": path}
+- first reply: {"pid": child pid} (the child leads its own process group,
+  so the client can cancel the run with killpg), or {"stale": true}
+- final reply: {"exit_code": n}; the run's output is appended to log
+
+The worker exits when conftest.py files, dependency manifests or the
+Python environment change (the client then falls back to a plain pytest
+subprocess and starts a new worker), and after an idle timeout.
+"""
+
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from lib.core.daemon import ForkingUnixServer, is_running, recv_message, send_message
+
+# Files whose change means installed dependencies or pytest config changed
+MANIFESTS = (
+    "pyproject.toml", "setup.py", "setup.cfg", "requirements.txt", "requirements-dev.txt",
+    "Pipfile.lock", "poetry.lock", "uv.lock", "pdm.lock", "pytest.ini", "tox.ini",
+)
+
+# Environment variables that change what Python imports
+ENV_VARS = ("PATH", "PYTHONPATH", "PYTHONHOME", "VIRTUAL_ENV", "CONDA_PREFIX")
+
+# Seconds without runs before the worker exits
+IDLE_TIMEOUT = 30 * 60
+
+# Seconds between idle checks
+POLL_INTERVAL = 1.0
+
+DEVKIT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _stat_key(path: str) -> tuple:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _site_dirs() -> list[str]:
+    import site
+
+    dirs = list(getattr(site, "getsitepackages", lambda: [])())
+    user_site = getattr(site, "getusersitepackages", lambda: None)()
+    if isinstance(user_site, str):
+        dirs.append(user_site)
+    return dirs
+
+
+def environment_fingerprint(
+    root: str, env: Optional[dict] = None, conftests: bool = True
+) -> int:
+    """
+    Fingerprint of everything that invalidates a warm worker.
+
+    Covers conftest.py files and dependency manifests (stat data), the
+    interpreter and its site-packages directories (installing or removing
+    a package changes the directory's mtime), and import-related
+    environment variables.
+
+    Args:
+        root: Project root
+        env: Environment to fingerprint (default: os.environ)
+        conftests: Include conftest.py files (callers that hash their
+            content separately can skip walking the tree for them)
+
+    Returns:
+        CRC32 of the collected state
+    """
+    from lib.core.impact import CONFTEST, _list_python_files
+
+    if env is None:
+        env = dict(os.environ)
+
+    paths = [os.path.join(root, name) for name in MANIFESTS]
+    if conftests:
+        paths += [
+            os.path.join(root, path) for path in _list_python_files(root)
+            if os.path.basename(path) == CONFTEST
+        ]
+    state = (
+        sys.executable,
+        [env.get(name) for name in ENV_VARS],
+        [_stat_key(path) for path in sorted(paths)],
+        [_stat_key(path) for path in _site_dirs()],
+    )
+    return zlib.crc32(repr(state).encode("utf-8", "surrogateescape"))
+
+
+def third_party_imports(root: str) -> list[str]:
+    """
+    Top-level modules the project imports that live outside it.
+
+    Returns:
+        Sorted module names (standard library and installed packages)
+    """
+    import importlib.util
+
+    from lib.core.impact import build_import_graph
+
+    graph = build_import_graph(root)
+    project = {name.split(".")[0] for name in graph.modules}
+    names = set()
+    for imports in graph.imports.values():
+        names.update(name for name in imports if "." not in name and name not in project)
+
+    found = []
+    for name in sorted(names):
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            continue
+        origin = spec.origin if spec is not None else None
+        if spec is None or (origin and os.path.realpath(origin).startswith(root + os.sep)):
+            continue  # Missing, or a project module outside the import graph
+        found.append(name)
+    return found
+
+
+def preload(root: str) -> list[str]:
+    """
+    Import pytest, its plugins and the project's stable dependencies.
+
+    Returns:
+        Modules that imported successfully
+    """
+    import importlib
+
+    loaded = []
+    for name in ["pytest"] + third_party_imports(root):
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            continue  # Broken or platform-specific imports stay lazy
+
+    from importlib.metadata import entry_points
+
+    try:
+        plugins = entry_points(group="pytest11")
+    except TypeError:  # Python < 3.10
+        plugins = entry_points().get("pytest11", [])
+    for plugin in plugins:
+        try:
+            plugin.load()
+        except Exception:
+            continue
+    return loaded
+
+
+def _unload_devkit() -> None:
+    """
+    Drop the devkit's modules and sys.path entry (in a forked run).
+
+    The worker itself imports lib.core; a project with its own top-level
+    `lib` package must import that one, as under a plain pytest.
+    """
+    import importlib
+
+    root = str(DEVKIT_ROOT)
+    prefix = root + os.sep
+    sys.path[:] = [path for path in sys.path if not path or os.path.realpath(path) != root]
+
+    def in_devkit(path) -> bool:
+        return isinstance(path, str) and os.path.realpath(path).startswith(prefix)
+
+    for name, module in list(sys.modules.items()):
+        locations = list(getattr(module, "__path__", None) or ())
+        locations.append(getattr(module, "__file__", None))
+        if any(in_devkit(location) for location in locations):
+            del sys.modules[name]
+    importlib.invalidate_caches()
+
+
+class PytestWorkerServer(ForkingUnixServer):
+    """Resident pytest process that forks a child per run."""
+
+    def __init__(self, socket_path: Path, root: str):
+        self.root = os.path.realpath(root)
+        self.fingerprint = environment_fingerprint(self.root)
+        self.stale = False
+        self.stopped = False
+        self.last_active = time.monotonic()
+        self.idle_timeout = IDLE_TIMEOUT
+        super().__init__(socket_path)
+        self.timeout = POLL_INTERVAL
+
+    def before_fork(self) -> None:
+        self.last_active = time.monotonic()
+        # Checked in the parent, so a stale worker stops after this request
+        if environment_fingerprint(self.root) != self.fingerprint:
+            self.stale = True
+
+    def handle_timeout(self) -> None:
+        super().handle_timeout()  # Reaps finished children
+        if time.monotonic() - self.last_active > self.idle_timeout:
+            self.stopped = True
+
+    def handle_request_payload(self, payload: dict) -> dict:
+        env = payload.get("env")
+        if self.stale or (
+            isinstance(env, dict)
+            and [env.get(name) for name in ENV_VARS]
+            != [os.environ.get(name) for name in ENV_VARS]
+        ):
+            return {"stale": True}
+
+        # Lead a process group so the client can cancel everything the run starts
+        os.setpgid(0, 0)
+        send_message(self.connection, {"pid": os.getpid()})
+
+        if isinstance(env, dict):
+            os.environ.clear()
+            os.environ.update(env)
+        os.chdir(payload.get("cwd") or self.root)
+        _unload_devkit()
+
+        log = os.open(payload["log"], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        os.dup2(log, 1)
+        os.dup2(log, 2)
+        os.close(log)
+        # Fresh streams: the inherited ones may be buffered or redirected
+        sys.stdout = open(1, "w", buffering=1, errors="replace", closefd=False)
+        sys.stderr = open(2, "w", buffering=1, errors="replace", closefd=False)
+
+        import pytest
+
+        args = [str(arg) for arg in payload.get("args", [])]
+        sys.argv = ["pytest"] + args
+        try:
+            exit_code = int(pytest.main(args))
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        return {"exit_code": exit_code}
+
+    def serve(self) -> None:
+        """Serve runs until the environment changes or the worker is idle."""
+        while not (self.stale or self.stopped):
+            self.handle_request()
+        self.collect_children(blocking=True)
+
+
+class WorkerRun:
+    """A run in progress on the worker (a Popen-like subset for callers)."""
+
+    def __init__(self, sock: socket.socket, pid: int):
+        self._sock = sock
+        self.pid = pid
+        self.returncode: Optional[int] = None
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """
+        Wait for the run to finish.
+
+        Raises:
+            subprocess.TimeoutExpired: If it is still running after timeout
+        """
+        if self.returncode is not None:
+            return self.returncode
+
+        self._sock.settimeout(timeout)
+        try:
+            # Peek, so a timeout never consumes part of the response
+            self._sock.recv(1, socket.MSG_PEEK)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired("pytest-worker", timeout)
+        except OSError:
+            pass
+
+        self._sock.settimeout(None)
+        try:
+            response = recv_message(self._sock)
+        except OSError:
+            response = None
+        self._sock.close()
+        # No response: the child was killed or crashed
+        self.returncode = response.get("exit_code", 1) if response else -signal.SIGTERM
+        return self.returncode
+
+
+def start_run(
+    socket_path: Path,
+    args: list[str],
+    cwd: str,
+    log_path: str,
+) -> Optional[WorkerRun]:
+    """
+    Start a pytest run on a warm worker.
+
+    Args:
+        socket_path: Worker socket
+        args: pytest arguments (without the "pytest" command)
+        cwd: Directory to run in
+        log_path: File the run's output is appended to
+
+    Returns:
+        WorkerRun, or None if no fresh worker is available (run pytest
+        directly instead)
+    """
+    if not Path(socket_path).exists():
+        return None
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):
+        return None
+
+    try:
+        sock.settimeout(POLL_INTERVAL * 5)
+        sock.connect(str(socket_path))
+        send_message(sock, {
+            "args": args, "cwd": cwd, "env": dict(os.environ), "log": log_path,
+        })
+        reply = recv_message(sock)
+    except OSError:
+        sock.close()
+        return None
+
+    if not reply or "pid" not in reply:
+        sock.close()
+        return None
+    return WorkerRun(sock, reply["pid"])
+
+
+def script_python(script: str) -> Optional[str]:
+    """
+    Interpreter named by a console script's shebang.
+
+    Handles `#!/usr/bin/env python3` by looking the name up on PATH.
+
+    Returns:
+        The interpreter's path, or None if the script has no Python shebang
+    """
+    try:
+        with open(script, "rb") as f:
+            shebang = f.readline(256).decode("utf-8", "replace")
+    except OSError:
+        return None
+    parts = shebang[2:].split() if shebang.startswith("#!") else []
+    if parts and os.path.basename(parts[0]) == "env" and len(parts) > 1:
+        parts = [shutil.which(parts[1]) or ""]
+    if parts and "python" in os.path.basename(parts[0]) and os.path.exists(parts[0]):
+        return parts[0]
+    return None
+
+
+def find_pytest_python(cwd: Optional[str] = None) -> str:
+    """
+    Interpreter that the `pytest` command on PATH runs under.
+
+    Returns:
+        Its path, read from the script's shebang, or sys.executable
+    """
+    script = shutil.which("pytest")
+    python = script_python(script) if script is not None else None
+    return python or sys.executable
+
+
+def ensure_worker(socket_path: Path, root: str, python: Optional[str] = None) -> bool:
+    """
+    Start a detached worker for a project unless one is running.
+
+    The worker warms up in the background; callers run pytest directly
+    until it accepts runs.
+
+    Returns:
+        True if a worker is already running
+    """
+    if is_running(Path(socket_path)):
+        return True
+
+    # The devkit goes on sys.path directly: the worker's environment must
+    # match its clients' (see ENV_VARS)
+    bootstrap = (
+        f"import sys; sys.path[0] = {str(DEVKIT_ROOT)!r}; "
+        "from lib.core.pytest_worker import main; main(*sys.argv[1:])"
+    )
+    try:
+        subprocess.Popen(
+            [python or find_pytest_python(root), "-c", bootstrap, str(socket_path), root],
+            cwd=root,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+    return False
+
+
+def main(socket_path: str, root: str) -> None:
+    """Worker process body (started by ensure_worker())."""
+    # Treat SIGTERM like Ctrl-C so the socket file is removed on exit
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    # Warm up before binding: a duplicate worker started meanwhile then
+    # fails to bind instead of replacing a live socket
+    preload(root)
+    try:
+        with PytestWorkerServer(Path(socket_path), root) as server:
+            try:
+                server.serve()
+            except KeyboardInterrupt:
+                pass
+    except OSError:
+        pass  # Another worker owns the socket
@@ -0,0 +1,509 @@
+"""
+Debounced background test runner for test-on-change.
+
+Hooks submit test requests and return immediately. A single detached
+runner process per project waits for a quiet window with no new edits,
+coalesces everything submitted in the meantime into one run per test
+tool (the union of the selected tests, or the whole suite if any edit
+needed it), and cancels a run as soon as a newer edit supersedes it; the
+cancelled run's requests are folded into the next one.
+
+State lives in a per-project directory under the cache directory:
+
+- queue: pending requests, one JSON object per line
+- status.json: the current or last finished run
+- output.log: output of the current run
+- runner.lock: held by the live runner
+- pytest-worker.sock: the warm pytest worker, if enabled (see
+  lib.core.pytest_worker)
+
+The outcome of a finished run is reported once, by the next hook
+invocation (see take_result()), and stays readable in status.json.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from lib.core.cache import FileLock
+from lib.core.config import get_cache_dir
+
+RUNNER_NAMESPACE = "test-runner"
+
+# Default quiet window: edits closer together than this share one run
+DEFAULT_QUIET_MS = 1500
+
+# Default seconds before a run is killed
+DEFAULT_TIMEOUT = 60.0
+
+# Seconds between checks for new edits while waiting or running
+POLL_INTERVAL = 0.1
+
+# Seconds a cancelled run gets to exit before it is killed
+TERMINATE_GRACE = 5.0
+
+# Output lines kept in status.json
+OUTPUT_TAIL_LINES = 40
+
+# Warm pytest worker socket, in the runner's directory
+WORKER_SOCKET = "pytest-worker.sock"
+
+DEVKIT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+@dataclass
+class RunRequest:
+    """Tests to run after one edit."""
+    kind: str  # "pytest" or "jest"
+    file: str  # Edited file
+    targets: Optional[list[str]] = None  # pytest: test files (None = whole suite)
+    time: float = 0.0
+
+
+@dataclass
+class CoalescedRun:
+    """One coalesced run of a test tool."""
+    kind: str
+    targets: Optional[list[str]]
+    files: list[str] = field(default_factory=list)
+    requests: list[RunRequest] = field(default_factory=list)
+
+
+@dataclass
+class RunStatus:
+    """State of the current or last run, as stored in status.json."""
+    state: str  # "running", "passed", "failed", "timeout" or "error"
+    files: list[str] = field(default_factory=list)
+    commands: list[list[str]] = field(default_factory=list)
+    output: str = ""
+    started: float = 0.0
+    finished: Optional[float] = None
+    reported: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.state == "passed"
+
+
+def build_command(kind: str, targets: Optional[list[str]]) -> list[str]:
+    """Command line for a coalesced run."""
+    if kind == "pytest":
+        return ["pytest", "-x", "-q", "--tb=short"] + (targets or [])
+    return ["npm", "test", "--", "--bail", "--findRelatedTests"] + (targets or [])
+
+
+def coalesce(requests: Iterable[RunRequest]) -> list[CoalescedRun]:
+    """
+    Merge requests into one run per test tool.
+
+    pytest targets are unioned, and any request for the whole suite makes
+    the run cover the whole suite; jest runs all edited files' related tests.
+
+    Returns:
+        Runs in first-submitted order of their tool
+    """
+    runs: dict[str, CoalescedRun] = {}
+    for req in requests:
+        run = runs.get(req.kind)
+        if run is None:
+            run = runs[req.kind] = CoalescedRun(req.kind, [])
+        run.requests.append(req)
+        if req.file not in run.files:
+            run.files.append(req.file)
+
+        if req.kind == "jest":
+            new_targets = [req.file]
+        elif req.targets is None:
+            run.targets = None
+            continue
+        else:
+            new_targets = req.targets
+
+        if run.targets is not None:
+            run.targets.extend(t for t in new_targets if t not in run.targets)
+    return list(runs.values())
+
+
+def _tail(path: Path, lines: int = OUTPUT_TAIL_LINES) -> str:
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 64 * 1024))
+            data = f.read()
+    except OSError:
+        return ""
+    return "\n".join(data.decode("utf-8", "replace").splitlines()[-lines:])
+
+
+class BackgroundRunner:
+    """Queue, status and runner loop for one project directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        cwd: str,
+        quiet_ms: int = DEFAULT_QUIET_MS,
+        timeout: float = DEFAULT_TIMEOUT,
+        warm_worker: bool = False,
+        result_cache: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.cwd = cwd
+        self.quiet = quiet_ms / 1000
+        self.timeout = timeout
+        self.warm_worker = warm_worker
+        self.result_cache = result_cache
+
+    @property
+    def status_path(self) -> Path:
+        return self.directory / "status.json"
+
+    def _queue_lock(self) -> FileLock:
+        return FileLock(self.directory / "queue.lock")
+
+    # -- hook side -------------------------------------------------------
+
+    def submit(self, request: RunRequest) -> None:
+        """Queue a request (the runner picks it up after the quiet window)."""
+        if not request.time:
+            request.time = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._queue_lock():
+            with open(self.directory / "queue", "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(request)) + "\n")
+
+    def is_running(self) -> bool:
+        """Whether a runner process currently holds the runner lock."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lock = FileLock(self.directory / "runner.lock", nonblocking=True)
+        if lock.acquire():
+            lock.release()
+            return False
+        return True
+
+    def spawn(self) -> bool:
+        """
+        Start a detached runner unless one is already running.
+
+        Returns:
+            True if a runner was started
+        """
+        if self.is_running():
+            return False
+
+        # The devkit goes on sys.path directly, so PYTHONPATH (inherited by
+        # the test commands) stays the user's
+        bootstrap = (
+            f"import sys; sys.path[0] = {str(DEVKIT_ROOT)!r}; "
+            "from lib.core.runner import main; main(sys.argv[1:])"
+        )
+        try:
+            subprocess.Popen(
+                [sys.executable, "-c", bootstrap, str(self.directory), self.cwd,
+                 str(int(self.quiet * 1000)), str(self.timeout), str(int(self.warm_worker)),
+                 str(int(self.result_cache))],
+                cwd=self.cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            return False
+        return True
+
+    def read_status(self) -> Optional[RunStatus]:
+        """The current or last run, or None if nothing has run."""
+        try:
+            with open(self.status_path, "r", encoding="utf-8") as f:
+                return RunStatus(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def take_result(self) -> Optional[RunStatus]:
+        """
+        Claim a finished run's result for reporting.
+
+        Returns:
+            The finished run, once; None if there is nothing new to report
+        """
+        if not self.status_path.exists():
+            return None
+        with self._queue_lock():
+            status = self.read_status()
+            if status is None or status.finished is None or status.reported:
+                return None
+            status.reported = True
+            self._write_status(status)
+        return status
+
+    # -- runner side -----------------------------------------------------
+
+    def _write_status(self, status: RunStatus) -> None:
+        tmp_path = self.status_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(status), f)
+        os.replace(tmp_path, self.status_path)
+
+    def _read_queue(self) -> list[RunRequest]:
+        requests = []
+        try:
+            with open(self.directory / "queue", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        requests.append(RunRequest(**json.loads(line)))
+                    except (ValueError, TypeError):
+                        continue  # Torn or foreign line
+        except FileNotFoundError:
+            pass
+        return requests
+
+    def _has_pending(self) -> bool:
+        try:
+            return os.path.getsize(self.directory / "queue") > 0
+        except OSError:
+            return False
+
+    def _take_queue(self) -> list[RunRequest]:
+        with self._queue_lock():
+            requests = self._read_queue()
+            open(self.directory / "queue", "w").close()
+        return requests
+
+    def _wait_for_quiet(self) -> None:
+        """Sleep until no request has been queued for the quiet window."""
+        while True:
+            requests = self._read_queue()
+            if not requests:
+                return
+            remaining = max(r.time for r in requests) + self.quiet - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 1.0))
+
+    def _start_on_worker(self, command: list[str], log):
+        """Start a pytest command on the warm worker, or None to run it directly."""
+        from lib.core.pytest_worker import ensure_worker, start_run
+
+        socket_path = self.directory / WORKER_SOCKET
+        log.flush()
+        run = start_run(socket_path, command[1:], self.cwd, log.name)
+        if run is None:
+            # Missing or stale: (re)start it for the next run
+            ensure_worker(socket_path, self.cwd)
+        return run
+
+    def _execute(self, command: list[str], log) -> Optional[tuple[str, Optional[int]]]:
+        """
+        Run one command, watching for superseding edits.
+
+        Returns:
+            ("passed", "failed", "timeout" or "error", exit code if the
+            command exited), or None if cancelled
+        """
+        proc = None
+        if self.warm_worker and command[0] == "pytest":
+            proc = self._start_on_worker(command, log)
+
+        try:
+            if proc is None:
+                proc = subprocess.Popen(
+                    command, cwd=self.cwd, stdin=subprocess.DEVNULL,
+                    stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+                )
+        except OSError as e:
+            log.write(f"Could not run {command[0]}: {e}\n".encode())
+            return "error", None
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                code = proc.wait(timeout=POLL_INTERVAL)
+                return ("passed" if code == 0 else "failed"), code
+            except subprocess.TimeoutExpired:
+                pass
+            if self._has_pending():
+                _terminate(proc)
+                return None
+            if time.monotonic() > deadline:
+                _terminate(proc)
+                return "timeout", None
+
+    def _result_keys(self, runs: list[CoalescedRun]) -> dict[int, list[tuple[str, bool]]]:
+        """
+        Result cache keys of each run's requests, from the content being tested.
+
+        Returns:
+            Run index -> [(key, whether the request selected exactly the
+            run's tests)]; whole-suite and non-pytest runs have no keys
+        """
+        from lib.core.git import get_repo_root
+        from lib.core.impact import build_import_graph
+        from lib.core.testcache import result_key
+
+        keys: dict[int, list[tuple[str, bool]]] = {}
+        graph = None
+        for i, run in enumerate(runs):
+            if run.kind != "pytest" or run.targets is None:
+                continue
+            if graph is None:
+                root = get_repo_root(self.cwd)
+                if root is None:
+                    return {}
+                graph = build_import_graph(root)
+            for req in run.requests:
+                key = result_key(graph, req.file, req.targets,
+                                 build_command(req.kind, req.targets))
+                if key is not None:
+                    keys.setdefault(i, []).append((key, set(req.targets) == set(run.targets)))
+        return keys
+
+    def _record_results(
+        self, keys: list[tuple[str, bool]], exit_code: Optional[int], log_path: Path
+    ) -> None:
+        """
+        Record a finished run's outcome for its requests.
+
+        Only exit codes that report test outcomes are recorded. A pass
+        covers every request (each selected a subset of the tests); a
+        failure is only attributed to requests that selected all of them.
+        """
+        from lib.core.testcache import RECORDED_EXIT_CODES, record_result
+
+        if exit_code not in RECORDED_EXIT_CODES:
+            return
+        output = _tail(log_path)
+        for key, exact in keys:
+            if exit_code == 0 or exact:
+                record_result(key, exit_code == 0, output)
+
+    def _run_batch(self, requests: list[RunRequest]) -> bool:
+        """
+        Run a coalesced batch and record its status.
+
+        Returns:
+            False if a newer edit cancelled the batch
+        """
+        runs = coalesce(requests)
+        status = RunStatus(
+            state="running",
+            files=[f for run in runs for f in run.files],
+            commands=[build_command(run.kind, run.targets) for run in runs],
+            started=time.time(),
+        )
+        self._write_status(status)
+        # Keyed before running: later edits supersede the run instead
+        keys = self._result_keys(runs) if self.result_cache else {}
+
+        log_path = self.directory / "output.log"
+        state = "passed"
+        with open(log_path, "wb") as log:
+            for i, command in enumerate(status.commands):
+                executed = self._execute(command, log)
+                if executed is None:
+                    return False
+                result, exit_code = executed
+                log.flush()
+                self._record_results(keys.get(i, []), exit_code, log_path)
+                if result != "passed":
+                    state = result
+                    break
+
+        status.state = state
+        status.output = _tail(log_path)
+        status.finished = time.time()
+        self._write_status(status)
+        return True
+
+    def run(self) -> None:
+        """
+        Process the queue until it is empty (the runner process body).
+
+        Returns at once if another runner holds the lock. The queue is
+        checked again after releasing the lock, so a request submitted
+        while this runner was exiting is never stranded.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        while self._has_pending():
+            lock = FileLock(self.directory / "runner.lock", nonblocking=True)
+            if not lock.acquire():
+                return
+            try:
+                carried: list[RunRequest] = []
+                while self._has_pending():
+                    self._wait_for_quiet()
+                    batch = carried + self._take_queue()
+                    carried = [] if self._run_batch(batch) else batch
+            finally:
+                lock.release()
+
+
+def _terminate(proc: subprocess.Popen) -> None:
+    """Stop a run and everything it started."""
+    for sig, wait in ((signal.SIGTERM, TERMINATE_GRACE), (signal.SIGKILL, None)):
+        try:
+            os.killpg(proc.pid, sig)
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=wait)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def is_supported() -> bool:
+    """Whether background runs are available (needs fcntl and process groups)."""
+    try:
+        import fcntl  # noqa: F401
+    except ImportError:
+        return False
+    return hasattr(os, "killpg")
+
+
+def get_runner(
+    cwd: Optional[str] = None,
+    quiet_ms: int = DEFAULT_QUIET_MS,
+    timeout: float = DEFAULT_TIMEOUT,
+    warm_worker: bool = False,
+    result_cache: bool = True,
+) -> Optional[BackgroundRunner]:
+    """
+    Get the background runner for a project directory.
+
+    Args:
+        cwd: Project directory (default: the current directory)
+        quiet_ms: Quiet window before a run starts
+        timeout: Seconds before a run is killed
+        warm_worker: Run pytest on a warm pre-forked worker
+        result_cache: Record outcomes in the test result cache
+
+    Returns:
+        BackgroundRunner, or None if caching is disabled or the platform lacks
+        support
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None or not is_supported():
+        return None
+
+    cwd = os.path.realpath(cwd or os.getcwd())
+    digest = zlib.crc32(cwd.encode("utf-8", "surrogateescape"))
+    return BackgroundRunner(
+        cache_dir / RUNNER_NAMESPACE / f"{digest:08x}", cwd, quiet_ms, timeout,
+        warm_worker, result_cache,
+    )
+
+
+def main(argv: list[str]) -> None:
+    """Runner process body: <state dir> <cwd> <quiet ms> <timeout> <warm> <cache>."""
+    BackgroundRunner(
+        Path(argv[0]), argv[1], int(argv[2]), float(argv[3]),
+        argv[4:5] == ["1"], argv[5:6] != ["0"],
+    ).run()
@@ -0,0 +1,157 @@
+"""
+Content-addressed cache of test outcomes.
+
+A result is keyed by what the tests actually exercised: the content
+hashes of the selected test files, every project file they (and the
+edited file) import transitively, the conftest.py files that apply to
+them, the project's pytest configuration files, the test command, and
+the Python environment (interpreter, dependency manifests and
+site-packages, as fingerprinted for the warm pytest worker).
+Editing a file back to a previously tested state, or making a no-op
+edit, therefore maps to an existing key and the recorded outcome can be
+reported without running anything.
+
+Content hashes come from the import graph (lib.core.impact), which
+already hashes every file it indexes, so building a key reads no extra
+source files. Entries live in a size-capped DiskCache namespace with LRU
+eviction. Only runs that report test outcomes (exit code 0 or 1) are
+recorded; interrupted runs, usage or internal errors and runs that
+collected no tests are not.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from lib.core.cache import DiskCache, get_disk_cache
+
+CACHE_NAMESPACE = "testresults"
+
+# Default byte budget for recorded results
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# Bump when the key or the stored result layout changes
+RESULT_VERSION = 2
+
+# Exit codes that report test outcomes (pytest: passed, tests failed)
+RECORDED_EXIT_CODES = (0, 1)
+
+# Project files that change how pytest collects and runs tests
+CONFIG_FILES = ("pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini")
+
+# Environment variables that change which packages the tests import
+ENV_VARS = ("VIRTUAL_ENV", "CONDA_PREFIX", "PYTHONPATH")
+
+
+@dataclass
+class CachedResult:
+    """A recorded test outcome."""
+    passed: bool
+    output: str
+    recorded: float
+
+
+def get_result_cache(max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[DiskCache]:
+    """The result cache, or None if caching is disabled."""
+    return get_disk_cache(CACHE_NAMESPACE, max_bytes=max_bytes)
+
+
+def _relative(root: str, path: str) -> str:
+    full = os.path.realpath(os.path.join(root, path))
+    return os.path.relpath(full, root).replace(os.sep, "/")
+
+
+def _conftests(graph, tests: Iterable[str]) -> set[str]:
+    """conftest.py files pytest loads for the given tests."""
+    found = set()
+    for test in tests:
+        directory = os.path.dirname(test)
+        while True:
+            conftest = f"{directory}/conftest.py" if directory else "conftest.py"
+            if conftest in graph.imports:
+                found.add(conftest)
+            if not directory:
+                break
+            directory = os.path.dirname(directory)
+    return found
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def result_key(
+    graph,
+    file: str,
+    tests: list[str],
+    command: list[str],
+) -> Optional[str]:
+    """
+    Key of a test run's outcome.
+
+    Args:
+        graph: ImportGraph of the project (lib.core.impact)
+        file: Edited file (absolute or root-relative)
+        tests: Selected test files (absolute or root-relative)
+        command: Test command line
+
+    Returns:
+        Hex digest, or None if the edited file or a test isn't in the graph
+    """
+    from lib.core.pytest_worker import environment_fingerprint
+
+    file = _relative(graph.root, file)
+    tests = [_relative(graph.root, test) for test in tests]
+    if file not in graph.imports or any(test not in graph.imports for test in tests):
+        return None
+
+    inputs = graph.dependencies([file, *tests])
+    inputs |= graph.dependencies(_conftests(graph, tests))
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{RESULT_VERSION}\0{file}\0".encode("utf-8", "surrogateescape"))
+    # Conftests are hashed by content below
+    h.update(f"{environment_fingerprint(graph.root, conftests=False)}\0".encode())
+    for part in command:
+        h.update(f"{part}\0".encode("utf-8", "surrogateescape"))
+    for name in ENV_VARS:
+        h.update(f"{os.environ.get(name, '')}\0".encode("utf-8", "surrogateescape"))
+    for path in sorted(inputs):
+        h.update(f"{path}\0{graph.digests.get(path, '')}\0".encode("utf-8", "surrogateescape"))
+    for name in CONFIG_FILES:
+        h.update(f"{name}\0{_file_digest(os.path.join(graph.root, name))}\0".encode())
+    return h.hexdigest()
+
+
+def get_cached_result(key: str, cache: Optional[DiskCache] = None) -> Optional[CachedResult]:
+    """
+    Look up a recorded outcome.
+
+    Returns:
+        CachedResult, or None if nothing was recorded under key
+    """
+    if cache is None:
+        cache = get_result_cache()
+    stored = cache.get(key) if cache is not None else None
+    if not isinstance(stored, tuple) or len(stored) != 3:
+        return None
+    return CachedResult(*stored)
+
+
+def record_result(
+    key: str,
+    passed: bool,
+    output: str = "",
+    cache: Optional[DiskCache] = None,
+) -> None:
+    """Record a test outcome (the cache evicts least-recently-used results)."""
+    if cache is None:
+        cache = get_result_cache()
+    if cache is not None:
+        cache.set(key, (passed, output, time.time()))
@@ -0,0 +1,273 @@
+"""
+Repository-wide source -> test file index.
+
+Instead of probing a fixed list of candidate paths per edit, the index is
+built from one `git ls-files` listing (tracked plus untracked, non-ignored
+files) by recognizing test files by name:
+
+- Python: test_<name>.py, <name>_test.py
+- JavaScript/TypeScript: <name>.test.<ext>, <name>.spec.<ext>, and any
+  file under a __tests__/ directory
+
+Tests are keyed by (language family, name), so a lookup is a dict access.
+A test only counts for a source when it sits next to it, or in a test
+directory (tests/, __tests__/, ...) of the source's directory or one of
+its ancestors, optionally mirroring the source's subdirectories; a test of
+the same name in another package does not. Among those, the one nearest
+the source wins, which handles package-local test directories in
+monorepos.
+
+The index is cached on disk keyed by HEAD and the index file's stat (see
+lib.core.git.cache.repo_fingerprint). Test files written since then are
+added incrementally with record_test_file().
+"""
+
+import os
+from typing import Iterable, Optional
+
+from lib.core.cache import DiskCache, get_disk_cache
+
+CACHE_NAMESPACE = "testmap"
+
+# Bump when the cached index layout changes
+TESTMAP_VERSION = 1
+
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+
+# Test name suffixes before the extension, e.g. foo.test.ts
+JS_TEST_SUFFIXES = (".test", ".spec")
+
+# Directory names that hold tests (the first must follow a source ancestor)
+TEST_DIRS = frozenset((
+    "test", "tests", "__tests__", "spec", "specs", "testing",
+    "unit", "integration", "functional", "e2e",
+))
+
+# Source roots a mirrored test tree may leave out (src/pkg -> tests/pkg)
+SOURCE_ROOTS = frozenset(("src", "lib", "app"))
+
+
+def _family(ext: str) -> Optional[str]:
+    if ext in PYTHON_EXTENSIONS:
+        return "py"
+    if ext in JS_EXTENSIONS:
+        return "js"
+    return None
+
+
+def source_key_for_test(path: str) -> Optional[tuple[str, str]]:
+    """
+    Key of the source a test file covers, or None if it isn't a test file.
+
+    Example: "pkg/tests/test_util.py" -> ("py", "util")
+    """
+    path = path.replace("\\", "/")
+    directory, _, name = path.rpartition("/")
+    stem, ext = os.path.splitext(name)
+    family = _family(ext)
+
+    if family == "py":
+        if stem.startswith("test_") and len(stem) > 5:
+            return family, stem[5:]
+        if stem.endswith("_test") and len(stem) > 5:
+            return family, stem[:-5]
+    elif family == "js":
+        for suffix in JS_TEST_SUFFIXES:
+            if stem.endswith(suffix) and len(stem) > len(suffix):
+                return family, stem[:-len(suffix)]
+        if "__tests__" in directory.split("/"):
+            return family, stem
+    return None
+
+
+def source_key(path: str) -> Optional[tuple[str, str]]:
+    """Key used to look up tests for a source file."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    family = _family(ext)
+    return (family, stem) if family else None
+
+
+def _shared_prefix(a: list[str], b: list[str]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def covers(source_dirs: list[str], test_dirs: list[str]) -> bool:
+    """
+    Whether a test in test_dirs can be a test of a source in source_dirs.
+
+    Accepted: the source's own directory (colocated tests), or a test
+    directory under the source's directory or one of its ancestors whose
+    other components mirror the source's remaining path (a leading src/,
+    lib/ or app/ may be left out).
+
+    Example: for pkg_a/utils.py, pkg_a/tests/ and tests/pkg_a/ qualify;
+    pkg_b/tests/ does not.
+    """
+    shared = _shared_prefix(source_dirs, test_dirs)
+    rest = test_dirs[shared:]
+    source_rest = source_dirs[shared:]
+    if not rest:
+        return not source_rest
+    if rest[0] not in TEST_DIRS:
+        return False
+
+    mirrored = [part for part in rest[1:] if part not in TEST_DIRS]
+    if mirrored == source_rest[:len(mirrored)]:
+        return True
+    return (
+        bool(source_rest) and source_rest[0] in SOURCE_ROOTS
+        and mirrored == source_rest[1:len(mirrored) + 1]
+    )
+
+
+class SourceTestIndex:
+    """Test files grouped by the source name they cover."""
+
+    def __init__(self, root: str, tests: dict[tuple[str, str], list[str]]):
+        self.root = root
+        self.tests = tests  # key -> repo-relative test paths
+
+    @classmethod
+    def from_paths(cls, root: str, paths: Iterable[str]) -> "SourceTestIndex":
+        index = cls(root, {})
+        for path in paths:
+            index.add(path)
+        return index
+
+    def add(self, path: str) -> bool:
+        """Add a repo-relative path if it is a test file. Returns True if added."""
+        key = source_key_for_test(path)
+        if key is None:
+            return False
+        paths = self.tests.setdefault(key, [])
+        if path not in paths:
+            paths.append(path)
+        return True
+
+    def find(self, source_file: str) -> list[str]:
+        """
+        Test files for a source file, nearest first (see covers()).
+
+        Args:
+            source_file: Absolute path, or path relative to the repository root
+
+        Returns:
+            Absolute paths of existing test files
+        """
+        key = source_key(source_file)
+        candidates = self.tests.get(key) if key else None
+        if not candidates:
+            return []
+
+        source = os.path.relpath(os.path.join(self.root, source_file), self.root)
+        source_dirs = source.replace("\\", "/").split("/")[:-1]
+
+        def rank(path: str) -> tuple:
+            test_dirs = path.split("/")[:-1]
+            return (-_shared_prefix(source_dirs, test_dirs), len(test_dirs), path)
+
+        found = []
+        eligible = [path for path in candidates if covers(source_dirs, path.split("/")[:-1])]
+        for path in sorted(eligible, key=rank):
+            full = os.path.join(self.root, path)
+            if os.path.exists(full):  # Tracked tests may have been deleted
+                found.append(full)
+        return found
+
+
+def get_testmap_cache() -> Optional[DiskCache]:
+    """The test index cache, or None if caching is disabled."""
+    return get_disk_cache(CACHE_NAMESPACE)
+
+
+def _added_key(root: str) -> str:
+    return f"added\0{root}"
+
+
+def _list_files(root: str) -> Optional[list[str]]:
+    from lib.core.git import run_git
+
+    exit_code, stdout, _ = run_git(
+        ["ls-files", "-z", "--cached", "--others", "--exclude-standard"], cwd=root
+    )
+    if exit_code != 0:
+        return None
+    return [path for path in stdout.split("\0") if path]
+
+
+def load_test_index(cwd: Optional[str] = None) -> Optional[SourceTestIndex]:
+    """
+    Get the test index for the repository containing cwd.
+
+    Reuses the cached index while HEAD and the git index are unchanged;
+    otherwise lists the repository once and caches the result.
+
+    Returns:
+        SourceTestIndex, or None outside a repository
+    """
+    from lib.core.git import get_repo_root
+    from lib.core.git.cache import HEAD, INDEX, repo_fingerprint
+
+    root = get_repo_root(cwd)
+    if root is None:
+        return None
+
+    cache = get_testmap_cache()
+    fingerprint = repo_fingerprint((HEAD, INDEX), root) if cache is not None else None
+    key = f"{TESTMAP_VERSION}\0{fingerprint}"
+
+    if fingerprint is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            index = SourceTestIndex(root, cached)
+            for path in cache.get(_added_key(root), []):
+                index.add(path)
+            return index
+
+    paths = _list_files(root)
+    if paths is None:
+        return None
+    index = SourceTestIndex.from_paths(root, paths)
+
+    if fingerprint is not None:
+        cache.set(key, index.tests)
+        # The fresh listing already includes previously written tests
+        cache.delete(_added_key(root))
+    return index
+
+
+def record_test_file(path: str, cwd: Optional[str] = None) -> bool:
+    """
+    Add a newly written test file to the cached index.
+
+    Args:
+        path: Test file path (absolute or relative to cwd)
+        cwd: Directory inside the repository
+
+    Returns:
+        True if the file is a test file and was recorded
+    """
+    from lib.core.git import get_repo_root
+
+    if source_key_for_test(path) is None:
+        return False
+
+    cache = get_testmap_cache()
+    root = get_repo_root(cwd) if cache is not None else None
+    if root is None:
+        return False
+
+    relative = os.path.relpath(os.path.abspath(path), root).replace("\\", "/")
+    if relative.startswith("../"):
+        return False
+
+    added = cache.get(_added_key(root), [])
+    if relative not in added:
+        cache.set(_added_key(root), added + [relative])
+    return True
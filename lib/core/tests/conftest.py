@@ -0,0 +1,60 @@
+"""Shared fixtures for lib.core tests."""
+
+import subprocess
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.config import clear_settings_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep on-disk caches out of the real ~/.claude during tests."""
+    cache_dir = tmp_path / "devkit-cache"
+    monkeypatch.setenv("CLAUDE_DEVKIT_CACHE_DIR", str(cache_dir))
+    monkeypatch.delenv("CLAUDE_DEVKIT_NO_CACHE", raising=False)
+    clear_settings_cache()
+    yield cache_dir
+    clear_settings_cache()
+
+
+def git(cwd, *args):
+    """Run git in cwd, failing the test on error."""
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """A small repository with nested directories and a merge."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "Dev")
+
+    (repo / "src" / "sub").mkdir(parents=True)
+    (repo / "a.txt").write_text("1\n")
+    (repo / "src" / "sub" / "x.py").write_text("x\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "one")
+
+    (repo / "a.txt").write_text("2\n")
+    (repo / "src" / "y.py").write_text("y\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "two")
+
+    git(repo, "rm", "-q", "src/sub/x.py")
+    git(repo, "commit", "-qm", "three")
+
+    git(repo, "checkout", "-qb", "side", "HEAD~1")
+    (repo / "s.txt").write_text("s\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "side")
+    git(repo, "checkout", "-q", "main")
+    git(repo, "merge", "-q", "--no-edit", "side")
+
+    return repo
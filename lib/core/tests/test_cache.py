@@ -0,0 +1,77 @@
+"""Tests for lib.core.cache module."""
+
+import os
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.cache import DiskCache, get_disk_cache, _entry_name
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(tmp_path / "ns", max_bytes=4096)
+
+
+class TestDiskCache:
+    """Tests for DiskCache."""
+
+    def test_roundtrip(self, cache):
+        """Marshal-able values survive a round trip."""
+        value = {"files": ["a.py", "b.py"], "count": 2, "ok": (True, None)}
+        cache.set("key", value)
+        assert cache.get("key") == value
+        assert "key" in cache
+        assert cache.get("other", "default") == "default"
+
+    def test_key_verified_on_read(self, cache):
+        """An entry file holding a different key is a miss."""
+        cache.set("key", "value")
+        os.rename(cache.directory / _entry_name("key"), cache.directory / _entry_name("other"))
+        assert cache.get("other") is None
+
+    def test_corrupt_entry_is_miss(self, cache):
+        cache.set("key", "value")
+        (cache.directory / _entry_name("key")).write_bytes(b"not marshal")
+        assert cache.get("key") is None
+
+    def test_unmarshallable_value_ignored(self, cache):
+        cache.set("key", object())
+        assert cache.get("key") is None
+
+    def test_lru_eviction(self, cache):
+        """Least-recently-used entries go first once over budget."""
+        blob = "x" * 1000
+        for i in range(3):
+            cache.set(f"k{i}", blob)
+            path = cache.directory / _entry_name(f"k{i}")
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+
+        cache.get("k0")  # Touch: k1 is now the oldest
+        cache.set("k3", blob)
+        cache.set("k4", blob)
+
+        assert cache.size() <= cache.max_bytes
+        assert "k0" in cache
+        assert "k1" not in cache
+        assert "k4" in cache
+
+    def test_clear(self, cache):
+        cache.set("key", "value")
+        cache.clear()
+        assert cache.size() == 0
+
+
+class TestGetDiskCache:
+    """Tests for get_disk_cache."""
+
+    def test_namespace_under_cache_dir(self, isolated_cache_dir):
+        cache = get_disk_cache("git")
+        assert cache.directory == isolated_cache_dir / "git"
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        assert get_disk_cache("git") is None
@@ -15,6 +15,8 @@ from lib.core.config import (
     Settings,
     ExtensionSettings,
     load_settings,
+    clear_settings_cache,
+    get_cache_dir,
     get_setting,
     is_extension_enabled,
     get_extension_option,
@@ -119,6 +121,70 @@ class TestLoadSettings:
                 os.unlink(f.name)
 
 
+class TestSettingsSnapshot:
+    """Tests for in-process and on-disk settings caching."""
+
+    def _write(self, path, data):
+        path.write_text(json.dumps(data))
+
+    def test_snapshot_round_trip(self):
+        """to_snapshot/from_snapshot preserve all fields."""
+        settings = Settings.from_dict({
+            "devkit": {
+                "debug": True,
+                "coverageThreshold": 90.0,
+                "securityPatterns": ["secret"],
+                "extensions": {"ext": {"enabled": False, "options": {"a": 1}}},
+            }
+        })
+        restored = Settings.from_snapshot(settings.to_snapshot())
+        assert restored == settings
+
+    def test_parsed_once_per_process(self, tmp_path):
+        """Unchanged file is served from the in-process cache."""
+        path = tmp_path / "settings.json"
+        self._write(path, {"devkit": {"debug": True}})
+
+        first = load_settings(path)
+        with patch("lib.core.config.json.load") as mock_load:
+            second = load_settings(path)
+            mock_load.assert_not_called()
+        assert second is first
+
+    def test_invalidated_by_size_change(self, tmp_path):
+        """Rewriting the file invalidates the cached snapshot."""
+        path = tmp_path / "settings.json"
+        self._write(path, {"devkit": {"debug": True}})
+        assert load_settings(path).debug is True
+
+        self._write(path, {"devkit": {"debug": False, "quiet": True}})
+        settings = load_settings(path)
+        assert settings.debug is False
+        assert settings.quiet is True
+
+    def test_disk_snapshot_skips_json(self, tmp_path, isolated_cache_dir):
+        """A fresh process reads the on-disk snapshot instead of JSON."""
+        path = tmp_path / "settings.json"
+        self._write(path, {"devkit": {"performanceBudgetMs": 750}})
+        load_settings(path)
+        assert list(isolated_cache_dir.glob("settings-*.marshal"))
+
+        clear_settings_cache()
+        with patch("lib.core.config.json.load") as mock_load:
+            settings = load_settings(path)
+            mock_load.assert_not_called()
+        assert settings.performance_budget_ms == 750
+
+    def test_no_cache_env_disables_disk_snapshot(self, tmp_path, isolated_cache_dir):
+        """CLAUDE_DEVKIT_NO_CACHE disables the on-disk layer."""
+        path = tmp_path / "settings.json"
+        self._write(path, {"devkit": {"debug": True}})
+        with patch.dict(os.environ, {"CLAUDE_DEVKIT_NO_CACHE": "1"}):
+            assert get_cache_dir() is None
+            assert load_settings(path).debug is True
+        assert not isolated_cache_dir.exists()
+
+
 class TestGetSetting:
     """Tests for get_setting function."""
 
@@ -0,0 +1,677 @@
+"""Tests for lib.core.coverage module."""
+
+import io
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.coverage import (
+    FileCoverage,
+    CoverageReport,
+    calculate_changed_line_coverage,
+    calculate_delta_coverage,
+    get_file_coverage,
+    get_uncovered_lines,
+    find_coverage_report,
+    iter_cobertura_coverage,
+    iter_jest_coverage,
+    iter_lcov_coverage,
+    parse_cobertura_coverage,
+    parse_coverage_report,
+    parse_jest_coverage,
+    parse_lcov_coverage,
+    parse_pytest_coverage,
+    sniff_coverage_format,
+)
+from lib.core.coverage import stream as coverage_stream
+from lib.core.coverage.index import PathTrie, build_coverage_index, open_coverage_index
+from lib.core.coverage.merge import CoverageMerger, merge_coverage_reports
+from lib.core.coverage.stream import JsonObjectStream, first_key
+from lib.core.git import FileDiff
+from lib.core.lines import LineRanges
+
+
+def jest_entry(path, hits, branch_hits=None, fn_hits=None):
+    """One coverage-final.json entry with one statement per line."""
+    branch_hits = branch_hits or []
+    fn_hits = fn_hits or []
+    return {
+        "path": path,
+        "statementMap": {
+            str(i): {"start": {"line": i + 1, "column": 0}, "end": {"line": i + 1, "column": 9}}
+            for i in range(len(hits))
+        },
+        "s": {str(i): h for i, h in enumerate(hits)},
+        "branchMap": {
+            str(i): {"locations": [{}] * len(b)} for i, b in enumerate(branch_hits)
+        },
+        "b": {str(i): b for i, b in enumerate(branch_hits)},
+        "fnMap": {str(i): {"name": f"f{i}"} for i in range(len(fn_hits))},
+        "f": {str(i): h for i, h in enumerate(fn_hits)},
+    }
+
+
+@pytest.fixture
+def jest_report(tmp_path):
+    data = {
+        "/repo/src/a.js": jest_entry("/repo/src/a.js", [1, 0, 3], [[1, 0]], [2]),
+        "/repo/src/b.ts": jest_entry("/repo/src/b.ts", [0, 0]),
+        "/repo/src/a.test.js": jest_entry("/repo/src/a.test.js", [1]),
+        "/repo/lib/c.js": jest_entry("/repo/lib/c.js", [5, 5, 5, 0], [[0, 0, 1]], [0, 1]),
+    }
+    path = tmp_path / "coverage-final.json"
+    path.write_text(json.dumps(data, indent=2))
+    return path
+
+
+@pytest.fixture
+def pytest_report(tmp_path):
+    data = {
+        "meta": {"version": "7.4.0"},
+        "files": {
+            "pkg/mod.py": {
+                "executed_lines": [1, 2, 4],
+                "missing_lines": [3],
+                "summary": {"num_statements": 4, "covered_lines": 3,
+                            "num_branches": 2, "covered_branches": 1},
+            },
+            "tests/test_mod.py": {
+                "executed_lines": [1],
+                "missing_lines": [],
+                "summary": {"num_statements": 1, "covered_lines": 1},
+            },
+        },
+        "totals": {"num_statements": 5},
+    }
+    path = tmp_path / "coverage.json"
+    path.write_text(json.dumps(data))
+    return path
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Force many refills so values straddle chunk boundaries."""
+    monkeypatch.setattr(coverage_stream, "CHUNK_SIZE", 7)
+
+
+class TestJsonObjectStream:
+    """Tests for the incremental JSON reader."""
+
+    def test_members_and_values(self, small_chunks):
+        text = '{"a": 12345, "b": {"x": [1, 2], "y": true}, "c": "s"}'
+        stream = JsonObjectStream(io.StringIO(text))
+        result = {key: s.value() for key, s in stream.members()}
+        assert result == json.loads(text)
+
+    def test_descend_and_skip(self, small_chunks):
+        text = '{"skip": {"deep": [1, 2, 3]}, "files": {"f1": 1, "f2": 2}, "after": null}'
+        stream = JsonObjectStream(io.StringIO(text))
+        seen = []
+        for key, s in stream.members():
+            if key == "files":
+                seen.extend((k, inner.value()) for k, inner in s.members())
+        assert seen == [("f1", 1), ("f2", 2)]
+
+    def test_invalid_json(self):
+        stream = JsonObjectStream(io.StringIO('{"a": [1, 2'))
+        with pytest.raises(ValueError):
+            list((k, s.value()) for k, s in stream.members())
+
+    def test_first_key(self):
+        assert first_key(io.StringIO('  {"meta": {}}')) == "meta"
+        assert first_key(io.StringIO("[1]")) is None
+        assert first_key(io.StringIO("{}")) is None
+
+
+class TestParseJestCoverage:
+    """Tests for parse_jest_coverage."""
+
+    def test_matches_full_load(self, jest_report, small_chunks):
+        """Streaming gives the same report as before, test files skipped."""
+        report = parse_jest_coverage(str(jest_report))
+        assert list(report.files) == ["/repo/src/a.js", "/repo/src/b.ts", "/repo/lib/c.js"]
+
+        a = report.files["/repo/src/a.js"]
+        assert (a.statements_total, a.statements_covered) == (3, 2)
+        assert (a.branches_total, a.branches_covered) == (2, 1)
+        assert (a.functions_total, a.functions_covered) == (1, 1)
+        assert list(a.lines_covered) == [1, 3]
+        assert list(a.lines_uncovered) == [2]
+
+        assert report.total_statements == 9
+        assert report.covered_statements == 5
+        assert report.total_branches == 5
+        assert report.covered_branches == 2
+
+    def test_requested_files_stop_early(self, tmp_path):
+        """Reading stops once every requested file is found."""
+        entry = json.dumps(jest_entry("/repo/src/a.js", [1]))
+        path = tmp_path / "coverage-final.json"
+        path.write_text('{"/repo/src/a.js": ' + entry + ', "/repo/b.js": {broken')
+
+        report = parse_jest_coverage(str(path), files=["src/a.js"])
+        assert list(report.files) == ["/repo/src/a.js"]
+        assert parse_jest_coverage(str(path)) is None
+
+    def test_requested_files_filter(self, jest_report):
+        files = [f.path for f in iter_jest_coverage(str(jest_report), files=["lib/c.js"])]
+        assert files == ["/repo/lib/c.js"]
+
+    def test_missing_file(self, tmp_path):
+        assert parse_jest_coverage(str(tmp_path / "none.json")) is None
+
+
+def file_cov(path, covered, uncovered):
+    return FileCoverage(
+        path=path,
+        statements_total=len(covered) + len(uncovered),
+        statements_covered=len(covered),
+        branches_total=0,
+        branches_covered=0,
+        functions_total=0,
+        functions_covered=0,
+        lines_covered=covered,
+        lines_uncovered=uncovered,
+    )
+
+
+class TestFileCoverage:
+    """Tests for FileCoverage line sets."""
+
+    def test_lists_are_converted(self):
+        """Callers passing lists get LineSets with list-like behavior."""
+        cov = file_cov("a.py", [3, 1, 2], [4])
+        assert cov.lines_covered == [1, 2, 3]
+        assert 4 in cov.lines_uncovered
+        assert cov.line_coverage == 75.0
+
+    def test_many_statements(self):
+        """Large files don't pay quadratic costs."""
+        cov = file_cov("big.js", range(0, 200000, 2), range(1, 200000, 2))
+        assert len(cov.lines_covered) == 100000
+        assert 199999 in cov.lines_uncovered
+
+
+class TestDeltaCoverage:
+    """Tests for calculate_delta_coverage and get_uncovered_lines."""
+
+    def test_new_lines_only(self):
+        base = CoverageReport(files={"a.py": file_cov("a.py", [1, 2], [3])})
+        current = CoverageReport(files={
+            "a.py": file_cov("a.py", [1, 2, 4], [3, 5]),
+            "b.py": file_cov("b.py", [1], [2]),
+        })
+        # New lines: a.py 4 (covered), 5 (uncovered); b.py 1 (covered), 2 (uncovered)
+        assert calculate_delta_coverage(base, current) == 50.0
+        assert calculate_delta_coverage(base, current, ["a.py"]) == 50.0
+
+    def test_uncovered_lines_by_suffix(self):
+        report = CoverageReport(files={"/repo/src/a.py": file_cov("/repo/src/a.py", [1], [2, 3])})
+        assert get_uncovered_lines(report, "src/a.py") == [2, 3]
+        assert get_uncovered_lines(report, "a.py") == []  # Basename alone is ambiguous
+        assert get_uncovered_lines(report, "missing.py") == []
+
+
+def file_diff(path, intervals, status="M"):
+    return FileDiff(path=path, status=status, additions=0, deletions=0,
+                    added_lines=LineRanges(intervals))
+
+
+class TestChangedLineCoverage:
+    """Tests for calculate_changed_line_coverage."""
+
+    def test_intersects_hunks_with_report(self):
+        report = CoverageReport(files={
+            "/repo/src/a.py": file_cov("/repo/src/a.py", [1, 2, 5, 6], [3, 7]),
+            "/repo/src/b.py": file_cov("/repo/src/b.py", [1], [2]),
+        })
+        diff = {
+            "src/a.py": file_diff("src/a.py", [(2, 4), (7, 7)]),  # Line 4 has no statement
+            "src/b.py": file_diff("src/b.py", [(10, 12)]),  # No statements changed
+            "src/gone.py": file_diff("src/gone.py", [], status="D"),
+            "README.md": file_diff("README.md", [(1, 1)]),
+        }
+        result = calculate_changed_line_coverage(report, diff=diff)
+
+        a = result.files["src/a.py"]
+        assert a.report_path == "/repo/src/a.py"
+        assert a.changed_lines == [2, 3, 7]
+        assert a.covered_lines == [2]
+        assert a.uncovered_lines == [3, 7]
+        assert result.files["src/b.py"].coverage == 100.0
+        assert result.unreported == ["README.md"]
+        assert (result.total_lines, result.covered_lines) == (3, 1)
+        assert result.coverage == pytest.approx(100 / 3)
+
+    def test_shifted_lines_not_counted(self):
+        """Lines moved by an insertion above them aren't treated as new."""
+        report = CoverageReport(files={"a.py": file_cov("a.py", [1, 2, 3, 4], [])})
+        result = calculate_changed_line_coverage(
+            report, diff={"a.py": file_diff("a.py", [(1, 1)])}
+        )
+        assert result.total_lines == 1
+
+    def test_reads_only_changed_files_from_index(self, jest_report):
+        build_coverage_index(str(jest_report))
+        diff = {"src/a.js": file_diff("src/a.js", [(2, 3)])}
+        with patch("lib.core.coverage.iter_report") as mock_iter:
+            result = calculate_changed_line_coverage(str(jest_report), diff=diff)
+        mock_iter.assert_not_called()
+        assert result.files["src/a.js"].uncovered_lines == [2]
+
+    def test_from_git_diff(self, git_repo, monkeypatch):
+        (git_repo / "src" / "y.py").write_text("y\nz\nw\n")
+        report = CoverageReport(files={
+            str(git_repo / "src" / "y.py"): file_cov("y.py", [1, 2], [3]),
+        })
+        monkeypatch.chdir(git_repo)
+        result = calculate_changed_line_coverage(report)
+        assert result.files["src/y.py"].changed_lines == [2, 3]
+        assert result.coverage == 50.0
+
+    def test_no_report(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert calculate_changed_line_coverage(diff={}) is None
+
+
+class TestParsePytestCoverage:
+    """Tests for parse_pytest_coverage."""
+
+    def test_parse(self, pytest_report, small_chunks):
+        report = parse_pytest_coverage(str(pytest_report))
+        assert list(report.files) == ["pkg/mod.py"]
+        mod = report.files["pkg/mod.py"]
+        assert list(mod.lines_uncovered) == [3]
+        assert report.total_statements == 4
+        assert report.covered_branches == 1
+
+
+class TestParseCoverageReport:
+    """Tests for format detection."""
+
+    def test_sniff(self, jest_report, pytest_report):
+        assert sniff_coverage_format(str(jest_report)) == "jest"
+        assert sniff_coverage_format(str(pytest_report)) == "pytest"
+
+    def test_auto_detect(self, jest_report, pytest_report):
+        assert "pkg/mod.py" in parse_coverage_report(str(pytest_report)).files
+        assert "/repo/src/a.js" in parse_coverage_report(str(jest_report)).files
+
+    def test_sniff_lcov_and_cobertura(self, lcov_report, cobertura_report, tmp_path):
+        assert sniff_coverage_format(str(lcov_report)) == "lcov"
+        assert sniff_coverage_format(str(cobertura_report)) == "cobertura"
+        other = tmp_path / "other.xml"
+        other.write_text("<?xml version='1.0'?><project/>")
+        assert sniff_coverage_format(str(other)) is None
+        assert "/repo/lib/b.js" in parse_coverage_report(str(lcov_report)).files
+        assert "pkg/other.py" in parse_coverage_report(str(cobertura_report)).files
+
+    def test_find_lcov(self, lcov_report, monkeypatch):
+        monkeypatch.chdir(lcov_report.parent)
+        assert find_coverage_report() == ("lcov.info", "lcov")
+
+    def test_index_lcov(self, lcov_report):
+        assert get_file_coverage(str(lcov_report), "lib/b.js").lines_covered == [3]
+
+
+LCOV = """TN:
+SF:/repo/src/a.js
+FN:1,main
+FN:5,helper
+FNDA:2,main
+FNDA:0,helper
+DA:1,2
+DA:2,0
+DA:5,0
+BRDA:2,0,0,1
+BRDA:2,0,1,-
+BRF:2
+BRH:1
+LF:3
+LH:1
+end_of_record
+TN:
+SF:/repo/src/a.test.js
+DA:1,1
+end_of_record
+SF:/repo/lib/b.js
+DA:3,1
+FNF:1
+FNH:1
+end_of_record
+"""
+
+COBERTURA = """<?xml version="1.0" ?>
+<!DOCTYPE coverage SYSTEM "http://cobertura.sourceforge.net/xml/coverage-04.dtd">
+<coverage version="7.4.0" line-rate="0.5">
+  <sources><source>/repo</source></sources>
+  <packages>
+    <package name="pkg">
+      <classes>
+        <class name="mod.py" filename="pkg/mod.py" line-rate="0.5">
+          <methods>
+            <method name="run" signature="">
+              <lines><line number="2" hits="1"/></lines>
+            </method>
+          </methods>
+          <lines>
+            <line number="1" hits="1"/>
+            <line number="2" hits="1" branch="true" condition-coverage="50% (1/2)"/>
+            <line number="3" hits="0"/>
+          </lines>
+        </class>
+        <class name="mod.py$Inner" filename="pkg/mod.py">
+          <lines><line number="9" hits="0"/></lines>
+        </class>
+        <class name="test_mod.py" filename="tests/test_mod.py">
+          <lines><line number="1" hits="1"/></lines>
+        </class>
+        <class name="other.py" filename="pkg/other.py">
+          <lines><line number="1" hits="4"/></lines>
+        </class>
+      </classes>
+    </package>
+  </packages>
+</coverage>
+"""
+
+
+@pytest.fixture
+def lcov_report(tmp_path):
+    path = tmp_path / "lcov.info"
+    path.write_text(LCOV)
+    return path
+
+
+@pytest.fixture
+def cobertura_report(tmp_path):
+    path = tmp_path / "coverage.xml"
+    path.write_text(COBERTURA)
+    return path
+
+
+class TestParseLcovCoverage:
+    """Tests for the LCOV parser."""
+
+    def test_parse(self, lcov_report):
+        report = parse_lcov_coverage(str(lcov_report))
+        assert list(report.files) == ["/repo/src/a.js", "/repo/lib/b.js"]
+
+        a = report.files["/repo/src/a.js"]
+        assert (a.statements_total, a.statements_covered) == (3, 1)
+        assert (a.branches_total, a.branches_covered) == (2, 1)
+        assert (a.functions_total, a.functions_covered) == (2, 1)
+        assert a.lines_uncovered == [2, 5]
+
+        b = report.files["/repo/lib/b.js"]
+        assert (b.functions_total, b.functions_covered) == (1, 1)  # From FNF/FNH
+
+    def test_requested_files_stop_early(self, tmp_path):
+        path = tmp_path / "lcov.info"
+        path.write_text(
+            "SF:/repo/a.js\nDA:1,1\nend_of_record\nSF:/repo/b.js\nDA:x,y\nend_of_record\n"
+        )
+        assert [f.path for f in iter_lcov_coverage(str(path), files=["a.js"])] == ["/repo/a.js"]
+        assert parse_lcov_coverage(str(path)) is None
+
+    def test_duplicate_sections(self, tmp_path):
+        """Repeated SF: sections of one file count each line once."""
+        path = tmp_path / "lcov.info"
+        path.write_text(
+            "SF:/repo/a.js\nDA:1,1\nDA:2,0\nend_of_record\n"
+            "SF:/repo/a.js\nDA:1,0\nDA:2,3\nend_of_record\n"
+        )
+        a = parse_lcov_coverage(str(path)).files["/repo/a.js"]
+        assert a.lines_covered == [1, 2]
+        assert a.lines_uncovered == []
+        assert (a.statements_total, a.statements_covered) == (2, 2)
+
+        index = build_coverage_index(str(path))
+        assert len(index) == 1
+        assert index.get("/repo/a.js") == a
+
+
+class TestParseCoberturaCoverage:
+    """Tests for the Cobertura parser."""
+
+    def test_parse(self, cobertura_report):
+        report = parse_cobertura_coverage(str(cobertura_report))
+        assert list(report.files) == ["pkg/mod.py", "pkg/other.py"]
+
+        mod = report.files["pkg/mod.py"]
+        assert mod.lines_covered == [1, 2]
+        assert mod.lines_uncovered == [3, 9]  # Inner class merged in
+        assert (mod.branches_total, mod.branches_covered) == (2, 1)
+        assert (mod.functions_total, mod.functions_covered) == (1, 1)
+
+    def test_requested_files(self, cobertura_report):
+        files = [f.path for f in iter_cobertura_coverage(str(cobertura_report), files=["other.py"])]
+        assert files == ["pkg/other.py"]
+
+    def test_non_adjacent_classes(self, tmp_path):
+        """Classes of one file in different packages merge into one entry."""
+        path = tmp_path / "coverage.xml"
+        path.write_text(
+            "<coverage><packages>"
+            '<package name="a"><classes>'
+            '<class name="Mod" filename="src/Mod.cs"><lines>'
+            '<line number="1" hits="1"/><line number="2" hits="0"/>'
+            '<line number="3" hits="1" branch="true" condition-coverage="50% (1/2)"/>'
+            "</lines></class>"
+            '<class name="Other" filename="src/Other.cs"><lines>'
+            '<line number="1" hits="1"/></lines></class>'
+            "</classes></package>"
+            '<package name="b"><classes>'
+            '<class name="Mod.Partial" filename="src/Mod.cs"><lines>'
+            '<line number="7" hits="0"/><line number="8" hits="2"/>'
+            "</lines></class>"
+            "</classes></package>"
+            "</packages></coverage>"
+        )
+
+        report = parse_cobertura_coverage(str(path))
+        assert list(report.files) == ["src/Mod.cs", "src/Other.cs"]
+        mod = report.files["src/Mod.cs"]
+        assert mod.lines_covered == [1, 3, 8]
+        assert mod.lines_uncovered == [2, 7]
+        assert (mod.statements_total, mod.statements_covered) == (5, 3)
+        assert (mod.branches_total, mod.branches_covered) == (2, 1)
+        assert (report.total_statements, report.covered_statements) == (6, 4)
+
+        filtered = parse_cobertura_coverage(str(path), files=["Mod.cs"])
+        assert filtered.files == {"src/Mod.cs": mod}
+
+        index = build_coverage_index(str(path))
+        assert len(index) == 2
+        assert index.get("src/Mod.cs") == mod
+
+    def test_invalid_xml(self, tmp_path):
+        path = tmp_path / "coverage.xml"
+        path.write_text("<coverage><packages>")
+        assert parse_cobertura_coverage(str(path)) is None
+
+
+class TestCoverageIndex:
+    """Tests for the sidecar coverage index."""
+
+    def test_single_file_lookup(self, jest_report):
+        """Lookups return the same FileCoverage as a full parse."""
+        full = parse_jest_coverage(str(jest_report))
+        index = build_coverage_index(str(jest_report))
+        assert index.format == "jest"
+        assert len(index) == 3
+
+        cov = index.get("/repo/lib/c.js")
+        assert cov == full.files["/repo/lib/c.js"]
+        assert index.get("src/a.js") == full.files["/repo/src/a.js"]
+        assert index.get("a.test.js") is None  # Test files aren't indexed
+        assert index.get("missing.js") is None
+
+    def test_reused_until_report_changes(self, jest_report):
+        """The sidecar is reused while the report's mtime and size match."""
+        build_coverage_index(str(jest_report))
+        with patch("lib.core.coverage.iter_report") as mock_iter:
+            index = open_coverage_index(str(jest_report))
+        mock_iter.assert_not_called()
+        assert index.get("src/b.ts") is not None
+
+        data = json.loads(jest_report.read_text())
+        data["/repo/src/new.js"] = jest_entry("/repo/src/new.js", [1])
+        jest_report.write_text(json.dumps(data))
+        assert open_coverage_index(str(jest_report)).get("src/new.js") is not None
+
+    def test_no_build(self, jest_report):
+        assert open_coverage_index(str(jest_report), build=False) is None
+
+    def test_cache_disabled(self, jest_report, monkeypatch):
+        """get_file_coverage still works without a cache directory."""
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        assert open_coverage_index(str(jest_report)) is None
+        assert get_file_coverage(str(jest_report), "lib/c.js").path == "/repo/lib/c.js"
+
+    def test_get_uncovered_lines_from_index(self, jest_report):
+        index = open_coverage_index(str(jest_report))
+        assert get_uncovered_lines(index, "src/a.js") == [2]
+
+
+class TestPathTrie:
+    """Tests for suffix matching."""
+
+    def test_longest_suffix_wins(self):
+        trie = PathTrie()
+        trie.insert("/repo/src/util.py", 0)
+        trie.insert("/repo/lib/util.py", 1)
+        assert trie.find("lib/util.py") == 1
+        assert trie.find("src/util.py") == 0
+        assert trie.find("util.py") is None  # Basename only
+        assert trie.find("/other/checkout/lib/util.py") == 1
+        assert trie.find("other.py") is None
+
+    def test_basename_match_rejected(self):
+        trie = PathTrie()
+        trie.insert("pkg/old/__init__.py", 0)
+        assert trie.find("/repo/pkg/brand_new/__init__.py") is None
+        assert trie.find("/repo/pkg/old/__init__.py") == 0
+
+    def test_tie_rejected(self):
+        trie = PathTrie()
+        trie.insert("/a/src/util.py", 0)
+        trie.insert("/b/src/util.py", 1)
+        assert trie.find("src/util.py") is None
+        assert trie.find("b/src/util.py") == 1
+
+    def test_report_find(self):
+        report = CoverageReport(files={
+            "/repo/src/util.py": file_cov("/repo/src/util.py", [1], []),
+            "/repo/lib/util.py": file_cov("/repo/lib/util.py", [], [1]),
+        })
+        assert report.find("lib/util.py").path == "/repo/lib/util.py"
+        assert get_uncovered_lines(report, "lib/util.py") == [1]
+        assert report.find("util.py") is None
+
+    def test_report_find_relative_to_cwd(self, tmp_path, monkeypatch):
+        """A root-level file matches its repo-relative report path exactly."""
+        monkeypatch.chdir(tmp_path)
+        report = CoverageReport(files={"mod.py": file_cov("mod.py", [1], [])})
+        assert report.find(str(tmp_path / "mod.py")).path == "mod.py"
+        assert report.find("/elsewhere/mod.py") is None
+
+
+def _exit_worker(path):
+    """Stand-in for load_shard that kills the pool worker."""
+    os._exit(1)
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.fixture
+def jest_shards(tmp_path):
+    return [
+        write_json(tmp_path / "shard1.json", {
+            "/repo/a.js": jest_entry("/repo/a.js", [1, 0, 0], [[1, 0]], [1, 0]),
+            "/repo/b.js": jest_entry("/repo/b.js", [0]),
+        }),
+        write_json(tmp_path / "shard2.json", {
+            "/repo/a.js": jest_entry("/repo/a.js", [2, 0, 4], [[0, 0]], [0, 3]),
+        }),
+        write_json(tmp_path / "shard3.json", {
+            "/repo/c.js": jest_entry("/repo/c.js", [1]),
+            "/repo/c.test.js": jest_entry("/repo/c.test.js", [1]),
+        }),
+    ]
+
+
+class TestMergeCoverageReports:
+    """Tests for merging coverage shards."""
+
+    def test_sums_hits(self, jest_shards):
+        merger = CoverageMerger()
+        for path in jest_shards:
+            merger.add(path)
+        statements, branches, functions = merger.hits("/repo/a.js")
+        assert [hits for _, hits in statements.values()] == [3, 0, 4]
+        assert branches == {("0", 0): 1, ("0", 1): 0}
+        assert functions == {"0": 1, "1": 3}
+
+        report = merger.report()
+        assert list(report.files) == ["/repo/a.js", "/repo/b.js", "/repo/c.js"]
+        a = report.files["/repo/a.js"]
+        assert (a.statements_total, a.statements_covered) == (3, 2)
+        assert (a.branches_total, a.branches_covered) == (2, 1)
+        assert (a.functions_total, a.functions_covered) == (2, 2)
+        assert a.lines_uncovered == [2]
+        assert report.total_statements == 5
+        assert report.covered_statements == 3
+
+    def test_deterministic_across_order(self, jest_shards):
+        forward = merge_coverage_reports(jest_shards, max_workers=1)
+        backward = merge_coverage_reports(reversed(jest_shards), max_workers=1)
+        assert forward == backward
+
+    def test_process_pool_and_generator(self, jest_shards):
+        serial = merge_coverage_reports(jest_shards, max_workers=1)
+        assert merge_coverage_reports((p for p in jest_shards), max_workers=2) == serial
+
+    def test_pytest_xdist_shards(self, tmp_path):
+        shards = [
+            write_json(tmp_path / f"cov{i}.json", {
+                "meta": {},
+                "files": {"pkg/m.py": {
+                    "executed_lines": executed,
+                    "missing_lines": missing,
+                    "executed_branches": [[2, 3]] if i else [],
+                    "missing_branches": [] if i else [[2, 3]],
+                }},
+            })
+            for i, (executed, missing) in enumerate([([1, 2], [3, 4]), ([1, 3], [2, 4])])
+        ]
+        m = merge_coverage_reports(shards, max_workers=1).files["pkg/m.py"]
+        assert m.lines_covered == [1, 2, 3]
+        assert m.lines_uncovered == [4]
+        assert (m.branches_total, m.branches_covered) == (1, 1)
+
+    def test_bad_shard(self, jest_shards, tmp_path):
+        bad = tmp_path / "bad.json"
+        bad.write_text("[]")
+        assert merge_coverage_reports(jest_shards + [str(bad)], max_workers=1) is None
+        assert merge_coverage_reports([str(tmp_path / "missing.json")], max_workers=2) is None
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_malformed_shard_entry(self, jest_shards, tmp_path, workers):
+        malformed = jest_entry("/repo/d.js", [1], [[1, 0]])
+        malformed["b"] = {"0": 3}  # Hit counts must be a list per branch
+        bad = write_json(tmp_path / "bad.json", {"/repo/d.js": malformed})
+        assert merge_coverage_reports(jest_shards + [bad], max_workers=workers) is None
+
+    def test_broken_pool(self, jest_shards):
+        with patch("lib.core.coverage.merge.load_shard", _exit_worker):
+            assert merge_coverage_reports(jest_shards, max_workers=2) is None
@@ -0,0 +1,128 @@
+"""Tests for the test-coverage-enforcer hook's coverage check."""
+
+import importlib.util
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.config import clear_settings_cache
+from lib.core.git.cache import clear_fingerprints
+from lib.core.git.repo import clear_repositories
+from lib.core.tests.conftest import git
+
+HOOK_PATH = (
+    Path(__file__).parent.parent.parent.parent
+    / "hooks" / "scripts" / "coverage" / "test-coverage-enforcer.py"
+)
+
+
+@pytest.fixture
+def enforcer():
+    spec = importlib.util.spec_from_file_location("test_coverage_enforcer_hook", HOOK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def project(git_repo, tmp_path, monkeypatch):
+    """mod.py with lines 1-5 covered and 6-10 uncovered in coverage.json."""
+    source = git_repo / "mod.py"
+    source.write_text("".join(f"x{n} = {n}\n" for n in range(1, 11)))
+    git(git_repo, "add", "mod.py")
+    git(git_repo, "commit", "-qm", "mod")
+
+    report = {
+        "meta": {"version": "7.4.0"},
+        "files": {
+            "mod.py": {
+                "executed_lines": [1, 2, 3, 4, 5],
+                "missing_lines": [6, 7, 8, 9, 10],
+                "summary": {"num_statements": 10, "covered_lines": 5},
+            },
+        },
+    }
+    (git_repo / "coverage.json").write_text(json.dumps(report))
+
+    monkeypatch.chdir(git_repo)
+    monkeypatch.setenv("CLAUDE_SETTINGS_PATH", str(tmp_path / "settings.json"))
+    clear_repositories()
+    clear_fingerprints()
+    yield git_repo
+    clear_repositories()
+    clear_fingerprints()
+
+
+def edit_line(path, number):
+    lines = path.read_text().splitlines(keepends=True)
+    lines[number - 1] = f"x{number} = -{number}\n"
+    path.write_text("".join(lines))
+
+
+def rerun_coverage(project):
+    """Mark coverage.json as written after the edits."""
+    report = project / "coverage.json"
+    later = max(os.stat(path).st_mtime for path in project.iterdir() if path.is_file()) + 1
+    os.utime(report, (later, later))
+
+
+def write_settings(tmp_path, **devkit):
+    (tmp_path / "settings.json").write_text(json.dumps({"devkit": devkit}))
+    clear_settings_cache()
+
+
+class TestCheckFileCoverage:
+    """Tests for the threshold check in both coverage modes."""
+
+    def test_delta_only_ignores_legacy_gaps(self, enforcer, project):
+        source = project / "mod.py"
+        edit_line(source, 2)  # A covered line, in a 50%-covered file
+        rerun_coverage(project)
+        assert enforcer.check_file_coverage(str(source)) is None
+
+    def test_delta_only_warns_on_uncovered_changes(self, enforcer, project):
+        source = project / "mod.py"
+        edit_line(source, 2)
+        edit_line(source, 8)
+        rerun_coverage(project)
+        assert enforcer.check_file_coverage(str(source)) == (
+            50.0, 80.0, "changed-line coverage"
+        )
+
+    def test_delta_only_skips_report_older_than_edit(self, enforcer, project):
+        """The report's line numbers are those of the file before the edit."""
+        source = project / "mod.py"
+        edit_line(source, 8)
+        report = project / "coverage.json"
+        earlier = os.stat(source).st_mtime - 10
+        os.utime(report, (earlier, earlier))
+        assert enforcer.check_file_coverage(str(source)) is None
+
+    def test_delta_only_large_report_rebuilds_in_background(
+        self, enforcer, project, tmp_path
+    ):
+        """A stale index is never rebuilt inline beyond the latency budget."""
+        write_settings(tmp_path, performanceBudgetMs=0)
+        source = project / "mod.py"
+        edit_line(source, 8)
+        rerun_coverage(project)
+        with patch("lib.core.coverage.summary.rebuild_in_background") as rebuild, \
+             patch("lib.core.coverage.index.build_coverage_index") as build:
+            assert enforcer.check_file_coverage(str(source)) is None
+        rebuild.assert_called_once()
+        build.assert_not_called()
+
+    def test_delta_only_without_changes(self, enforcer, project):
+        assert enforcer.check_file_coverage(str(project / "mod.py")) is None
+
+    def test_whole_file(self, enforcer, project, tmp_path):
+        write_settings(tmp_path, coverageDeltaOnly=False)
+        source = project / "mod.py"
+        edit_line(source, 2)
+        assert enforcer.check_file_coverage(str(source)) == (50.0, 80.0, "statement coverage")
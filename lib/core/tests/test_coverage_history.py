@@ -0,0 +1,116 @@
+"""Tests for lib.core.coverage.history module."""
+
+import json
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.coverage import FileCoverage
+from lib.core.coverage.history import (
+    CoverageHistory,
+    dropped_since_merge_base,
+    open_history,
+)
+from lib.core.coverage.index import build_coverage_index
+from lib.core.tests.conftest import git
+
+
+def counts(path, total, covered, branches=(0, 0)):
+    return FileCoverage(
+        path=path,
+        statements_total=total,
+        statements_covered=covered,
+        branches_total=branches[0],
+        branches_covered=branches[1],
+        functions_total=0,
+        functions_covered=0,
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = CoverageHistory(tmp_path / "history")
+    history.record("c1", [counts("/repo/src/a.py", 10, 8), counts("/repo/src/b.py", 4, 4)], 1.0)
+    history.record("c2", [counts("/repo/src/b.py", 4, 2), counts("/repo/src/a.py", 10, 9)], 2.0)
+    history.record("c3", [counts("/repo/src/c.py", 2, 1), counts("/repo/src/a.py", 10, 5)], 3.0)
+    return history
+
+
+class TestCoverageHistory:
+    """Tests for recording and querying runs."""
+
+    def test_trend(self, history):
+        trend = history.trend("src/a.py")
+        assert [(e.commit, e.statements_covered) for e in trend] == [
+            ("c1", 8), ("c2", 9), ("c3", 5)
+        ]
+        assert trend[0].timestamp == 1.0
+        assert trend[0].path == "/repo/src/a.py"
+        assert [e.commit for e in history.trend("b.py", limit=2)] == ["c2"]
+        assert [e.commit for e in history.trend("a.py", commits=["c3", "c1"])] == ["c1", "c3"]
+        assert history.trend("missing.py") == []
+
+    def test_snapshot(self, history):
+        snapshot = history.snapshot("c2")
+        assert sorted(snapshot) == ["/repo/src/a.py", "/repo/src/b.py"]
+        assert snapshot["/repo/src/b.py"].statement_coverage == 50.0
+        assert history.snapshot("nope") == {}
+
+    def test_dropped_since(self, history):
+        drops = history.dropped_since("c1")  # vs latest run (c3)
+        assert [(d.path, d.delta) for d in drops] == [("/repo/src/a.py", -30.0)]
+
+        drops = history.dropped_since("c1", "c2")
+        assert [d.path for d in drops] == ["/repo/src/b.py"]
+        assert history.dropped_since("c1", "c2", min_drop=60) == []
+
+    def test_rerecorded_commit_wins(self, history):
+        history.record("c1", [counts("/repo/src/a.py", 10, 1)])
+        assert history.commits() == ["c2", "c3", "c1"]
+        assert history.snapshot("c1")["/repo/src/a.py"].statements_covered == 1
+
+    def test_interrupted_write_ignored(self, history):
+        """Rows written without a commits line are dropped and overwritten."""
+        with open(history.directory / "path.u32", "ab") as f:
+            f.write(b"\x07\x00")
+        history.record("c4", [counts("/repo/src/a.py", 10, 10)])
+        assert history.snapshot("c4")["/repo/src/a.py"].statements_covered == 10
+        assert len(history.trend("a.py")) == 4
+
+    def test_empty(self, tmp_path):
+        history = CoverageHistory(tmp_path / "empty")
+        assert history.commits() == []
+        assert history.trend("a.py") == []
+        assert history.dropped_since("c1") == []
+
+
+class TestRecordOnIndex:
+    """Building a report's index records it under HEAD."""
+
+    def test_index_build_records_history(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        report = git_repo / "coverage.json"
+        files = {"src/y.py": {"executed_lines": [1], "missing_lines": [2],
+                              "summary": {"num_statements": 2, "covered_lines": 1}}}
+        report.write_text(json.dumps({"meta": {}, "files": files}))
+        build_coverage_index(str(report))
+        assert len(open_history().commits()) == 1
+
+        # A feature branch commit loses coverage in src/y.py
+        git(git_repo, "checkout", "-qb", "feature")
+        git(git_repo, "commit", "-q", "--allow-empty", "-m", "four")
+        git(git_repo, "commit", "-q", "--allow-empty", "-m", "five")
+        files["src/y.py"]["summary"] = {"num_statements": 3, "covered_lines": 1}
+        report.write_text(json.dumps({"meta": {}, "files": files}))
+        build_coverage_index(str(report))
+
+        drops = dropped_since_merge_base("main")
+        assert [(d.path, round(d.delta, 1)) for d in drops] == [("src/y.py", -16.7)]
+        assert dropped_since_merge_base("main", min_drop=20) == []
+
+    def test_outside_repository(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert open_history() is None
@@ -0,0 +1,131 @@
+"""Tests for lib.core.coverage.summary module."""
+
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.coverage.index import build_coverage_index
+from lib.core.coverage.summary import (
+    get_file_summary,
+    open_coverage_summary,
+    rebuild_in_background,
+)
+
+
+def pytest_files(count):
+    return {
+        f"/repo/pkg{i % 7}/mod{i}.py": {
+            "executed_lines": list(range(1, i % 10 + 1)),
+            "missing_lines": [20, 21],
+            "summary": {"num_statements": i % 10 + 2, "covered_lines": i % 10},
+        }
+        for i in range(count)
+    }
+
+
+@pytest.fixture
+def report(tmp_path):
+    files = pytest_files(50)
+    files["/repo/a/util.py"] = {"summary": {"num_statements": 4, "covered_lines": 4}}
+    files["/repo/b/util.py"] = {"summary": {"num_statements": 4, "covered_lines": 1}}
+    path = tmp_path / "coverage.json"
+    path.write_text(json.dumps({"meta": {}, "files": files}))
+    return path
+
+
+class TestCoverageSummary:
+    """Tests for the precompiled summary."""
+
+    def test_written_with_index(self, report):
+        assert open_coverage_summary(str(report)) is None
+        build_coverage_index(str(report))
+        summary = open_coverage_summary(str(report))
+
+        mod = summary.get("pkg3/mod17.py")
+        assert mod.path == "/repo/pkg3/mod17.py"
+        assert (mod.statements_total, mod.statements_covered) == (9, 7)
+        assert summary.get("/elsewhere/pkg3/mod17.py").path == "/repo/pkg3/mod17.py"
+        assert summary.get("mod999.py") is None
+        assert summary.get("") is None
+
+    def test_longest_suffix_wins(self, report):
+        build_coverage_index(str(report))
+        summary = open_coverage_summary(str(report))
+        assert summary.get("b/util.py").statement_coverage == 25.0
+        assert summary.get("util.py") is None  # Basename only, two candidates
+
+    def test_basename_match_rejected(self, tmp_path):
+        path = tmp_path / "coverage.json"
+        files = {"pkg/old/__init__.py": {"summary": {"num_statements": 1, "covered_lines": 1}}}
+        path.write_text(json.dumps({"meta": {}, "files": files}))
+        build_coverage_index(str(path))
+        summary = open_coverage_summary(str(path))
+        assert summary.get("/repo/pkg/brand_new/__init__.py") is None
+        assert summary.get("pkg/old/__init__.py").path == "pkg/old/__init__.py"
+
+    def test_relative_to_cwd(self, tmp_path, monkeypatch):
+        """A root-level file matches its repo-relative report path exactly."""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "coverage.json"
+        files = {"mod.py": {"summary": {"num_statements": 2, "covered_lines": 1}}}
+        path.write_text(json.dumps({"meta": {}, "files": files}))
+        build_coverage_index(str(path))
+        summary = open_coverage_summary(str(path))
+        assert summary.get(str(tmp_path / "mod.py")).path == "mod.py"
+        assert summary.get("/elsewhere/mod.py") is None
+
+    def test_stale_after_report_changes(self, report):
+        build_coverage_index(str(report))
+        report.write_text(json.dumps({"meta": {}, "files": pytest_files(3)}))
+        assert open_coverage_summary(str(report)) is None
+
+
+class TestGetFileSummary:
+    """Tests for budgeted lookups."""
+
+    def test_small_report_rebuilt_inline(self, report):
+        with patch("lib.core.coverage.summary.rebuild_in_background") as mock_rebuild:
+            summary = get_file_summary(str(report), "pkg3/mod3.py", budget_ms=1000)
+        assert summary.path == "/repo/pkg3/mod3.py"
+        mock_rebuild.assert_not_called()
+
+        with patch("lib.core.coverage.index.build_coverage_index") as mock_build:
+            assert get_file_summary(str(report), "pkg4/mod4.py", budget_ms=1000) is not None
+        mock_build.assert_not_called()
+
+    def test_large_report_rebuilt_in_background(self, report):
+        with patch("lib.core.coverage.summary.rebuild_in_background") as mock_rebuild:
+            assert get_file_summary(str(report), "pkg3/mod3.py", budget_ms=0) is None
+        mock_rebuild.assert_called_once_with(str(report))
+
+    def test_background_rebuild(self, report):
+        """The detached rebuild writes the summary and removes its marker."""
+        with patch("lib.core.coverage.summary.subprocess.Popen") as mock_popen:
+            assert rebuild_in_background(str(report))
+            assert not rebuild_in_background(str(report))  # Already running
+        args = mock_popen.call_args[0][0]
+        marker = Path(args[-1])
+        assert marker.exists()
+
+        import subprocess
+        subprocess.run(args, env=mock_popen.call_args[1]["env"], check=True, timeout=30)
+        assert not marker.exists()
+        assert open_coverage_summary(str(report)).get("pkg3/mod3.py") is not None
+
+    def test_stale_marker_ignored(self, report):
+        with patch("lib.core.coverage.summary.subprocess.Popen") as mock_popen:
+            assert rebuild_in_background(str(report))
+            marker = Path(mock_popen.call_args[0][0][-1])
+            os.utime(marker, (0, 0))
+            assert rebuild_in_background(str(report))
+
+    def test_cache_disabled(self, report, monkeypatch):
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        assert get_file_summary(str(report), "pkg3/mod3.py", budget_ms=1000) is None
+        assert not rebuild_in_background(str(report))
@@ -0,0 +1,227 @@
+"""Tests for lib.core.daemon module."""
+
+import os
+import subprocess
+import threading
+import time
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.daemon import (
+    HookDaemonError,
+    HookServer,
+    call_hook,
+    compile_script,
+    exec_hook,
+    exit_status,
+    is_running,
+    resolve_hook_script,
+)
+
+
+BLOCKING_HOOK = """
+import json, sys
+data = json.load(sys.stdin)
+if data.get("block"):
+    print("BLOCKED", file=sys.stderr)
+    sys.exit(2)
+print("allowed")
+"""
+
+
+# Counts its runs in the file named by stdin, then dies without replying
+CRASHING_HOOK = """
+import os, sys
+with open(sys.stdin.read(), "a") as f:
+    f.write("ran\\n")
+os._exit(1)
+"""
+
+SLOW_HOOK = """
+import time
+time.sleep(1)
+"""
+
+# Starts a long-running subprocess (pid written to the file named by stdin)
+SPAWNING_HOOK = """
+import subprocess, sys, time
+proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+with open(sys.stdin.read(), "w") as f:
+    f.write(str(proc.pid))
+time.sleep(30)
+"""
+
+
+@pytest.fixture
+def scripts_dir(tmp_path):
+    """A hooks/scripts/ tree with test hooks."""
+    root = tmp_path / "scripts"
+    (root / "security").mkdir(parents=True)
+    (root / "security" / "fake-guard.py").write_text(BLOCKING_HOOK)
+    (root / "security" / "crashing-hook.py").write_text(CRASHING_HOOK)
+    (root / "security" / "slow-hook.py").write_text(SLOW_HOOK)
+    (root / "security" / "spawning-hook.py").write_text(SPAWNING_HOOK)
+    return root
+
+
+@pytest.fixture
+def server(tmp_path, scripts_dir):
+    """A running hook server on a temporary socket."""
+    socket_path = tmp_path / "hookd.sock"
+    srv = HookServer(socket_path, scripts_dir)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestExitStatus:
+    """Tests for exit_status function."""
+
+    def test_none_is_success(self):
+        """sys.exit() with no argument is exit code 0."""
+        assert exit_status(None) == 0
+
+    def test_int_passthrough(self):
+        """Integer codes pass through unchanged."""
+        assert exit_status(2) == 2
+        assert exit_status(3) == 3
+
+    def test_message_is_failure(self):
+        """String codes exit with 1."""
+        assert exit_status("boom") == 1
+
+
+class TestExecHook:
+    """Tests for exec_hook function."""
+
+    def test_captures_exit_code_and_output(self, scripts_dir):
+        """Exit code, stdout and stderr are captured."""
+        path = scripts_dir / "security" / "fake-guard.py"
+        code = compile_script(path)
+
+        exit_code, stdout, stderr = exec_hook(code, path, '{"block": true}')
+        assert exit_code == 2
+        assert "BLOCKED" in stderr
+
+        exit_code, stdout, stderr = exec_hook(code, path, '{}')
+        assert exit_code == 0
+        assert stdout == "allowed\n"
+
+    def test_restores_stdio(self, scripts_dir):
+        """Real stdio is restored after the hook runs."""
+        path = scripts_dir / "security" / "fake-guard.py"
+        stdout_before = sys.stdout
+        exec_hook(compile_script(path), path, "{}")
+        assert sys.stdout is stdout_before
+
+
+class TestResolveHookScript:
+    """Tests for resolve_hook_script function."""
+
+    def test_unregistered_hook_found_by_name(self, scripts_dir):
+        """Hooks not in HOOK_SCRIPTS are found one directory deep."""
+        path = resolve_hook_script("fake-guard", scripts_dir)
+        assert path == scripts_dir / "security" / "fake-guard.py"
+
+    def test_unknown_hook(self, scripts_dir):
+        """Unknown hook returns None."""
+        assert resolve_hook_script("missing", scripts_dir) is None
+
+
+class TestCallHook:
+    """Tests for call_hook client."""
+
+    def test_no_daemon_returns_none(self, tmp_path):
+        """Missing daemon signals the caller to fall back."""
+        assert call_hook("fake-guard", "{}", socket_path=tmp_path / "none.sock") is None
+
+    def test_block_exit_code_preserved(self, server):
+        """Exit code 2 from the hook reaches the client."""
+        result = call_hook("fake-guard", '{"block": true}', socket_path=server.socket_path)
+        assert result is not None
+        exit_code, stdout, stderr = result
+        assert exit_code == 2
+        assert "BLOCKED" in stderr
+
+    def test_allow(self, server):
+        """Exit code 0 and stdout reach the client."""
+        exit_code, stdout, _ = call_hook("fake-guard", "{}", socket_path=server.socket_path)
+        assert exit_code == 0
+        assert stdout == "allowed\n"
+
+    def test_unknown_hook_falls_back(self, server):
+        """Unknown hook names fall back to in-process execution."""
+        assert call_hook("missing", "{}", socket_path=server.socket_path) is None
+
+    def test_timeout_is_not_a_fallback(self, server):
+        """A hook that outlives the timeout raises instead of returning None."""
+        with pytest.raises(HookDaemonError, match="timed out"):
+            call_hook("slow-hook", "{}", socket_path=server.socket_path, timeout=0.3)
+
+    def test_timeout_kills_hook_process_group(self, server, tmp_path):
+        """A hook abandoned by its client is killed with its subprocesses."""
+        pid_file = tmp_path / "pid.txt"
+        devkit = Path(__file__).parent.parent.parent.parent
+        # A separate client process: a forked child of this one would hold
+        # the client's end of the socket open
+        client = (
+            "import sys; from pathlib import Path; from lib.core.daemon import call_hook; "
+            "call_hook('spawning-hook', sys.argv[1], socket_path=Path(sys.argv[2]), timeout=1.0)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", client, str(pid_file), str(server.socket_path)],
+            capture_output=True, text=True, timeout=30, cwd=devkit,
+        )
+        assert "timed out" in result.stderr
+
+        pid = int(pid_file.read_text())
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail("hook subprocess survived the client timeout")
+
+    def test_error_response_is_not_a_fallback(self, server, monkeypatch):
+        """An error after the hook was accepted raises instead of returning None."""
+        def fail(*args):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr("lib.core.daemon.exec_hook", fail)
+        with pytest.raises(HookDaemonError, match="boom"):
+            call_hook("fake-guard", "{}", socket_path=server.socket_path)
+
+    def test_client_does_not_rerun_accepted_hook(self, server, tmp_path):
+        """hook-client reports a crashed daemon run instead of running the hook again."""
+        counter = tmp_path / "runs.txt"
+        devkit = Path(__file__).parent.parent.parent.parent
+        client = devkit / "hooks" / "scripts" / "daemon"
+        result = subprocess.run(
+            [sys.executable, str(client / "hook-client.py"), "crashing-hook"],
+            input=str(counter),
+            capture_output=True,
+            text=True,
+            timeout=30,
+            env={
+                **os.environ,
+                "CLAUDE_DEVKIT": str(devkit),
+                "CLAUDE_DEVKIT_HOOK_SOCKET": str(server.socket_path),
+            },
+        )
+        assert result.returncode == 0
+        assert "closed the connection" in result.stderr
+        assert counter.read_text() == "ran\n"
+
+    def test_is_running(self, server, tmp_path):
+        """Ping detects a live daemon."""
+        assert is_running(server.socket_path) is True
+        assert is_running(tmp_path / "none.sock") is False
@@ -0,0 +1,427 @@
+"""Tests for lib.core.formatting module."""
+
+import http.server
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.formatting import (
+    KNOWN_FORMATTED,
+    FormatBatch,
+    FormatOptions,
+    FormatResult,
+    black_library_matches_cli,
+    format_file,
+    format_files,
+    format_with_black_library,
+    format_with_blackd,
+    format_with_cli,
+    format_with_prettier_server,
+    formatter_for,
+    get_prettier_server_script,
+)
+from lib.core.daemon import is_running
+
+
+def formatted(paths):
+    return {path: FormatResult(path, "formatted") for path in paths}
+
+
+class TestFormatFiles:
+    """Tests for dispatching files to formatters."""
+
+    def test_formatter_for(self):
+        assert formatter_for("a/b.tsx") == "prettier"
+        assert formatter_for("a/b.pyi") == "black"
+        assert formatter_for("a/b.md") is None
+
+    def test_one_cli_call_per_formatter(self):
+        options = FormatOptions(daemons=False, in_process=False)
+        with patch("lib.core.formatting.format_with_cli",
+                   side_effect=lambda formatter, paths, line_length: formatted(paths)) as cli:
+            results = format_files(["a.py", "b.ts", "c.py", "a.py", "d.md"], options)
+
+        assert set(results) == {"a.py", "b.ts", "c.py"}
+        calls = {call.args[0]: call.args[1] for call in cli.call_args_list}
+        assert calls == {"black": ["a.py", "c.py"], "prettier": ["b.ts"]}
+
+    def test_unavailable_daemons_fall_back_to_cli(self):
+        with patch("lib.core.formatting.format_with_blackd", return_value=None), \
+             patch("lib.core.formatting.format_with_cli",
+                   side_effect=lambda formatter, paths, line_length: formatted(paths)) as cli:
+            results = format_files(["a.py"], FormatOptions(in_process=False))
+        assert results["a.py"].status == "formatted"
+        cli.assert_called_once()
+
+
+class TestCli:
+    """Tests for the command-line fallback."""
+
+    def test_missing_formatter(self):
+        with patch("subprocess.run", side_effect=FileNotFoundError):
+            results = format_with_cli("black", ["a.py", "b.py"])
+        assert [r.status for r in results.values()] == ["missing", "missing"]
+
+    def test_timeout(self):
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("black", 10)):
+            assert format_with_cli("black", ["a.py"])["a.py"].status == "timeout"
+
+    def test_failure_is_attributed_per_file(self):
+        def run(cmd, **kwargs):
+            code = 123 if "bad.py" in cmd else 0
+            return subprocess.CompletedProcess(cmd, code, "", "cannot parse")
+
+        with patch("subprocess.run", side_effect=run) as mock_run:
+            results = format_with_cli("black", ["good.py", "bad.py"])
+
+        assert mock_run.call_args_list[0].args[0] == [
+            "black", "--line-length", "100", "good.py", "bad.py"
+        ]
+        assert results["good.py"].status == "formatted"
+        assert results["bad.py"].status == "failed"
+        assert results["bad.py"].message == "cannot parse"
+
+
+class FakeBlackd(http.server.BaseHTTPRequestHandler):
+    """Uppercases sources, rejects ones containing 'error'."""
+
+    def do_POST(self):
+        source = self.rfile.read(int(self.headers["Content-Length"]))
+        FakeBlackd.headers_seen.append(dict(self.headers))
+        if b"error" in source:
+            status, body = 400, b"Cannot parse"
+        elif source.upper() == source:
+            status, body = 204, b""
+        else:
+            status, body = 200, source.upper()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def blackd_url():
+    FakeBlackd.headers_seen = []
+    server = http.server.HTTPServer(("127.0.0.1", 0), FakeBlackd)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestBlackd:
+    """Tests for the blackd client."""
+
+    def test_statuses(self, blackd_url, tmp_path):
+        changed = tmp_path / "changed.py"
+        changed.write_text("x = 1\n")
+        same = tmp_path / "same.py"
+        same.write_text("X = 1\n")
+        broken = tmp_path / "broken.py"
+        broken.write_text("error(\n")
+
+        results = format_with_blackd([str(changed), str(same), str(broken)], blackd_url, 88)
+
+        assert results[str(changed)].status == "formatted"
+        assert changed.read_text() == "X = 1\n"
+        assert results[str(same)].status == "unchanged"
+        assert results[str(broken)].status == "failed"
+        assert results[str(broken)].message == "Cannot parse"
+        assert FakeBlackd.headers_seen[0]["X-Line-Length"] == "88"
+
+    def test_unreachable(self, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("x = 1\n")
+        with patch("lib.core.formatting.start_blackd") as start:
+            assert format_with_blackd([str(source)], "http://127.0.0.1:9") is None
+        start.assert_called_once()
+
+
+class TestPrettierServer:
+    """Tests for the prettier server client."""
+
+    def test_results(self, tmp_path):
+        socket_path = tmp_path / "p.sock"
+        socket_path.touch()
+        response = {"results": [
+            {"file": "a.ts", "changed": True},
+            {"file": "b.ts", "changed": False},
+            {"file": "c.ts", "error": "SyntaxError"},
+        ]}
+        with patch("lib.core.formatting.prettier_socket_path", return_value=socket_path), \
+             patch("lib.core.daemon.request", return_value=response):
+            results = format_with_prettier_server(["a.ts", "b.ts", "c.ts"], str(tmp_path))
+
+        assert [r.status for r in results.values()] == ["formatted", "unchanged", "failed"]
+        assert results["c.ts"].message == "SyntaxError"
+
+    def test_stale_server_falls_back(self, tmp_path):
+        socket_path = tmp_path / "p.sock"
+        socket_path.touch()
+        with patch("lib.core.formatting.prettier_socket_path", return_value=socket_path), \
+             patch("lib.core.daemon.request", return_value={"stale": True}), \
+             patch("lib.core.formatting.start_prettier_server") as start:
+            assert format_with_prettier_server(["a.ts"], str(tmp_path)) is None
+        start.assert_called_once_with(str(tmp_path))
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+    def test_server_exits_without_local_prettier(self, tmp_path):
+        result = subprocess.run(
+            ["node", str(get_prettier_server_script()), str(tmp_path / "p.sock"), str(tmp_path)],
+            capture_output=True,
+            timeout=30,
+        )
+        assert result.returncode == 3
+
+
+# Stand-in for the prettier API the server uses; like prettier, it caches
+# resolved config files until clearConfigCache() is called
+FAKE_PRETTIER = """
+const fs = require('fs');
+const path = require('path');
+let cache = new Map();
+exports.getFileInfo = async () => ({ ignored: false, inferredParser: 'babel' });
+exports.resolveConfig = async (file) => {
+  const rc = path.join(path.dirname(file), '.prettierrc');
+  if (!cache.has(rc)) cache.set(rc, JSON.parse(fs.readFileSync(rc, 'utf8')));
+  return cache.get(rc);
+};
+exports.clearConfigCache = async () => { cache = new Map(); };
+exports.format = async (text, options) =>
+  options.semi ? text.replace(/([^;\\n])\\n/g, '$1;\\n') : text.replace(/;/g, '');
+"""
+
+
+@pytest.fixture
+def prettier_server(tmp_path):
+    """A prettier server for a project with the stand-in prettier installed."""
+    if shutil.which("node") is None:
+        pytest.skip("node not installed")
+    package = tmp_path / "node_modules" / "prettier"
+    package.mkdir(parents=True)
+    (package / "package.json").write_text('{"name": "prettier", "main": "index.js"}')
+    (package / "index.js").write_text(FAKE_PRETTIER)
+
+    socket_dir = tempfile.mkdtemp(prefix="ps", dir="/tmp")
+    socket_path = Path(socket_dir) / "p.sock"
+    process = subprocess.Popen(
+        ["node", str(get_prettier_server_script()), str(socket_path), str(tmp_path)]
+    )
+    # The socket file appears at bind(), before the server accepts connections
+    deadline = time.monotonic() + 10
+    while not is_running(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    yield socket_path
+    process.terminate()
+    process.wait(timeout=10)
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+class TestPrettierServerScript:
+    """Tests for prettier-server.js."""
+
+    def test_config_changes_apply_to_next_request(self, prettier_server, tmp_path):
+        from lib.core.daemon import request
+
+        source = tmp_path / "a.js"
+        (tmp_path / ".prettierrc").write_text('{"semi": true}')
+        source.write_text("a\n")
+        response = request(prettier_server, {"files": [str(source)]}, timeout=10)
+        assert response == {"results": [{"file": str(source), "changed": True}]}
+        assert source.read_text() == "a;\n"
+
+        (tmp_path / ".prettierrc").write_text('{"semi": false}')
+        response = request(prettier_server, {"files": [str(source)]}, timeout=10)
+        assert response == {"results": [{"file": str(source), "changed": True}]}
+        assert source.read_text() == "a\n"
+
+
+class TestBatching:
+    """Tests for sharing one formatter call between concurrent hooks."""
+
+    def test_concurrent_edits_share_a_call(self, tmp_path):
+        batch = FormatBatch(tmp_path / "batch", FormatOptions(), window_ms=200)
+        calls = []
+
+        def fake_format(paths, options):
+            calls.append(list(paths))
+            return formatted(paths)
+
+        results = {}
+
+        def hook(path):
+            results[path] = batch.format(path)
+
+        with patch("lib.core.formatting.format_files", side_effect=fake_format):
+            threads = [threading.Thread(target=hook, args=(f"{n}.py",)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+
+        assert len(calls) == 1
+        assert sorted(calls[0]) == ["0.py", "1.py", "2.py", "3.py"]
+        assert all(results[f"{n}.py"].status == "formatted" for n in range(4))
+        assert sorted(p.name for p in (tmp_path / "batch").iterdir()) == [
+            "leader.lock", "queue", "queue.lock"
+        ]
+
+    def test_no_batching(self, isolated_cache_dir):
+        with patch("lib.core.formatting.format_files",
+                   side_effect=lambda paths, options: formatted(paths)) as fake:
+            result = format_file("a.py", batch_window_ms=0)
+        assert result.status == "formatted"
+        fake.assert_called_once()
+        assert not (isolated_cache_dir / "format-batch").exists()
+
+    def test_unsupported_file(self):
+        assert format_file("README.md") is None
+
+
+class TestBlackLibrary:
+    """Tests for formatting with black in-process."""
+
+    def test_not_importable(self, tmp_path):
+        with patch.dict(sys.modules, {"black": None}):
+            assert format_with_black_library([str(tmp_path / "a.py")]) is None
+
+    def test_format(self, tmp_path):
+        pytest.importorskip("black")
+        (tmp_path / "pyproject.toml").write_text(
+            "[tool.black]\nskip-string-normalization = true\n"
+        )
+        changed = tmp_path / "changed.py"
+        changed.write_text("x = {  'a':1 }\n")
+        same = tmp_path / "same.py"
+        same.write_text("x = 1\n")
+        broken = tmp_path / "broken.py"
+        broken.write_text("def (:\n")
+
+        results = format_with_black_library([str(changed), str(same), str(broken)])
+
+        assert results[str(changed)].status == "formatted"
+        assert changed.read_text() == "x = {'a': 1}\n"
+        assert results[str(same)].status == "unchanged"
+        assert results[str(broken)].status == "failed"
+
+
+@pytest.fixture
+def black_install(tmp_path):
+    """A virtualenv-style prefix with a black console script for this interpreter."""
+    prefix = tmp_path / "venv"
+    (prefix / "bin").mkdir(parents=True)
+    script = prefix / "bin" / "black"
+    script.write_text(f"#!{sys.executable}\nimport black\n")
+    script.chmod(0o755)
+    package = prefix / "lib" / "site-packages" / "black"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    return prefix
+
+
+class TestBlackLibraryMatchesCli:
+    """Tests for only using in-process black when it is the black on PATH."""
+
+    def test_same_installation(self, black_install):
+        origin = black_install / "lib" / "site-packages" / "black" / "__init__.py"
+        with patch("lib.core.formatting.shutil.which",
+                   return_value=str(black_install / "bin" / "black")), \
+             patch("lib.core.formatting._find_black_origin", return_value=str(origin)):
+            assert black_library_matches_cli()
+
+    def test_other_installation(self, black_install, tmp_path):
+        with patch("lib.core.formatting.shutil.which",
+                   return_value=str(black_install / "bin" / "black")), \
+             patch("lib.core.formatting._find_black_origin",
+                   return_value=str(tmp_path / "other" / "black" / "__init__.py")):
+            assert not black_library_matches_cli()
+
+    def test_other_interpreter(self, black_install):
+        script = black_install / "bin" / "black"
+        script.write_text("#!/nonexistent/python3\nimport black\n")
+        origin = black_install / "lib" / "site-packages" / "black" / "__init__.py"
+        with patch("lib.core.formatting.shutil.which", return_value=str(script)), \
+             patch("lib.core.formatting._find_black_origin", return_value=str(origin)):
+            assert not black_library_matches_cli()
+
+    def test_no_cli(self):
+        with patch("lib.core.formatting.shutil.which", return_value=None):
+            assert not black_library_matches_cli()
+
+    def test_format_files_skips_mismatched_library(self, tmp_path):
+        path = str(tmp_path / "a.py")
+        with patch("lib.core.formatting.black_library_matches_cli", return_value=False), \
+             patch("lib.core.formatting.format_with_black_library") as library, \
+             patch("lib.core.formatting.format_with_cli", return_value=formatted([path])):
+            results = format_files([path], FormatOptions(daemons=False))
+        library.assert_not_called()
+        assert results[path].status == "formatted"
+
+
+class TestKnownFormatted:
+    """Tests for skipping content that is already formatted."""
+
+    @pytest.fixture
+    def fake_format(self):
+        def format_files(paths, options):
+            for path in paths:
+                Path(path).write_text(Path(path).read_text().strip() + "\n")
+            return formatted(paths)
+
+        with patch("lib.core.formatting.format_files", side_effect=format_files) as fake:
+            yield fake
+
+    def test_skips_known_content(self, fake_format, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("x = 1  \n\n")
+        assert format_file(str(source), batch_window_ms=0).status == "formatted"
+
+        # Writing the formatted content again skips the formatter
+        source.write_text("x = 1\n")
+        result = format_file(str(source), batch_window_ms=0)
+        assert result.status == "unchanged"
+        assert result.message == KNOWN_FORMATTED
+        assert fake_format.call_count == 1
+
+        source.write_text("x = 2\n")
+        format_file(str(source), batch_window_ms=0)
+        assert fake_format.call_count == 2
+
+    def test_config_change_invalidates(self, fake_format, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("x = 1\n")
+        format_file(str(source), batch_window_ms=0)
+        (tmp_path / "pyproject.toml").write_text("[tool.black]\n")
+        format_file(str(source), batch_window_ms=0)
+        assert fake_format.call_count == 2
+
+    def test_disabled(self, fake_format, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("x = 1\n")
+        options = FormatOptions(skip_known=False)
+        format_file(str(source), options, batch_window_ms=0)
+        format_file(str(source), options, batch_window_ms=0)
+        assert fake_format.call_count == 2
+
+    def test_failures_are_not_remembered(self, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("x = (\n")
+        failed = {str(source): FormatResult(str(source), "failed", "Cannot parse")}
+        with patch("lib.core.formatting.format_files", return_value=failed) as fake:
+            format_file(str(source), batch_window_ms=0)
+            format_file(str(source), batch_window_ms=0)
+        assert fake.call_count == 2
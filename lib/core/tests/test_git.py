@@ -1,5 +1,6 @@
 """Tests for lib.core.git module."""
 
+import subprocess
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -14,10 +15,21 @@ from lib.core.git import (
     Commit,
     run_git,
     get_diff,
+    get_diff_index,
     get_changed_files,
     get_current_branch,
     get_base_branch,
+    get_recent_commits,
+    iter_commits,
+    get_blame,
+    get_blame_file,
+    get_blame_range,
+    clear_blame_cache,
+    parse_blame_porcelain,
+    BLAME_RANGE_LINES,
+    UNCOMMITTED_HASH,
 )
+from lib.core.tests.conftest import git
 
 
 class TestFileDiff:
@@ -112,19 +124,359 @@ class TestGetDiff:
 
     @patch("lib.core.git.run_git")
     def test_modified_file(self, mock_run):
-        """Modified file appears in diff."""
-        # First call: name-status
-        # Second call: numstat
-        mock_run.side_effect = [
-            (0, "M\tsrc/main.py\n", ""),
-            (0, "10\t5\tsrc/main.py\n", ""),
-        ]
+        """Modified file appears in diff with line counts from one call."""
+        mock_run.return_value = (
+            0,
+            ":100644 100644 aaaaaaa bbbbbbb M\0src/main.py\0"
+            "10\t5\tsrc/main.py\0",
+            "",
+        )
         result = get_diff()
         assert len(result) == 1
         assert result[0].path == "src/main.py"
         assert result[0].status == "M"
+        assert result[0].additions == 10
+        assert result[0].deletions == 5
+        assert mock_run.call_count == 1
+
+    @patch("lib.core.git.run_git")
+    def test_rename_counts(self, mock_run):
+        """Renames keep old_path and get their numstat counts."""
+        mock_run.return_value = (
+            0,
+            ":100644 100644 aaaaaaa bbbbbbb R090\0old.py\0new.py\0"
+            "3\t1\t\0old.py\0new.py\0",
+            "",
+        )
+        result = get_diff()
+        assert result[0].path == "new.py"
+        assert result[0].old_path == "old.py"
+        assert result[0].status == "R"
+        assert result[0].additions == 3
+
+    @patch("lib.core.git.run_git")
+    def test_hunk_ranges(self, mock_run):
+        """-U0 hunks become added/removed line ranges per file."""
+        mock_run.return_value = (
+            0,
+            ":100644 100644 aaaaaaa bbbbbbb M\0a.py\0"
+            ":000000 100644 0000000 ccccccc A\0b.py\0"
+            "2\t1\ta.py\0"
+            "2\t0\tb.py\0\0"
+            "diff --git a/a.py b/a.py\n"
+            "index aaaaaaa..bbbbbbb 100644\n"
+            "--- a/a.py\n"
+            "+++ b/a.py\n"
+            "@@ -3 +3 @@ def f():\n"
+            "-old\n"
+            "+new\n"
+            "@@ -10,0 +11 @@\n"
+            "+added\n"
+            "diff --git a/b.py b/b.py\n"
+            "new file mode 100644\n"
+            "--- /dev/null\n"
+            "+++ b/b.py\n"
+            "@@ -0,0 +1,2 @@\n"
+            "+one\n"
+            "+two\n",
+            "",
+        )
+        index = get_diff_index(include_hunks=True)
+        assert index["a.py"].added_lines.intervals() == [(3, 3), (11, 11)]
+        assert index["a.py"].removed_lines.intervals() == [(3, 3)]
+        assert index["a.py"].is_line_changed(11)
+        assert not index["a.py"].is_line_changed(4)
+        assert index["b.py"].added_lines.intervals() == [(1, 2)]
+
+    @patch("lib.core.git.run_git")
+    def test_hunks_matched_by_path(self, mock_run):
+        """Sections are matched by header path, not by record position."""
+        mock_run.return_value = (
+            0,
+            ":100644 120000 aaaaaaa 0000000 T\0f\0"
+            ":100644 100644 aaaaaaa 0000000 M\0g\0"
+            ":100644 100644 aaaaaaa 0000000 M\0tab\tname.py\0"
+            "1\t1\tf\0"
+            "1\t0\tg\0"
+            "1\t0\ttab\tname.py\0\0"
+            "diff --git a/f b/f\n"
+            "deleted file mode 100644\n"
+            "--- a/f\n"
+            "+++ /dev/null\n"
+            "@@ -1 +0,0 @@\n"
+            "-1\n"
+            "diff --git a/f b/f\n"
+            "new file mode 120000\n"
+            "--- /dev/null\n"
+            "+++ b/f\n"
+            "@@ -0,0 +1 @@\n"
+            "+g\n"
+            "diff --git a/g b/g\n"
+            "--- a/g\n"
+            "+++ b/g\n"
+            "@@ -1,0 +2 @@\n"
+            "+2\n"
+            "diff --git \"a/tab\\tname.py\" \"b/tab\\tname.py\"\n"
+            "--- \"a/tab\\tname.py\"\n"
+            "+++ \"b/tab\\tname.py\"\n"
+            "@@ -4,0 +5 @@\n"
+            "+x\n",
+            "",
+        )
+        index = get_diff_index(include_hunks=True)
+        assert index["f"].removed_lines.intervals() == [(1, 1)]
+        assert index["f"].added_lines.intervals() == [(1, 1)]
+        assert index["g"].added_lines.intervals() == [(2, 2)]
+        assert index["tab\tname.py"].added_lines.intervals() == [(5, 5)]
+
+    @patch("lib.core.git.run_git")
+    def test_quoted_non_ascii_paths(self, mock_run):
+        """Octal escapes and unescaped non-ASCII (core.quotepath=false) both decode."""
+        mock_run.return_value = (
+            0,
+            ":100644 100644 aaaaaaa bbbbbbb M\0\u00fc.py\0"
+            ":100644 100644 aaaaaaa bbbbbbb M\0tab\t\u65e5\u672c.py\0"
+            "1\t0\t\u00fc.py\0"
+            "1\t0\ttab\t\u65e5\u672c.py\0\0"
+            "diff --git \"a/\\303\\274.py\" \"b/\\303\\274.py\"\n"
+            "--- \"a/\\303\\274.py\"\n"
+            "+++ \"b/\\303\\274.py\"\n"
+            "@@ -1,0 +2 @@\n"
+            "+x\n"
+            "diff --git \"a/tab\\t\u65e5\u672c.py\" \"b/tab\\t\u65e5\u672c.py\"\n"
+            "--- \"a/tab\\t\u65e5\u672c.py\"\n"
+            "+++ \"b/tab\\t\u65e5\u672c.py\"\n"
+            "@@ -3,0 +4 @@\n"
+            "+y\n",
+            "",
+        )
+        index = get_diff_index(include_hunks=True)
+        assert index["\u00fc.py"].added_lines.intervals() == [(2, 2)]
+        assert index["tab\t\u65e5\u672c.py"].added_lines.intervals() == [(4, 4)]
+
+    def test_real_repository(self, git_repo, monkeypatch):
+        """Working tree changes are reported with hunks."""
+        monkeypatch.chdir(git_repo)
+        (git_repo / "a.txt").write_text("2\nnew\n")
+        result = get_diff(include_hunks=True)
+        assert [d.path for d in result] == ["a.txt"]
+        assert result[0].added_lines.intervals() == [(2, 2)]
+
+    def test_real_typechange(self, git_repo, monkeypatch):
+        """A file replaced by a symlink doesn't shift later files' hunks."""
+        monkeypatch.chdir(git_repo)
+        (git_repo / "b.txt").write_text("1\n")
+        (git_repo / "c.txt").write_text("1\n")
+        git(git_repo, "add", "-A")
+        git(git_repo, "commit", "-q", "-m", "files")
+
+        (git_repo / "a.txt").unlink()
+        (git_repo / "a.txt").symlink_to("b.txt")
+        (git_repo / "b.txt").write_text("1\n2\n")
+        (git_repo / "c.txt").write_text("1\n2\n")
+
+        index = get_diff_index(include_hunks=True)
+        assert index["a.txt"].status == "T"
+        assert index["b.txt"].added_lines.intervals() == [(2, 2)]
+        assert index["c.txt"].added_lines.intervals() == [(2, 2)]
+
+
+def log_record(sha, subject, files=None):
+    """Build one raw `git log -z` record in the iter_commits format."""
+    fields = [sha, sha[:7], "Dev", "dev@example.com", "2024-01-15 10:00:00 +0000", subject]
+    record = "\x1e" + "\x1f".join(fields) + "\x1f\0"
+    if files is not None:
+        record += "\n" + "".join(f + "\0" for f in files)
+    return record.encode("utf-8")
+
+
+class TestIterCommits:
+    """Tests for iter_commits streaming parser."""
+
+    @patch("lib.core.git.stream_git")
+    def test_records_split_across_chunks(self, mock_stream):
+        """Records spanning chunk boundaries are reassembled."""
+        data = (
+            log_record("a" * 40, "feat: one", ["src/a.py", "src/b.py"])
+            + log_record("b" * 40, "fix: two", ["README.md"])
+        )
+        mock_stream.return_value = iter([data[i:i + 7] for i in range(0, len(data), 7)])
+
+        commits = list(iter_commits())
+        assert [c.message for c in commits] == ["feat: one", "fix: two"]
+        assert commits[0].files_changed == ["src/a.py", "src/b.py"]
+        assert commits[0].date == "2024-01-15"
+        assert commits[1].short_hash == "bbbbbbb"
+
+    @patch("lib.core.git.stream_git")
+    def test_without_files(self, mock_stream):
+        """include_files=False omits --name-only and leaves files empty."""
+        mock_stream.return_value = iter([log_record("a" * 40, "feat: one")])
+
+        commits = list(iter_commits(include_files=False))
+        assert commits[0].files_changed == []
+        assert "--name-only" not in mock_stream.call_args[0][0]
+
+    @patch("lib.core.git.stream_git")
+    def test_paging_args(self, mock_stream):
+        """skip, since and count map to git log options."""
+        mock_stream.return_value = iter([])
+        list(iter_commits(count=5, skip=10, since="2 weeks ago", path="src"))
+
+        args = mock_stream.call_args[0][0]
+        assert "--max-count=5" in args
+        assert "--skip=10" in args
+        assert "--since=2 weeks ago" in args
+        assert args[-2:] == ["--", "src"]
+
+    def test_real_repository(self, git_repo, monkeypatch):
+        """One git log pass returns commits with their files."""
+        monkeypatch.chdir(git_repo)
+        commits = get_recent_commits(count=10)
+        assert [c.message for c in commits][:2] == ["Merge branch 'side'", "three"]
+        assert commits[0].files_changed == []  # Merge
+        assert commits[1].files_changed == ["src/sub/x.py"]
+
+        page = get_recent_commits(count=2, skip=1, include_files=False)
+        assert [c.message for c in page] == ["three", "side"]
+
+
+PORCELAIN = (
+    "a" * 40 + " 1 1 2\n"
+    "author Alice\n"
+    "author-mail <alice@example.com>\n"
+    "author-time 1705312800\n"
+    "author-tz +0000\n"
+    "summary first\n"
+    "filename f.py\n"
+    "\tline one\n"
+    + "a" * 40 + " 2 2\n"
+    "\tline two\n"
+    + "b" * 40 + " 1 3 1\n"
+    "author Bob\n"
+    "author-mail <bob@example.com>\n"
+    "author-time 1705312800\n"
+    "author-tz +0000\n"
+    "summary second\n"
+    "filename f.py\n"
+    "\tline three\n"
+)
+
+
+class TestGetBlame:
+    """Tests for porcelain blame parsing and cached blame."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        clear_blame_cache()
+        yield
+        clear_blame_cache()
+
+    def test_parse_shares_commit_metadata(self):
+        """Metadata from a commit's first line applies to its later lines."""
+        blame = parse_blame_porcelain(PORCELAIN)
+        assert [b.line_number for b in blame] == [1, 2, 3]
+        assert [b.content for b in blame] == ["line one", "line two", "line three"]
+        assert blame[1].author == "Alice"
+        assert blame[1].author_email == "alice@example.com"
+        assert blame[2].commit_hash == "b" * 40
+        assert blame[2].author == "Bob"
+
+    @patch("lib.core.git.get_session", return_value=None)
+    @patch("lib.core.git.run_git")
+    def test_large_range_from_one_blame(self, mock_run, _):
+        """Large ranges slice one whole-file porcelain pass."""
+        mock_run.return_value = (0, PORCELAIN, "")
+
+        blame = get_blame_range("f.py", 2, 2 + BLAME_RANGE_LINES)
+        assert [b.content for b in blame] == ["line two", "line three"]
+        mock_run.assert_called_once_with(["blame", "--porcelain", "--", "f.py"])
+
+    @patch("lib.core.git.get_session", return_value=None)
+    @patch("lib.core.git.run_git")
+    def test_small_range_blames_lines(self, mock_run, _):
+        """Small ranges on an uncached file blame only those lines."""
+        mock_run.return_value = (0, PORCELAIN, "")
+
+        assert get_blame("f.py", 3).author == "Alice"
+        mock_run.assert_called_once_with(["blame", "--porcelain", "-L", "3,3", "--", "f.py"])
+        assert get_blame_range("f.py", 3, 2) == []
+
+    @patch("lib.core.git.get_session")
+    @patch("lib.core.git.run_git")
+    def test_small_range_skips_session_without_cache(self, mock_run, mock_session):
+        """With nothing cached, a small range never starts a git session."""
+        mock_run.return_value = (0, PORCELAIN, "")
+
+        assert get_blame("f.py", 3).author == "Alice"
+        mock_session.assert_not_called()
+
+    def test_small_range_matches_git(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        (git_repo / "a.txt").write_text("0\n2\n")
+
+        assert get_blame("a.txt", 1).commit_hash == UNCOMMITTED_HASH
+        assert get_blame("a.txt", 2).author == "Dev"
+        assert get_blame("a.txt", 10) is None
+        assert [b.content for b in get_blame_range("a.txt", 2, 10)] == ["2"]
+
+    def test_small_range_uses_warm_cache(self, git_repo, monkeypatch):
+        """Once the whole file is blamed, small ranges don't run git blame."""
+        monkeypatch.chdir(git_repo)
+        get_blame_file("a.txt")
+
+        with patch("lib.core.git.run_git", side_effect=run_git) as mock_run:
+            info = get_blame("a.txt", 1)
+        assert all(c[0][0][0] != "blame" for c in mock_run.call_args_list)
+        assert info.author == "Dev"
+
+    def test_real_repository_matches_git(self, git_repo, monkeypatch):
+        """Working-tree edits are mapped onto the cached HEAD blame."""
+        monkeypatch.chdir(git_repo)
+        (git_repo / "a.txt").write_text("0\n2\n")
+        blame = get_blame_file("a.txt")
+
+        assert [b.content for b in blame] == ["0", "2"]
+        assert blame[0].commit_hash == UNCOMMITTED_HASH
+        assert blame[1].commit_hash != UNCOMMITTED_HASH
+        assert blame[1].line_number == 2
+        assert blame[1].author == "Dev"
+
+        expected = parse_blame_porcelain(
+            subprocess.run(
+                ["git", "blame", "--porcelain", "--", "a.txt"],
+                cwd=git_repo, capture_output=True, text=True, check=True,
+            ).stdout
+        )
+        assert [b.commit_hash for b in blame] == [b.commit_hash for b in expected]
+
+    def test_cached_across_edits(self, git_repo, monkeypatch):
+        """git blame runs once per HEAD blob, not once per edit."""
+        monkeypatch.chdir(git_repo)
+        get_blame_file("a.txt")
+        (git_repo / "a.txt").write_text("2\nmore\n")
+
+        with patch("lib.core.git.run_git", side_effect=run_git) as mock_run:
+            blame = get_blame_file("a.txt")
+        assert all(c[0][0][0] != "blame" for c in mock_run.call_args_list)
+        assert [b.content for b in blame] == ["2", "more"]
+        assert blame[1].commit_hash == UNCOMMITTED_HASH
+
+    def test_file_not_in_head(self, git_repo, monkeypatch):
+        """Files not in HEAD fall back to a working-tree blame."""
+        monkeypatch.chdir(git_repo)
+        (git_repo / "new.txt").write_text("n\n")
+        subprocess.run(["git", "add", "new.txt"], cwd=git_repo, check=True)
+        assert get_blame("new.txt", 1).commit_hash == UNCOMMITTED_HASH
+
+
+@pytest.fixture
+def no_repository(monkeypatch):
+    """Force the subprocess path instead of the in-process repository reader."""
+    monkeypatch.setattr("lib.core.git.open_repository", lambda: None)
 
 
+@pytest.mark.usefixtures("no_repository")
 class TestGetChangedFiles:
     """Tests for get_changed_files function."""
 
@@ -143,6 +495,7 @@ class TestGetChangedFiles:
         assert result == ["file1.py", "file2.py"]
 
 
+@pytest.mark.usefixtures("no_repository")
 class TestGetCurrentBranch:
     """Tests for get_current_branch function."""
 
@@ -161,6 +514,7 @@ class TestGetCurrentBranch:
         assert result is None
 
 
+@pytest.mark.usefixtures("no_repository")
 class TestGetBaseBranch:
     """Tests for get_base_branch function."""
 
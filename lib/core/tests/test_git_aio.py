@@ -0,0 +1,155 @@
+"""Tests for lib.core.git.aio module."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core import git as sync_git
+from lib.core.git import aio
+from lib.core.git.repo import clear_repositories
+
+
+@pytest.fixture(autouse=True)
+def default_concurrency():
+    yield
+    aio.set_concurrency(aio.DEFAULT_CONCURRENCY)
+
+
+class TestRunGit:
+    """Tests for the async run_git."""
+
+    def test_successful_command(self):
+        """Exit code and output are returned."""
+        exit_code, stdout, _ = asyncio.run(aio.run_git(["--version"]))
+        assert exit_code == 0
+        assert "git version" in stdout
+
+    def test_invalid_command(self):
+        """Git errors are reported through the exit code."""
+        exit_code, _, stderr = asyncio.run(aio.run_git(["not-a-command"]))
+        assert exit_code != 0
+        assert stderr
+
+    def test_concurrency_is_bounded(self, monkeypatch):
+        """No more than the configured number of processes run at once."""
+        aio.set_concurrency(2)
+        running = 0
+        peak = 0
+        real_exec = asyncio.create_subprocess_exec
+
+        async def tracking_exec(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            proc = await real_exec(*args, **kwargs)
+            real_communicate = proc.communicate
+
+            async def communicate():
+                nonlocal running
+                try:
+                    await asyncio.sleep(0.01)
+                    return await real_communicate()
+                finally:
+                    running -= 1
+
+            proc.communicate = communicate
+            return proc
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", tracking_exec)
+
+        async def run_many():
+            return await asyncio.gather(*(aio.run_git(["--version"]) for _ in range(6)))
+
+        results = asyncio.run(run_many())
+        assert all(code == 0 for code, _, _ in results)
+        assert peak == 2
+
+    def test_limiter_survives_new_loops(self):
+        """Each asyncio.run gets a limiter bound to its own loop."""
+        for _ in range(2):
+            assert asyncio.run(aio.run_git(["--version"]))[0] == 0
+
+
+class TestMatchesSyncApi:
+    """The async API returns the same dataclasses as lib.core.git."""
+
+    def test_diff_and_commits(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        (git_repo / "a.txt").write_text("2\nnew\n")
+
+        async def both():
+            return await asyncio.gather(
+                aio.get_diff(include_hunks=True),
+                aio.get_recent_commits(count=3),
+                aio.get_file_history("a.txt"),
+            )
+
+        diff, commits, history = asyncio.run(both())
+        assert diff == sync_git.get_diff(include_hunks=True)
+        assert commits == sync_git.get_recent_commits(count=3)
+        assert history == sync_git.get_file_history("a.txt")
+
+    def test_blame(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        blame = asyncio.run(aio.get_blame("a.txt", 1))
+        assert blame == sync_git.get_blame("a.txt", 1)
+
+    def test_blame_empty_range(self, git_repo, monkeypatch):
+        """end < start is an empty range, as in the synchronous version."""
+        monkeypatch.chdir(git_repo)
+        with patch("lib.core.git.aio.run_git") as mock_run:
+            assert asyncio.run(aio.get_blame_range("a.txt", 2, 1)) == []
+        mock_run.assert_not_called()
+        assert sync_git.get_blame_range("a.txt", 2, 1) == []
+
+    def test_branches_read_repository(self, git_repo, monkeypatch):
+        """Branch lookups read .git directly instead of spawning git."""
+        monkeypatch.chdir(git_repo)
+        sync_git.run_git(["checkout", "-qb", "feature"])
+        clear_repositories()
+
+        async def both():
+            return await asyncio.gather(aio.get_current_branch(), aio.get_base_branch())
+
+        with patch("lib.core.git.aio.run_git") as mock_run:
+            assert asyncio.run(both()) == ["feature", "main"]
+        mock_run.assert_not_called()
+
+    def test_branches_without_repository(self, git_repo, monkeypatch):
+        """git is still used when the repository can't be read directly."""
+        monkeypatch.chdir(git_repo)
+        with patch("lib.core.git.aio.open_repository", return_value=None):
+            assert asyncio.run(aio.get_current_branch()) == sync_git.get_current_branch()
+            assert asyncio.run(aio.get_base_branch()) == "main"
+
+
+class TestGatherRepoSnapshot:
+    """Tests for gather_repo_snapshot."""
+
+    def test_snapshot(self, git_repo, monkeypatch):
+        """All fields are fetched and agree with the sync helpers."""
+        monkeypatch.chdir(git_repo)
+        sync_git.run_git(["checkout", "-qb", "feature"])
+        (git_repo / "a.txt").write_text("changed\n")
+
+        snapshot = aio.repo_snapshot(commit_count=2)
+        assert snapshot.branch == "feature"
+        assert snapshot.base_branch == "main"
+        assert snapshot.commit_range == sync_git.get_commit_range("main")
+        assert [d.path for d in snapshot.diff] == ["a.txt"]
+        assert snapshot.changed_files == ["a.txt"]
+        # The merged commits can share a timestamp: compare with git, not a fixed order
+        assert snapshot.recent_commits == sync_git.get_recent_commits(count=2)
+        assert snapshot.recent_commits[0].message == "Merge branch 'side'"
+
+    def test_explicit_base(self, git_repo, monkeypatch):
+        """An explicit base skips base-branch detection."""
+        monkeypatch.chdir(git_repo)
+        snapshot = asyncio.run(aio.gather_repo_snapshot(base="side"))
+        assert snapshot.base_branch == "side"
+        assert snapshot.merge_base == sync_git.get_commit_range("side")[0]
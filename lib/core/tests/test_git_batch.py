@@ -0,0 +1,76 @@
+"""Tests for lib.core.git.batch module."""
+
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.git.batch import GitSession, parse_commit
+
+
+@pytest.fixture
+def session(git_repo):
+    s = GitSession(str(git_repo))
+    yield s
+    s.close()
+
+
+class TestParseCommit:
+    """Tests for parse_commit function."""
+
+    def test_headers_and_message(self):
+        """Tree, parents, author and message are parsed."""
+        body = (
+            b"tree aaaa\n"
+            b"parent bbbb\n"
+            b"parent cccc\n"
+            b"author Dev <dev@example.com> 1700000000 +0000\n"
+            b"committer Dev <dev@example.com> 1700000000 +0000\n"
+            b"\n"
+            b"Subject line\n\nBody\n"
+        )
+        commit = parse_commit("dddd", body)
+        assert commit.tree == "aaaa"
+        assert commit.parents == ["bbbb", "cccc"]
+        assert commit.author.startswith("Dev <dev@example.com>")
+        assert commit.message.startswith("Subject line")
+
+
+class TestGitSession:
+    """Tests for GitSession against a real repository."""
+
+    def test_object_info(self, session):
+        """Refs and rev:path resolve through batch-check."""
+        head = session.object_info("HEAD")
+        assert head.type == "commit"
+        assert len(head.sha) == 40
+
+        blob = session.object_info("HEAD:a.txt")
+        assert blob.type == "blob"
+        assert blob.size == 2
+
+    def test_missing_object(self, session):
+        """Missing objects return None without breaking the pipeline."""
+        infos = session.object_info_many(["HEAD", "refs/heads/nope", "HEAD:a.txt"])
+        assert infos[0] is not None
+        assert infos[1] is None
+        assert infos[2] is not None
+
+    def test_read_object(self, session):
+        """Object contents are returned."""
+        info, body = session.read_object("HEAD:a.txt")
+        assert body == b"2\n"
+
+    def test_pipelines_past_chunk_size(self, session):
+        """More requests than one pipeline chunk are all answered."""
+        infos = session.object_info_many(["HEAD"] * 300)
+        assert len(infos) == 300
+        assert all(info is not None for info in infos)
+
+    def test_restarts_after_close(self, session):
+        """A closed session transparently restarts its processes."""
+        session.close()
+        assert session.rev_parse("HEAD") is not None
+
@@ -0,0 +1,106 @@
+"""Tests for lib.core.git.cache module."""
+
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.git import get_changed_files, run_git
+from lib.core.git.cache import (
+    HEAD,
+    INDEX,
+    WORKTREE,
+    cached_run_git,
+    clear_fingerprints,
+    repo_fingerprint,
+)
+
+
+@pytest.fixture
+def repo(git_repo, monkeypatch):
+    """The test repository as cwd, with no in-process fingerprints."""
+    monkeypatch.chdir(git_repo)
+    clear_fingerprints()
+    yield git_repo
+    clear_fingerprints()
+
+
+def fingerprint(*depends):
+    clear_fingerprints()
+    return repo_fingerprint(depends)
+
+
+class TestRepoFingerprint:
+    """Tests for repo_fingerprint."""
+
+    def test_head_changes_on_commit(self, repo):
+        before = fingerprint(HEAD)
+        (repo / "a.txt").write_text("edited\n")
+        assert fingerprint(HEAD) == before  # Worktree edits don't move HEAD
+
+        run_git(["commit", "-qam", "four"])
+        assert fingerprint(HEAD) != before
+
+    def test_index_changes_on_add(self, repo):
+        before = fingerprint(INDEX)
+        (repo / "new.txt").write_text("n\n")
+        run_git(["add", "new.txt"])
+        assert fingerprint(INDEX) != before
+
+    def test_worktree_changes_on_edit(self, repo):
+        before = fingerprint(WORKTREE)
+        (repo / "a.txt").write_text("edited\n")
+        after = fingerprint(WORKTREE)
+        assert after != before
+        (repo / "a.txt").write_text("edited again, longer\n")
+        assert fingerprint(WORKTREE) != after
+
+    def test_unsupported_repository(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert fingerprint(HEAD) is None
+
+
+class TestCachedRunGit:
+    """Tests for cached_run_git."""
+
+    def test_reuses_result_until_head_moves(self, repo):
+        with patch("lib.core.git.cache.run_git", side_effect=run_git) as mock_run:
+            first = cached_run_git(["log", "--oneline", "-1"])
+            second = cached_run_git(["log", "--oneline", "-1"])
+            assert first == second
+            assert mock_run.call_count == 1
+
+            run_git(["commit", "-q", "--allow-empty", "-m", "four"])
+            clear_fingerprints()
+            third = cached_run_git(["log", "--oneline", "-1"])
+            assert "four" in third[1]
+            assert mock_run.call_count == 2
+
+    def test_no_match_is_cached_but_errors_are_not(self, repo):
+        with patch("lib.core.git.cache.run_git", side_effect=run_git) as mock_run:
+            for _ in range(2):
+                result = cached_run_git(["grep", "-n", "nothing-here"], depends=(INDEX, WORKTREE))
+                assert result[0] == 1
+            assert mock_run.call_count == 1
+
+            for _ in range(2):
+                assert cached_run_git(["not-a-command"])[0] != 0
+            assert mock_run.call_count == 3
+
+    def test_cache_disabled(self, repo, monkeypatch):
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        with patch("lib.core.git.cache.run_git", side_effect=run_git) as mock_run:
+            cached_run_git(["log", "-1"])
+            cached_run_git(["log", "-1"])
+        assert mock_run.call_count == 2
+
+    def test_staged_changed_files(self, repo):
+        """get_changed_files(staged=True) sees new staged files."""
+        assert get_changed_files(staged=True) == []
+        (repo / "a.txt").write_text("staged\n")
+        run_git(["add", "a.txt"])
+        clear_fingerprints()
+        assert get_changed_files(staged=True) == ["a.txt"]
@@ -0,0 +1,175 @@
+"""Tests for lib.core.git.repo module."""
+
+import os
+import subprocess
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.git import get_base_branch, get_changed_files, get_current_branch
+from lib.core.git.repo import (
+    Repository,
+    UnsupportedRepository,
+    find_git_dir,
+    open_repository,
+    parse_config,
+)
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def git_modified(repo) -> list[str]:
+    return [f for f in git(repo, "diff", "--name-only").split("\n") if f]
+
+
+@pytest.fixture
+def repo(git_repo):
+    return Repository(str(git_repo / ".git"), str(git_repo))
+
+
+class TestParseConfig:
+    """Tests for parse_config function."""
+
+    def test_sections_and_values(self, tmp_path):
+        """Sections, subsections and bare booleans are flattened."""
+        path = tmp_path / "config"
+        path.write_text(
+            "[core]\n"
+            "\tfileMode = false\n"
+            "\tbare\n"
+            "; comment\n"
+            '[remote "origin"]\n'
+            "\turl = https://example.com/repo.git\n"
+        )
+        config = parse_config(str(path))
+        assert config["core.filemode"] == "false"
+        assert config["core.bare"] == "true"
+        assert config["remote.origin.url"] == "https://example.com/repo.git"
+
+    def test_missing_file(self, tmp_path):
+        assert parse_config(str(tmp_path / "none")) == {}
+
+
+class TestRefs:
+    """Tests for HEAD and ref resolution."""
+
+    def test_current_branch(self, repo, git_repo):
+        assert repo.current_branch() == "main"
+        git(git_repo, "checkout", "-qb", "feature")
+        assert repo.current_branch() == "feature"
+
+    def test_detached_head(self, repo, git_repo):
+        """Detached HEAD is reported as "" like `git branch --show-current`."""
+        git(git_repo, "checkout", "-q", "--detach")
+        assert repo.current_branch() == ""
+
+    def test_resolve_loose_and_packed(self, repo, git_repo):
+        """Refs resolve the same before and after `git pack-refs`."""
+        head = git(git_repo, "rev-parse", "HEAD").strip()
+        assert repo.resolve_ref("HEAD") == head
+        assert repo.has_branch("side")
+
+        git(git_repo, "pack-refs", "--all")
+        assert not (git_repo / ".git" / "refs" / "heads" / "side").exists()
+        assert repo.resolve_ref("HEAD") == head
+        assert repo.resolve_ref("refs/heads/side") == git(git_repo, "rev-parse", "side").strip()
+        assert repo.has_branch("side")
+        assert not repo.has_branch("master")
+
+
+class TestModifiedFiles:
+    """modified_files agrees with `git diff --name-only`."""
+
+    def test_clean(self, repo, git_repo):
+        assert repo.modified_files() == git_modified(git_repo) == []
+
+    def test_edits_deletes_and_touches(self, repo, git_repo):
+        (git_repo / "a.txt").write_text("9\n")  # Same size, new content
+        (git_repo / "s.txt").unlink()
+        os.utime(git_repo / "src" / "y.py")  # Touched, content unchanged
+        assert repo.modified_files() == git_modified(git_repo) == ["a.txt", "s.txt"]
+
+    def test_mode_change(self, repo, git_repo):
+        os.chmod(git_repo / "a.txt", 0o755)
+        assert repo.modified_files() == git_modified(git_repo) == ["a.txt"]
+
+    def test_staged_changes_are_clean(self, repo, git_repo):
+        """Changes already in the index aren't reported."""
+        (git_repo / "a.txt").write_text("staged\n")
+        git(git_repo, "add", "a.txt")
+        assert repo.modified_files() == git_modified(git_repo) == []
+
+    def test_intent_to_add(self, repo, git_repo):
+        (git_repo / "new.txt").write_text("n\n")
+        git(git_repo, "add", "-N", "new.txt")
+        assert repo.modified_files() == git_modified(git_repo) == ["new.txt"]
+
+    def test_content_filters_unsupported(self, repo, git_repo):
+        """Hashing is refused when attributes could rewrite content."""
+        (git_repo / ".gitattributes").write_text("*.txt text eol=crlf\n")
+        (git_repo / "a.txt").write_text("9\n")
+        with pytest.raises(UnsupportedRepository):
+            repo.modified_files()
+
+    def test_nested_content_filters_unsupported(self, repo, git_repo):
+        """Attributes in a subdirectory's .gitattributes are checked too."""
+        (git_repo / "src" / ".gitattributes").write_text("*.py filter=lfs\n")
+        git(git_repo, "add", "src/.gitattributes")
+        (git_repo / "src" / "y.py").write_text("changed\n")
+        with pytest.raises(UnsupportedRepository):
+            repo.modified_files()
+
+    def test_index_v4_unsupported(self, repo, git_repo):
+        git(git_repo, "update-index", "--index-version", "4")
+        with pytest.raises(UnsupportedRepository):
+            repo.modified_files()
+
+
+class TestOpenRepository:
+    """Tests for repository discovery."""
+
+    def test_from_subdirectory(self, git_repo):
+        git_dir, work_tree = find_git_dir(str(git_repo / "src"))
+        assert work_tree == str(git_repo)
+        assert git_dir == str(git_repo / ".git")
+
+    def test_linked_worktree(self, git_repo, tmp_path):
+        """Worktrees (.git is a file) are left to git."""
+        worktree = tmp_path / "wt"
+        git(git_repo, "worktree", "add", "-q", str(worktree), "side")
+        assert find_git_dir(str(worktree)) is None
+
+    def test_git_dir_override(self, git_repo, monkeypatch):
+        monkeypatch.setenv("GIT_DIR", str(git_repo / ".git"))
+        assert open_repository(str(git_repo)) is None
+
+
+class TestGitFastPaths:
+    """lib.core.git helpers give the same answers with and without git."""
+
+    def test_matches_subprocess(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        git(git_repo, "checkout", "-qb", "feature")
+        (git_repo / "a.txt").write_text("changed\n")
+
+        assert get_current_branch() == "feature"
+        assert get_base_branch() == "main"
+        assert get_changed_files() == ["a.txt"]
+
+        monkeypatch.setattr("lib.core.git.open_repository", lambda: None)
+        assert get_current_branch() == "feature"
+        assert get_base_branch() == "main"
+        assert get_changed_files() == ["a.txt"]
+
+    def test_unsupported_index_falls_back(self, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo)
+        git(git_repo, "update-index", "--index-version", "4")
+        (git_repo / "a.txt").write_text("changed\n")
+        assert get_changed_files() == ["a.txt"]
@@ -0,0 +1,141 @@
+"""Tests for lib.core.impact module."""
+
+import os
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.impact import affected_tests, build_import_graph, extract_imports, is_test_module
+from lib.core.git.repo import clear_repositories
+from lib.core.tests.conftest import git
+
+
+PROJECT = {
+    "src/app/__init__.py": "",
+    "src/app/core.py": "import os\nfrom . import util\n",
+    "src/app/util.py": (
+        "from typing import TYPE_CHECKING\nif TYPE_CHECKING:\n    from app import api\n"
+    ),
+    "src/app/api.py": "from .core import run\n",
+    "src/app/cli.py": "def main():\n    from app.api import serve\n",
+    "tests/conftest.py": "",
+    "tests/test_core.py": "from app.core import run\n",
+    "tests/test_api.py": "import app.api\n",
+    "tests/test_cli.py": "from app import cli\n",
+    "tests/unit/conftest.py": "from app import util\n",
+    "tests/unit/test_misc.py": "",
+    "scripts/tool.py": "import sys\n",
+}
+
+
+@pytest.fixture
+def project(git_repo, monkeypatch):
+    for path, content in PROJECT.items():
+        (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / path).write_text(content)
+    monkeypatch.chdir(git_repo)
+    clear_repositories()
+    yield git_repo
+    clear_repositories()
+
+
+def names(paths):
+    return [p.rsplit("/", 1)[-1] for p in paths]
+
+
+class TestExtractImports:
+    """Tests for import extraction."""
+
+    def test_absolute_and_parents(self, tmp_path):
+        imports = extract_imports(b"import a.b.c\nfrom x.y import z\n", "m.py", str(tmp_path))
+        assert imports == ("a", "a.b", "a.b.c", "x", "x.y", "x.y.z")
+
+    def test_relative(self, tmp_path):
+        pkg = tmp_path / "pkg" / "sub"
+        pkg.mkdir(parents=True)
+        (tmp_path / "pkg" / "__init__.py").write_text("")
+        (pkg / "__init__.py").write_text("")
+        imports = extract_imports(b"from .. import a\nfrom .b import c\n", "pkg/sub/m.py",
+                                  str(tmp_path))
+        assert "pkg.a" in imports
+        assert "pkg.sub.b.c" in imports
+
+    def test_type_checking_and_syntax_errors(self, tmp_path):
+        source = b"if TYPE_CHECKING:\n    import heavy\nelse:\n    import light\n"
+        assert extract_imports(source, "m.py", str(tmp_path)) == ("light",)
+        assert extract_imports(b"import (", "m.py", str(tmp_path)) == ()
+
+    def test_is_test_module(self):
+        assert is_test_module("tests/test_a.py")
+        assert is_test_module("a_test.py")
+        assert not is_test_module("tests/conftest.py")
+        assert not is_test_module("test_a.txt")
+
+
+class TestAffectedTests:
+    """Tests for affected-test selection."""
+
+    def test_transitive_importers(self, project):
+        graph = build_import_graph(str(project))
+        # cli imports api lazily inside a function, which still counts
+        assert names(graph.affected_tests("src/app/core.py")) == [
+            "test_api.py", "test_cli.py", "test_core.py"
+        ]
+        # util is imported by core (and so by everything above it) and a conftest
+        assert names(graph.affected_tests("src/app/util.py")) == [
+            "test_api.py", "test_cli.py", "test_core.py", "test_misc.py"
+        ]
+        assert names(graph.affected_tests("src/app/api.py")) == ["test_api.py", "test_cli.py"]
+        assert graph.affected_tests("scripts/tool.py") == []
+        assert graph.affected_tests("missing.py") is None
+
+    def test_conftest_affects_tests_below(self, project):
+        graph = build_import_graph(str(project))
+        assert names(graph.affected_tests("tests/conftest.py")) == [
+            "test_api.py", "test_cli.py", "test_core.py", "test_misc.py"
+        ]
+
+    def test_absolute_paths(self, project):
+        tests = affected_tests(str(project / "src" / "app" / "cli.py"))
+        assert tests == [str(project / "tests" / "test_cli.py")]
+        assert affected_tests("/elsewhere/x.py") is None
+
+    def test_incremental_update(self, project):
+        """Unchanged files aren't parsed again; changed ones are."""
+        build_import_graph(str(project))
+        with patch("lib.core.impact.extract_imports") as mock_extract:
+            build_import_graph(str(project))
+        mock_extract.assert_not_called()
+
+        # Touched but identical: hashed, not parsed
+        core = project / "src" / "app" / "core.py"
+        core.write_text(PROJECT["src/app/core.py"])
+        with patch("lib.core.impact.extract_imports") as mock_extract:
+            build_import_graph(str(project))
+        mock_extract.assert_not_called()
+
+        (project / "tests" / "test_misc.py").write_text("from app import core\n")
+        graph = build_import_graph(str(project))
+        assert "test_misc.py" in names(graph.affected_tests("src/app/core.py"))
+
+    def test_package_directories_checked_once(self, project):
+        """Module names check each directory for __init__.py once per graph."""
+        build_import_graph(str(project))
+        with patch("lib.core.impact.os.path.isfile", side_effect=os.path.isfile) as isfile:
+            graph = build_import_graph(str(project))
+        checked = [c[0][0] for c in isfile.call_args_list]
+        assert len(checked) == len(set(checked))
+        assert graph.modules["app.util"] == ["src/app/util.py"]
+
+    def test_without_git(self, tmp_path, monkeypatch):
+        (tmp_path / "mod.py").write_text("")
+        (tmp_path / "test_mod.py").write_text("import mod\n")
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / "node_modules" / "x.py").write_text("import mod\n")
+        graph = build_import_graph(str(tmp_path))
+        assert sorted(graph.imports) == ["mod.py", "test_mod.py"]
+        assert graph.affected_tests("mod.py") == ["test_mod.py"]
@@ -0,0 +1,124 @@
+"""Import-time budget tests for hook entry points.
+
+Each hook runs as a fresh interpreter, so import cost is paid on every tool
+call. These tests run each hook under ``python -X importtime`` and fail when
+its lib.* imports exceed the budget.
+
+Override the budget with DEVKIT_IMPORT_BUDGET_MS (e.g. on slow CI runners).
+"""
+
+import os
+import subprocess
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import lib.core
+
+
+DEVKIT_ROOT = Path(__file__).parent.parent.parent.parent
+SCRIPTS_DIR = DEVKIT_ROOT / "hooks" / "scripts"
+
+IMPORT_BUDGET_MS = float(os.environ.get("DEVKIT_IMPORT_BUDGET_MS", "100"))
+
+HOOK_ENTRY_POINTS = sorted(
+    str(path.relative_to(SCRIPTS_DIR))
+    for path in SCRIPTS_DIR.glob("*/*.py")
+    if path.parent.name != "daemon"
+)
+
+
+def run_importtime(args: list[str], stdin: str = "{}") -> dict[str, tuple[int, int]]:
+    """
+    Run python -X importtime and collect top-level import costs.
+
+    Returns:
+        Mapping of top-level module name to (self_us, cumulative_us)
+    """
+    env = dict(os.environ)
+    env["CLAUDE_DEVKIT"] = str(DEVKIT_ROOT)
+    env["CLAUDE_DEVKIT_NO_CACHE"] = "1"
+    env.pop("CLAUDE_HOOK_DEBUG", None)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        timeout=30,
+        cwd=str(DEVKIT_ROOT),
+        env=env,
+    )
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header row
+        name = parts[2].rstrip()
+        if name.startswith("  "):
+            continue  # Nested import, already counted by its parent
+        imports[name.strip()] = (int(parts[0]), int(parts[1]))
+
+    return imports
+
+
+def lib_import_ms(imports: dict[str, tuple[int, int]]) -> float:
+    """Total cumulative import time of top-level lib.* modules, in ms."""
+    total_us = sum(
+        cumulative for name, (_, cumulative) in imports.items()
+        if name == "lib" or name.startswith("lib.")
+    )
+    return total_us / 1000
+
+
+class TestLazyPackage:
+    """Tests for lazy attribute resolution in lib.core."""
+
+    def test_public_surface_unchanged(self):
+        """Every name in __all__ resolves."""
+        for name in lib.core.__all__:
+            assert getattr(lib.core, name) is not None
+
+    def test_unknown_attribute_raises(self):
+        """Unknown names raise AttributeError."""
+        with pytest.raises(AttributeError):
+            lib.core.not_a_real_name
+
+    def test_config_import_is_light(self):
+        """Importing lib.core.config doesn't drag in git, coverage or output."""
+        code = (
+            "import sys; import lib.core.config; "
+            "print(','.join(m for m in ('lib.core.git', 'lib.core.coverage', "
+            "'lib.core.output', 'subprocess', 'threading') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=str(DEVKIT_ROOT),
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
+
+
+class TestHookImportBudget:
+    """Import-time budget for each hook entry point."""
+
+    @pytest.mark.parametrize("script", HOOK_ENTRY_POINTS)
+    def test_within_budget(self, script):
+        """lib.* imports stay within IMPORT_BUDGET_MS."""
+        imports = run_importtime([str(SCRIPTS_DIR / script)])
+        spent = lib_import_ms(imports)
+        assert spent <= IMPORT_BUDGET_MS, (
+            f"{script} spent {spent:.1f}ms importing lib.* "
+            f"(budget {IMPORT_BUDGET_MS:.0f}ms): "
+            + ", ".join(f"{n}={c / 1000:.1f}ms" for n, (_, c) in imports.items()
+                        if n.startswith("lib"))
+        )
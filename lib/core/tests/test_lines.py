@@ -0,0 +1,106 @@
+"""Tests for lib.core.lines module."""
+
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.lines import LineRanges, LineSet
+
+
+class TestLineRanges:
+    """Tests for LineRanges."""
+
+    def test_membership(self):
+        """Membership checks interval bounds inclusively."""
+        ranges = LineRanges([(3, 5), (10, 10)])
+        assert 3 in ranges
+        assert 5 in ranges
+        assert 10 in ranges
+        assert 2 not in ranges
+        assert 6 not in ranges
+        assert 11 not in ranges
+
+    def test_merges_overlapping_and_adjacent(self):
+        """Overlapping and adjacent intervals are merged."""
+        ranges = LineRanges([(5, 7), (1, 3), (4, 4), (6, 9)])
+        assert ranges.intervals() == [(1, 9)]
+
+    def test_len_and_iter(self):
+        """len() counts lines; iteration yields each line."""
+        ranges = LineRanges([(1, 2), (5, 6)])
+        assert len(ranges) == 4
+        assert list(ranges) == [1, 2, 5, 6]
+
+    def test_empty(self):
+        """Empty ranges are falsy and contain nothing."""
+        ranges = LineRanges()
+        assert not ranges
+        assert 1 not in ranges
+        assert len(ranges) == 0
+
+    def test_add_requires_ascending_order(self):
+        """add() rejects out-of-order intervals."""
+        ranges = LineRanges([(10, 12)])
+        with pytest.raises(ValueError):
+            ranges.add(1, 11)
+
+
+class TestLineSet:
+    """Tests for LineSet."""
+
+    def test_membership_and_order(self):
+        """Duplicates collapse; iteration is ascending."""
+        lines = LineSet([10, 3, 3, 7, 0])
+        assert list(lines) == [0, 3, 7, 10]
+        assert len(lines) == 4
+        assert 7 in lines
+        assert 8 not in lines
+        assert 1000 not in lines
+        assert -1 not in lines
+
+    def test_list_like(self):
+        """Indexing and list comparison work like a sorted list."""
+        lines = LineSet([5, 1, 9])
+        assert lines[0] == 1
+        assert lines[-1] == 9
+        assert lines[:2] == [1, 5]
+        assert lines == [1, 5, 9]
+        assert lines.tolist() == [1, 5, 9]
+        assert not LineSet()
+
+    def test_add_invalidates_list(self):
+        lines = LineSet([2])
+        assert lines[0] == 2
+        lines.add(1)
+        assert lines[0] == 1
+        assert len(lines) == 2
+
+    def test_set_operations(self):
+        a = LineSet([1, 2, 3, 100])
+        b = LineSet([2, 3, 4])
+        assert a | b == [1, 2, 3, 4, 100]
+        assert a & b == [2, 3]
+        assert a - b == [1, 100]
+        assert a ^ b == [1, 4, 100]
+        assert len(a - b) == 2
+
+    def test_operations_with_ranges_and_lists(self):
+        """Set operations accept LineRanges and plain iterables."""
+        lines = LineSet([1, 5, 9, 12])
+        assert lines & LineRanges([(4, 10)]) == [5, 9]
+        assert lines - [1, 12] == [5, 9]
+        assert LineSet.from_ranges([(2, 4), (6, 6)]) == [2, 3, 4, 6]
+
+    def test_bytes_roundtrip(self):
+        lines = LineSet(range(0, 50000, 7))
+        restored = LineSet.from_bytes(lines.to_bytes())
+        assert restored == lines
+        assert len(restored) == len(lines)
+        assert len(lines.to_bytes()) <= 50000 // 8 + 1
+
+    def test_negative_rejected(self):
+        with pytest.raises(ValueError):
+            LineSet([-1])
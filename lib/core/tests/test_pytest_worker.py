@@ -0,0 +1,150 @@
+"""Tests for lib.core.pytest_worker module."""
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import pytest
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.pytest_worker import (
+    PytestWorkerServer,
+    environment_fingerprint,
+    find_pytest_python,
+    script_python,
+    start_run,
+    third_party_imports,
+)
+
+RUN_ARGS = ["-q", "-p", "no:cacheprovider", "tests/test_mod.py"]
+
+TEST_MODULE = """
+import time
+import mod
+
+def test_value():
+    if mod.SLEEP:
+        time.sleep(mod.SLEEP)
+    assert mod.VALUE == 1
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "tests").mkdir(parents=True)
+    (root / "conftest.py").write_text("")
+    (root / "mod.py").write_text("import json\nVALUE = 1\nSLEEP = 0\n")
+    (root / "tests" / "test_mod.py").write_text(TEST_MODULE)
+    return root
+
+
+@pytest.fixture
+def worker(project):
+    """A worker serving from a thread (socket in a short /tmp path)."""
+    socket_dir = tempfile.mkdtemp(prefix="pw", dir="/tmp")
+    server = PytestWorkerServer(Path(socket_dir) / "w.sock", str(project))
+    server.timeout = 0.05
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    yield server
+    server.stopped = True
+    thread.join(timeout=5)
+    server.server_close()
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def run(worker, project, log):
+    started = start_run(worker.socket_path, RUN_ARGS, str(project), str(log))
+    assert started is not None
+    return started
+
+
+class TestPytestWorker:
+    """Tests for runs served by forked children."""
+
+    def test_pass_and_fail(self, worker, project, tmp_path):
+        log = tmp_path / "run.log"
+        assert run(worker, project, log).wait(timeout=30) == 0
+        assert "1 passed" in log.read_text()
+
+        # Project modules are imported fresh by every run
+        (project / "mod.py").write_text("VALUE = 2\nSLEEP = 0\n")
+        assert run(worker, project, log).wait(timeout=30) == 1
+        assert "1 failed" in log.read_text()
+
+    def test_cancel(self, worker, project, tmp_path):
+        (project / "mod.py").write_text("VALUE = 1\nSLEEP = 30\n")
+        started = run(worker, project, tmp_path / "run.log")
+        with pytest.raises(subprocess.TimeoutExpired):
+            started.wait(timeout=0.2)
+
+        os.killpg(started.pid, signal.SIGTERM)
+        assert started.wait(timeout=10) < 0
+
+    def test_project_lib_package(self, worker, project, tmp_path):
+        """A project's own top-level lib package isn't shadowed by the devkit's."""
+        (project / "lib").mkdir()
+        (project / "lib" / "__init__.py").write_text("")
+        (project / "lib" / "util.py").write_text("X = 1\n")
+        (project / "test_lib.py").write_text(
+            "from lib.util import X\n\ndef test_x():\n    assert X == 1\n"
+        )
+        log = tmp_path / "run.log"
+        started = start_run(worker.socket_path, ["-q", "-p", "no:cacheprovider", "test_lib.py"],
+                            str(project), str(log))
+        assert started.wait(timeout=30) == 0, log.read_text()
+        assert "1 passed" in log.read_text()
+        assert "lib.core.pytest_worker" in sys.modules  # Only the child unloads
+
+    def test_conftest_change_stops_worker(self, worker, project, tmp_path):
+        (project / "conftest.py").write_text("import os\n")
+        assert start_run(worker.socket_path, RUN_ARGS, str(project),
+                         str(tmp_path / "run.log")) is None
+        assert worker.stale
+
+    def test_environment_change(self, worker, project, tmp_path, monkeypatch):
+        monkeypatch.setenv("VIRTUAL_ENV", str(tmp_path / "other-venv"))
+        assert start_run(worker.socket_path, RUN_ARGS, str(project),
+                         str(tmp_path / "run.log")) is None
+
+    def test_no_worker(self, project, tmp_path):
+        assert start_run(tmp_path / "none.sock", RUN_ARGS, str(project),
+                         str(tmp_path / "run.log")) is None
+
+
+class TestWarmState:
+    """Tests for what the worker preloads and watches."""
+
+    def test_third_party_imports(self, project):
+        (project / "extra.py").write_text("import pytest\nimport mod\nimport not_installed_xyz\n")
+        assert third_party_imports(str(project)) == ["json", "pytest", "time"]
+
+    def test_fingerprint_tracks_manifests(self, project):
+        before = environment_fingerprint(str(project))
+        assert environment_fingerprint(str(project)) == before
+        (project / "requirements.txt").write_text("requests\n")
+        assert environment_fingerprint(str(project)) != before
+
+    def test_find_pytest_python(self):
+        assert os.path.exists(find_pytest_python())
+
+    def test_script_python(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PATH", os.path.dirname(sys.executable))
+        direct = tmp_path / "direct"
+        direct.write_text(f"#!{sys.executable}\nimport tool\n")
+        via_env = tmp_path / "via_env"
+        via_env.write_text(f"#!/usr/bin/env {os.path.basename(sys.executable)}\n")
+        shell = tmp_path / "shell"
+        shell.write_text("#!/bin/sh\nexec tool\n")
+
+        assert script_python(str(direct)) == sys.executable
+        assert script_python(str(via_env)) == sys.executable
+        assert script_python(str(shell)) is None
+        assert script_python(str(tmp_path / "missing")) is None
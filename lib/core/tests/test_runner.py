@@ -0,0 +1,142 @@
+"""Tests for lib.core.runner module."""
+
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.cache import FileLock
+from lib.core.runner import RunRequest, build_command, coalesce, get_runner
+
+
+def python_command(code):
+    return {"side_effect": lambda kind, targets: [sys.executable, "-c", code]}
+
+
+@pytest.fixture
+def runner(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    return get_runner(str(project), quiet_ms=50, timeout=10)
+
+
+class TestCoalesce:
+    """Tests for merging queued requests."""
+
+    def test_pytest_targets_are_unioned(self):
+        runs = coalesce([
+            RunRequest("pytest", "a.py", ["tests/test_a.py"]),
+            RunRequest("pytest", "b.py", ["tests/test_b.py", "tests/test_a.py"]),
+            RunRequest("pytest", "a.py", ["tests/test_a.py"]),
+        ])
+        assert len(runs) == 1
+        assert runs[0].targets == ["tests/test_a.py", "tests/test_b.py"]
+        assert runs[0].files == ["a.py", "b.py"]
+
+    def test_whole_suite_wins(self):
+        runs = coalesce([
+            RunRequest("pytest", "a.py", ["tests/test_a.py"]),
+            RunRequest("pytest", "setup.py", None),
+            RunRequest("pytest", "b.py", ["tests/test_b.py"]),
+        ])
+        assert runs[0].targets is None
+        assert build_command("pytest", runs[0].targets) == ["pytest", "-x", "-q", "--tb=short"]
+
+    def test_one_run_per_tool(self):
+        runs = coalesce([
+            RunRequest("jest", "src/a.ts"),
+            RunRequest("pytest", "a.py", ["tests/test_a.py"]),
+            RunRequest("jest", "src/b.ts"),
+        ])
+        assert [run.kind for run in runs] == ["jest", "pytest"]
+        assert build_command("jest", runs[0].targets)[-2:] == ["src/a.ts", "src/b.ts"]
+
+
+class TestBackgroundRunner:
+    """Tests for the runner loop, run in-process."""
+
+    def test_burst_is_one_run(self, runner):
+        for name in ("a.py", "b.py", "c.py"):
+            runner.submit(RunRequest("pytest", name, [f"tests/test_{name}"]))
+
+        with patch("lib.core.runner.build_command", **python_command("print('ok')")) as build:
+            runner.run()
+
+        build.assert_called_once_with(
+            "pytest", ["tests/test_a.py", "tests/test_b.py", "tests/test_c.py"]
+        )
+        result = runner.take_result()
+        assert result.ok
+        assert result.files == ["a.py", "b.py", "c.py"]
+        assert result.output == "ok"
+        # Reported once; status.json keeps it
+        assert runner.take_result() is None
+        assert runner.read_status().reported
+        assert not runner.is_running()
+
+    def test_failure_output(self, runner):
+        runner.submit(RunRequest("pytest", "a.py", None))
+        code = "import sys; print('1 failed'); sys.exit(1)"
+        with patch("lib.core.runner.build_command", **python_command(code)):
+            runner.run()
+
+        result = runner.take_result()
+        assert result.state == "failed"
+        assert "1 failed" in result.output
+
+    def test_superseded_run_is_cancelled(self, runner):
+        """A newer edit kills the running batch; its files run again with the new one."""
+        commands = []
+
+        def build(kind, targets):
+            commands.append(list(targets))
+            if len(commands) == 1:
+                return [sys.executable, "-c", "import time; time.sleep(30)"]
+            return [sys.executable, "-c", "pass"]
+
+        runner.submit(RunRequest("pytest", "a.py", ["tests/test_a.py"]))
+        with patch("lib.core.runner.build_command", build):
+            thread = threading.Thread(target=runner.run)
+            start = time.monotonic()
+            thread.start()
+            while runner.read_status() is None:
+                time.sleep(0.01)
+            assert runner.take_result() is None  # Still running
+            runner.submit(RunRequest("pytest", "b.py", ["tests/test_b.py"]))
+            thread.join(timeout=10)
+
+        assert time.monotonic() - start < 10
+        assert commands == [["tests/test_a.py"], ["tests/test_a.py", "tests/test_b.py"]]
+        result = runner.take_result()
+        assert result.ok
+        assert result.files == ["a.py", "b.py"]
+
+    def test_timeout(self, runner):
+        runner.timeout = 0.2
+        runner.submit(RunRequest("pytest", "a.py", None))
+        with patch("lib.core.runner.build_command",
+                   **python_command("import time; time.sleep(30)")):
+            runner.run()
+        assert runner.take_result().state == "timeout"
+
+    def test_second_runner_exits(self, runner):
+        runner.submit(RunRequest("pytest", "a.py", None))
+        lock = FileLock(runner.directory / "runner.lock", nonblocking=True)
+        assert lock.acquire()
+        try:
+            assert runner.is_running()
+            assert not runner.spawn()
+            with patch("lib.core.runner.build_command") as build:
+                runner.run()
+            build.assert_not_called()
+        finally:
+            lock.release()
+
+    def test_disabled_without_cache(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        assert get_runner() is None
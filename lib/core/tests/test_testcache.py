@@ -0,0 +1,180 @@
+"""Tests for lib.core.testcache module."""
+
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.git.repo import clear_repositories
+from lib.core.impact import analyze_impact, build_import_graph
+from lib.core.runner import RunRequest, get_runner
+from lib.core.testcache import get_cached_result, get_result_cache, record_result, result_key
+
+PROJECT = {
+    "app/__init__.py": "",
+    "app/core.py": "from app import util\nVALUE = 1\n",
+    "app/util.py": "X = 1\n",
+    "app/other.py": "Y = 1\n",
+    "tests/conftest.py": "",
+    "tests/test_core.py": "from app import core\n",
+}
+
+COMMAND = ["pytest", "-x", "-q", "--tb=short", "tests/test_core.py"]
+
+
+@pytest.fixture
+def project(git_repo, monkeypatch):
+    for path, content in PROJECT.items():
+        (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / path).write_text(content)
+    monkeypatch.chdir(git_repo)
+    clear_repositories()
+    yield git_repo
+    clear_repositories()
+
+
+def key_for(project, file="app/core.py", tests=("tests/test_core.py",)):
+    graph = build_import_graph(str(project))
+    return result_key(graph, file, list(tests), COMMAND)
+
+
+class TestResultKey:
+    """Tests for content-based result keys."""
+
+    def test_stable_and_revertible(self, project):
+        key = key_for(project)
+        assert key_for(project) == key
+
+        core = project / "app" / "core.py"
+        core.write_text("from app import util\nVALUE = 2\n")
+        assert key_for(project) != key
+        core.write_text(PROJECT["app/core.py"])
+        assert key_for(project) == key
+
+    @pytest.mark.parametrize("path", ["app/util.py", "app/__init__.py", "tests/test_core.py",
+                                      "tests/conftest.py"])
+    def test_inputs_change_key(self, project, path):
+        """Transitive imports, packages, tests and conftest files are all inputs."""
+        key = key_for(project)
+        (project / path).write_text("Z = 1\n")
+        assert key_for(project) != key
+
+    def test_unrelated_files_dont_change_key(self, project):
+        key = key_for(project)
+        (project / "app" / "other.py").write_text("Y = 2\n")
+        (project / "a.txt").write_text("changed\n")
+        assert key_for(project) == key
+
+    def test_config_and_command(self, project):
+        key = key_for(project)
+        graph = build_import_graph(str(project))
+        assert result_key(graph, "app/core.py", ["tests/test_core.py"], COMMAND[:-1]) != key
+        (project / "pytest.ini").write_text("[pytest]\n")
+        assert key_for(project) != key
+
+    def test_environment(self, project, monkeypatch):
+        """Installed packages and dependency manifests are inputs."""
+        key = key_for(project)
+        monkeypatch.setattr("lib.core.pytest_worker._site_dirs",
+                            lambda: [str(project / "site-packages")])
+        assert key_for(project) != key
+
+        key = key_for(project)
+        (project / "requirements.txt").write_text("requests\n")
+        assert key_for(project) != key
+
+    def test_unknown_files(self, project):
+        assert key_for(project, file="missing.py") is None
+        assert key_for(project, tests=["tests/test_missing.py"]) is None
+
+    def test_matches_impact(self, project):
+        impact = analyze_impact(str(project / "app" / "util.py"))
+        assert impact.tests == ["tests/test_core.py"]
+        assert result_key(impact.graph, impact.file, impact.paths, COMMAND) == key_for(
+            project, file="app/util.py"
+        )
+
+
+class TestResultCache:
+    """Tests for recording and evicting results."""
+
+    def test_roundtrip(self):
+        assert get_cached_result("k") is None
+        record_result("k", False, "1 failed")
+        cached = get_cached_result("k")
+        assert not cached.passed
+        assert cached.output == "1 failed"
+
+    def test_lru_eviction(self):
+        cache = get_result_cache(max_bytes=2000)
+        for i in range(20):
+            record_result(f"key{i}", True, "x" * 200, cache=cache)
+        assert cache.size() <= 2000
+        assert get_cached_result("key19", cache=cache) is not None
+        assert get_cached_result("key0", cache=cache) is None
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_DEVKIT_NO_CACHE", "1")
+        record_result("k", True)
+        assert get_cached_result("k") is None
+
+
+class TestRunnerRecording:
+    """Tests for outcomes recorded by the background runner."""
+
+    def build(self, code):
+        return lambda kind, targets: [sys.executable, "-c", code]
+
+    def submit(self, runner, project, file):
+        tests = [str(project / "tests" / "test_core.py")]
+        runner.submit(RunRequest("pytest", str(project / file), tests))
+        return tests
+
+    def key(self, project, file, tests, build):
+        graph = build_import_graph(str(project))
+        return result_key(graph, file, tests, build("pytest", tests))
+
+    def test_pass_recorded_for_each_request(self, project):
+        runner = get_runner(str(project), quiet_ms=0)
+        build = self.build("pass")
+        tests = self.submit(runner, project, "app/core.py")
+        self.submit(runner, project, "app/util.py")
+        with patch("lib.core.runner.build_command", side_effect=build):
+            runner.run()
+
+        for file in ("app/core.py", "app/util.py"):
+            assert get_cached_result(self.key(project, file, tests, build)).passed
+
+    def test_failure_recorded(self, project):
+        runner = get_runner(str(project), quiet_ms=0)
+        build = self.build("import sys; print('1 failed'); sys.exit(1)")
+        tests = self.submit(runner, project, "app/core.py")
+        with patch("lib.core.runner.build_command", side_effect=build):
+            runner.run()
+
+        cached = get_cached_result(self.key(project, "app/core.py", tests, build))
+        assert not cached.passed
+        assert "1 failed" in cached.output
+
+    @pytest.mark.parametrize("code", [2, 4, 5])
+    def test_errors_not_recorded(self, project, code):
+        """Interrupted runs, usage errors and empty collections aren't outcomes."""
+        runner = get_runner(str(project), quiet_ms=0)
+        build = self.build(f"import sys; sys.exit({code})")
+        tests = self.submit(runner, project, "app/core.py")
+        with patch("lib.core.runner.build_command", side_effect=build):
+            runner.run()
+
+        assert runner.take_result().state == "failed"
+        assert get_cached_result(self.key(project, "app/core.py", tests, build)) is None
+
+    def test_disabled(self, project):
+        runner = get_runner(str(project), quiet_ms=0, result_cache=False)
+        build = self.build("pass")
+        tests = self.submit(runner, project, "app/core.py")
+        with patch("lib.core.runner.build_command", side_effect=build):
+            runner.run()
+        assert get_cached_result(self.key(project, "app/core.py", tests, build)) is None
@@ -0,0 +1,157 @@
+"""Tests for lib.core.testmap module."""
+
+import pytest
+from unittest.mock import patch
+
+# Add parent path for imports
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from lib.core.git.cache import clear_fingerprints
+from lib.core.git.repo import clear_repositories
+from lib.core.testmap import (
+    SourceTestIndex,
+    load_test_index,
+    record_test_file,
+    source_key,
+    source_key_for_test,
+)
+from lib.core.tests.conftest import git
+
+
+@pytest.fixture
+def monorepo(git_repo, monkeypatch):
+    files = [
+        "packages/api/src/util.py",
+        "packages/api/tests/test_util.py",
+        "packages/web/src/util.ts",
+        "packages/web/src/__tests__/util.tsx",
+        "packages/web/src/button.tsx",
+        "packages/web/src/button.spec.ts",
+        "tests/test_util.py",
+        "tools/lint_test.py",
+    ]
+    for path in files:
+        (git_repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (git_repo / path).write_text("x\n")
+    git(git_repo, "add", "-A")
+    git(git_repo, "commit", "-qm", "monorepo")
+    monkeypatch.chdir(git_repo)
+    clear_repositories()
+    clear_fingerprints()
+    yield git_repo
+    clear_repositories()
+    clear_fingerprints()
+
+
+class TestKeys:
+    """Tests for recognizing test files."""
+
+    @pytest.mark.parametrize("path,key", [
+        ("tests/test_util.py", ("py", "util")),
+        ("pkg/util_test.py", ("py", "util")),
+        ("src/a.test.ts", ("js", "a")),
+        ("src/a.spec.jsx", ("js", "a")),
+        ("src/__tests__/a.tsx", ("js", "a")),
+        ("src/test_.py", None),
+        ("src/util.py", None),
+        ("README.md", None),
+    ])
+    def test_source_key_for_test(self, path, key):
+        assert source_key_for_test(path) == key
+
+    def test_source_key(self):
+        assert source_key("/abs/src/util.tsx") == ("js", "util")
+        assert source_key("notes.txt") is None
+
+
+class TestSourceTestIndex:
+    """Tests for lookups."""
+
+    def test_nearest_test_wins(self, monorepo):
+        index = load_test_index()
+        root = str(monorepo)
+        assert index.find(f"{root}/packages/api/src/util.py") == [
+            f"{root}/packages/api/tests/test_util.py",
+            f"{root}/tests/test_util.py",
+        ]
+        assert index.find("packages/web/src/util.ts") == [
+            f"{root}/packages/web/src/__tests__/util.tsx"
+        ]
+        assert index.find("packages/web/src/button.tsx") == [
+            f"{root}/packages/web/src/button.spec.ts"
+        ]
+        assert index.find("tools/lint.py") == [f"{root}/tools/lint_test.py"]
+        assert index.find("packages/api/src/other.py") == []
+
+    def test_other_packages_tests_ignored(self):
+        index = SourceTestIndex.from_paths("/r", [
+            "pkg_b/tests/test_utils.py",
+            "pkg_b/__tests__/index.test.ts",
+            "tests/pkg_b/test_utils.py",
+            "pkg_a/sub/test_utils.py",
+        ])
+        with patch("os.path.exists", return_value=True):
+            assert index.find("pkg_a/utils.py") == []
+            assert index.find("pkg_a/index.ts") == []
+
+    @pytest.mark.parametrize("test_path", [
+        "pkg_a/utils.test.ts",
+        "pkg_a/__tests__/utils.test.ts",
+        "pkg_a/tests/unit/utils.test.ts",
+        "__tests__/utils.test.ts",
+        "tests/pkg_a/utils.test.ts",
+        "tests/unit/pkg_a/utils.test.ts",
+    ])
+    def test_package_and_ancestor_test_dirs(self, test_path):
+        index = SourceTestIndex.from_paths("/r", [test_path])
+        with patch("os.path.exists", return_value=True):
+            assert index.find("pkg_a/utils.ts") == [f"/r/{test_path}"]
+            assert index.find("src/pkg_a/utils.ts") == (
+                [] if test_path.startswith("pkg_a/") else [f"/r/{test_path}"]
+            )
+
+    def test_deleted_tests_skipped(self, monorepo):
+        (monorepo / "tests" / "test_util.py").unlink()
+        index = load_test_index()
+        assert index.find("packages/api/src/util.py") == [
+            str(monorepo / "packages/api/tests/test_util.py")
+        ]
+
+    def test_cached_until_index_changes(self, monorepo):
+        load_test_index()
+        with patch("lib.core.testmap._list_files") as mock_list:
+            index = load_test_index()
+        mock_list.assert_not_called()
+        assert index.find("packages/web/src/button.tsx")
+
+        (monorepo / "new_test.py").write_text("x\n")
+        git(monorepo, "add", "new_test.py")
+        clear_fingerprints()
+        assert load_test_index().find("new.py") == [str(monorepo / "new_test.py")]
+
+    def test_record_written_test(self, monorepo):
+        load_test_index()
+        written = monorepo / "packages" / "api" / "tests" / "test_fresh.py"
+        written.write_text("x\n")
+        assert record_test_file(str(written))
+        assert not record_test_file(str(monorepo / "src" / "fresh.py"))
+
+        with patch("lib.core.testmap._list_files") as mock_list:
+            index = load_test_index()
+        mock_list.assert_not_called()
+        assert index.find("packages/api/src/fresh.py") == [str(written)]
+
+    def test_untracked_tests_listed(self, monorepo):
+        (monorepo / "test_loose.py").write_text("x\n")
+        assert load_test_index().find("loose.py") == [str(monorepo / "test_loose.py")]
+
+    def test_outside_repository(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        clear_repositories()
+        assert load_test_index() is None
+
+    def test_from_paths(self):
+        index = SourceTestIndex.from_paths("/r", ["a/test_x.py", "a/x.py", "a/test_x.py"])
+        assert index.tests == {("py", "x"): ["a/test_x.py"]}